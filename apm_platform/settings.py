@@ -327,12 +327,112 @@ REST_FRAMEWORK = {
     "PAGE_SIZE": int(os.environ.get("DRF_PAGE_SIZE", "50")),
     "TEST_REQUEST_DEFAULT_FORMAT": "json",
 }
+# /api/requests/ list pagination: "page" (count + OFFSET) or "cursor" (keyset on time, id).
+# Per request: ?pagination=page|cursor
+APM_LIST_PAGINATION = _env("APM_LIST_PAGINATION", "page").lower()
+# Page-mode list and admin changelist counts: planner/approximate_row_count estimates,
+# switching to an exact COUNT(*) when the estimate is below EXACT_THRESHOLD rows.
+APM_COUNT_ESTIMATES = _env_bool("APM_COUNT_ESTIMATES", True)
+APM_COUNT_EXACT_THRESHOLD = int(_env("APM_COUNT_EXACT_THRESHOLD", "10000"))
+# /api/requests/export/: rows fetched per server-side cursor round trip (?batch_size= overrides).
+APM_EXPORT_BATCH_SIZE = int(_env("APM_EXPORT_BATCH_SIZE", "5000"))
 
 # --- APM ingestion defaults (Step 2) ---
 # Used by /api/requests/ingest/ (can be overridden via query params)
 APM_INGEST_BATCH_SIZE = 1000  # bulk_create batch size
 APM_INGEST_MAX_EVENTS = 50_000  # max number of events accepted per request
 APM_INGEST_MAX_ERRORS = 25  # max number of per-item error details returned
+# Content-Encoding gzip/zstd bodies: decompressed size cap = MAX_EVENTS x MAX_EVENT_BYTES
+APM_INGEST_MAX_EVENT_BYTES = int(_env("APM_INGEST_MAX_EVENT_BYTES", "4096"))
+# Column-wise batch validator; False => one DRF serializer per event (reference path)
+APM_INGEST_FAST_VALIDATION = _env_bool("APM_INGEST_FAST_VALIDATION", True)
+# Shard validation of large payloads over a process pool (0/1 worker = disabled).
+# Auto for JSON bodies >= THRESHOLD events; per request override: ?parallel=true|false
+APM_INGEST_VALIDATION_WORKERS = int(_env("APM_INGEST_VALIDATION_WORKERS", "0"))
+APM_INGEST_PARALLEL_THRESHOLD = int(_env("APM_INGEST_PARALLEL_THRESHOLD", "20000"))
+APM_INGEST_PARALLEL_SHARD_SIZE = int(_env("APM_INGEST_PARALLEL_SHARD_SIZE", "5000"))
+# Validated chunks allowed to queue ahead of the writer (pipelined ingest).
+APM_INGEST_PIPELINE_DEPTH = int(_env("APM_INGEST_PIPELINE_DEPTH", "2"))
+# Bulk writer on PostgreSQL: binary | text COPY, or "off" to force bulk_create
+APM_INGEST_COPY_FORMAT = _env("APM_INGEST_COPY_FORMAT", "binary").lower()
+# In-process LRU of (service, endpoint, method) -> dimension id used by the bulk writer
+APM_INGEST_DIM_CACHE_SIZE = int(_env("APM_INGEST_DIM_CACHE_SIZE", "100000"))
+# Endpoint templating at ingest: RULES is a JSON list of [regex, replacement], TEMPLATES a
+# JSON object {service or "*": ["/orders/{id}", ...]}; numbers/UUIDs/hex ids become {id}/
+# {uuid}/{hex}. MAX_PER_SERVICE (0 = off) folds further new endpoints into "__other__"; the
+# endpoints already in the dimension table count, so the cap holds across workers/restarts.
+APM_INGEST_ENDPOINT_NORMALIZE = _env_bool("APM_INGEST_ENDPOINT_NORMALIZE", False)
+APM_INGEST_ENDPOINT_RULES = _env("APM_INGEST_ENDPOINT_RULES", "")
+APM_INGEST_ENDPOINT_TEMPLATES = _env("APM_INGEST_ENDPOINT_TEMPLATES", "")
+APM_INGEST_ENDPOINT_DETECT_SEGMENTS = _env_bool("APM_INGEST_ENDPOINT_DETECT_SEGMENTS", True)
+APM_INGEST_ENDPOINT_MAX_PER_SERVICE = int(_env("APM_INGEST_ENDPOINT_MAX_PER_SERVICE", "0"))
+APM_INGEST_ENDPOINT_KEEP_RAW = _env_bool("APM_INGEST_ENDPOINT_KEEP_RAW", False)  # tags[RAW_TAG]
+APM_INGEST_ENDPOINT_RAW_TAG = _env("APM_INGEST_ENDPOINT_RAW_TAG", "raw_endpoint")
+# Write-behind mode: validate, queue in-process, answer 202; a flusher thread does the inserts.
+# Per request override: ?async=true|false
+APM_INGEST_ASYNC = _env_bool("APM_INGEST_ASYNC", False)
+APM_INGEST_BUFFER_MAX_ROWS = int(_env("APM_INGEST_BUFFER_MAX_ROWS", "200000"))  # per worker
+APM_INGEST_BUFFER_FLUSH_ROWS = int(_env("APM_INGEST_BUFFER_FLUSH_ROWS", "20000"))  # size trigger
+APM_INGEST_BUFFER_FLUSH_INTERVAL = float(_env("APM_INGEST_BUFFER_FLUSH_INTERVAL", "1.0"))  # secs
+# Buffer full: "block" waits up to BLOCK_TIMEOUT seconds for room, "drop" refuses at once (503)
+APM_INGEST_BUFFER_POLICY = _env("APM_INGEST_BUFFER_POLICY", "block").lower()
+APM_INGEST_BUFFER_BLOCK_TIMEOUT = float(_env("APM_INGEST_BUFFER_BLOCK_TIMEOUT", "5.0"))
+# Idempotency-Key ledger: cache alias, replay TTL, in-flight claim TTL. The alias must be shared
+# by all workers (no CACHES are configured here: "default" is a per-process LocMemCache, which
+# `manage.py check` reports as observability.W001).
+APM_INGEST_IDEMPOTENCY_CACHE = _env("APM_INGEST_IDEMPOTENCY_CACHE", "default")
+APM_INGEST_IDEMPOTENCY_TTL = int(_env("APM_INGEST_IDEMPOTENCY_TTL", "86400"))
+APM_INGEST_IDEMPOTENCY_PENDING_TTL = int(_env("APM_INGEST_IDEMPOTENCY_PENDING_TTL", "300"))
+# Per-worker Bloom filter dropping re-sent events by (trace_id, time, endpoint)
+APM_INGEST_DEDUP = _env_bool("APM_INGEST_DEDUP", False)
+APM_INGEST_DEDUP_WINDOW_SECONDS = int(_env("APM_INGEST_DEDUP_WINDOW_SECONDS", "600"))
+APM_INGEST_DEDUP_CAPACITY = int(_env("APM_INGEST_DEDUP_CAPACITY", "1000000"))  # per window
+APM_INGEST_DEDUP_ERROR_RATE = float(_env("APM_INGEST_DEDUP_ERROR_RATE", "0.001"))
+# Token-bucket admission control in events/sec (0 = unlimited); over the limit -> 429.
+# SERVICES overrides the per-service default, e.g. "billing=5000,search=200".
+APM_INGEST_RATE_LIMIT = _env_bool("APM_INGEST_RATE_LIMIT", False)
+APM_INGEST_RATE_GLOBAL = float(_env("APM_INGEST_RATE_GLOBAL", "0"))
+APM_INGEST_RATE_PER_SERVICE = float(_env("APM_INGEST_RATE_PER_SERVICE", "0"))
+APM_INGEST_RATE_SERVICES = _env("APM_INGEST_RATE_SERVICES", "")
+APM_INGEST_RATE_BURST_SECONDS = float(_env("APM_INGEST_RATE_BURST_SECONDS", "2.0"))
+# "sqlite" shares the buckets between workers on the host (file at PATH, default in tmp)
+APM_INGEST_RATE_LIMIT_STORE = _env("APM_INGEST_RATE_LIMIT_STORE", "sqlite").lower()
+APM_INGEST_RATE_LIMIT_PATH = _env("APM_INGEST_RATE_LIMIT_PATH", "")
+# Local disk spool: rows whose write fails (or exceeds WRITE_TIMEOUT_MS, PostgreSQL) are
+# appended here and replayed by a background thread; see `manage.py ingest_spool`.
+APM_INGEST_SPOOL = _env_bool("APM_INGEST_SPOOL", False)
+APM_INGEST_SPOOL_DIR = _env("APM_INGEST_SPOOL_DIR", "")  # default: <tmp>/apm-ingest-spool
+APM_INGEST_SPOOL_SEGMENT_BYTES = int(_env("APM_INGEST_SPOOL_SEGMENT_BYTES", str(64 * 1024 * 1024)))
+APM_INGEST_SPOOL_SEGMENT_SECONDS = float(_env("APM_INGEST_SPOOL_SEGMENT_SECONDS", "60"))
+APM_INGEST_SPOOL_FSYNC = _env_bool("APM_INGEST_SPOOL_FSYNC", True)
+APM_INGEST_SPOOL_WRITE_TIMEOUT_MS = int(_env("APM_INGEST_SPOOL_WRITE_TIMEOUT_MS", "0"))
+APM_INGEST_SPOOL_REPLAY_INTERVAL = float(_env("APM_INGEST_SPOOL_REPLAY_INTERVAL", "5.0"))
+
+# --- Analytics query planning ---
+# Cost model picking raw/minute/hourly/daily per span of a stitched KPI/top-endpoints range
+# from table statistics (TimescaleDB row estimates, chunk ranges, dimension selectivity).
+# Statistics are cached per worker for STATS_TTL seconds.
+APM_ANALYTICS_COST_MODEL = _env_bool("APM_ANALYTICS_COST_MODEL", True)
+APM_ANALYTICS_STATS_TTL_SECONDS = float(_env("APM_ANALYTICS_STATS_TTL_SECONDS", "300"))
+# Result cache for kpis/top-endpoints/hourly/daily/timeseries. The alias must be shared by all
+# workers and the refresh_apirequest_* commands (observability.W002 flags a per-process one).
+# Rollup ranges ending in an open bucket live OPEN_TTL seconds, closed ones CLOSED_TTL; results
+# reading raw rows always OPEN_TTL. CAGG refreshes invalidate. Bypass: Cache-Control: no-cache
+APM_ANALYTICS_CACHE = _env_bool("APM_ANALYTICS_CACHE", False)
+APM_ANALYTICS_CACHE_ALIAS = _env("APM_ANALYTICS_CACHE_ALIAS", "default")
+APM_ANALYTICS_CACHE_OPEN_TTL_SECONDS = float(_env("APM_ANALYTICS_CACHE_OPEN_TTL_SECONDS", "5"))
+APM_ANALYTICS_CACHE_CLOSED_TTL_SECONDS = float(
+    _env("APM_ANALYTICS_CACHE_CLOSED_TTL_SECONDS", "3600")
+)
+# Identical concurrent analytics queries (SQL + params) share one execution per worker; with
+# SHARED, workers on the host coordinate through lock/result files in SINGLEFLIGHT_DIR (created
+# 0700; a directory owned by another user is refused and coalescing stays per worker).
+APM_ANALYTICS_SINGLEFLIGHT = _env_bool("APM_ANALYTICS_SINGLEFLIGHT", True)
+APM_ANALYTICS_SINGLEFLIGHT_SHARED = _env_bool("APM_ANALYTICS_SINGLEFLIGHT_SHARED", True)
+APM_ANALYTICS_SINGLEFLIGHT_DIR = _env("APM_ANALYTICS_SINGLEFLIGHT_DIR", "")  # <tmp>/apm-analytics-*
+APM_ANALYTICS_SINGLEFLIGHT_TIMEOUT = float(_env("APM_ANALYTICS_SINGLEFLIGHT_TIMEOUT", "30"))
+# /api/requests/timeseries/: most buckets one response may hold (range / step).
+APM_TIMESERIES_MAX_POINTS = int(_env("APM_TIMESERIES_MAX_POINTS", "5000"))
 
 # SSL/HTTPS Security Settings
 # Enable SSL redirect when nginx with SSL is available (production or local with nginx)
@@ -1,6 +1,7 @@
 # observability/admin.py
 from django.contrib import admin
 
+from .counting import EstimatedCountPaginator
 from .models import ApiRequest, ApiRequestEmbedding
 
 
@@ -34,6 +35,9 @@ class ApiRequestAdmin(admin.ModelAdmin):
     # Performance on big tables
     list_select_related = ()
     list_per_page = 50
+    # Estimated counts above APM_COUNT_EXACT_THRESHOLD, and no second unfiltered COUNT(*)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 @admin.register(ApiRequestEmbedding)
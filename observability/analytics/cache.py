@@ -0,0 +1,286 @@
+# observability/analytics/cache.py
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DatabaseError, connection, transaction
+
+from ..checks import cache_is_process_local
+from .planner import QueryPlan, _ceil, _floor
+from .sql import DIM_CAGGS, LATENCY_CAGGS, AnalyticsFilters
+
+CACHE_STATUS_HEADER = "Analytics-Cache"  # response: hit | miss | bypass
+BYPASS_DIRECTIVES = ("no-cache", "no-store")  # request Cache-Control => skip the cache
+
+HIT = "hit"
+MISS = "miss"
+BYPASS = "bypass"
+
+# Width of the bucket a range ends in, per source: a rollup range ending before
+# the start of the open bucket is closed (only a CAGG refresh changes it). Raw
+# ranges never are: see ResultCache.ttl().
+BUCKET_WIDTHS: dict[str, timedelta] = {
+    "raw": timedelta(minutes=1),
+    "minute": timedelta(minutes=1),
+    "hourly": timedelta(hours=1),
+    "daily": timedelta(days=1),
+}
+
+DEFAULT_OPEN_TTL_SECONDS = 5.0
+DEFAULT_CLOSED_TTL_SECONDS = 3600.0
+
+# Last successful run of each continuous aggregate's refresh policy.
+_WATERMARK_SQL = """
+SELECT ca.user_view_name, MAX(js.last_successful_finish)
+FROM _timescaledb_catalog.continuous_agg ca
+JOIN timescaledb_information.jobs j
+  ON j.proc_name = 'policy_refresh_continuous_aggregate'
+ AND (j.config ->> 'mat_hypertable_id')::integer = ca.mat_hypertable_id
+LEFT JOIN timescaledb_information.job_stats js ON js.job_id = j.job_id
+GROUP BY ca.user_view_name
+"""
+
+
+# ----------------------------
+# Key normalization
+# ----------------------------
+def rollup_views(sources: Iterable[str]) -> list[str]:
+    """Continuous aggregates read for the given sources (raw reads none)."""
+    views: set[str] = set()
+    for source in sources:
+        if source in DIM_CAGGS:
+            views.update((DIM_CAGGS[source], LATENCY_CAGGS[source]))
+    return sorted(views)
+
+
+def snap_range(start: datetime, end: datetime, source: str) -> tuple[datetime, datetime]:
+    """
+    Range equivalent to [start, end] on a rollup (bucket >= start AND bucket <= end
+    only sees aligned buckets); raw ranges are returned as-is.
+    """
+    if source not in DIM_CAGGS:
+        return start, end
+    width = BUCKET_WIDTHS[source]
+    return _ceil(start, width), _floor(end, width)
+
+
+def cache_parts(
+    filters: AnalyticsFilters,
+    *,
+    source: str,
+    plan: QueryPlan | None = None,
+    **options: Any,
+) -> dict[str, Any]:
+    """
+    Cache key material: the name filters (empty == absent), the source, the
+    range snapped to bucket boundaries (or the plan's spans, which already are)
+    and the endpoint's other options.
+    """
+    parts: dict[str, Any] = {
+        "source": source,
+        "service": filters.service or None,
+        "endpoint": filters.endpoint or None,
+        "method": filters.method or None,
+        **options,
+    }
+    if plan is not None:
+        parts["spans"] = [(s.source, s.start, s.end) for s in plan.spans]
+    elif filters.start is not None and filters.end is not None:
+        parts["range"] = snap_range(filters.start, filters.end, source)
+    else:
+        parts["range"] = (filters.start, filters.end)
+    return parts
+
+
+def plan_ttl_source(plan: QueryPlan | None, source: str) -> str:
+    """Source deciding a result's TTL: "raw" if any span reads raw rows, else the last span's."""
+    if plan is None:
+        return source
+    if any(span.source == "raw" for span in plan.spans):
+        return "raw"
+    return plan.spans[-1].source if plan.spans else source
+
+
+def bypass_requested(headers: Mapping[str, str]) -> bool:
+    value = str(headers.get("Cache-Control", "")).lower()
+    return any(directive in value for directive in BYPASS_DIRECTIVES)
+
+
+# ----------------------------
+# Result cache
+# ----------------------------
+@dataclass
+class CacheLookup:
+    """Outcome of ResultCache.lookup(); store() the computed result on a miss."""
+
+    cache: ResultCache
+    status: str  # hit | miss | bypass
+    key: str | None = None
+    data: Any = None
+
+    def store(self, value: Any, *, end: datetime, source: str) -> None:
+        if self.status == MISS and self.key is not None:
+            self.cache.set(self.key, value, ttl=self.cache.ttl(end, source))
+
+
+class ResultCache:
+    """
+    Analytics responses in a (shared) Django cache.
+
+    Keys hash the normalized request (cache_parts) plus the refresh watermarks
+    of every continuous aggregate it reads: when a refresh policy run finishes
+    or a refresh_apirequest_* command bumps its generation, keys change on
+    every worker at once and old entries simply expire. Results whose range
+    ends in an open bucket live `open_ttl` seconds, closed ranges `closed_ttl`.
+    Policy watermarks are read at most once per `open_ttl` per worker.
+
+    Generations live in the cache itself, so bump() from a management command
+    only reaches the web workers when the cache is `shared` between processes.
+    """
+
+    def __init__(
+        self,
+        cache,
+        *,
+        open_ttl: float = DEFAULT_OPEN_TTL_SECONDS,
+        closed_ttl: float = DEFAULT_CLOSED_TTL_SECONDS,
+        prefix: str = "apm:analytics:",
+        shared: bool = True,
+    ):
+        self.cache = cache
+        self.shared = shared
+        self.open_ttl = float(open_ttl)
+        self.closed_ttl = float(closed_ttl)
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._policy_marks: tuple[float, dict[str, str]] | None = None
+
+    # ---- watermarks
+    def _generation_key(self, view: str) -> str:
+        return f"{self.prefix}gen:{view}"
+
+    def _policy_watermarks(self) -> dict[str, str]:
+        now = time.monotonic()
+        with self._lock:
+            if self._policy_marks is not None and now - self._policy_marks[0] < self.open_ttl:
+                return self._policy_marks[1]
+
+        marks: dict[str, str] = {}
+        if connection.vendor == "postgresql":
+            try:
+                with transaction.atomic(), connection.cursor() as cursor:
+                    cursor.execute(_WATERMARK_SQL)
+                    marks = {view: str(finished) for view, finished in cursor.fetchall()}
+            except DatabaseError:
+                # No TimescaleDB catalog: generations (manual refreshes) only.
+                marks = {}
+        with self._lock:
+            self._policy_marks = (now, marks)
+        return marks
+
+    def watermarks(self, views: Iterable[str]) -> dict[str, list[Any]]:
+        views = list(views)
+        if not views:
+            return {}
+        policy = self._policy_watermarks()
+        generations = self.cache.get_many([self._generation_key(v) for v in views])
+        return {
+            view: [policy.get(view), generations.get(self._generation_key(view), 0)]
+            for view in views
+        }
+
+    def bump(self, views: Iterable[str]) -> None:
+        """Invalidate cached results reading `views` (after a manual refresh)."""
+        for view in views:
+            key = self._generation_key(view)
+            try:
+                self.cache.incr(key)
+            except ValueError:
+                self.cache.add(key, 1, timeout=None)
+
+    # ---- entries
+    def key(self, view: str, parts: Mapping[str, Any], *, sources: Iterable[str]) -> str:
+        payload = json.dumps(
+            {"view": view, "parts": parts, "watermarks": self.watermarks(rollup_views(sources))},
+            sort_keys=True,
+            default=str,
+        )
+        return f"{self.prefix}result:{view}:" + hashlib.sha256(payload.encode()).hexdigest()
+
+    def ttl(self, end: datetime, source: str, *, now: datetime | None = None) -> float:
+        if source == "raw":
+            # No refresh watermark covers raw rows: late ingests and edits must show up.
+            return self.open_ttl
+        now = now or datetime.now(UTC)
+        if end < _floor(now, BUCKET_WIDTHS[source]):
+            return self.closed_ttl
+        return self.open_ttl
+
+    def lookup(
+        self,
+        view: str,
+        parts: Mapping[str, Any],
+        *,
+        sources: Iterable[str],
+        bypass: bool = False,
+    ) -> CacheLookup:
+        if bypass:
+            return CacheLookup(self, BYPASS)
+        key = self.key(view, parts, sources=sources)
+        data = self.get(key)
+        if data is not None:
+            return CacheLookup(self, HIT, key, data)
+        return CacheLookup(self, MISS, key)
+
+    def get(self, key: str) -> Any | None:
+        return self.cache.get(key)
+
+    def set(self, key: str, value: Any, *, ttl: float) -> None:
+        self.cache.set(key, value, timeout=ttl)
+
+    def live_now(self, now: datetime) -> datetime:
+        """`now` for ranges without an explicit end, stepped by open_ttl so polls share keys."""
+        return _floor(now, timedelta(seconds=self.open_ttl)) if self.open_ttl >= 1 else now
+
+
+_result_cache: ResultCache | None = None
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> ResultCache | None:
+    """Process-wide result cache, or None when APM_ANALYTICS_CACHE is off."""
+    global _result_cache
+    if not bool(getattr(settings, "APM_ANALYTICS_CACHE", False)):
+        return None
+    if _result_cache is None:
+        with _result_cache_lock:
+            if _result_cache is None:
+                alias = str(getattr(settings, "APM_ANALYTICS_CACHE_ALIAS", "default"))
+                _result_cache = ResultCache(
+                    caches[alias],
+                    open_ttl=float(
+                        getattr(
+                            settings,
+                            "APM_ANALYTICS_CACHE_OPEN_TTL_SECONDS",
+                            DEFAULT_OPEN_TTL_SECONDS,
+                        )
+                    ),
+                    closed_ttl=float(
+                        getattr(
+                            settings,
+                            "APM_ANALYTICS_CACHE_CLOSED_TTL_SECONDS",
+                            DEFAULT_CLOSED_TTL_SECONDS,
+                        )
+                    ),
+                    shared=not cache_is_process_local(alias),
+                )
+    return _result_cache
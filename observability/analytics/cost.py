@@ -0,0 +1,263 @@
+# observability/analytics/cost.py
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from datetime import UTC, datetime
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+
+from ..metrics import ANALYTICS_PLAN_SPANS
+from .planner import LEVELS, QueryPlan, Span, plan_range
+from .sql import DIM_CAGGS, DIM_TABLE, RAW_TABLE, AnalyticsFilters, TableKind, minute_available
+
+# Relative cost of reading one row (rollup rows carry ~20 status counters).
+ROW_COST: dict[str, float] = {"raw": 1.0, "minute": 1.5, "hourly": 1.5, "daily": 1.5}
+# Fixed cost of one UNION ALL branch (planning, index descent), in raw-row units.
+BRANCH_COST = 200.0
+
+BUCKET_HOURS: dict[str, float] = {"minute": 1 / 60, "hourly": 1.0, "daily": 24.0}
+
+DEFAULT_STATS_TTL_SECONDS = 300.0
+SELECTIVITY_CACHE_SIZE = 1024
+
+
+# ----------------------------
+# Statistics
+# ----------------------------
+@dataclass(frozen=True)
+class TableStatistics:
+    """Rows per hour of the raw hypertable and of each *_dim rollup, plus the dimension count."""
+
+    rows_per_hour: dict[str, float]
+    dims: int
+
+    def density(self, source: str) -> float:
+        raw = self.rows_per_hour.get("raw", 0.0)
+        if source == "raw":
+            return raw
+        measured = self.rows_per_hour.get(source)
+        if measured:
+            return measured
+        # Nothing materialized yet: at most one row per dimension and bucket,
+        # and never more rows than the raw data they summarize.
+        return min(raw, self.dims / BUCKET_HOURS[source])
+
+
+_RAW_STATS_SQL = f"""
+SELECT
+    approximate_row_count('{RAW_TABLE}'::regclass)::double precision,
+    EXTRACT(EPOCH FROM (now() - MIN(time))) / 3600.0
+FROM {RAW_TABLE}
+"""
+
+# Materialized rows of a continuous aggregate over the time its chunks cover.
+_CAGG_STATS_SQL = """
+SELECT
+    approximate_row_count(format('%%I.%%I', ca.materialization_hypertable_schema,
+                                 ca.materialization_hypertable_name)::regclass)::double precision,
+    EXTRACT(EPOCH FROM (LEAST(MAX(ch.range_end), now()) - MIN(ch.range_start))) / 3600.0
+FROM timescaledb_information.continuous_aggregates ca
+LEFT JOIN timescaledb_information.chunks ch
+  ON ch.hypertable_schema = ca.materialization_hypertable_schema
+ AND ch.hypertable_name = ca.materialization_hypertable_name
+WHERE ca.view_name = %s
+GROUP BY ca.materialization_hypertable_schema, ca.materialization_hypertable_name
+"""
+
+
+def _rate(rows: float | None, hours: float | None) -> float:
+    if not rows or not hours or rows <= 0:
+        return 0.0
+    return float(rows) / max(float(hours), 1.0)
+
+
+def collect_statistics() -> TableStatistics:
+    """Row estimates (no table scans) for raw + rollups; raises DatabaseError off TimescaleDB."""
+    with connection.cursor() as cursor:
+        cursor.execute(_RAW_STATS_SQL)
+        rows, hours = cursor.fetchone()
+        rates = {"raw": _rate(rows, hours)}
+        for source, view in DIM_CAGGS.items():
+            cursor.execute(_CAGG_STATS_SQL, [view])
+            row = cursor.fetchone()
+            rates[source] = _rate(*row) if row else 0.0
+        cursor.execute(f"SELECT COUNT(*) FROM {DIM_TABLE}")
+        dims = int(cursor.fetchone()[0])
+    return TableStatistics(rows_per_hour=rates, dims=dims)
+
+
+def dim_selectivity(filters: AnalyticsFilters) -> float:
+    """Share of dimensions matched by the name filters (~ share of rows)."""
+    clauses: list[str] = []
+    params: list[object] = []
+    for column in ("service", "endpoint", "method"):
+        value = getattr(filters, column)
+        if value:
+            clauses.append(f"{column} = %s")
+            params.append(value)
+    if not clauses:
+        return 1.0
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT COUNT(*) FILTER (WHERE {' AND '.join(clauses)}), COUNT(*) FROM {DIM_TABLE}",
+            params,
+        )
+        matched, total = cursor.fetchone()
+    if not total:
+        return 1.0
+    # Never 0: a dimension created after the statistics were cached may still match.
+    return max(int(matched), 1) / int(total)
+
+
+# ----------------------------
+# Cost model
+# ----------------------------
+class CostModel:
+    """
+    Picks the cheapest source for each span of a stitched plan.
+
+    A span aligned to a level can be read from that rollup or from any finer
+    one (minute only inside its retention) or raw rows; the estimate is
+    rows/hour of the source x span hours x filter selectivity, costed per row
+    plus a fixed per-branch overhead. Adjacent spans that end up on the same
+    source are merged into one branch, so the choice is made over the whole
+    plan rather than span by span. Statistics and selectivities are cached
+    for `ttl` seconds (per worker).
+    """
+
+    def __init__(self, *, ttl: float = DEFAULT_STATS_TTL_SECONDS):
+        self.ttl = float(ttl)
+        self._lock = threading.Lock()
+        self._stats: tuple[float, TableStatistics | None] | None = None
+        self._selectivity: OrderedDict[tuple, tuple[float, float]] = OrderedDict()
+
+    def statistics(self) -> TableStatistics | None:
+        now = time.monotonic()
+        with self._lock:
+            if self._stats is not None and now - self._stats[0] < self.ttl:
+                return self._stats[1]
+        try:
+            with transaction.atomic():
+                stats: TableStatistics | None = collect_statistics()
+        except DatabaseError:
+            # No TimescaleDB (or no rollups): remember that too, plans stay as-is.
+            stats = None
+        with self._lock:
+            self._stats = (now, stats)
+        return stats
+
+    def selectivity(self, filters: AnalyticsFilters) -> float:
+        key = (filters.service, filters.endpoint, filters.method)
+        now = time.monotonic()
+        with self._lock:
+            hit = self._selectivity.get(key)
+            if hit is not None and now - hit[0] < self.ttl:
+                self._selectivity.move_to_end(key)
+                return hit[1]
+        try:
+            with transaction.atomic():
+                value = dim_selectivity(filters)
+        except DatabaseError:
+            value = 1.0
+        with self._lock:
+            self._selectivity[key] = (now, value)
+            self._selectivity.move_to_end(key)
+            while len(self._selectivity) > SELECTIVITY_CACHE_SIZE:
+                self._selectivity.popitem(last=False)
+        return value
+
+    def optimize(
+        self,
+        plan: QueryPlan,
+        stats: TableStatistics,
+        selectivity: float,
+        *,
+        now: datetime | None = None,
+    ) -> QueryPlan:
+        now = now or datetime.now(UTC)
+        # Cheapest source per span, where a span continuing its neighbour's source
+        # joins that branch instead of paying BRANCH_COST again (Viterbi over spans).
+        # best[source] = (total cost, spans so far with their row estimates)
+        best: dict[TableKind | None, tuple[float, list[tuple[Span, float]]]] = {None: (0.0, [])}
+        for span in plan.spans:
+            hours = (span.end - span.start).total_seconds() / 3600.0
+            step: dict[TableKind | None, tuple[float, list[tuple[Span, float]]]] = {}
+            for source in _candidates(span, now):
+                rows = stats.density(source) * hours * selectivity
+                for prev, (total, path) in best.items():
+                    cost = total + rows * ROW_COST[source]
+                    if prev != source:
+                        cost += BRANCH_COST
+                    if source not in step or cost < step[source][0]:
+                        step[source] = (cost, [*path, (replace(span, source=source), rows)])
+            best = step
+
+        _, path = min(best.values(), key=lambda item: item[0])
+        chosen: list[Span] = []
+        for span, rows in path:
+            if chosen and chosen[-1].source == span.source:
+                prev = chosen.pop()
+                span = replace(prev, end=span.end)
+                rows += prev.estimated_rows or 0.0
+            chosen.append(replace(span, estimated_rows=rows))
+        return QueryPlan(tuple(chosen))
+
+
+def _candidates(span: Span, now: datetime) -> list[TableKind]:
+    if span.source == "raw":
+        return ["raw"]
+    kinds = [kind for kind, _ in LEVELS]
+    out: list[TableKind] = []
+    for kind in kinds[kinds.index(span.source) :]:
+        if kind == "minute" and not minute_available(span.start, now):
+            continue
+        out.append(kind)
+    out.append("raw")
+    return out
+
+
+_cost_model: CostModel | None = None
+_cost_model_lock = threading.Lock()
+
+
+def get_cost_model() -> CostModel | None:
+    """Process-wide cost model, or None when APM_ANALYTICS_COST_MODEL is off."""
+    global _cost_model
+    if not bool(getattr(settings, "APM_ANALYTICS_COST_MODEL", True)):
+        return None
+    if _cost_model is None:
+        with _cost_model_lock:
+            if _cost_model is None:
+                _cost_model = CostModel(
+                    ttl=float(
+                        getattr(
+                            settings, "APM_ANALYTICS_STATS_TTL_SECONDS", DEFAULT_STATS_TTL_SECONDS
+                        )
+                    )
+                )
+    return _cost_model
+
+
+def choose_plan(start: datetime, end: datetime, filters: AnalyticsFilters) -> QueryPlan:
+    """
+    Stitched plan for [start, end] (planner.plan_range), with each span's source
+    chosen by the cost model when statistics are available (PostgreSQL +
+    TimescaleDB); otherwise the plain coarsest-first plan.
+    """
+    plan = plan_range(start, end)
+    model = get_cost_model()
+    if model is None or connection.vendor != "postgresql":
+        return plan
+
+    stats = model.statistics()
+    if stats is None:
+        return plan
+    plan = model.optimize(plan, stats, model.selectivity(filters))
+    for span in plan.spans:
+        ANALYTICS_PLAN_SPANS.labels(source=span.source).inc()
+    return plan
@@ -0,0 +1,329 @@
+# observability/analytics/planner.py
+from __future__ import annotations
+
+from collections.abc import Sequence
+from dataclasses import dataclass, replace
+from datetime import UTC, datetime, timedelta
+from typing import Any, Literal
+
+from .sketch import latency_bin_sql
+from .sql import (
+    _CAGG_SORT_ALLOWLIST,
+    DIM_CAGGS,
+    DIM_TABLE,
+    LATENCY_CAGGS,
+    RAW_TABLE,
+    AnalyticsFilters,
+    TableKind,
+    build_dim_where_clause,
+    build_where_clause,
+    errors_from_status_sql,
+    minute_available,
+)
+
+# Coarsest first: each level takes the aligned interior of what is left.
+LEVELS: tuple[tuple[TableKind, timedelta], ...] = (
+    ("daily", timedelta(days=1)),
+    ("hourly", timedelta(hours=1)),
+    ("minute", timedelta(minutes=1)),
+)
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+
+
+# ----------------------------
+# Plan
+# ----------------------------
+@dataclass(frozen=True)
+class Span:
+    """[start, end) read from one source (a rollup of that width, or raw rows)."""
+
+    source: TableKind
+    start: datetime
+    end: datetime
+    estimated_rows: float | None = None  # set by the cost model (cost.py)
+
+
+@dataclass(frozen=True)
+class QueryPlan:
+    spans: tuple[Span, ...]
+
+    @property
+    def source(self) -> str:
+        """The single source used, or "stitched"."""
+        kinds = {span.source for span in self.spans}
+        if len(kinds) == 1:
+            return kinds.pop()
+        return "stitched" if kinds else "raw"
+
+    @property
+    def estimated_rows(self) -> int | None:
+        if any(span.estimated_rows is None for span in self.spans):
+            return None
+        return round(sum(span.estimated_rows or 0.0 for span in self.spans))
+
+    def describe(self) -> list[dict[str, Any]]:
+        out: list[dict[str, Any]] = []
+        for span in self.spans:
+            item: dict[str, Any] = {
+                "source": span.source,
+                "start": span.start.astimezone(UTC).isoformat().replace("+00:00", "Z"),
+                "end": span.end.astimezone(UTC).isoformat().replace("+00:00", "Z"),
+            }
+            if span.estimated_rows is not None:
+                item["estimated_rows"] = round(span.estimated_rows)
+            out.append(item)
+        return out
+
+
+def _floor(dt: datetime, width: timedelta) -> datetime:
+    # time_bucket() aligns minute/hour/day buckets on UTC midnight, like the epoch.
+    return dt - (dt - _EPOCH) % width
+
+
+def _ceil(dt: datetime, width: timedelta) -> datetime:
+    floored = _floor(dt, width)
+    return floored if floored == dt else floored + width
+
+
+def bucket_window(start: datetime, end: datetime, width: timedelta) -> tuple[datetime, datetime]:
+    """[first, last + width): the whole `width` buckets covering [start, end]."""
+    return _floor(start, width), _floor(end, width) + width
+
+
+def _split(
+    start: datetime, end: datetime, levels: Sequence[tuple[TableKind, timedelta]], now: datetime
+) -> list[Span]:
+    if start >= end:
+        return []
+    if not levels:
+        return [Span("raw", start, end)]
+
+    (kind, width), finer = levels[0], levels[1:]
+    if kind == "minute" and not minute_available(start, now):
+        # Minute rows are gone this far back: the remainder comes from raw rows.
+        return _split(start, end, finer, now)
+
+    lo, hi = _ceil(start, width), _floor(end, width)
+    if lo >= hi:
+        return _split(start, end, finer, now)
+    return [*_split(start, lo, finer, now), Span(kind, lo, hi), *_split(hi, end, finer, now)]
+
+
+def plan_range(
+    start: datetime,
+    end: datetime,
+    *,
+    levels: Sequence[tuple[TableKind, timedelta]] = LEVELS,
+    now: datetime | None = None,
+) -> QueryPlan:
+    """
+    Split the inclusive range [start, end] into aligned spans, coarsest first:
+    whole days from the daily rollup, the hours around them from the hourly
+    one, whole minutes from the minute one (inside its retention) and the
+    sub-minute tails from raw rows. Spans never overlap, so totals merge exactly.
+    """
+    stop = end + timedelta(microseconds=1)  # filters are inclusive of `end`
+    return QueryPlan(tuple(_split(start, stop, levels, now or datetime.now(UTC))))
+
+
+# ----------------------------
+# Stitched SQL builders (one UNION ALL query per plan)
+# ----------------------------
+def _span_where(span: Span, filters: AnalyticsFilters) -> tuple[str, list[object]]:
+    names = replace(filters, start=None, end=None)
+    if span.source == "raw":
+        where_sql, params = build_where_clause(names, kind="raw")
+        time_column = "time"
+    else:
+        where_sql, params = build_dim_where_clause(names)
+        time_column = "bucket"
+
+    bounds = f"{time_column} >= %s AND {time_column} < %s"
+    if where_sql:
+        return f"{where_sql} AND {bounds}", [*params, span.start, span.end]
+    return f"WHERE {bounds}", [span.start, span.end]
+
+
+def _rollup_errors_sql(error_from: int) -> str:
+    errors_sql = errors_from_status_sql(error_from)
+    if errors_sql is None:
+        raise ValueError(f"error_from={error_from} is not available from the CAGG counters.")
+    return errors_sql
+
+
+def _stats_branches(
+    plan: QueryPlan, filters: AnalyticsFilters, *, error_from: int, group_by_dim: bool
+) -> tuple[str, list[object]]:
+    """Per-span (dim_id,) hits / errors / latency_sum / max_latency_ms, UNION ALL'd."""
+    dim_select = "dim_id, " if group_by_dim else ""
+    group_sql = "GROUP BY dim_id" if group_by_dim else ""
+
+    branches: list[str] = []
+    params: list[object] = []
+    for span in plan.spans:
+        where_sql, where_params = _span_where(span, filters)
+        if span.source == "raw":
+            branches.append(f"""
+        SELECT {dim_select}
+            COUNT(*)::bigint AS hits,
+            COUNT(*) FILTER (WHERE status_code >= %s)::bigint AS errors,
+            SUM(latency_ms)::double precision AS latency_sum,
+            MAX(latency_ms)::integer AS max_latency_ms
+        FROM {RAW_TABLE}
+        {where_sql}
+        {group_sql}""")
+            params += [error_from, *where_params]
+        else:
+            branches.append(f"""
+        SELECT {dim_select}
+            SUM(hits)::bigint AS hits,
+            {_rollup_errors_sql(error_from)}::bigint AS errors,
+            SUM(avg_latency_ms * hits)::double precision AS latency_sum,
+            MAX(max_latency_ms)::integer AS max_latency_ms
+        FROM {DIM_CAGGS[span.source]}
+        {where_sql}
+        {group_sql}""")
+            params += where_params
+    return "\n        UNION ALL".join(branches), params
+
+
+def stitched_kpis_sql(
+    *,
+    plan: QueryPlan,
+    filters: AnalyticsFilters,
+    error_from: int = 500,
+) -> tuple[str, list[object]]:
+    """
+    KPI totals/errors/avg/max over every span of the plan in one query.
+    Same columns as kpis_from_cagg_sql / kpis_from_raw_sql.
+    """
+    branches_sql, params = _stats_branches(plan, filters, error_from=error_from, group_by_dim=False)
+    sql = f"""
+    WITH spans AS ({branches_sql}
+    )
+    SELECT
+        COALESCE(SUM(hits), 0)::bigint AS hits,
+        COALESCE(SUM(errors), 0)::bigint AS errors,
+        CASE
+            WHEN COALESCE(SUM(hits), 0) > 0
+            THEN (SUM(errors)::double precision / SUM(hits)::double precision)
+            ELSE 0::double precision
+        END AS error_rate,
+        CASE
+            WHEN COALESCE(SUM(hits), 0) > 0
+            THEN (SUM(latency_sum) / SUM(hits)::double precision)
+            ELSE NULL::double precision
+        END AS avg_latency_ms,
+        MAX(max_latency_ms)::integer AS max_latency_ms
+    FROM spans
+    """
+    return sql.strip(), params
+
+
+def stitched_top_endpoints_sql(
+    *,
+    plan: QueryPlan,
+    filters: AnalyticsFilters,
+    error_from: int = 500,
+    limit: int = 20,
+    sort_by: str = "hits",
+    direction: Literal["asc", "desc"] = "desc",
+) -> tuple[str, list[object]]:
+    """
+    Top endpoints over every span of the plan: per-dim totals of each span,
+    then names joined once and re-grouped by (service, endpoint).
+    Same columns as top_endpoints_from_cagg_sql (no p95).
+    """
+    branches_sql, params = _stats_branches(plan, filters, error_from=error_from, group_by_dim=True)
+    sort_col = _CAGG_SORT_ALLOWLIST.get(sort_by, "hits")
+    dir_sql = "ASC" if direction.lower() == "asc" else "DESC"
+
+    sql = f"""
+    WITH spans AS ({branches_sql}
+    )
+    SELECT
+        d.service AS service,
+        d.endpoint AS endpoint,
+        COALESCE(SUM(s.hits), 0)::bigint AS hits,
+        COALESCE(SUM(s.errors), 0)::bigint AS errors,
+        CASE
+            WHEN COALESCE(SUM(s.hits), 0) > 0
+            THEN (SUM(s.errors)::double precision / SUM(s.hits)::double precision)
+            ELSE 0::double precision
+        END AS error_rate,
+        CASE
+            WHEN COALESCE(SUM(s.hits), 0) > 0
+            THEN (SUM(s.latency_sum) / SUM(s.hits)::double precision)
+            ELSE NULL::double precision
+        END AS avg_latency_ms,
+        MAX(s.max_latency_ms)::integer AS max_latency_ms
+    FROM spans s
+    JOIN {DIM_TABLE} d ON d.id = s.dim_id
+    GROUP BY d.service, d.endpoint
+    ORDER BY {sort_col} {dir_sql}, service ASC, endpoint ASC
+    LIMIT %s
+    """
+    return sql.strip(), params + [limit]
+
+
+def stitched_latency_bins_sql(
+    *,
+    plan: QueryPlan,
+    filters: AnalyticsFilters,
+    endpoints: Sequence[tuple[str, str]] | None = None,
+) -> tuple[str, list[object]]:
+    """
+    Merged latency sketch over every span: (bin, n) rows, or with `endpoints`
+    (service, endpoint, bin, n) rows for those endpoints only. Raw spans are
+    binned with latency_bin_sql(), so they merge exactly with the rollups.
+    """
+    target_sql = ""
+    target_params: list[object] = []
+    if endpoints:
+        values_rows = ", ".join(["(%s, %s)"] * len(endpoints))
+        target_sql = f"""AND dim_id IN (
+                SELECT d.id
+                FROM {DIM_TABLE} d
+                JOIN (VALUES {values_rows}) AS t(service, endpoint)
+                  ON d.service = t.service AND d.endpoint = t.endpoint
+            )"""
+        target_params = [value for pair in endpoints for value in pair]
+
+    branches: list[str] = []
+    params: list[object] = []
+    for span in plan.spans:
+        where_sql, where_params = _span_where(span, filters)
+        if span.source == "raw":
+            branches.append(f"""
+        SELECT dim_id, {latency_bin_sql()} AS bin, COUNT(*)::bigint AS n
+        FROM {RAW_TABLE}
+        {where_sql} {target_sql}
+        GROUP BY 1, 2""")
+        else:
+            branches.append(f"""
+        SELECT dim_id, bin, SUM(n)::bigint AS n
+        FROM {LATENCY_CAGGS[span.source]}
+        {where_sql} {target_sql}
+        GROUP BY 1, 2""")
+        params += [*where_params, *target_params]
+    branches_sql = "\n        UNION ALL".join(branches)
+
+    if endpoints is None:
+        sql = f"""
+    WITH spans AS ({branches_sql}
+    )
+    SELECT bin, SUM(n)::bigint AS n
+    FROM spans
+    GROUP BY bin
+    """
+    else:
+        sql = f"""
+    WITH spans AS ({branches_sql}
+    )
+    SELECT d.service, d.endpoint, s.bin, SUM(s.n)::bigint AS n
+    FROM spans s
+    JOIN {DIM_TABLE} d ON d.id = s.dim_id
+    GROUP BY d.service, d.endpoint, s.bin
+    """
+    return sql.strip(), params
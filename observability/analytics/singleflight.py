@@ -0,0 +1,248 @@
+# observability/analytics/singleflight.py
+from __future__ import annotations
+
+import fcntl
+import hashlib
+import logging
+import os
+import pickle
+import stat
+import tempfile
+import threading
+import time
+from collections.abc import Callable, Sequence
+from typing import Any
+
+from django.conf import settings
+from django.db import connection
+
+from ..metrics import ANALYTICS_COALESCED_QUERIES
+
+logger = logging.getLogger(__name__)
+
+LOCK_SUFFIX = ".lock"
+RESULT_SUFFIX = ".result"
+
+DEFAULT_WAIT_TIMEOUT = 30.0
+# Result/lock files older than this are pruned (results are only read by workers
+# that were waiting while the query ran).
+RESULT_MAX_AGE = 60.0
+_POLL_INTERVAL = 0.005
+
+
+def query_key(sql: str, params: Sequence[object]) -> str:
+    """Identity of a query: database, SQL text and parameters."""
+    db = connection.settings_dict
+    payload = repr((db.get("HOST"), db.get("PORT"), db.get("NAME"), sql, list(params)))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def secure_directory(path: str) -> bool:
+    """
+    Create `path` with mode 0700, or check that an existing one is a real directory
+    owned by this user (group/other permissions are then removed). Results are
+    unpickled from it, so nobody else may be able to write there.
+    """
+    try:
+        os.makedirs(path, mode=0o700, exist_ok=True)
+        st = os.lstat(path)
+        if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.geteuid():
+            return False
+        if stat.S_IMODE(st.st_mode) & 0o077:
+            os.chmod(path, 0o700)
+        return True
+    except OSError:
+        return False
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent queries.
+
+    Within a worker, the first caller for a key runs it and every caller that
+    arrives before it finishes waits and gets the same result (or exception).
+    With `directory` set, the running caller also holds an flock on
+    <directory>/<key>.lock and leaves the result in <key>.result: a caller in
+    another worker that finds the lock taken waits for it and reads that
+    result instead of running the query again. Callers that wait longer than
+    `wait_timeout` run the query themselves. Results are shared, not copied:
+    treat them as read-only. A `directory` that fails secure_directory() is not
+    used: coalescing then stays within the worker.
+    """
+
+    def __init__(self, directory: str | None = None, *, wait_timeout: float = DEFAULT_WAIT_TIMEOUT):
+        self.directory = directory
+        self.wait_timeout = float(wait_timeout)
+        self._lock = threading.Lock()
+        self._calls: dict[str, _Call] = {}
+        self._pruned_at = 0.0
+        if directory and not secure_directory(directory):
+            logger.warning(
+                "Single-flight directory %s is not a private directory of this user; "
+                "analytics queries are only coalesced within each worker",
+                directory,
+            )
+            self.directory = None
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            if not call.done.wait(self.wait_timeout):
+                return fn()
+            ANALYTICS_COALESCED_QUERIES.labels(scope="worker").inc()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._across_workers(key, fn) if self.directory else fn()
+            return call.result
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    # ----------------------------
+    # Across workers (lock file + result file)
+    # ----------------------------
+    def _across_workers(self, key: str, fn: Callable[[], Any]) -> Any:
+        assert self.directory is not None
+        base = os.path.join(self.directory, key)
+        arrived = time.time()
+        fd = os.open(base + LOCK_SUFFIX, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                # Another worker is running it: wait, then take its result.
+                if self._wait_for_lock(fd):
+                    shared = self._read_result(base + RESULT_SUFFIX, since=arrived)
+                    if shared is not None:
+                        ANALYTICS_COALESCED_QUERIES.labels(scope="host").inc()
+                        return shared[0]
+
+            result = fn()
+            self._write_result(base + RESULT_SUFFIX, result)
+            return result
+        finally:
+            os.close(fd)  # releases the flock
+
+    def _wait_for_lock(self, fd: int) -> bool:
+        deadline = time.monotonic() + self.wait_timeout
+        while time.monotonic() < deadline:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return True
+            except BlockingIOError:
+                time.sleep(_POLL_INTERVAL)
+        return False
+
+    def _read_result(self, path: str, *, since: float) -> tuple[Any] | None:
+        try:
+            if os.stat(path).st_mtime < since:
+                return None  # written by a run that finished before we arrived
+            with open(path, "rb") as fh:
+                return (pickle.load(fh),)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+
+    def _write_result(self, path: str, result: Any) -> None:
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "wb") as fh:
+                pickle.dump(result, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except (OSError, pickle.PicklingError):
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+        self._prune()
+
+    def _prune(self) -> None:
+        now = time.time()
+        if now - self._pruned_at < RESULT_MAX_AGE:
+            return
+        self._pruned_at = now
+        assert self.directory is not None
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                if now - os.stat(path).st_mtime <= RESULT_MAX_AGE:
+                    continue
+                if name.endswith(RESULT_SUFFIX):
+                    os.unlink(path)
+                elif name.endswith(LOCK_SUFFIX):
+                    # Only idle lock files; at worst a racing opener runs its query uncoalesced.
+                    fd = os.open(path, os.O_RDWR)
+                    try:
+                        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                        os.unlink(path)
+                    finally:
+                        os.close(fd)
+            except OSError:
+                pass
+
+
+def single_flight_directory() -> str | None:
+    if not bool(getattr(settings, "APM_ANALYTICS_SINGLEFLIGHT_SHARED", True)):
+        return None
+    return str(
+        getattr(settings, "APM_ANALYTICS_SINGLEFLIGHT_DIR", "")
+        or os.path.join(tempfile.gettempdir(), f"apm-analytics-singleflight-{os.geteuid()}")
+    )
+
+
+_single_flight: SingleFlight | None = None
+_single_flight_lock = threading.Lock()
+
+
+def get_single_flight() -> SingleFlight | None:
+    """Process-wide coalescer, or None when APM_ANALYTICS_SINGLEFLIGHT is off."""
+    global _single_flight
+    if not bool(getattr(settings, "APM_ANALYTICS_SINGLEFLIGHT", True)):
+        return None
+    if _single_flight is None:
+        with _single_flight_lock:
+            if _single_flight is None:
+                _single_flight = SingleFlight(
+                    single_flight_directory(),
+                    wait_timeout=float(
+                        getattr(
+                            settings, "APM_ANALYTICS_SINGLEFLIGHT_TIMEOUT", DEFAULT_WAIT_TIMEOUT
+                        )
+                    ),
+                )
+    return _single_flight
+
+
+def fetch_all(sql: str, params: Sequence[object]) -> list[tuple]:
+    """cursor.execute(sql, params).fetchall(), shared with identical in-flight queries."""
+
+    def run() -> list[tuple]:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return [tuple(row) for row in cursor.fetchall()]
+
+    flight = get_single_flight()
+    if flight is None or connection.in_atomic_block:
+        # Inside a transaction the result depends on its snapshot (and own writes).
+        return run()
+    return flight.do(query_key(sql, params), run)
@@ -0,0 +1,117 @@
+# observability/analytics/sketch.py
+from __future__ import annotations
+
+import math
+from collections.abc import Iterable, Sequence
+
+# Must match the bin expression baked into the latency CAGGs (migration 0010).
+DEFAULT_RELATIVE_ACCURACY = 0.01
+ZERO_BIN = -32768  # latency_ms <= 0
+
+QUANTILES: tuple[float, ...] = (0.5, 0.9, 0.95, 0.99)
+
+
+def quantile_field(q: float) -> str:
+    """0.95 -> "p95_latency_ms" (response key)."""
+    return f"p{round(q * 100):g}_latency_ms"
+
+
+class LatencySketch:
+    """
+    DDSketch-style log-bucketed histogram with bounded relative error.
+
+    bin(x) = ceil(log_gamma(x)), gamma = (1 + a) / (1 - a): every value in bin i
+    lies in (gamma^(i-1), gamma^i], and the bin's representative
+    2 * gamma^i / (gamma + 1) is within a (relative accuracy) of each of them.
+    Sketches merge by adding bin counts, so hourly sketches can be summed into
+    any longer window (in SQL: SUM(n) GROUP BY bin) without losing accuracy.
+    """
+
+    def __init__(self, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be in (0, 1).")
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._ln_gamma = math.log(self.gamma)
+        self.bins: dict[int, int] = {}
+        self.count = 0
+
+    @classmethod
+    def from_bins(
+        cls,
+        rows: Iterable[Sequence[int]],
+        relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY,
+    ) -> LatencySketch:
+        """Build from (bin, count) rows, e.g. the result of latency_bins_sql()."""
+        sketch = cls(relative_accuracy)
+        for b, n in rows:
+            sketch.add_bin(int(b), int(n))
+        return sketch
+
+    def bin_of(self, value: float) -> int:
+        if value <= 0:
+            return ZERO_BIN
+        return math.ceil(math.log(value) / self._ln_gamma)
+
+    def value_of(self, b: int) -> float:
+        if b == ZERO_BIN:
+            return 0.0
+        return 2 * self.gamma**b / (self.gamma + 1)
+
+    def add(self, value: float, count: int = 1) -> None:
+        self.add_bin(self.bin_of(value), count)
+
+    def add_bin(self, b: int, count: int) -> None:
+        if count > 0:
+            self.bins[b] = self.bins.get(b, 0) + count
+            self.count += count
+
+    def merge(self, other: LatencySketch) -> None:
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different relative accuracy.")
+        for b, n in other.bins.items():
+            self.add_bin(b, n)
+
+    def quantiles(self, qs: Sequence[float] = QUANTILES) -> dict[float, float | None]:
+        """Value at rank q * (count - 1) for each q (None when the sketch is empty)."""
+        if not self.count:
+            return {q: None for q in qs}
+        wanted = sorted((q * (self.count - 1), q) for q in qs)
+        out: dict[float, float | None] = {}
+        seen = 0
+        i = 0
+        for b in sorted(self.bins):
+            seen += self.bins[b]
+            while i < len(wanted) and wanted[i][0] < seen:
+                out[wanted[i][1]] = self.value_of(b)
+                i += 1
+            if i == len(wanted):
+                break
+        return out
+
+    def quantile(self, q: float) -> float | None:
+        return self.quantiles((q,))[q]
+
+
+def latency_bin_sql(
+    column: str = "latency_ms", relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY
+) -> str:
+    """SQL expression computing LatencySketch.bin_of(column) (immutable; CAGG-safe)."""
+    gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+    return (
+        f"(CASE WHEN {column} <= 0 THEN {ZERO_BIN} "
+        f"ELSE CEIL(LN({column}::double precision) / LN({gamma!r}::double precision)) "
+        f"END)::smallint"
+    )
+
+
+def latency_value_sql(
+    column: str = "bin", relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY
+) -> str:
+    """SQL expression computing LatencySketch.value_of(column) for a bin column."""
+    gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+    return (
+        f"(CASE WHEN {column} = {ZERO_BIN} THEN 0 "
+        f"ELSE 2 * POWER({gamma!r}::double precision, {column}) / {gamma + 1!r} "
+        f"END)::double precision"
+    )
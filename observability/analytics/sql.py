@@ -6,16 +6,52 @@ from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Literal
 
-Granularity = Literal["hourly", "daily"]
-GranularityParam = Literal["auto", "hourly", "daily"]
-TableKind = Literal["raw", "hourly", "daily"]
+from .sketch import QUANTILES, quantile_field
+
+Granularity = Literal["minute", "hourly", "daily"]
+GranularityParam = Literal["auto", "minute", "hourly", "daily"]
+TableKind = Literal["raw", "minute", "hourly", "daily"]
 
 RAW_TABLE = "observability_apirequest"
+# Plain views over the *_dim rollups grouped by (service, endpoint) (migration 0012).
 HOURLY_CAGG = "apirequest_hourly"
 DAILY_CAGG = "apirequest_daily"
 
+# Rollups keyed on the (service, endpoint, method) dimension id (migration 0009).
+# Since 0013 they form a hierarchy: minute <- raw, hourly <- minute, daily <- hourly.
+DIM_TABLE = "observability_endpointdim"
+MINUTE_DIM_CAGG = "apirequest_minute_dim"
+HOURLY_DIM_CAGG = "apirequest_hourly_dim"
+DAILY_DIM_CAGG = "apirequest_daily_dim"
+
+# Latency sketch rollups: (bucket, dim_id, bin) -> n (migration 0010, see sketch.py).
+MINUTE_LATENCY_CAGG = "apirequest_latency_minute"
+HOURLY_LATENCY_CAGG = "apirequest_latency_hourly"
+DAILY_LATENCY_CAGG = "apirequest_latency_daily"
+
+DIM_CAGGS: dict[str, str] = {
+    "minute": MINUTE_DIM_CAGG,
+    "hourly": HOURLY_DIM_CAGG,
+    "daily": DAILY_DIM_CAGG,
+}
+LATENCY_CAGGS: dict[str, str] = {
+    "minute": MINUTE_LATENCY_CAGG,
+    "hourly": HOURLY_LATENCY_CAGG,
+    "daily": DAILY_LATENCY_CAGG,
+}
+DATE_TRUNC_UNITS: dict[str, str] = {"minute": "minute", "hourly": "hour", "daily": "day"}
+
+DEFAULT_AUTO_MINUTE_MAX_HOURS = 6
 DEFAULT_AUTO_HOURLY_MAX_HOURS = 48
 
+# Minute rollups are dropped after this (retention policy, migrations 0013 / 0015).
+MINUTE_RETENTION = timedelta(days=8)
+
+# Status counters in the *_dim rollups (migration 0011): one column per class
+# (s1xx..s5xx) and one per common code (c404, ...).
+STATUS_CLASSES: tuple[int, ...] = (1, 2, 3, 4, 5)
+STATUS_CODES: tuple[int, ...] = (400, 401, 403, 404, 408, 409, 422, 429, 500, 502, 503, 504)
+
 
 # ----------------------------
 # Filters / where-clause builder
@@ -26,7 +62,7 @@ class AnalyticsFilters:
     end: datetime | None = None
     service: str | None = None
     endpoint: str | None = None
-    method: str | None = None  # raw-only
+    method: str | None = None
 
 
 def build_where_clause(
@@ -63,6 +99,8 @@ def build_where_clause(
         clauses.append("endpoint = %s")
         params.append(filters.endpoint)
 
+    # The name-keyed views are grouped by (service, endpoint) only; method
+    # filters on rollups go through build_dim_where_clause.
     if kind == "raw" and filters.method:
         clauses.append("method = %s")
         params.append(filters.method)
@@ -73,17 +111,100 @@ def build_where_clause(
     return "WHERE " + " AND ".join(clauses), params
 
 
+def build_dim_where_clause(
+    filters: AnalyticsFilters,
+    *,
+    time_column: str = "bucket",
+) -> tuple[str, list[object]]:
+    """
+    WHERE clause for the *_dim rollups: the time range plus one
+    `dim_id IN (SELECT id FROM dim ...)` for the name filters, so the strings are
+    only compared against the (small) dimension table, never per rollup row.
+    """
+    clauses: list[str] = []
+    params: list[object] = []
+
+    if filters.start is not None:
+        clauses.append(f"{time_column} >= %s")
+        params.append(filters.start)
+
+    if filters.end is not None:
+        clauses.append(f"{time_column} <= %s")
+        params.append(filters.end)
+
+    dim_clauses: list[str] = []
+    for column in ("service", "endpoint", "method"):
+        value = getattr(filters, column)
+        if value:
+            dim_clauses.append(f"{column} = %s")
+            params.append(value)
+    if dim_clauses:
+        clauses.append(f"dim_id IN (SELECT id FROM {DIM_TABLE} WHERE {' AND '.join(dim_clauses)})")
+
+    if not clauses:
+        return "", params
+
+    return "WHERE " + " AND ".join(clauses), params
+
+
+# ----------------------------
+# Status counters
+# ----------------------------
+def status_count_columns_sql(status_column: str = "status_code") -> str:
+    """
+    `COUNT(*) FILTER (...) AS s1xx, ..., AS c404, ...` select list: the status
+    counters as stored in the *_dim rollups (also used for raw fallbacks).
+    """
+    columns = [
+        f"COUNT(*) FILTER (WHERE {status_column} BETWEEN {k}00 AND {k}99)::bigint AS s{k}xx"
+        for k in STATUS_CLASSES
+    ]
+    columns += [
+        f"COUNT(*) FILTER (WHERE {status_column} = {code})::bigint AS c{code}"
+        for code in STATUS_CODES
+    ]
+    return ",\n    ".join(columns)
+
+
+def errors_from_status_sql(error_from: int) -> str | None:
+    """
+    SUM expression counting rows with status_code >= error_from from the status
+    counters: every class above error_from's class, plus its own class minus the
+    codes in [class start, error_from). None when one of those codes has no
+    counter (e.g. 405), i.e. the threshold needs the raw table.
+    """
+    cls = error_from // 100
+    below = range(cls * 100, error_from)
+    if cls not in STATUS_CLASSES or any(code not in STATUS_CODES for code in below):
+        return None
+
+    terms = " + ".join(f"SUM(s{k}xx)" for k in STATUS_CLASSES if k >= cls)
+    for code in below:
+        terms += f" - SUM(c{code})"
+    return f"({terms})"
+
+
 # ----------------------------
 # Source selection helpers (Step 6)
 # ----------------------------
+def minute_available(start: datetime | None, now: datetime | None = None) -> bool:
+    """Minute rollups only exist for the last MINUTE_RETENTION."""
+    if start is None:
+        return False
+    now = now or datetime.now(start.tzinfo)
+    return start >= now - MINUTE_RETENTION
+
+
 def _auto_granularity(
     start: datetime | None,
     end: datetime | None,
     *,
     hourly_max_hours: int = DEFAULT_AUTO_HOURLY_MAX_HOURS,
+    minute_max_hours: int = DEFAULT_AUTO_MINUTE_MAX_HOURS,
 ) -> Granularity:
     """
-    If range <= hourly_max_hours => hourly else daily.
+    If range <= minute_max_hours (and still within the minute retention) => minute,
+    elif range <= hourly_max_hours => hourly, else daily.
     If start/end missing, default daily (safer).
     """
     if start is None or end is None:
@@ -91,11 +212,30 @@ def _auto_granularity(
     if end < start:
         # views validate start<=end; default daily here just in case.
         return "daily"
+    if (end - start) <= timedelta(hours=minute_max_hours) and minute_available(start):
+        return "minute"
     if (end - start) <= timedelta(hours=hourly_max_hours):
         return "hourly"
     return "daily"
 
 
+def _resolve_granularity(
+    granularity: GranularityParam,
+    filters: AnalyticsFilters,
+    *,
+    hourly_max_hours: int,
+) -> Granularity:
+    """
+    Explicit granularity wins, except minute for a range reaching past the
+    minute retention (those rows are gone), which is served hourly.
+    """
+    if granularity == "auto":
+        return _auto_granularity(filters.start, filters.end, hourly_max_hours=hourly_max_hours)
+    if granularity == "minute" and not minute_available(filters.start):
+        return "hourly"
+    return granularity
+
+
 def select_kpis_source(
     *,
     filters: AnalyticsFilters,
@@ -105,21 +245,13 @@ def select_kpis_source(
 ) -> TableKind:
     """
     KPIs (totals/errors/avg/max) can use CAGGs only when:
-      - method is NOT used (method is raw-only)
-      - error_from == 500 (caggs are baked with status_code >= 500)
-    Otherwise raw.
+      - error_from can be computed from the status counters (errors_from_status_sql)
+    Otherwise raw. method is a dimension of the rollups, like service/endpoint.
     """
-    if filters.method:
-        return "raw"
-    if error_from != 500:
+    if errors_from_status_sql(error_from) is None:
         return "raw"
 
-    if granularity == "daily":
-        return "daily"
-    if granularity == "hourly":
-        return "hourly"
-
-    return _auto_granularity(filters.start, filters.end, hourly_max_hours=hourly_max_hours)
+    return _resolve_granularity(granularity, filters, hourly_max_hours=hourly_max_hours)
 
 
 def select_top_endpoints_source(
@@ -132,49 +264,83 @@ def select_top_endpoints_source(
 ) -> TableKind:
     """
     Top endpoints can use CAGGs only when:
-      - method is NOT used
-      - error_from == 500
+      - error_from can be computed from the status counters
       - sort_by != p95_latency_ms (since caggs don't compute p95 here)
     Otherwise raw.
     """
-    if filters.method:
-        return "raw"
-    if error_from != 500:
+    if errors_from_status_sql(error_from) is None:
         return "raw"
     if sort_by == "p95_latency_ms":
         return "raw"
 
-    if granularity == "daily":
-        return "daily"
-    if granularity == "hourly":
-        return "hourly"
+    return _resolve_granularity(granularity, filters, hourly_max_hours=hourly_max_hours)
+
+
+def select_latency_source(
+    *,
+    filters: AnalyticsFilters,
+    granularity: GranularityParam = "auto",
+    exact: bool = False,
+    hourly_max_hours: int = DEFAULT_AUTO_HOURLY_MAX_HOURS,
+) -> TableKind:
+    """
+    Percentiles come from the latency-sketch rollups (1% relative error) unless:
+      - exact=True (percentile_cont over raw)
+    error_from does not matter here: the sketches only hold latencies.
+    """
+    if exact:
+        return "raw"
 
-    return _auto_granularity(filters.start, filters.end, hourly_max_hours=hourly_max_hours)
+    return _resolve_granularity(granularity, filters, hourly_max_hours=hourly_max_hours)
+
+
+def select_status_distribution_source(
+    *,
+    filters: AnalyticsFilters,
+    granularity: GranularityParam = "auto",
+    hourly_max_hours: int = DEFAULT_AUTO_HOURLY_MAX_HOURS,
+) -> tuple[TableKind, Granularity]:
+    """
+    (source, bucket width) for the status distribution series: the *_dim CAGG of
+    that width (method included). The raw builder (date_trunc buckets) stays for
+    callers that must bypass the rollups.
+    """
+    width = _resolve_granularity(granularity, filters, hourly_max_hours=hourly_max_hours)
+    return width, width
 
 
 # ----------------------------
 # KPI SQL builders
 # ----------------------------
+def _cagg_errors_sql(error_from: int) -> str:
+    errors_sql = errors_from_status_sql(error_from)
+    if errors_sql is None:
+        raise ValueError(f"error_from={error_from} is not available from the CAGG counters.")
+    return errors_sql
+
+
 def kpis_from_cagg_sql(
     *,
     granularity: Granularity,
     filters: AnalyticsFilters,
+    error_from: int = 500,
 ) -> tuple[str, list[object]]:
     """
-    KPI totals/errors/avg/max using Timescale CAGGs (fast).
-    NOTE: error threshold is baked into caggs as status_code >= 500.
-    NOTE: p95 is NOT computed here (use raw builder below).
+    KPI totals/errors/avg/max using the dimension-keyed CAGGs (fast; no name join needed).
+    errors = status_code >= error_from, computed from the status counters.
+    NOTE: percentiles are NOT computed here (see latency_bins_sql).
     """
-    view = HOURLY_CAGG if granularity == "hourly" else DAILY_CAGG
-    where_sql, params = build_where_clause(filters, kind=granularity, time_column="bucket")
+    view = DIM_CAGGS[granularity]
+    where_sql, params = build_dim_where_clause(filters, time_column="bucket")
+    errors_sql = _cagg_errors_sql(error_from)
 
     sql = f"""
     SELECT
         COALESCE(SUM(hits), 0)::bigint AS hits,
-        COALESCE(SUM(errors), 0)::bigint AS errors,
+        COALESCE({errors_sql}, 0)::bigint AS errors,
         CASE
             WHEN COALESCE(SUM(hits), 0) > 0
-            THEN (SUM(errors)::double precision / SUM(hits)::double precision)
+            THEN ({errors_sql}::double precision / SUM(hits)::double precision)
             ELSE 0::double precision
         END AS error_rate,
         CASE
@@ -240,6 +406,98 @@ def p95_global_from_raw_sql(
     return sql.strip(), params
 
 
+def latency_percentiles_from_raw_sql(
+    *,
+    filters: AnalyticsFilters,
+    quantiles: Sequence[float] = QUANTILES,
+) -> tuple[str, list[object]]:
+    """
+    Exact percentiles over raw table (one column per quantile, named like
+    quantile_field(): p50_latency_ms, p90_latency_ms, ...). Used for ?exact=true.
+    """
+    where_sql, params = build_where_clause(filters, kind="raw", time_column="time")
+
+    columns = ",\n        ".join(
+        f"(percentile_cont({float(q)!r}) WITHIN GROUP (ORDER BY latency_ms))::double precision"
+        f" AS {quantile_field(q)}"
+        for q in quantiles
+    )
+    sql = f"""
+    SELECT
+        {columns}
+    FROM {RAW_TABLE}
+    {where_sql}
+    """
+    return sql.strip(), params
+
+
+def latency_bins_sql(
+    *,
+    granularity: Granularity,
+    filters: AnalyticsFilters,
+) -> tuple[str, list[object]]:
+    """
+    Merged latency sketch for the filters: (bin, n) rows summed over every
+    matching (bucket, dim_id). Feed to LatencySketch.from_bins().
+    """
+    view = LATENCY_CAGGS[granularity]
+    where_sql, params = build_dim_where_clause(filters, time_column="bucket")
+
+    sql = f"""
+    SELECT bin, SUM(n)::bigint AS n
+    FROM {view}
+    {where_sql}
+    GROUP BY bin
+    """
+    return sql.strip(), params
+
+
+def latency_bins_by_endpoints_sql(
+    *,
+    granularity: Granularity,
+    filters: AnalyticsFilters,
+    endpoints: Sequence[tuple[str, str]],
+) -> tuple[str, list[object]]:
+    """
+    Merged latency sketch per (service, endpoint) for a *given list* of endpoints:
+    (service, endpoint, bin, n) rows. The targets are resolved to dim ids first.
+    """
+    if not endpoints:
+        return (
+            "SELECT NULL::text AS service, NULL::text AS endpoint, "
+            "NULL::smallint AS bin, NULL::bigint AS n WHERE FALSE",
+            [],
+        )
+
+    view = LATENCY_CAGGS[granularity]
+    where_sql, where_params = build_dim_where_clause(filters, time_column="bucket")
+
+    values_rows = ", ".join(["(%s, %s)"] * len(endpoints))
+    values_params: list[object] = [value for pair in endpoints for value in pair]
+
+    target_sql = f"""dim_id IN (
+            SELECT d.id
+            FROM {DIM_TABLE} d
+            JOIN (VALUES {values_rows}) AS t(service, endpoint)
+              ON d.service = t.service AND d.endpoint = t.endpoint
+        )"""
+    where_sql = f"{where_sql} AND {target_sql}" if where_sql else f"WHERE {target_sql}"
+
+    sql = f"""
+    WITH per_dim AS (
+        SELECT dim_id, bin, SUM(n) AS n
+        FROM {view}
+        {where_sql}
+        GROUP BY dim_id, bin
+    )
+    SELECT d.service, d.endpoint, p.bin, SUM(p.n)::bigint AS n
+    FROM per_dim p
+    JOIN {DIM_TABLE} d ON d.id = p.dim_id
+    GROUP BY d.service, d.endpoint, p.bin
+    """
+    return sql.strip(), where_params + values_params
+
+
 def p95_by_endpoints_from_raw_sql(
     *,
     filters: AnalyticsFilters,
@@ -307,40 +565,56 @@ def top_endpoints_from_cagg_sql(
     *,
     granularity: Granularity,
     filters: AnalyticsFilters,
+    error_from: int = 500,
     limit: int = 20,
     sort_by: str = "hits",
     direction: Literal["asc", "desc"] = "desc",
 ) -> tuple[str, list[object]]:
     """
-    Top endpoints using CAGGs (fast).
+    Top endpoints using the dimension-keyed CAGGs (fast).
+    Aggregates per dim_id first, then joins names onto those (few) rows and
+    re-groups by (service, endpoint), since a dimension also carries the method.
+    errors = status_code >= error_from, computed from the status counters.
     NOTE: Does NOT compute p95 here.
     """
-    view = HOURLY_CAGG if granularity == "hourly" else DAILY_CAGG
-    where_sql, params = build_where_clause(filters, kind=granularity, time_column="bucket")
+    view = DIM_CAGGS[granularity]
+    where_sql, params = build_dim_where_clause(filters, time_column="bucket")
+    errors_sql = _cagg_errors_sql(error_from)
 
     sort_col = _CAGG_SORT_ALLOWLIST.get(sort_by, "hits")
     dir_sql = "ASC" if direction.lower() == "asc" else "DESC"
 
     sql = f"""
+    WITH per_dim AS (
+        SELECT
+            dim_id,
+            SUM(hits) AS hits,
+            {errors_sql} AS errors,
+            SUM(avg_latency_ms * hits) AS latency_sum,
+            MAX(max_latency_ms) AS max_latency_ms
+        FROM {view}
+        {where_sql}
+        GROUP BY dim_id
+    )
     SELECT
-        service,
-        endpoint,
-        COALESCE(SUM(hits), 0)::bigint AS hits,
-        COALESCE(SUM(errors), 0)::bigint AS errors,
+        d.service AS service,
+        d.endpoint AS endpoint,
+        COALESCE(SUM(p.hits), 0)::bigint AS hits,
+        COALESCE(SUM(p.errors), 0)::bigint AS errors,
         CASE
-            WHEN COALESCE(SUM(hits), 0) > 0
-            THEN (SUM(errors)::double precision / SUM(hits)::double precision)
+            WHEN COALESCE(SUM(p.hits), 0) > 0
+            THEN (SUM(p.errors)::double precision / SUM(p.hits)::double precision)
             ELSE 0::double precision
         END AS error_rate,
         CASE
-            WHEN COALESCE(SUM(hits), 0) > 0
-            THEN (SUM(avg_latency_ms * hits)::double precision / SUM(hits)::double precision)
+            WHEN COALESCE(SUM(p.hits), 0) > 0
+            THEN (SUM(p.latency_sum)::double precision / SUM(p.hits)::double precision)
             ELSE NULL::double precision
         END AS avg_latency_ms,
-        MAX(max_latency_ms)::integer AS max_latency_ms
-    FROM {view}
-    {where_sql}
-    GROUP BY service, endpoint
+        MAX(p.max_latency_ms)::integer AS max_latency_ms
+    FROM per_dim p
+    JOIN {DIM_TABLE} d ON d.id = p.dim_id
+    GROUP BY d.service, d.endpoint
     ORDER BY {sort_col} {dir_sql}, service ASC, endpoint ASC
     LIMIT %s
     """
@@ -407,3 +681,158 @@ def top_endpoints_from_raw_sql(
     """
     params2 = [error_from, error_from] + params + [limit]
     return sql.strip(), params2
+
+
+# ----------------------------
+# Status distribution SQL builders
+# ----------------------------
+def status_distribution_from_cagg_sql(
+    *,
+    granularity: Granularity,
+    filters: AnalyticsFilters,
+) -> tuple[str, list[object]]:
+    """
+    Status counters per bucket from the dimension-keyed CAGGs:
+    (bucket, hits, s1xx..s5xx, c400..c504), oldest bucket first.
+    """
+    view = DIM_CAGGS[granularity]
+    where_sql, params = build_dim_where_clause(filters, time_column="bucket")
+
+    counters = [f"s{k}xx" for k in STATUS_CLASSES] + [f"c{code}" for code in STATUS_CODES]
+    sums = ",\n        ".join(f"SUM({c})::bigint AS {c}" for c in counters)
+
+    sql = f"""
+    SELECT
+        bucket,
+        SUM(hits)::bigint AS hits,
+        {sums}
+    FROM {view}
+    {where_sql}
+    GROUP BY bucket
+    ORDER BY bucket ASC
+    """
+    return sql.strip(), params
+
+
+def status_distribution_from_raw_sql(
+    *,
+    granularity: Granularity,
+    filters: AnalyticsFilters,
+) -> tuple[str, list[object]]:
+    """
+    Same shape as status_distribution_from_cagg_sql, over the raw table
+    (fallback; supports method). Buckets via date_trunc.
+    """
+    unit = DATE_TRUNC_UNITS[granularity]
+    where_sql, params = build_where_clause(filters, kind="raw", time_column="time")
+
+    sql = f"""
+    SELECT
+        date_trunc('{unit}', time) AS bucket,
+        COUNT(*)::bigint AS hits,
+        {status_count_columns_sql()}
+    FROM {RAW_TABLE}
+    {where_sql}
+    GROUP BY 1
+    ORDER BY 1 ASC
+    """
+    return sql.strip(), params
+
+
+# ----------------------------
+# Time series SQL builders
+# ----------------------------
+# ?step= of /timeseries/ -> bucket width. Every step is a whole number of one
+# rollup's buckets, and divides a day (buckets align like time_bucket's).
+TIMESERIES_STEPS: dict[str, timedelta] = {
+    "1m": timedelta(minutes=1),
+    "5m": timedelta(minutes=5),
+    "15m": timedelta(minutes=15),
+    "1h": timedelta(hours=1),
+    "1d": timedelta(days=1),
+}
+_ROLLUP_WIDTHS: tuple[tuple[Granularity, timedelta], ...] = (
+    ("daily", timedelta(days=1)),
+    ("hourly", timedelta(hours=1)),
+    ("minute", timedelta(minutes=1)),
+)
+
+
+def select_timeseries_source(
+    *,
+    step: timedelta,
+    filters: AnalyticsFilters,
+    error_from: int = 500,
+) -> TableKind:
+    """
+    Coarsest *_dim rollup whose buckets tile `step` (daily for 1d, hourly for
+    1h, minute below that). Raw when the minute rollup no longer covers the
+    range or error_from is not available from the status counters.
+    """
+    if errors_from_status_sql(error_from) is None:
+        return "raw"
+    for granularity, width in _ROLLUP_WIDTHS:
+        if step % width:
+            continue
+        if granularity == "minute" and not minute_available(filters.start):
+            break
+        return granularity
+    return "raw"
+
+
+def timeseries_sql(
+    *,
+    source: TableKind,
+    step: timedelta,
+    filters: AnalyticsFilters,
+    error_from: int = 500,
+) -> tuple[str, list[object]]:
+    """
+    (bucket, hits, errors, avg_latency_ms, max_latency_ms) per `step` bucket
+    over [filters.start, filters.end) (both step-aligned), oldest first.
+    time_bucket_gapfill emits every bucket of the range; missing ones come
+    back with NULL aggregates.
+    """
+    if source == "raw":
+        where_sql, params = build_where_clause(
+            AnalyticsFilters(
+                service=filters.service, endpoint=filters.endpoint, method=filters.method
+            ),
+            kind="raw",
+        )
+        time_sql = "time >= %s AND time < %s"
+        select_sql = """
+            COUNT(*)::bigint AS hits,
+            COUNT(*) FILTER (WHERE status_code >= %s)::bigint AS errors,
+            AVG(latency_ms)::double precision AS avg_latency_ms,
+            MAX(latency_ms)::integer AS max_latency_ms"""
+        select_params: list[object] = [error_from]
+        time_column, table = "time", RAW_TABLE
+    else:
+        where_sql, params = build_dim_where_clause(
+            AnalyticsFilters(
+                service=filters.service, endpoint=filters.endpoint, method=filters.method
+            )
+        )
+        time_sql = "bucket >= %s AND bucket < %s"
+        select_sql = f"""
+            SUM(hits)::bigint AS hits,
+            {_cagg_errors_sql(error_from)}::bigint AS errors,
+            (SUM(sum_latency_ms)::double precision / NULLIF(SUM(hits), 0))::double precision
+                AS avg_latency_ms,
+            MAX(max_latency_ms)::integer AS max_latency_ms"""
+        select_params = []
+        time_column, table = "bucket", DIM_CAGGS[source]
+
+    where_sql = f"{where_sql} AND {time_sql}" if where_sql else f"WHERE {time_sql}"
+    sql = f"""
+    SELECT
+        time_bucket_gapfill(%s::interval, {time_column}, %s, %s) AS bucket,
+        {select_sql.strip()}
+    FROM {table}
+    {where_sql}
+    GROUP BY 1
+    ORDER BY 1 ASC
+    """
+    bounds = [filters.start, filters.end]
+    return sql.strip(), [step, *bounds, *select_params, *params, *bounds]
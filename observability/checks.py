@@ -0,0 +1,56 @@
+# observability/checks.py
+from __future__ import annotations
+
+from django.conf import settings
+from django.core.checks import Warning, register
+
+# Backends whose entries live in one process: every gunicorn worker sees its own copy.
+PROCESS_LOCAL_CACHES = frozenset(
+    {
+        "django.core.cache.backends.locmem.LocMemCache",
+        "django.core.cache.backends.dummy.DummyCache",
+    }
+)
+
+
+def cache_is_process_local(alias: str) -> bool:
+    backend = settings.CACHES.get(alias, {}).get("BACKEND", "")
+    return not backend or backend in PROCESS_LOCAL_CACHES
+
+
+@register()
+def check_idempotency_cache(app_configs=None, **kwargs):
+    alias = str(getattr(settings, "APM_INGEST_IDEMPOTENCY_CACHE", "default"))
+    if not cache_is_process_local(alias):
+        return []
+    return [
+        Warning(
+            f"APM_INGEST_IDEMPOTENCY_CACHE={alias!r} is a per-process cache.",
+            hint=(
+                "Idempotency-Key claims and replays are then only seen by the worker that "
+                "handled the first attempt. Point it at a cache shared by all workers "
+                "(CACHES: DatabaseCache, Redis, Memcached)."
+            ),
+            id="observability.W001",
+        )
+    ]
+
+
+@register()
+def check_analytics_cache(app_configs=None, **kwargs):
+    if not bool(getattr(settings, "APM_ANALYTICS_CACHE", False)):
+        return []
+    alias = str(getattr(settings, "APM_ANALYTICS_CACHE_ALIAS", "default"))
+    if not cache_is_process_local(alias):
+        return []
+    return [
+        Warning(
+            f"APM_ANALYTICS_CACHE_ALIAS={alias!r} is a per-process cache.",
+            hint=(
+                "Each worker caches its own results, and refresh_apirequest_* cannot "
+                "invalidate them (bump() only reaches the command's own process). "
+                "Point it at a cache shared by all workers."
+            ),
+            id="observability.W002",
+        )
+    ]
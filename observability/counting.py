@@ -0,0 +1,128 @@
+# observability/counting.py
+from __future__ import annotations
+
+import json
+from functools import cached_property
+
+from django.conf import settings
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db import DatabaseError, connections, transaction
+from django.db.models import QuerySet
+
+from .metrics import LIST_COUNTS
+
+DEFAULT_EXACT_COUNT_THRESHOLD = 10_000
+
+
+def _table_estimate(cursor, table: str) -> int:
+    # TimescaleDB: sums chunk statistics (pg_class.reltuples for plain tables).
+    cursor.execute("SELECT approximate_row_count(%s::regclass)", [table])
+    return int(cursor.fetchone()[0] or 0)
+
+
+def _plan_estimate(cursor, queryset: QuerySet) -> int:
+    sql, params = queryset.order_by().query.sql_with_params()
+    cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+    plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def estimate_count(queryset: QuerySet) -> int | None:
+    """
+    Row count estimate without scanning: approximate_row_count() for the whole
+    table, the planner's row estimate for a filtered queryset. None when the
+    database cannot estimate (not PostgreSQL, no statistics, any error).
+    """
+    db = connections[queryset.db]
+    if db.vendor != "postgresql":
+        return None
+    try:
+        with transaction.atomic(using=queryset.db), db.cursor() as cursor:
+            if not queryset.query.where and not queryset.query.distinct:
+                return _table_estimate(cursor, queryset.model._meta.db_table)
+            return _plan_estimate(cursor, queryset)
+    except (DatabaseError, KeyError, IndexError, TypeError, ValueError):
+        return None
+
+
+def count_rows(queryset: QuerySet, *, threshold: int | None = None) -> tuple[int, bool]:
+    """
+    (count, estimated). The estimate is used when it is at least `threshold`
+    (APM_COUNT_EXACT_THRESHOLD); below that, or without an estimate, COUNT(*)
+    is cheap enough and exact.
+    """
+    if bool(getattr(settings, "APM_COUNT_ESTIMATES", True)):
+        if threshold is None:
+            threshold = int(
+                getattr(settings, "APM_COUNT_EXACT_THRESHOLD", DEFAULT_EXACT_COUNT_THRESHOLD)
+            )
+        estimate = estimate_count(queryset)
+        if estimate is not None and estimate >= threshold:
+            LIST_COUNTS.labels(kind="estimated").inc()
+            return estimate, True
+    LIST_COUNTS.labels(kind="exact").inc()
+    return queryset.count(), False
+
+
+class EstimatedPage(Page):
+    """Page of an estimated count: has_next() comes from the rows, not the count."""
+
+    def __init__(self, object_list, number, paginator, *, more: bool):
+        super().__init__(object_list, number, paginator)
+        self.more = more
+
+    def has_next(self) -> bool:
+        return self.more
+
+    def end_index(self) -> int:
+        return (self.number - 1) * self.paginator.per_page + len(self.object_list)
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator whose count comes from count_rows(): large results report the
+    planner's "about N" instead of running COUNT(*). `count_estimated` tells
+    callers which one they got.
+
+    An estimate can be off either way, so it never bounds the pages: any page
+    number is served (pages past the real end are empty) and each page fetches
+    per_page + 1 rows to tell whether another one follows.
+    """
+
+    count_estimated = False
+
+    @cached_property
+    def count(self) -> int:
+        if not isinstance(self.object_list, QuerySet):
+            return len(self.object_list)
+        count, self.count_estimated = count_rows(self.object_list)
+        return count
+
+    @property
+    def estimated(self) -> bool:
+        """Whether `count` is an estimate (evaluates it first)."""
+        return bool(self.count) and self.count_estimated
+
+    def validate_number(self, number):
+        if not self.estimated:
+            return super().validate_number(number)
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError) as exc:
+            raise PageNotAnInteger(self.error_messages["invalid_page"]) from exc
+        if number < 1:
+            raise EmptyPage(self.error_messages["min_page"])
+        return number
+
+    def page(self, number):
+        if not self.estimated:
+            return super().page(number)
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom : bottom + self.per_page + 1])
+        more = len(rows) > self.per_page
+        return EstimatedPage(rows[: self.per_page], number, self, more=more)
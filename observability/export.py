@@ -0,0 +1,105 @@
+# observability/export.py
+from __future__ import annotations
+
+import csv
+import io
+import json
+import zlib
+from collections.abc import Iterable, Iterator
+from datetime import datetime
+from typing import Any
+
+from django.db.models import QuerySet
+
+from .metrics import EXPORT_ROWS
+
+EXPORT_FIELDS: tuple[str, ...] = (
+    "id",
+    "time",
+    "service",
+    "endpoint",
+    "method",
+    "status_code",
+    "latency_ms",
+    "trace_id",
+    "user_ref",
+    "tags",
+)
+EXPORT_FORMATS: dict[str, str] = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+DEFAULT_EXPORT_BATCH_SIZE = 5000
+GZIP_LEVEL = 6
+
+
+def _iso(value: datetime) -> str:
+    return value.isoformat().replace("+00:00", "Z")
+
+
+def iter_batches(queryset: QuerySet, *, batch_size: int) -> Iterator[list[tuple]]:
+    """
+    Rows of EXPORT_FIELDS as tuples, `batch_size` at a time. QuerySet.iterator()
+    reads through a server-side (named) cursor on PostgreSQL and caches nothing,
+    so memory holds one batch whatever the row count.
+    """
+    batch: list[tuple] = []
+    for row in queryset.values_list(*EXPORT_FIELDS).iterator(chunk_size=batch_size):
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def ndjson_chunks(batches: Iterable[list[tuple]]) -> Iterator[bytes]:
+    """One JSON object per line (keys = EXPORT_FIELDS), one chunk per batch."""
+    for batch in batches:
+        lines = []
+        for row in batch:
+            item: dict[str, Any] = dict(zip(EXPORT_FIELDS, row, strict=True))
+            item["time"] = _iso(item["time"])
+            lines.append(json.dumps(item, separators=(",", ":"), default=str))
+        EXPORT_ROWS.labels(format="ndjson").inc(len(batch))
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def csv_chunks(batches: Iterable[list[tuple]]) -> Iterator[bytes]:
+    """Header row, then one chunk per batch; tags are JSON-encoded in their cell."""
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    writer.writerow(EXPORT_FIELDS)
+    yield buf.getvalue().encode("utf-8")
+
+    time_index = EXPORT_FIELDS.index("time")
+    tags_index = EXPORT_FIELDS.index("tags")
+    for batch in batches:
+        buf.seek(0)
+        buf.truncate()
+        for row in batch:
+            values = list(row)
+            values[time_index] = _iso(values[time_index])
+            values[tags_index] = json.dumps(values[tags_index], separators=(",", ":"))
+            writer.writerow(values)
+        EXPORT_ROWS.labels(format="csv").inc(len(batch))
+        yield buf.getvalue().encode("utf-8")
+
+
+def gzip_chunks(chunks: Iterable[bytes], *, level: int = GZIP_LEVEL) -> Iterator[bytes]:
+    """Compresses a chunk stream into one gzip member, chunk by chunk."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        out = compressor.compress(chunk)
+        if out:
+            yield out
+    yield compressor.flush()
+
+
+def export_stream(
+    queryset: QuerySet, *, fmt: str, batch_size: int = DEFAULT_EXPORT_BATCH_SIZE, gzip: bool
+) -> Iterator[bytes]:
+    batches = iter_batches(queryset, batch_size=batch_size)
+    chunks = csv_chunks(batches) if fmt == "csv" else ndjson_chunks(batches)
+    return gzip_chunks(chunks) if gzip else chunks
@@ -0,0 +1,25 @@
+# observability/ingest/__init__.py
+from .copy_writer import WriteResult, write_rows
+from .validation import (
+    INGEST_COLUMNS,
+    IngestRow,
+    InvalidEvent,
+    ValidationResult,
+    row_as_dict,
+    row_from_dict,
+    validate_events,
+    validate_events_with_serializer,
+)
+
+__all__ = [
+    "INGEST_COLUMNS",
+    "IngestRow",
+    "InvalidEvent",
+    "ValidationResult",
+    "WriteResult",
+    "row_as_dict",
+    "row_from_dict",
+    "validate_events",
+    "validate_events_with_serializer",
+    "write_rows",
+]
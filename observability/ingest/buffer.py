@@ -0,0 +1,279 @@
+# observability/ingest/buffer.py
+from __future__ import annotations
+
+import atexit
+import logging
+import threading
+import time
+import uuid
+from collections import deque
+from collections.abc import Callable, Sequence
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from ..metrics import (
+    INGEST_BUFFER_DEPTH,
+    INGEST_BUFFER_DROPPED_ROWS,
+    INGEST_BUFFER_FLUSH_FAILURES,
+    INGEST_BUFFER_FLUSH_SECONDS,
+)
+from .copy_writer import EMPTY_WRITE, WriteResult, write_rows
+from .spool import SPOOLABLE_ERRORS, get_spool, write_or_spool
+from .validation import IngestRow
+
+logger = logging.getLogger(__name__)
+
+BUFFER_POLICIES = ("block", "drop")
+
+Writer = Callable[[Sequence[IngestRow]], WriteResult]
+DeadLetter = Callable[[Sequence[IngestRow], BaseException], None]
+
+# Errors worth retrying the whole batch for (database unreachable); anything
+# else (bad data, constraint violations) is isolated by bisecting the batch.
+TRANSIENT_ERRORS = SPOOLABLE_ERRORS
+
+
+class BufferFull(Exception):
+    """The write-behind buffer cannot take the batch (drop policy or block timeout)."""
+
+    def __init__(self, message: str, *, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _default_writer(rows: Sequence[IngestRow]) -> WriteResult:
+    spool = get_spool()
+    if spool is not None:
+        return write_or_spool(rows, spool=spool, source="buffer")[0]
+    return write_rows(rows, source="buffer")
+
+
+def _log_dead_letter(rows: Sequence[IngestRow], exc: BaseException) -> None:
+    logger.error(
+        "Ingest buffer dropped %d row(s) the database rejected (%s): %r", len(rows), exc, rows
+    )
+
+
+class IngestBuffer:
+    """
+    Bounded in-process write-behind queue for ingest rows.
+
+    Requests append validated rows (submit) and return immediately; a daemon
+    flusher thread coalesces rows from many requests into one bulk write when
+    `flush_rows` rows are queued or `flush_interval` seconds have passed.
+
+    When full:
+      - policy "drop":  the incoming batch is refused right away
+      - policy "block": the request waits up to `block_timeout` for room
+    Either way BufferFull is raised and the caller answers 503.
+
+    Rows of a flush that failed with a transient error (database unreachable)
+    are put back at the head of the queue and retried with backoff, so a
+    slow/failed primary turns into backpressure, not data loss. With
+    APM_INGEST_SPOOL on, the default writer spools them to local disk instead.
+    Any other writer error means some row is unacceptable: the batch is bisected
+    until the failing rows are isolated, and those are handed to `dead_letter`
+    (logged by default) so one bad row cannot wedge the queue.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_rows: int,
+        flush_rows: int,
+        flush_interval: float,
+        policy: str = "block",
+        block_timeout: float = 5.0,
+        writer: Writer = _default_writer,
+        dead_letter: DeadLetter = _log_dead_letter,
+    ):
+        if policy not in BUFFER_POLICIES:
+            raise ValueError(f"policy must be one of {BUFFER_POLICIES}, got {policy!r}")
+        self.max_rows = max(1, int(max_rows))
+        self.flush_rows = max(1, min(int(flush_rows), self.max_rows))
+        self.flush_interval = max(0.01, float(flush_interval))
+        self.policy = policy
+        self.block_timeout = max(0.0, float(block_timeout))
+        self._writer = writer
+        self._dead_letter = dead_letter
+
+        self._rows: deque[IngestRow] = deque()
+        self._cond = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._stopping = False
+        self._backoff = 0.0
+
+    # ----------------------------
+    # Producer side
+    # ----------------------------
+    @property
+    def depth(self) -> int:
+        return len(self._rows)
+
+    def submit(self, rows: Sequence[IngestRow], *, batch_id: str | None = None) -> str:
+        """
+        Queue rows for the flusher. Returns the batch id (`batch_id`, or a new one
+        when None; one request submitting several chunks passes the same id).
+        Raises BufferFull when the batch cannot be queued.
+        """
+        batch_id = batch_id or uuid.uuid4().hex
+        n = len(rows)
+        if n == 0:
+            return batch_id
+        if n > self.max_rows:
+            INGEST_BUFFER_DROPPED_ROWS.labels(reason="too_large").inc(n)
+            raise BufferFull(
+                f"Batch of {n} rows exceeds buffer capacity ({self.max_rows}).",
+                retry_after=self.flush_interval,
+            )
+
+        with self._cond:
+            deadline = time.monotonic() + self.block_timeout
+            while len(self._rows) + n > self.max_rows:
+                remaining = deadline - time.monotonic()
+                if self.policy == "drop" or remaining <= 0:
+                    INGEST_BUFFER_DROPPED_ROWS.labels(reason=self.policy).inc(n)
+                    raise BufferFull(
+                        f"Ingest buffer full ({len(self._rows)}/{self.max_rows} rows).",
+                        retry_after=max(self.flush_interval, self._backoff),
+                    )
+                self._cond.wait(remaining)
+
+            self._rows.extend(rows)
+            INGEST_BUFFER_DEPTH.set(len(self._rows))
+            if len(self._rows) >= self.flush_rows:
+                self._cond.notify_all()
+
+        self._ensure_thread()
+        return batch_id
+
+    # ----------------------------
+    # Flusher side
+    # ----------------------------
+    def _take(self, limit: int) -> list[IngestRow]:
+        take = min(limit, len(self._rows))
+        popleft = self._rows.popleft
+        return [popleft() for _ in range(take)]
+
+    def flush(self, *, limit: int | None = None) -> WriteResult | None:
+        """
+        Write up to `limit` queued rows (default: everything queued) in one bulk insert.
+        Returns None when nothing was queued. Transient writer errors re-queue the
+        unwritten rows and are re-raised; other errors are isolated (_write_isolating).
+        """
+        with self._cond:
+            batch = self._take(limit or len(self._rows))
+            INGEST_BUFFER_DEPTH.set(len(self._rows))
+        if not batch:
+            return None
+
+        t0 = time.perf_counter()
+        try:
+            result = self._write_isolating(batch)
+        finally:
+            INGEST_BUFFER_FLUSH_SECONDS.observe(time.perf_counter() - t0)
+
+        with self._cond:
+            # Room was made: wake producers blocked in submit().
+            self._cond.notify_all()
+        return result
+
+    def _write_isolating(self, batch: list[IngestRow]) -> WriteResult:
+        """
+        Write `batch`, bisecting it on non-transient errors: halves are retried
+        in order and a single row that still fails is dead-lettered. On a
+        transient error, whatever was not written yet goes back to the queue head.
+        """
+        pending: list[list[IngestRow]] = [batch]
+        total = EMPTY_WRITE
+        while pending:
+            part = pending.pop(0)
+            try:
+                result = self._writer(part)
+            except TRANSIENT_ERRORS:
+                INGEST_BUFFER_FLUSH_FAILURES.inc()
+                unwritten = [row for chunk in [part, *pending] for row in chunk]
+                with self._cond:
+                    self._rows.extendleft(reversed(unwritten))
+                    INGEST_BUFFER_DEPTH.set(len(self._rows))
+                raise
+            except Exception as exc:
+                INGEST_BUFFER_FLUSH_FAILURES.inc()
+                if len(part) == 1:
+                    INGEST_BUFFER_DROPPED_ROWS.labels(reason="rejected").inc()
+                    self._dead_letter(part, exc)
+                    continue
+                mid = len(part) // 2
+                pending[0:0] = [part[:mid], part[mid:]]
+                continue
+            total = total + result
+        return total
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                deadline = time.monotonic() + self.flush_interval + self._backoff
+                while not self._stopping and len(self._rows) < self.flush_rows:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                stopping = self._stopping
+
+            close_old_connections()
+            try:
+                self.flush()
+                self._backoff = 0.0
+            except Exception:
+                self._backoff = min(30.0, max(self.flush_interval, self._backoff * 2))
+                logger.exception("Ingest buffer flush failed; retrying in %.1fs", self._backoff)
+            finally:
+                close_old_connections()
+
+            if stopping:
+                return
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._cond:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping = False
+            self._thread = threading.Thread(
+                target=self._run, name="apm-ingest-flusher", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Flush what is left and stop the flusher thread (used at interpreter exit)."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+_buffer: IngestBuffer | None = None
+_buffer_lock = threading.Lock()
+
+
+def get_ingest_buffer() -> IngestBuffer:
+    """Process-wide buffer built from APM_INGEST_BUFFER_* settings (one per gunicorn worker)."""
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = IngestBuffer(
+                    max_rows=int(getattr(settings, "APM_INGEST_BUFFER_MAX_ROWS", 200_000)),
+                    flush_rows=int(getattr(settings, "APM_INGEST_BUFFER_FLUSH_ROWS", 20_000)),
+                    flush_interval=float(
+                        getattr(settings, "APM_INGEST_BUFFER_FLUSH_INTERVAL", 1.0)
+                    ),
+                    policy=str(getattr(settings, "APM_INGEST_BUFFER_POLICY", "block")),
+                    block_timeout=float(getattr(settings, "APM_INGEST_BUFFER_BLOCK_TIMEOUT", 5.0)),
+                )
+                atexit.register(_buffer.stop)
+    return _buffer
@@ -0,0 +1,486 @@
+# observability/ingest/columnar.py
+"""
+Compact binary columnar batch format for ingest (application/x-apm-columnar).
+
+A body is one or more frames. All integers are little-endian.
+
+Frame header (24 bytes, struct "<4sBBHIIq"):
+    magic      b"APMC"
+    version    1
+    flags      bit0 trace_id column, bit1 user_ref column, bit2 tags column
+    reserved   0
+    count      number of events in the frame
+    body_len   number of bytes following the header
+    base_us    time of the first event, microseconds since the Unix epoch (UTC)
+
+Frame body, in order:
+    dictionary   string table shared by service/endpoint/method/tags
+    service      int column of dictionary indexes
+    endpoint     int column of dictionary indexes
+    method       int column of dictionary indexes
+    time         int column of deltas (us) from the previous event (first is 0)
+    status_code  int column
+    latency_ms   int column
+    trace_id     string column (flag bit0)
+    user_ref     string column (flag bit1)
+    tags         int column of dictionary indexes into compact JSON objects (flag bit2)
+
+int column:    typecode (1 byte, one of "bBhHiIqQ"), byte length (u32), packed values.
+               The encoder picks the narrowest typecode that fits the column.
+string column: int column of UTF-8 byte lengths (-1 = null), blob length (u32), blob.
+dictionary:    entry count (u32) followed by a non-null string column.
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+import sys
+from array import array
+from collections.abc import Iterator, Sequence
+from datetime import UTC, datetime, timedelta
+from functools import cache
+from itertools import accumulate
+from typing import Any
+
+from rest_framework import serializers
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+from ..serializers import ApiRequestIngestItemSerializer
+from .compression import DecompressingParserMixin, max_decompressed_bytes
+from .validation import (
+    _ENDPOINT_MAX,
+    _MAX_LATENCY_MS,
+    _METHODS,
+    _PROHIBITED_CHARS,
+    _SERVICE_MAX,
+    _TRACE_ID_MAX,
+    _USER_REF_MAX,
+    IngestRow,
+    ValidationResult,
+)
+
+COLUMNAR_MEDIA_TYPE = "application/x-apm-columnar"
+
+MAGIC = b"APMC"
+VERSION = 1
+
+FLAG_TRACE_ID = 0x01
+FLAG_USER_REF = 0x02
+FLAG_TAGS = 0x04
+
+DEFAULT_FRAME_SIZE = 10_000
+
+_HEADER = struct.Struct("<4sBBHIIq")
+_U32 = struct.Struct("<I")
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+_MIN_US = int((datetime(1, 1, 1, tzinfo=UTC) - _EPOCH) / timedelta(microseconds=1))
+_MAX_US = int((datetime(9999, 12, 31, 23, 59, 59, tzinfo=UTC) - _EPOCH) / timedelta(microseconds=1))
+
+_SIGNED = ("b", "h", "i", "q")
+_UNSIGNED = ("B", "H", "I", "Q")
+_TYPECODES = frozenset(_SIGNED + _UNSIGNED)
+_BIG_ENDIAN = sys.byteorder == "big"
+
+
+def _to_us(dt: datetime) -> int:
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=UTC)
+    return (dt - _EPOCH) // timedelta(microseconds=1)
+
+
+# ----------------------------
+# Encoder
+# ----------------------------
+def _pack_ints(values: Sequence[int]) -> bytes:
+    lo = min(values, default=0)
+    hi = max(values, default=0)
+    codes = _UNSIGNED if lo >= 0 else _SIGNED
+    for code in codes:
+        arr = array(code)
+        bits = arr.itemsize * 8
+        if code in _UNSIGNED:
+            fits = hi < (1 << bits)
+        else:
+            fits = -(1 << (bits - 1)) <= lo and hi < (1 << (bits - 1))
+        if fits:
+            break
+    else:
+        raise ValueError("Integer column does not fit in 64 bits.")
+    arr.extend(values)
+    if _BIG_ENDIAN:
+        arr.byteswap()
+    data = arr.tobytes()
+    return code.encode("ascii") + _U32.pack(len(data)) + data
+
+
+def _pack_strings(values: Sequence[str | None]) -> bytes:
+    encoded = [None if v is None else v.encode("utf-8") for v in values]
+    lengths = [-1 if b is None else len(b) for b in encoded]
+    blob = b"".join(b for b in encoded if b)
+    return _pack_ints(lengths) + _U32.pack(len(blob)) + blob
+
+
+class _Dictionary:
+    def __init__(self):
+        self.index: dict[str, int] = {}
+
+    def ids(self, values: Sequence[str]) -> list[int]:
+        index = self.index
+        setdefault = index.setdefault
+        return [setdefault(v, len(index)) for v in values]
+
+    def pack(self) -> bytes:
+        return _U32.pack(len(self.index)) + _pack_strings(list(self.index))
+
+
+def _tags_key(tags: Any) -> str:
+    return json.dumps(tags or {}, separators=(",", ":"), sort_keys=True)
+
+
+def encode_frame(rows: Sequence[IngestRow]) -> bytes:
+    """Encode rows (INGEST_COLUMNS order, `time` an aware datetime) as one frame."""
+    count = len(rows)
+    if count == 0:
+        return b""
+    times, services, endpoints, methods, statuses, latencies, trace_ids, user_refs, tags = zip(
+        *rows, strict=True
+    )
+
+    us = [_to_us(t) for t in times]
+    base = us[0]
+    deltas = [0] + [b - a for a, b in zip(us, us[1:], strict=False)]
+
+    flags = 0
+    strings = _Dictionary()
+    parts = [
+        None,  # dictionary, filled once every column has registered its strings
+        _pack_ints(strings.ids(services)),
+        _pack_ints(strings.ids(endpoints)),
+        _pack_ints(strings.ids(methods)),
+        _pack_ints(deltas),
+        _pack_ints(statuses),
+        _pack_ints(latencies),
+    ]
+    if any(v is not None for v in trace_ids):
+        flags |= FLAG_TRACE_ID
+        parts.append(_pack_strings(trace_ids))
+    if any(v is not None for v in user_refs):
+        flags |= FLAG_USER_REF
+        parts.append(_pack_strings(user_refs))
+    if any(tags):
+        flags |= FLAG_TAGS
+        parts.append(_pack_ints(strings.ids([_tags_key(t) for t in tags])))
+    parts[0] = strings.pack()
+
+    body = b"".join(parts)
+    return _HEADER.pack(MAGIC, VERSION, flags, 0, count, len(body), base) + body
+
+
+def encode_batch(rows: Sequence[IngestRow], *, frame_size: int = DEFAULT_FRAME_SIZE) -> bytes:
+    """Encode any number of rows as consecutive frames of at most `frame_size` events."""
+    return b"".join(
+        encode_frame(rows[i : i + frame_size]) for i in range(0, len(rows), max(1, frame_size))
+    )
+
+
+# ----------------------------
+# Decoder
+# ----------------------------
+class ColumnarFrame:
+    """One undecoded frame: header fields + body bytes. len() is the event count."""
+
+    __slots__ = ("flags", "count", "base_us", "body")
+
+    def __init__(self, flags: int, count: int, base_us: int, body: bytes):
+        self.flags = flags
+        self.count = count
+        self.base_us = base_us
+        self.body = body
+
+    def __len__(self) -> int:
+        return self.count
+
+
+class _Reader:
+    __slots__ = ("buf", "pos", "count")
+
+    def __init__(self, buf: bytes, count: int):
+        self.buf = memoryview(buf)
+        self.pos = 0
+        self.count = count
+
+    def take(self, n: int) -> memoryview:
+        end = self.pos + n
+        if n < 0 or end > len(self.buf):
+            raise ParseError("Malformed columnar frame: truncated body.")
+        out = self.buf[self.pos : end]
+        self.pos = end
+        return out
+
+    def u32(self) -> int:
+        return _U32.unpack(self.take(4))[0]
+
+    def ints(self, count: int | None = None) -> array:
+        count = self.count if count is None else count
+        code = bytes(self.take(1)).decode("ascii", errors="replace")
+        if code not in _TYPECODES:
+            raise ParseError(f"Malformed columnar frame: unknown typecode {code!r}.")
+        arr = array(code)
+        size = self.u32()
+        if size != count * arr.itemsize:
+            raise ParseError("Malformed columnar frame: column length mismatch.")
+        arr.frombytes(self.take(size))
+        if _BIG_ENDIAN:
+            arr.byteswap()
+        return arr
+
+    def strings(self, count: int | None = None) -> list[str | None]:
+        lengths = self.ints(count)
+        blob = bytes(self.take(self.u32()))
+        if sum(n for n in lengths if n > 0) != len(blob):
+            raise ParseError("Malformed columnar frame: string blob length mismatch.")
+        out: list[str | None] = []
+        pos = 0
+        try:
+            for n in lengths:
+                if n < 0:
+                    out.append(None)
+                    continue
+                out.append(blob[pos : pos + n].decode("utf-8"))
+                pos += n
+        except UnicodeDecodeError as exc:
+            raise ParseError(f"Malformed columnar frame: {exc}") from exc
+        return out
+
+
+def read_frames(stream, *, max_frame_bytes: int) -> Iterator[ColumnarFrame]:
+    """Split a columnar body into frames, reading one frame at a time."""
+    if stream is None:
+        return
+    while True:
+        header = stream.read(_HEADER.size)
+        if not header:
+            return
+        if len(header) < _HEADER.size:
+            raise ParseError("Malformed columnar body: truncated frame header.")
+        magic, version, flags, _, count, body_len, base_us = _HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ParseError("Malformed columnar body: bad magic.")
+        if version != VERSION:
+            raise ParseError(f"Unsupported columnar version {version} (expected {VERSION}).")
+        if body_len > max_frame_bytes:
+            raise ParseError(f"Columnar frame exceeds {max_frame_bytes} bytes.")
+        body = stream.read(body_len)
+        if len(body) != body_len:
+            raise ParseError("Malformed columnar body: truncated frame.")
+        yield ColumnarFrame(flags, count, base_us, body)
+
+
+@cache
+def _serializer() -> ApiRequestIngestItemSerializer:
+    return ApiRequestIngestItemSerializer()
+
+
+def _field_errors(name: str, value: Any) -> list[Any] | None:
+    """Run one serializer field (+ validate_<name>) to get the exact JSON-path error."""
+    ser = _serializer()
+    try:
+        clean = ser.fields[name].run_validation(value)
+        hook = getattr(ser, f"validate_{name}", None)
+        if hook is not None:
+            hook(clean)
+    except serializers.ValidationError as exc:
+        return exc.detail
+    return None
+
+
+def _dict_column(
+    name: str, ids: array, table: list[Any], errors: dict[int, dict[str, Any]], check
+) -> list[Any]:
+    """
+    Resolve dictionary ids and validate each distinct entry once.
+    `check(value)` returns (clean, error_detail_or_None).
+    """
+    resolved: dict[int, tuple[Any, Any]] = {}
+    n_entries = len(table)
+    for i in set(ids):
+        if i < 0 or i >= n_entries:
+            raise ParseError(f"Malformed columnar frame: {name} index out of range.")
+        resolved[i] = check(table[i])
+
+    if all(err is None for _, err in resolved.values()):
+        clean = {i: v for i, (v, _) in resolved.items()}
+        return [clean[i] for i in ids]
+
+    out: list[Any] = []
+    for row, i in enumerate(ids):
+        value, err = resolved[i]
+        if err is not None:
+            errors.setdefault(row, {})[name] = err
+        out.append(value)
+    return out
+
+
+def _check_text(name: str, max_length: int):
+    def check(value: str) -> tuple[Any, Any]:
+        s = value.strip()
+        if s and len(s) <= max_length and not _PROHIBITED_CHARS.search(s):
+            return s, None
+        return None, _field_errors(name, value)
+
+    return check
+
+
+def _check_method(value: str) -> tuple[Any, Any]:
+    if value in _METHODS:
+        return value, None
+    return None, _field_errors("method", value)
+
+
+def _check_tags_json(value: str) -> tuple[Any, Any]:
+    try:
+        tags = json.loads(value)
+    except ValueError:
+        return None, ["Invalid JSON."]
+    if type(tags) is dict:
+        return tags, None
+    return None, _field_errors("tags", tags)
+
+
+def _check_range(name: str, col: array, lo: int, hi: int, errors: dict[int, dict[str, Any]]):
+    if col and lo <= min(col) and max(col) <= hi:
+        return
+    for row, v in enumerate(col):
+        if v < lo or v > hi:
+            errors.setdefault(row, {})[name] = _field_errors(name, v)
+
+
+def _optional_text(
+    name: str, col: list[str | None], max_length: int, errors: dict[int, dict[str, Any]]
+) -> list[str | None]:
+    out: list[str | None] = []
+    for row, v in enumerate(col):
+        if v is None:
+            out.append(None)
+            continue
+        s = v.strip()
+        if len(s) > max_length or _PROHIBITED_CHARS.search(s):
+            errors.setdefault(row, {})[name] = _field_errors(name, v)
+        out.append(s)
+    return out
+
+
+def _times(base_us: int, deltas: array, errors: dict[int, dict[str, Any]]) -> list[Any]:
+    stamps = list(accumulate(deltas, initial=base_us))[1:]
+    if stamps and _MIN_US <= min(stamps) and max(stamps) <= _MAX_US:
+        return [_EPOCH + timedelta(microseconds=us) for us in stamps]
+
+    out: list[Any] = []
+    for row, us in enumerate(stamps):
+        if _MIN_US <= us <= _MAX_US:
+            out.append(_EPOCH + timedelta(microseconds=us))
+        else:
+            errors.setdefault(row, {})["time"] = ["Timestamp out of range."]
+            out.append(None)
+    return out
+
+
+def decode_frame(
+    frame: ColumnarFrame,
+    *,
+    max_errors: int,
+    start_index: int = 0,
+) -> ValidationResult:
+    """
+    Decode and validate one frame column-wise, straight into INGEST_COLUMNS tuples.
+
+    Dictionary strings (service/endpoint/method/tags) are validated once per
+    distinct value; numeric columns are range-checked as whole arrays. Error
+    details match the JSON path (same serializer fields produce the messages).
+    Structural problems (bad lengths, indexes, UTF-8) raise ParseError.
+    """
+    count = frame.count
+    reader = _Reader(frame.body, count)
+    errors: dict[int, dict[str, Any]] = {}
+
+    n_strings = reader.u32()
+    table = reader.strings(n_strings)
+    if any(s is None for s in table):
+        raise ParseError("Malformed columnar frame: null dictionary entry.")
+
+    services = _dict_column(
+        "service", reader.ints(), table, errors, _check_text("service", _SERVICE_MAX)
+    )
+    endpoints = _dict_column(
+        "endpoint", reader.ints(), table, errors, _check_text("endpoint", _ENDPOINT_MAX)
+    )
+    methods = _dict_column("method", reader.ints(), table, errors, _check_method)
+    times = _times(frame.base_us, reader.ints(), errors)
+
+    statuses = reader.ints()
+    _check_range("status_code", statuses, 100, 599, errors)
+    latencies = reader.ints()
+    _check_range("latency_ms", latencies, 0, _MAX_LATENCY_MS, errors)
+
+    none_col = [None] * count
+    trace_ids = none_col
+    user_refs = none_col
+    if frame.flags & FLAG_TRACE_ID:
+        trace_ids = _optional_text("trace_id", reader.strings(), _TRACE_ID_MAX, errors)
+    if frame.flags & FLAG_USER_REF:
+        user_refs = _optional_text("user_ref", reader.strings(), _USER_REF_MAX, errors)
+    if frame.flags & FLAG_TAGS:
+        tags = _dict_column("tags", reader.ints(), table, errors, _check_tags_json)
+    else:
+        tags = [{} for _ in range(count)]
+
+    if reader.pos != len(reader.buf):
+        raise ParseError("Malformed columnar frame: trailing bytes.")
+
+    columns = (
+        times,
+        services,
+        endpoints,
+        methods,
+        statuses.tolist(),
+        latencies.tolist(),
+        trace_ids,
+        user_refs,
+        tags,
+    )
+    result = ValidationResult()
+    if not errors:
+        result.rows = list(zip(*columns, strict=True))
+        return result
+
+    result.invalid = len(errors)
+    result.rows = [row for i, row in enumerate(zip(*columns, strict=True)) if i not in errors]
+    for i in sorted(errors)[:max_errors]:
+        result.errors.append({"index": start_index + i, "errors": errors[i]})
+    return result
+
+
+class ColumnarStream:
+    """Parsed columnar body (request.data): iterates ColumnarFrame objects, once."""
+
+    def __init__(self, stream, *, max_frame_bytes: int):
+        self._iter = read_frames(stream, max_frame_bytes=max_frame_bytes)
+
+    def __iter__(self) -> Iterator[ColumnarFrame]:
+        return self._iter
+
+
+class ColumnarParser(BaseParser):
+    """application/x-apm-columnar: frames are read lazily by the ingest view."""
+
+    media_type = COLUMNAR_MEDIA_TYPE
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        return ColumnarStream(stream, max_frame_bytes=max_decompressed_bytes())
+
+
+class IngestColumnarParser(DecompressingParserMixin, ColumnarParser):
+    pass
@@ -0,0 +1,168 @@
+# observability/ingest/compression.py
+from __future__ import annotations
+
+import gzip
+import zlib
+from typing import Any
+
+from django.conf import settings
+from rest_framework import status
+from rest_framework.exceptions import APIException, ParseError
+from rest_framework.parsers import JSONParser
+
+from ..metrics import INGEST_BODY_BYTES
+from .ndjson import NDJSONParser
+
+try:  # Python 3.14+ stdlib
+    from compression import zstd as _zstd_stdlib
+except ImportError:  # pragma: no cover - depends on interpreter version
+    _zstd_stdlib = None
+
+try:  # python-zstandard (optional)
+    import zstandard as _zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    _zstandard = None
+
+ZSTD_AVAILABLE = _zstd_stdlib is not None or _zstandard is not None
+
+SUPPORTED_ENCODINGS = ("gzip", "x-gzip", "identity") + (("zstd",) if ZSTD_AVAILABLE else ())
+
+# Decompressed bytes allowed per event; the body limit is APM_INGEST_MAX_EVENTS times this.
+DEFAULT_MAX_EVENT_BYTES = 4096
+
+
+class UnsupportedContentEncoding(APIException):
+    status_code = status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+    default_detail = "Unsupported Content-Encoding."
+    default_code = "unsupported_content_encoding"
+
+
+class DecompressedBodyTooLarge(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = "Decompressed request body is too large."
+    default_code = "body_too_large"
+
+
+def _corrupt_errors() -> tuple[type[BaseException], ...]:
+    errors: list[type[BaseException]] = [OSError, EOFError, zlib.error]
+    if _zstd_stdlib is not None:
+        errors.append(_zstd_stdlib.ZstdError)
+    if _zstandard is not None:
+        errors.append(_zstandard.ZstdError)
+    return tuple(errors)
+
+
+_CORRUPT_ERRORS = _corrupt_errors()
+
+
+def max_decompressed_bytes() -> int:
+    max_events = int(getattr(settings, "APM_INGEST_MAX_EVENTS", 50_000))
+    per_event = int(getattr(settings, "APM_INGEST_MAX_EVENT_BYTES", DEFAULT_MAX_EVENT_BYTES))
+    return max(1, max_events * per_event)
+
+
+def parse_content_encoding(header: str | None) -> list[str]:
+    """
+    Content-Encoding codings in the order they were applied (RFC 9110).
+    Raises UnsupportedContentEncoding (415) for anything we cannot decode.
+    """
+    codings = [c.strip().lower() for c in (header or "").split(",") if c.strip()]
+    for coding in codings:
+        if coding not in SUPPORTED_ENCODINGS:
+            raise UnsupportedContentEncoding(
+                f"Unsupported Content-Encoding {coding!r}; "
+                f"supported: {', '.join(SUPPORTED_ENCODINGS)}."
+            )
+    return [c for c in codings if c != "identity"]
+
+
+def _decoder(stream, coding: str):
+    if coding in ("gzip", "x-gzip"):
+        return gzip.GzipFile(fileobj=stream, mode="rb")
+    if _zstd_stdlib is not None:
+        return _zstd_stdlib.ZstdFile(stream, mode="rb")
+    return _zstandard.ZstdDecompressor().stream_reader(stream, read_across_frames=True)
+
+
+class DecompressingStream:
+    """
+    File-like reader that decodes a compressed request body on the fly.
+
+    Parsers pull from it in small reads (the NDJSON parser 64 KiB at a time), so
+    the compressed and decompressed bodies are never held in memory whole.
+    Reading past `max_bytes` of decoded data raises DecompressedBodyTooLarge (413);
+    a corrupt body raises ParseError (400).
+    """
+
+    def __init__(self, stream, codings: list[str], *, max_bytes: int):
+        self._codings = codings
+        self._label = "+".join(codings)
+        self._max_bytes = max_bytes
+        self._seen = 0
+        reader = stream
+        for coding in reversed(codings):
+            reader = _decoder(reader, coding)
+        self._reader = reader
+
+    def _read(self, size: int) -> bytes:
+        try:
+            data = self._reader.read(size)
+        except _CORRUPT_ERRORS as exc:
+            raise ParseError(f"Malformed {self._label} body: {exc}") from exc
+        self._seen += len(data)
+        INGEST_BODY_BYTES.labels(encoding=self._label, stage="decoded").inc(len(data))
+        if self._seen > self._max_bytes:
+            raise DecompressedBodyTooLarge(
+                f"Decompressed body exceeds {self._max_bytes} bytes "
+                "(APM_INGEST_MAX_EVENTS x APM_INGEST_MAX_EVENT_BYTES)."
+            )
+        return data
+
+    def read(self, size: int | None = -1) -> bytes:
+        if size is not None and size >= 0:
+            return self._read(min(size, self._max_bytes - self._seen + 1))
+
+        parts: list[bytes] = []
+        while True:
+            data = self._read(64 * 1024)
+            if not data:
+                return b"".join(parts)
+            parts.append(data)
+
+
+def compress_body(data: bytes, coding: str) -> bytes:
+    """Client side of the above (seed command, tests)."""
+    coding = coding.strip().lower()
+    if coding in ("gzip", "x-gzip"):
+        return gzip.compress(data, compresslevel=6)
+    if coding == "zstd":
+        if _zstd_stdlib is not None:
+            return _zstd_stdlib.compress(data)
+        if _zstandard is not None:
+            return _zstandard.ZstdCompressor().compress(data)
+    if coding in ("", "identity"):
+        return data
+    raise ValueError(f"Unsupported encoding {coding!r}; supported: {SUPPORTED_ENCODINGS}")
+
+
+class DecompressingParserMixin:
+    """Wrap the request stream according to Content-Encoding before the real parser runs."""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        request = (parser_context or {}).get("request")
+        meta: dict[str, Any] = getattr(request, "META", {}) if request is not None else {}
+        codings = parse_content_encoding(meta.get("HTTP_CONTENT_ENCODING"))
+        if codings and stream is not None:
+            label = "+".join(codings)
+            wire = int(meta.get("CONTENT_LENGTH") or 0)
+            INGEST_BODY_BYTES.labels(encoding=label, stage="wire").inc(wire)
+            stream = DecompressingStream(stream, codings, max_bytes=max_decompressed_bytes())
+        return super().parse(stream, media_type=media_type, parser_context=parser_context)
+
+
+class IngestJSONParser(DecompressingParserMixin, JSONParser):
+    pass
+
+
+class IngestNDJSONParser(DecompressingParserMixin, NDJSONParser):
+    pass
@@ -0,0 +1,180 @@
+# observability/ingest/copy_writer.py
+from __future__ import annotations
+
+import time
+from collections.abc import Iterable
+from contextlib import closing
+from dataclasses import dataclass
+from itertools import islice
+
+from django.conf import settings
+from django.db import connections, router, transaction
+
+from ..metrics import INGEST_ROWS_WRITTEN, INGEST_WRITE_ROWS_PER_SECOND, INGEST_WRITE_SECONDS
+from ..models import ApiRequest
+from .dimensions import DEFAULT_DIM_CHUNK, iter_with_dim_ids
+from .validation import INGEST_COLUMNS, IngestRow, row_as_dict
+
+try:  # psycopg 3 (requirements.txt); psycopg2 has no Cursor.copy()
+    from psycopg.types.json import Jsonb
+except ImportError:  # pragma: no cover - depends on installed driver
+    Jsonb = None
+
+RAW_TABLE = ApiRequest._meta.db_table
+
+# Columns actually written: the validated INGEST_COLUMNS + the resolved dimension id.
+WRITE_COLUMNS: tuple[str, ...] = (*INGEST_COLUMNS, "dim_id")
+
+# Binary COPY needs the exact Postgres type of every column (WRITE_COLUMNS order).
+_COPY_TYPES = [
+    "timestamptz",
+    "varchar",
+    "varchar",
+    "varchar",
+    "int2",
+    "int4",
+    "varchar",
+    "varchar",
+    "jsonb",
+    "int4",
+]
+
+COPY_FORMATS = ("binary", "text", "off")
+
+
+@dataclass(frozen=True)
+class WriteResult:
+    rows: int
+    seconds: float
+    method: str  # copy_binary | copy_text | bulk_create | insert | none
+
+    @property
+    def rows_per_sec(self) -> float:
+        if self.seconds <= 0:
+            return 0.0
+        return self.rows / self.seconds
+
+    def __add__(self, other: WriteResult) -> WriteResult:
+        method = self.method if other.method == "none" else other.method
+        return WriteResult(self.rows + other.rows, self.seconds + other.seconds, method)
+
+
+EMPTY_WRITE = WriteResult(rows=0, seconds=0.0, method="none")
+
+
+def copy_format() -> str:
+    fmt = str(getattr(settings, "APM_INGEST_COPY_FORMAT", "binary")).strip().lower()
+    return fmt if fmt in COPY_FORMATS else "binary"
+
+
+def _copy_supported(conn) -> bool:
+    return conn.vendor == "postgresql" and Jsonb is not None and copy_format() != "off"
+
+
+def _copy_rows(conn, rows: Iterable[IngestRow], *, binary: bool, table: str = RAW_TABLE) -> int:
+    """
+    Stream rows into the hypertable with COPY ... FROM STDIN.
+    Rows never become model instances; psycopg buffers and flushes as we go.
+    """
+    cols = ", ".join(WRITE_COLUMNS)
+    sql = f"COPY {table} ({cols}) FROM STDIN"
+    if binary:
+        sql += " (FORMAT BINARY)"
+
+    count = 0
+    with conn.cursor() as cursor:
+        with cursor.cursor.copy(sql) as copy:
+            if binary:
+                copy.set_types(_COPY_TYPES)
+            write_row = copy.write_row
+            for row in rows:
+                write_row((*row[:8], Jsonb(row[8]), row[9]))
+                count += 1
+    return count
+
+
+def _bulk_create_rows(alias: str, rows: Iterable[IngestRow], *, batch_size: int) -> int:
+    count = 0
+    it = iter(rows)
+    while True:
+        chunk = [
+            ApiRequest(**row_as_dict(row[:9]), dim_id=row[9]) for row in islice(it, batch_size)
+        ]
+        if not chunk:
+            return count
+        ApiRequest.objects.using(alias).bulk_create(chunk, batch_size=batch_size)
+        count += len(chunk)
+
+
+def _insert_rows(conn, table: str, rows: Iterable[IngestRow], *, batch_size: int) -> int:
+    """executemany fallback for tables without a model (e.g. the strict-mode staging table)."""
+    fields = [ApiRequest._meta.get_field(name) for name in (*INGEST_COLUMNS, "dim")]
+    cols = ", ".join(WRITE_COLUMNS)
+    marks = ", ".join(["%s"] * len(WRITE_COLUMNS))
+    sql = f"INSERT INTO {table} ({cols}) VALUES ({marks})"
+
+    count = 0
+    it = iter(rows)
+    with conn.cursor() as cursor:
+        while True:
+            chunk = [
+                [f.get_db_prep_save(v, conn) for f, v in zip(fields, row, strict=True)]
+                for row in islice(it, batch_size)
+            ]
+            if not chunk:
+                return count
+            cursor.executemany(sql, chunk)
+            count += len(chunk)
+
+
+def write_rows(
+    rows: Iterable[IngestRow],
+    *,
+    batch_size: int = 1000,
+    source: str = "api",
+    using: str | None = None,
+    table: str = RAW_TABLE,
+) -> WriteResult:
+    """
+    Insert validated rows (INGEST_COLUMNS order) in a single transaction.
+
+    PostgreSQL: COPY FROM STDIN (binary unless APM_INGEST_COPY_FORMAT says otherwise).
+    Other vendors (SQLite in tests/local runs): bulk_create in batch_size chunks.
+    `rows` may be any iterable, including a generator: it is consumed in chunks whose
+    dimension ids (dim_id) are resolved just before each chunk is written.
+    `table` targets another table with the same columns (strict-mode staging).
+    """
+    alias = using or router.db_for_write(ApiRequest)
+    conn = connections[alias]
+
+    if _copy_supported(conn):
+        binary = copy_format() == "binary"
+        method = "copy_binary" if binary else "copy_text"
+    else:
+        binary = False
+        method = "bulk_create" if table == RAW_TABLE else "insert"
+
+    t0 = time.perf_counter()
+    count = 0
+    with transaction.atomic(using=alias):
+        # Lookups can't run while a COPY is open: one COPY per resolved chunk.
+        chunk_size = max(batch_size, DEFAULT_DIM_CHUNK)
+        chunks = iter_with_dim_ids(rows, using=alias, chunk_size=chunk_size)
+        with closing(chunks):
+            for chunk in chunks:
+                if method == "bulk_create":
+                    count += _bulk_create_rows(alias, chunk, batch_size=batch_size)
+                elif method == "insert":
+                    count += _insert_rows(conn, table, chunk, batch_size=batch_size)
+                else:
+                    count += _copy_rows(conn, chunk, binary=binary, table=table)
+    elapsed = time.perf_counter() - t0
+
+    if count == 0:
+        return EMPTY_WRITE
+
+    result = WriteResult(rows=count, seconds=elapsed, method=method)
+    INGEST_ROWS_WRITTEN.labels(source=source, method=method).inc(count)
+    INGEST_WRITE_SECONDS.labels(source=source, method=method).observe(elapsed)
+    INGEST_WRITE_ROWS_PER_SECOND.labels(source=source, method=method).set(result.rows_per_sec)
+    return result
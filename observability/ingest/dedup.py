@@ -0,0 +1,144 @@
+# observability/ingest/dedup.py
+from __future__ import annotations
+
+import hashlib
+import math
+import threading
+import time
+from collections.abc import Iterable, Sequence
+from datetime import UTC, datetime, timedelta
+
+from django.conf import settings
+
+from .validation import IngestRow
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+_US = timedelta(microseconds=1)
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over 16-byte digests (double hashing, k probes).
+    Sized for `capacity` items at false-positive rate `error_rate`.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        capacity = max(1, int(capacity))
+        error_rate = min(max(float(error_rate), 1e-9), 0.5)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _probes(self, digest: bytes) -> Iterable[int]:
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:16], "little") | 1
+        size = self.size
+        return ((h1 + i * h2) % size for i in range(self.hashes))
+
+    def __contains__(self, digest: bytes) -> bool:
+        bits = self.bits
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in self._probes(digest))
+
+    def add(self, digest: bytes) -> None:
+        bits = self.bits
+        for p in self._probes(digest):
+            bits[p >> 3] |= 1 << (p & 7)
+        self.count += 1
+
+
+def event_digest(row: IngestRow) -> bytes | None:
+    """Identity of an event for dedup: (trace_id, time, endpoint). None without trace_id."""
+    trace_id = row[6]
+    if not trace_id:
+        return None
+    t = row[0]
+    us = (t - _EPOCH) // _US if t.tzinfo else (t.replace(tzinfo=UTC) - _EPOCH) // _US
+    key = f"{trace_id}\x1f{us}\x1f{row[2]}".encode()
+    return hashlib.blake2b(key, digest_size=16).digest()
+
+
+class RotatingBloomFilter:
+    """
+    Two-generation Bloom filter: an event is a duplicate if either the current or
+    the previous generation has it; generations rotate every `window` seconds, so
+    retries are caught for between one and two windows and memory stays fixed.
+
+    In-process only (one per worker): a retry routed to another worker is not
+    caught. Idempotency-Key (shared cache) covers that case for whole batches.
+    """
+
+    def __init__(self, *, window: float, capacity: int, error_rate: float, clock=time.monotonic):
+        self.window = max(1.0, float(window))
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._current = BloomFilter(capacity, error_rate)
+        self._previous: BloomFilter | None = None
+        self._rotated_at = clock()
+
+    def _maybe_rotate(self) -> None:
+        now = self._clock()
+        elapsed = now - self._rotated_at
+        if elapsed < self.window:
+            return
+        # More than two windows idle: both generations are stale.
+        self._previous = self._current if elapsed < 2 * self.window else None
+        self._current = BloomFilter(self.capacity, self.error_rate)
+        self._rotated_at = now
+
+    def _seen(self, digest: bytes) -> bool:
+        return digest in self._current or (self._previous is not None and digest in self._previous)
+
+    def split(self, rows: Sequence[IngestRow]) -> tuple[list[IngestRow], list[bytes], int]:
+        """
+        Drop rows already seen (or repeated within `rows`).
+        Returns (kept rows, digests to remember once they are stored, duplicates).
+        Nothing is remembered here: call remember() after the write succeeded.
+        """
+        kept: list[IngestRow] = []
+        digests: list[bytes] = []
+        batch: set[bytes] = set()
+        duplicates = 0
+        with self._lock:
+            self._maybe_rotate()
+            for row in rows:
+                digest = event_digest(row)
+                if digest is None:
+                    kept.append(row)
+                    continue
+                if digest in batch or self._seen(digest):
+                    duplicates += 1
+                    continue
+                batch.add(digest)
+                kept.append(row)
+                digests.append(digest)
+        return kept, digests, duplicates
+
+    def remember(self, digests: Iterable[bytes]) -> None:
+        with self._lock:
+            self._maybe_rotate()
+            add = self._current.add
+            for digest in digests:
+                add(digest)
+
+
+_filter: RotatingBloomFilter | None = None
+_filter_lock = threading.Lock()
+
+
+def get_dedup_filter() -> RotatingBloomFilter | None:
+    """Process-wide filter, or None when APM_INGEST_DEDUP is off."""
+    global _filter
+    if not bool(getattr(settings, "APM_INGEST_DEDUP", False)):
+        return None
+    if _filter is None:
+        with _filter_lock:
+            if _filter is None:
+                _filter = RotatingBloomFilter(
+                    window=float(getattr(settings, "APM_INGEST_DEDUP_WINDOW_SECONDS", 600)),
+                    capacity=int(getattr(settings, "APM_INGEST_DEDUP_CAPACITY", 1_000_000)),
+                    error_rate=float(getattr(settings, "APM_INGEST_DEDUP_ERROR_RATE", 0.001)),
+                )
+    return _filter
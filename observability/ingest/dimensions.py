@@ -0,0 +1,221 @@
+# observability/ingest/dimensions.py
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from collections.abc import Collection, Iterable, Iterator
+from contextlib import closing
+from itertools import islice
+
+from django.conf import settings
+from django.db import connections, transaction
+
+from ..metrics import INGEST_DIM_LOOKUPS
+from ..models import EndpointDim
+from .validation import IngestRow
+
+DimKey = tuple[str, str, str]  # (service, endpoint, method)
+
+DEFAULT_DIM_CACHE_SIZE = 100_000
+DEFAULT_DIM_CHUNK = 5_000
+DIM_QUERY_BATCH = 5_000  # keys per INSERT / lookup statement
+
+
+def dim_key(row: IngestRow) -> DimKey:
+    return (row[1], row[2], row[3])
+
+
+class DimensionCache:
+    """Thread-safe LRU of (service, endpoint, method) -> EndpointDim id."""
+
+    def __init__(self, maxsize: int = DEFAULT_DIM_CACHE_SIZE):
+        self.maxsize = max(1, int(maxsize))
+        self._ids: OrderedDict[DimKey, int] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def get_many(self, keys: Iterable[DimKey]) -> dict[DimKey, int]:
+        found: dict[DimKey, int] = {}
+        with self._lock:
+            for key in keys:
+                dim_id = self._ids.get(key)
+                if dim_id is not None:
+                    self._ids.move_to_end(key)
+                    found[key] = dim_id
+        return found
+
+    def put_many(self, ids: dict[DimKey, int]) -> None:
+        with self._lock:
+            self._ids.update(ids)
+            for key in ids:
+                self._ids.move_to_end(key)
+            while len(self._ids) > self.maxsize:
+                self._ids.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._ids.clear()
+
+
+def _insert_separately(using: str) -> bool:
+    """
+    New dimensions go through their own autocommit connection when `using` is
+    inside a transaction on PostgreSQL (write_rows' COPY): committed at once,
+    their rows are not locked until the whole batch commits.
+    """
+    conn = connections[using]
+    return conn.vendor == "postgresql" and conn.in_atomic_block
+
+
+class SideConnection:
+    """
+    The autocommit connection of _insert_separately(), opened on first use.
+    One is shared by every chunk of a write (see iter_with_dim_ids).
+    """
+
+    def __init__(self, using: str):
+        self.using = using
+        self._conn = None
+
+    def cursor(self):
+        if self._conn is None:
+            self._conn = connections.create_connection(self.using)
+        return self._conn.cursor()
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+def _insert_missing(keys: list[DimKey], using: str, side: SideConnection) -> None:
+    """INSERT ... ON CONFLICT DO NOTHING, `keys` already sorted."""
+    if not _insert_separately(using):
+        EndpointDim.objects.using(using).bulk_create(
+            [EndpointDim(service=s, endpoint=e, method=m) for s, e, m in keys],
+            ignore_conflicts=True,
+        )
+        return
+
+    table = EndpointDim._meta.db_table
+    values = ", ".join(["(%s, %s, %s)"] * len(keys))
+    with side.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} (service, endpoint, method) VALUES {values} "
+            "ON CONFLICT (service, endpoint, method) DO NOTHING",
+            [v for key in keys for v in key],
+        )
+
+
+def _fetch_ids(keys: list[DimKey], using: str) -> dict[DimKey, int]:
+    wanted = set(keys)
+    rows = (
+        EndpointDim.objects.using(using)
+        .filter(
+            service__in={k[0] for k in keys},
+            endpoint__in={k[1] for k in keys},
+            method__in={k[2] for k in keys},
+        )
+        .values_list("service", "endpoint", "method", "id")
+    )
+    return {(s, e, m): i for s, e, m, i in rows if (s, e, m) in wanted}
+
+
+def _fetch_or_create(
+    keys: Collection[DimKey], using: str, side: SideConnection
+) -> dict[DimKey, int]:
+    """
+    Insert the missing keys, then read all their ids, DIM_QUERY_BATCH keys per
+    statement (PostgreSQL takes at most 65535 bind parameters, 3 per key).
+
+    Keys are inserted in sorted order, so concurrent writers take the unique-index
+    locks in the same order and cannot deadlock on each other's new dimensions.
+    """
+    ordered = sorted(keys)
+    found: dict[DimKey, int] = {}
+    for start in range(0, len(ordered), DIM_QUERY_BATCH):
+        batch = ordered[start : start + DIM_QUERY_BATCH]
+        _insert_missing(batch, using, side)
+        found.update(_fetch_ids(batch, using))
+    return found
+
+
+def resolve_dim_ids(
+    keys: Collection[DimKey],
+    *,
+    using: str,
+    cache: DimensionCache | None = None,
+    side: SideConnection | None = None,
+) -> dict[DimKey, int]:
+    """
+    Map keys to dimension ids: LRU first, then the database for the misses.
+
+    Ids learned inside a transaction reach the cache only once it commits, so a
+    rolled-back dimension row can never be handed out from the cache (unless the
+    dimensions were committed on their own connection, see _insert_separately).
+    Without `side`, that connection is opened for this call only.
+    """
+    cache = cache if cache is not None else get_dimension_cache()
+    found = cache.get_many(keys)
+    if len(found) == len(keys):
+        INGEST_DIM_LOOKUPS.labels(result="hit").inc(len(keys))
+        return found
+
+    missing = [k for k in keys if k not in found]
+    INGEST_DIM_LOOKUPS.labels(result="hit").inc(len(found))
+    INGEST_DIM_LOOKUPS.labels(result="miss").inc(len(missing))
+    if side is None:
+        with closing(SideConnection(using)) as own:
+            fetched = _fetch_or_create(missing, using, own)
+    else:
+        fetched = _fetch_or_create(missing, using, side)
+    found.update(fetched)
+
+    if connections[using].in_atomic_block and not _insert_separately(using):
+        transaction.on_commit(lambda: cache.put_many(fetched), using=using)
+    else:
+        cache.put_many(fetched)
+    return found
+
+
+def iter_with_dim_ids(
+    rows: Iterable[IngestRow],
+    *,
+    using: str,
+    chunk_size: int = DEFAULT_DIM_CHUNK,
+    cache: DimensionCache | None = None,
+) -> Iterator[list[IngestRow]]:
+    """
+    Yield lists of rows extended with their dim_id (INGEST_COLUMNS + dim_id),
+    resolving each chunk's keys before the chunk is written. Close the
+    generator when done: it holds the side connection of new dimensions.
+    """
+    it = iter(rows)
+    side = SideConnection(using)
+    try:
+        while True:
+            chunk = list(islice(it, chunk_size))
+            if not chunk:
+                return
+            keys = {dim_key(r) for r in chunk}
+            ids = resolve_dim_ids(keys, using=using, cache=cache, side=side)
+            yield [(*r, ids[dim_key(r)]) for r in chunk]
+    finally:
+        side.close()
+
+
+_cache: DimensionCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_dimension_cache() -> DimensionCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = DimensionCache(
+                    int(getattr(settings, "APM_INGEST_DIM_CACHE_SIZE", DEFAULT_DIM_CACHE_SIZE))
+                )
+    return _cache
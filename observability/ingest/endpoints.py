@@ -0,0 +1,250 @@
+# observability/ingest/endpoints.py
+from __future__ import annotations
+
+import json
+import re
+import threading
+from collections import Counter
+from collections.abc import Callable, Iterable, Mapping, Sequence
+from typing import Any
+
+from django.conf import settings
+from django.db import router
+
+from ..metrics import INGEST_ENDPOINTS_FOLDED, INGEST_ENDPOINTS_TEMPLATED
+from ..models import EndpointDim
+from .validation import IngestRow
+
+OTHER_ENDPOINT = "__other__"
+ALL_SERVICES = "*"
+DEFAULT_RAW_TAG = "raw_endpoint"
+
+_SERVICE_COL = 1
+_ENDPOINT_COL = 2
+_TAGS_COL = 8
+
+_DIGIT = re.compile(r"\d")
+_UUID = re.compile(r"^[0-9a-fA-F]{8}-(?:[0-9a-fA-F]{4}-){3}[0-9a-fA-F]{12}$")
+_HEX = re.compile(r"^[0-9a-fA-F]{16,}$")
+_PLACEHOLDER = re.compile(r"\{[^/{}]*\}")
+
+
+def template_segment(segment: str) -> str:
+    """Built-in detection for one path segment: numbers, UUIDs and long hex ids."""
+    if segment.isdigit():
+        return "{id}"
+    if len(segment) == 36 and _UUID.match(segment):
+        return "{uuid}"
+    if len(segment) >= 16 and _HEX.match(segment):
+        return "{hex}"
+    return segment
+
+
+def compile_template(template: str) -> re.Pattern[str]:
+    """
+    "/orders/{id}/items/{item}" -> a regex where each {placeholder} matches one
+    path segment and the rest is literal (an optional trailing slash is allowed).
+    """
+    parts = _PLACEHOLDER.split(template.rstrip("/") or "/")
+    return re.compile("^" + "[^/]+".join(re.escape(p) for p in parts) + "/?$")
+
+
+def parse_rules(raw: str | Sequence[Sequence[str]]) -> list[tuple[re.Pattern[str], str]]:
+    """Parse a JSON list of [regex, replacement] pairs (or the list itself)."""
+    if isinstance(raw, str):
+        raw = json.loads(raw) if raw.strip() else []
+    return [(re.compile(pattern), str(replacement)) for pattern, replacement in raw]
+
+
+def parse_templates(raw: str | Mapping[str, Iterable[str]]) -> dict[str, list[str]]:
+    """Parse '{"orders": ["/orders/{id}"], "*": [...]}' (JSON) or a dict of lists."""
+    if isinstance(raw, str):
+        raw = json.loads(raw) if raw.strip() else {}
+    return {str(service): [str(t) for t in templates] for service, templates in raw.items()}
+
+
+KnownEndpoints = Callable[[str, int], Iterable[str]]  # (service, limit) -> endpoints
+
+
+def stored_endpoints(service: str, limit: int) -> list[str]:
+    """Up to `limit` endpoints of `service` in EndpointDim, earliest dimension first."""
+    alias = router.db_for_write(EndpointDim)
+    found: dict[str, None] = {}
+    rows = (
+        EndpointDim.objects.using(alias)
+        .filter(service=service)
+        .exclude(endpoint=OTHER_ENDPOINT)
+        .order_by("id")
+        .values_list("endpoint", flat=True)
+    )
+    for endpoint in rows.iterator():
+        found.setdefault(endpoint)
+        if len(found) >= limit:
+            break
+    return list(found)
+
+
+class CardinalityGuard:
+    """
+    Per-service cap on distinct endpoints. The first `limit` endpoints seen for a
+    service are admitted for good; later new ones fold into OTHER_ENDPOINT.
+
+    Exact bounded sets (at most `limit` entries per service) rather than a sketch:
+    admission needs "have I seen this one?", which a HyperLogLog cannot answer.
+    With `known` (stored_endpoints in production), an endpoint not seen locally is
+    checked against what is already stored before it takes a free slot, so the cap
+    holds across workers and restarts; the only overshoot is endpoints admitted by
+    several workers at once, before any of them was written. Once a service is
+    full locally, new endpoints fold without a lookup.
+    """
+
+    def __init__(self, limit: int, *, known: KnownEndpoints | None = None):
+        self.limit = max(1, int(limit))
+        self.known = known
+        self._seen: dict[str, set[str]] = {}
+        self._lock = threading.Lock()
+
+    def distinct(self, service: str) -> int:
+        return len(self._seen.get(service, ()))
+
+    def admit(self, service: str, endpoint: str) -> str:
+        seen = self._seen.get(service)
+        if seen is not None and endpoint in seen:
+            return endpoint
+        with self._lock:
+            seen = self._seen.setdefault(service, set())
+            if endpoint in seen:
+                return endpoint
+            if len(seen) < self.limit and self.known is not None:
+                seen.update(self.known(service, self.limit))
+                if endpoint in seen:
+                    return endpoint
+            if len(seen) >= self.limit:
+                return OTHER_ENDPOINT
+            seen.add(endpoint)
+            return endpoint
+
+
+class EndpointNormalizer:
+    """
+    Rewrites raw request paths into low-cardinality endpoint templates, in order:
+
+      1. query string / fragment dropped
+      2. regex `rules` (re.sub over the whole path, in order)
+      3. per-service `templates` (first match wins; "*" applies to every service)
+      4. built-in segment detection ({id}, {uuid}, {hex}) if no template matched
+      5. per-service cardinality cap (`max_per_service`, 0 = off), checked
+         against `known_endpoints` when given
+
+    With `keep_raw_tag`, rows whose endpoint changed keep the original path in
+    tags[keep_raw_tag].
+    """
+
+    def __init__(
+        self,
+        *,
+        rules: Sequence[tuple[re.Pattern[str], str]] = (),
+        templates: Mapping[str, Iterable[str]] | None = None,
+        detect_segments: bool = True,
+        max_per_service: int = 0,
+        known_endpoints: KnownEndpoints | None = None,
+        keep_raw_tag: str | None = None,
+    ):
+        self.rules = list(rules)
+        compiled = {
+            service: [(compile_template(t), t) for t in items]
+            for service, items in (templates or {}).items()
+        }
+        self._shared = compiled.pop(ALL_SERVICES, [])
+        self._templates = compiled
+        self.detect_segments = detect_segments
+        self.guard = None
+        if max_per_service > 0:
+            self.guard = CardinalityGuard(max_per_service, known=known_endpoints)
+        self.keep_raw_tag = keep_raw_tag or None
+
+    def template(self, service: str, path: str) -> str:
+        """Steps 1-4: the template for `path` (no cardinality cap)."""
+        for sep in ("?", "#"):
+            path = path.partition(sep)[0]
+        for pattern, replacement in self.rules:
+            path = pattern.sub(replacement, path)
+
+        for pattern, template in (*self._templates.get(service, ()), *self._shared):
+            if pattern.match(path):
+                return template
+
+        if self.detect_segments and _DIGIT.search(path):
+            path = "/".join(template_segment(s) for s in path.split("/"))
+        return path or "/"
+
+    def normalize(self, service: str, path: str) -> str:
+        endpoint = self.template(service, path)
+        if self.guard is not None:
+            endpoint = self.guard.admit(service, endpoint)
+        return endpoint
+
+    def apply(self, rows: Sequence[IngestRow]) -> list[IngestRow]:
+        """Rows with normalized endpoints (unchanged rows are passed through as is)."""
+        out: list[IngestRow] = []
+        templated = 0
+        folded: Counter[str] = Counter()
+        tag = self.keep_raw_tag
+        for row in rows:
+            service, raw = row[_SERVICE_COL], row[_ENDPOINT_COL]
+            endpoint = self.template(service, raw)
+            if endpoint != raw:
+                templated += 1
+            if self.guard is not None:
+                admitted = self.guard.admit(service, endpoint)
+                if admitted != endpoint:
+                    folded[service] += 1
+                    endpoint = admitted
+            if endpoint == raw:
+                out.append(row)
+                continue
+
+            tags: Any = row[_TAGS_COL]
+            if tag is not None:
+                tags = {**tags, tag: raw}
+            out.append((*row[:_ENDPOINT_COL], endpoint, *row[_ENDPOINT_COL + 1 : _TAGS_COL], tags))
+
+        if templated:
+            INGEST_ENDPOINTS_TEMPLATED.inc(templated)
+        for service, n in folded.items():
+            INGEST_ENDPOINTS_FOLDED.labels(service=service).inc(n)
+        return out
+
+
+_normalizer: EndpointNormalizer | None = None
+_normalizer_lock = threading.Lock()
+
+
+def get_endpoint_normalizer() -> EndpointNormalizer | None:
+    """Process-wide normalizer, or None when APM_INGEST_ENDPOINT_NORMALIZE is off."""
+    global _normalizer
+    if not bool(getattr(settings, "APM_INGEST_ENDPOINT_NORMALIZE", False)):
+        return None
+    if _normalizer is None:
+        with _normalizer_lock:
+            if _normalizer is None:
+                keep_raw = bool(getattr(settings, "APM_INGEST_ENDPOINT_KEEP_RAW", False))
+                _normalizer = EndpointNormalizer(
+                    rules=parse_rules(getattr(settings, "APM_INGEST_ENDPOINT_RULES", "")),
+                    templates=parse_templates(
+                        getattr(settings, "APM_INGEST_ENDPOINT_TEMPLATES", "")
+                    ),
+                    detect_segments=bool(
+                        getattr(settings, "APM_INGEST_ENDPOINT_DETECT_SEGMENTS", True)
+                    ),
+                    max_per_service=int(
+                        getattr(settings, "APM_INGEST_ENDPOINT_MAX_PER_SERVICE", 0)
+                    ),
+                    known_endpoints=stored_endpoints,
+                    keep_raw_tag=(
+                        str(getattr(settings, "APM_INGEST_ENDPOINT_RAW_TAG", DEFAULT_RAW_TAG))
+                        if keep_raw
+                        else None
+                    ),
+                )
+    return _normalizer
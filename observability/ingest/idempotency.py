@@ -0,0 +1,66 @@
+# observability/ingest/idempotency.py
+from __future__ import annotations
+
+import hashlib
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import caches
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+PENDING = "pending"
+DONE = "done"
+
+
+class IdempotencyLedger:
+    """
+    Short-lived ledger of ingest batches keyed by the client's Idempotency-Key.
+
+    begin() atomically claims a key (cache.add) with a short "pending" TTL, so a
+    retry that arrives while the first attempt is still running can be refused;
+    complete() stores the response for `ttl` seconds so later retries replay it
+    without touching the database. Use a cache shared by all workers
+    (APM_INGEST_IDEMPOTENCY_CACHE) for the guarantee to hold across them.
+    """
+
+    def __init__(self, cache, *, ttl: int, pending_ttl: int, prefix: str = "apm:ingest:idem:"):
+        self.cache = cache
+        self.ttl = ttl
+        self.pending_ttl = pending_ttl
+        self.prefix = prefix
+
+    def _key(self, key: str) -> str:
+        return self.prefix + hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def begin(self, key: str) -> dict[str, Any] | None:
+        """Claim `key`. Returns None when claimed, else the existing ledger entry."""
+        if self.cache.add(self._key(key), {"state": PENDING}, timeout=self.pending_ttl):
+            return None
+        entry = self.cache.get(self._key(key))
+        if entry is None:
+            # Expired between add() and get(): try once more.
+            if self.cache.add(self._key(key), {"state": PENDING}, timeout=self.pending_ttl):
+                return None
+            entry = self.cache.get(self._key(key)) or {"state": PENDING}
+        return entry
+
+    def complete(self, key: str, status_code: int, data: Any) -> None:
+        self.cache.set(
+            self._key(key), {"state": DONE, "status": status_code, "data": data}, timeout=self.ttl
+        )
+
+    def abandon(self, key: str) -> None:
+        """Release the key so the client can retry (failed or retryable outcome)."""
+        self.cache.delete(self._key(key))
+
+
+def get_idempotency_ledger() -> IdempotencyLedger:
+    alias = str(getattr(settings, "APM_INGEST_IDEMPOTENCY_CACHE", "default"))
+    return IdempotencyLedger(
+        caches[alias],
+        ttl=int(getattr(settings, "APM_INGEST_IDEMPOTENCY_TTL", 86_400)),
+        pending_ttl=int(getattr(settings, "APM_INGEST_IDEMPOTENCY_PENDING_TTL", 300)),
+    )
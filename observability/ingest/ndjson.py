@@ -0,0 +1,114 @@
+# observability/ingest/ndjson.py
+from __future__ import annotations
+
+import json
+from collections.abc import Iterable, Iterator
+from itertools import islice
+from typing import Any
+
+from rest_framework.parsers import BaseParser
+
+from .validation import InvalidEvent
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+DEFAULT_READ_SIZE = 64 * 1024
+DEFAULT_MAX_LINE_BYTES = 1024 * 1024
+
+_BLANK = object()
+
+
+def _decode_line(line: bytes) -> Any:
+    line = line.strip()
+    if not line:
+        return _BLANK
+    try:
+        return json.loads(line)
+    except (ValueError, UnicodeDecodeError) as exc:
+        return InvalidEvent({"non_field_errors": [f"Invalid JSON line: {exc}"]})
+
+
+def iter_ndjson(
+    stream,
+    *,
+    read_size: int = DEFAULT_READ_SIZE,
+    max_line_bytes: int = DEFAULT_MAX_LINE_BYTES,
+) -> Iterator[Any]:
+    """
+    Lazily decode an NDJSON byte stream: one JSON value per line.
+
+    - blank lines are skipped (they do not count as events)
+    - undecodable or oversized lines yield an InvalidEvent, so they are
+      reported at their index like any other invalid event
+    - memory is bounded by read_size + max_line_bytes, whatever the body size
+    """
+    if stream is None:
+        return
+
+    buf = b""
+    skipping = False
+    while True:
+        chunk = stream.read(read_size)
+        if not chunk:
+            break
+        buf += chunk
+
+        start = 0
+        while True:
+            nl = buf.find(b"\n", start)
+            if nl < 0:
+                break
+            line = buf[start:nl]
+            start = nl + 1
+            if skipping:
+                # End of an oversized line (already reported).
+                skipping = False
+                continue
+            item = _decode_line(line)
+            if item is not _BLANK:
+                yield item
+        buf = buf[start:]
+
+        if len(buf) > max_line_bytes:
+            if not skipping:
+                yield InvalidEvent({"non_field_errors": [f"Line exceeds {max_line_bytes} bytes."]})
+                skipping = True
+            buf = b""
+
+    if buf and not skipping:
+        item = _decode_line(buf)
+        if item is not _BLANK:
+            yield item
+
+
+def iter_chunks(items: Iterable[Any], size: int) -> Iterator[list[Any]]:
+    it = iter(items)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class NDJSONStream:
+    """
+    Parsed body of an NDJSON request (request.data).
+    Iterating it reads the request body incrementally; it can only be consumed once.
+    """
+
+    def __init__(self, stream, **kwargs):
+        self._iter = iter_ndjson(stream, **kwargs)
+
+    def __iter__(self) -> Iterator[Any]:
+        return self._iter
+
+
+class NDJSONParser(BaseParser):
+    """
+    application/x-ndjson: returns a lazy NDJSONStream instead of a decoded list.
+    """
+
+    media_type = NDJSON_MEDIA_TYPE
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        return NDJSONStream(stream)
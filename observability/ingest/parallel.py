@@ -0,0 +1,119 @@
+# observability/ingest/parallel.py
+from __future__ import annotations
+
+import atexit
+import multiprocessing
+import threading
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator, Sized
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+
+import django
+from django.conf import settings
+
+from .validation import ValidationResult
+
+Validator = Callable[..., ValidationResult]
+ValidatedChunk = tuple[int, ValidationResult]
+
+
+def iter_validated(
+    chunks: Iterable[Sized],
+    validate: Validator,
+    *,
+    max_errors: int,
+    start_index: int = 0,
+) -> Iterator[ValidatedChunk]:
+    """Validate chunks one after the other: yields (chunk length, result) in order."""
+    for chunk in chunks:
+        yield len(chunk), validate(chunk, max_errors=max_errors, start_index=start_index)
+        start_index += len(chunk)
+
+
+# ----------------------------
+# Process pool
+# ----------------------------
+def _run_shard(validate: Validator, chunk, max_errors: int, start_index: int) -> ValidationResult:
+    return validate(chunk, max_errors=max_errors, start_index=start_index)
+
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def validation_workers() -> int:
+    return max(0, int(getattr(settings, "APM_INGEST_VALIDATION_WORKERS", 0)))
+
+
+def get_validation_pool() -> ProcessPoolExecutor:
+    """
+    Per-process pool (created lazily, i.e. after gunicorn forked the worker).
+
+    Children come from a forkserver rather than a plain fork so they never
+    inherit the parent's database sockets or background threads.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                methods = multiprocessing.get_all_start_methods()
+                method = "forkserver" if "forkserver" in methods else "spawn"
+                _pool = ProcessPoolExecutor(
+                    max_workers=max(1, validation_workers()),
+                    mp_context=multiprocessing.get_context(method),
+                    # Children start from a clean interpreter; referencing anything in
+                    # this package before apps are loaded would fail to unpickle.
+                    initializer=django.setup,
+                )
+                atexit.register(_pool.shutdown, wait=False, cancel_futures=True)
+    return _pool
+
+
+def iter_validated_parallel(
+    chunks: Iterable[Sized],
+    validate: Validator,
+    *,
+    max_errors: int,
+    start_index: int = 0,
+    executor: Executor | None = None,
+    window: int | None = None,
+) -> Iterator[ValidatedChunk]:
+    """
+    Same contract as iter_validated, but shards run on a process pool.
+
+    Up to `window` shards are in flight; results are yielded in input order as
+    soon as the head shard is done, so the caller can insert shard 0 while later
+    shards are still validating. Every shard gets the full `max_errors` budget
+    (they run concurrently); since results come back in index order the caller
+    keeps the first max_errors errors, exactly like the serial path.
+    `validate` must be a module-level (picklable) function.
+    """
+    executor = executor or get_validation_pool()
+    window = max(1, window or 2 * max(1, validation_workers()))
+
+    it = iter(chunks)
+    pending: deque[tuple[int, Future]] = deque()
+    next_index = start_index
+
+    def submit() -> bool:
+        nonlocal next_index
+        chunk = next(it, None)
+        if chunk is None:
+            return False
+        pending.append(
+            (len(chunk), executor.submit(_run_shard, validate, chunk, max_errors, next_index))
+        )
+        next_index += len(chunk)
+        return True
+
+    try:
+        while len(pending) < window and submit():
+            pass
+        while pending:
+            size, future = pending.popleft()
+            result = future.result()
+            submit()
+            yield size, result
+    finally:
+        for _, future in pending:
+            future.cancel()
@@ -0,0 +1,133 @@
+# observability/ingest/pipeline.py
+from __future__ import annotations
+
+import queue
+import threading
+import uuid
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from typing import TypeVar
+
+from django.db import connections, transaction
+
+from .copy_writer import RAW_TABLE, WRITE_COLUMNS
+
+T = TypeVar("T")
+
+DEFAULT_PIPELINE_DEPTH = 2
+
+_DONE = object()
+
+
+class _Failure:
+    __slots__ = ("exc",)
+
+    def __init__(self, exc: BaseException):
+        self.exc = exc
+
+
+def prefetch(items: Iterable[T], *, depth: int = DEFAULT_PIPELINE_DEPTH) -> Iterator[T]:
+    """
+    Produce `items` on a background thread, at most `depth` ahead of the consumer.
+
+    Ingest uses it to validate chunk N+1 while the request thread writes chunk N:
+    validation is CPU work and the write mostly waits on the database, so the two
+    overlap, and at most depth + 2 chunks are resident at any time.
+    Exceptions raised by the producer are re-raised in the consumer, in order.
+
+    If the consumer stops early (an aborted ingest), the producer is told to
+    stop, the source iterator is closed on the producer thread and the thread
+    is joined: nothing reads the request body once the response is built.
+    """
+    q: queue.Queue = queue.Queue(maxsize=max(1, depth))
+    stop = threading.Event()
+    source = iter(items)
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        try:
+            for item in source:
+                if not put(item):
+                    return
+        except BaseException as exc:  # noqa: B036 - handed over to the consumer
+            put(_Failure(exc))
+            return
+        finally:
+            close = getattr(source, "close", None)
+            if close is not None:
+                close()
+        put(_DONE)
+
+    thread = threading.Thread(target=produce, name="apm-ingest-prefetch", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = q.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.exc
+            yield item
+    finally:
+        stop.set()
+        _drain(q)
+        # No timeout: the producer returns at its next put(), after the read in flight.
+        thread.join()
+
+
+def _drain(q: queue.Queue) -> None:
+    while True:
+        try:
+            q.get_nowait()
+        except queue.Empty:
+            return
+
+
+class StagingTable:
+    """
+    Session-local TEMP table shaped like WRITE_COLUMNS (strict-mode ingest).
+
+    Chunks are written to it as they are validated; only publish() touches the
+    hypertable, in one short INSERT ... SELECT, so locks on the raw table are not
+    held while the request body is still being read and validated.
+    """
+
+    def __init__(self, alias: str):
+        self.alias = alias
+        self.name = f"apm_ingest_stage_{uuid.uuid4().hex[:12]}"
+
+    def create(self) -> None:
+        cols = ", ".join(WRITE_COLUMNS)
+        with connections[self.alias].cursor() as cursor:
+            cursor.execute(
+                f"CREATE TEMP TABLE {self.name} AS SELECT {cols} FROM {RAW_TABLE} WHERE 1 = 0"
+            )
+
+    def drop(self) -> None:
+        with connections[self.alias].cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {self.name}")
+
+    def publish(self) -> int:
+        cols = ", ".join(WRITE_COLUMNS)
+        with transaction.atomic(using=self.alias):
+            with connections[self.alias].cursor() as cursor:
+                cursor.execute(f"INSERT INTO {RAW_TABLE} ({cols}) SELECT {cols} FROM {self.name}")
+                return cursor.rowcount
+
+
+@contextmanager
+def staging_table(alias: str) -> Iterator[StagingTable]:
+    stage = StagingTable(alias)
+    stage.create()
+    try:
+        yield stage
+    finally:
+        stage.drop()
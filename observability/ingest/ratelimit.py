@@ -0,0 +1,226 @@
+# observability/ingest/ratelimit.py
+from __future__ import annotations
+
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import Counter
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+
+from django.conf import settings
+
+from ..metrics import INGEST_RATE_LIMIT_DECISIONS, INGEST_RATE_LIMITED_EVENTS
+from .validation import IngestRow
+
+GLOBAL_BUCKET = "*"
+
+_SERVICE_COL = 1
+
+
+@dataclass(frozen=True)
+class BucketSpec:
+    rate: float  # tokens (events) per second
+    burst: float  # bucket capacity
+
+
+@dataclass(frozen=True)
+class Decision:
+    allowed: bool
+    retry_after: float = 0.0
+    bucket: str | None = None  # the bucket that refused (GLOBAL_BUCKET or a service)
+
+
+ALLOWED = Decision(True)
+
+# bucket -> (spec, events wanted)
+BucketRequest = Mapping[str, tuple[BucketSpec, int]]
+# bucket -> (tokens, updated_at)
+BucketState = dict[str, tuple[float, float]]
+
+
+def decide(state: BucketState, wanted: BucketRequest, now: float) -> tuple[Decision, BucketState]:
+    """
+    All-or-nothing debit of several token buckets.
+
+    A bucket admits `n` events when it holds min(n, burst) tokens, then goes down
+    by n (possibly below zero): a chunk larger than the burst is not refused
+    forever, it just has to wait for a full bucket and pays the debt afterwards.
+    Nothing is debited when any bucket refuses; retry_after is the longest wait.
+    """
+    refilled: BucketState = {}
+    worst: Decision | None = None
+    for bucket, (spec, n) in wanted.items():
+        tokens, updated = state.get(bucket, (spec.burst, now))
+        tokens = min(spec.burst, tokens + max(0.0, now - updated) * spec.rate)
+        refilled[bucket] = (tokens, now)
+        need = min(float(n), spec.burst)
+        if tokens < need:
+            wait = (need - tokens) / spec.rate
+            if worst is None or wait > worst.retry_after:
+                worst = Decision(False, wait, bucket)
+
+    if worst is not None:
+        return worst, refilled
+    return ALLOWED, {b: (t - wanted[b][1], u) for b, (t, u) in refilled.items()}
+
+
+class MemoryBucketStore:
+    """Per-process buckets (one gunicorn worker = its own share of the limit)."""
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state: BucketState = {}
+
+    def take(self, wanted: BucketRequest) -> Decision:
+        with self._lock:
+            decision, updated = decide(self._state, wanted, self._clock())
+            self._state.update(updated)
+            return decision
+
+
+class SQLiteBucketStore:
+    """
+    Buckets in a local SQLite file, shared by every worker process on the host.
+
+    Each take() is one BEGIN IMMEDIATE transaction (a write lock held for a few
+    microseconds), which is enough to keep concurrent workers from over-spending.
+    Uses wall-clock time since the state outlives and crosses processes.
+    """
+
+    def __init__(self, path: str, clock=time.time):
+        self.path = path
+        self._clock = clock
+        self._local = threading.local()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets "
+                "(bucket TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+            )
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def take(self, wanted: BucketRequest) -> Decision:
+        conn = self._conn()
+        keys = list(wanted)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            marks = ", ".join("?" * len(keys))
+            rows = conn.execute(
+                f"SELECT bucket, tokens, updated FROM buckets WHERE bucket IN ({marks})", keys
+            ).fetchall()
+            decision, updated = decide({b: (t, u) for b, t, u in rows}, wanted, self._clock())
+            conn.executemany(
+                "INSERT INTO buckets (bucket, tokens, updated) VALUES (?, ?, ?) "
+                "ON CONFLICT(bucket) DO UPDATE SET tokens = excluded.tokens, "
+                "updated = excluded.updated",
+                [(b, t, u) for b, (t, u) in updated.items()],
+            )
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return decision
+
+
+class IngestRateLimiter:
+    """
+    Admission control for ingest, in events per second: one global bucket plus
+    one bucket per service (a rate of 0 disables a bucket). Burst = rate x
+    burst_seconds, so a quiet service can send a short spike at full speed.
+    """
+
+    def __init__(
+        self,
+        store,
+        *,
+        global_rate: float = 0.0,
+        service_rate: float = 0.0,
+        service_rates: Mapping[str, float] | None = None,
+        burst_seconds: float = 1.0,
+    ):
+        self.store = store
+        self.global_rate = float(global_rate)
+        self.service_rate = float(service_rate)
+        self.service_rates = dict(service_rates or {})
+        self.burst_seconds = max(0.0, float(burst_seconds))
+
+    def _spec(self, rate: float) -> BucketSpec:
+        return BucketSpec(rate, max(1.0, rate * self.burst_seconds))
+
+    def admit(self, rows: Sequence[IngestRow]) -> Decision:
+        """Charge `rows` to their buckets, or refuse all of them."""
+        if not rows:
+            return ALLOWED
+
+        wanted: dict[str, tuple[BucketSpec, int]] = {}
+        if self.global_rate > 0:
+            wanted[GLOBAL_BUCKET] = (self._spec(self.global_rate), len(rows))
+        for service, n in Counter(row[_SERVICE_COL] for row in rows).items():
+            rate = self.service_rates.get(service, self.service_rate)
+            if rate > 0:
+                wanted[service] = (self._spec(rate), n)
+        if not wanted:
+            return ALLOWED
+
+        decision = self.store.take(wanted)
+        if decision.allowed:
+            INGEST_RATE_LIMIT_DECISIONS.labels(decision="allowed").inc()
+        else:
+            INGEST_RATE_LIMIT_DECISIONS.labels(decision="limited").inc()
+            INGEST_RATE_LIMITED_EVENTS.labels(bucket=decision.bucket or "").inc(len(rows))
+        return decision
+
+
+def parse_service_rates(raw: str | Mapping[str, float]) -> dict[str, float]:
+    """Parse "billing=500,search=50" (or a dict) into {"billing": 500.0, "search": 50.0}."""
+    if isinstance(raw, Mapping):
+        return {str(k): float(v) for k, v in raw.items()}
+    rates: dict[str, float] = {}
+    for part in (raw or "").split(","):
+        name, sep, rate = part.partition("=")
+        if sep and name.strip():
+            rates[name.strip()] = float(rate)
+    return rates
+
+
+_limiter: IngestRateLimiter | None = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> IngestRateLimiter | None:
+    """Process-wide limiter, or None when APM_INGEST_RATE_LIMIT is off."""
+    global _limiter
+    if not bool(getattr(settings, "APM_INGEST_RATE_LIMIT", False)):
+        return None
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                backend = str(getattr(settings, "APM_INGEST_RATE_LIMIT_STORE", "sqlite")).lower()
+                if backend == "memory":
+                    store = MemoryBucketStore()
+                else:
+                    path = str(
+                        getattr(settings, "APM_INGEST_RATE_LIMIT_PATH", "")
+                        or os.path.join(tempfile.gettempdir(), "apm-ingest-ratelimit.sqlite3")
+                    )
+                    store = SQLiteBucketStore(path)
+                _limiter = IngestRateLimiter(
+                    store,
+                    global_rate=float(getattr(settings, "APM_INGEST_RATE_GLOBAL", 0)),
+                    service_rate=float(getattr(settings, "APM_INGEST_RATE_PER_SERVICE", 0)),
+                    service_rates=parse_service_rates(
+                        getattr(settings, "APM_INGEST_RATE_SERVICES", "")
+                    ),
+                    burst_seconds=float(getattr(settings, "APM_INGEST_RATE_BURST_SECONDS", 2.0)),
+                )
+    return _limiter
@@ -0,0 +1,493 @@
+# observability/ingest/spool.py
+from __future__ import annotations
+
+import fcntl
+import io
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from collections.abc import Callable, Iterator, Sequence
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, close_old_connections, connections
+from django.db.utils import InterfaceError, OperationalError
+
+from ..metrics import (
+    INGEST_SPOOL_BYTES,
+    INGEST_SPOOL_CORRUPT_SEGMENTS,
+    INGEST_SPOOL_OLDEST_SECONDS,
+    INGEST_SPOOL_REPLAY_ROWS_PER_SECOND,
+    INGEST_SPOOL_REPLAYED_ROWS,
+    INGEST_SPOOLED_ROWS,
+)
+from .columnar import DEFAULT_FRAME_SIZE, decode_frame, encode_frame, read_frames
+from .copy_writer import WriteResult, write_rows
+from .validation import IngestRow
+
+logger = logging.getLogger(__name__)
+
+RECORD_MAGIC = b"APMS"
+# magic, payload length, crc32(payload), spooled_at (µs since epoch); payload = columnar frame
+_RECORD = struct.Struct("<4sIIq")
+
+SEGMENT_SUFFIX = ".spool"
+OFFSET_SUFFIX = ".offset"
+CORRUPT_SUFFIX = ".corrupt"
+
+# Failures worth spooling: the database is down, failing over or too slow.
+# Data errors (IntegrityError, DataError) would fail again on replay.
+SPOOLABLE_ERRORS = (OperationalError, InterfaceError)
+
+_QUERY_CANCELED = "57014"
+
+Writer = Callable[[Sequence[IngestRow]], WriteResult]
+
+
+@dataclass(frozen=True)
+class SpoolRecord:
+    offset: int
+    end: int
+    spooled_at: float  # unix seconds
+    payload: bytes
+
+    def rows(self) -> list[IngestRow]:
+        frame = next(read_frames(io.BytesIO(self.payload), max_frame_bytes=len(self.payload)))
+        return decode_frame(frame, max_errors=1).rows
+
+
+@dataclass(frozen=True)
+class SegmentInfo:
+    path: str
+    size: int
+    replayed: int  # bytes already drained (offset sidecar)
+    records: int
+    rows: int
+    oldest: float | None  # spooled_at of the first pending record
+    corrupt_tail: bool
+
+
+@dataclass(frozen=True)
+class ReplayResult:
+    rows: int
+    records: int
+    segments: int
+    seconds: float
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+
+def _read_offset(path: str) -> int:
+    try:
+        with open(path + OFFSET_SUFFIX, encoding="ascii") as fh:
+            return int(fh.read().strip() or 0)
+    except (FileNotFoundError, ValueError):
+        return 0
+
+
+def _write_offset(path: str, offset: int) -> None:
+    tmp = f"{path}{OFFSET_SUFFIX}.tmp"
+    with open(tmp, "w", encoding="ascii") as fh:
+        fh.write(str(offset))
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp, path + OFFSET_SUFFIX)
+
+
+def iter_records(path: str, start: int = 0) -> Iterator[SpoolRecord]:
+    """
+    Records of one segment from byte `start`, read through mmap.
+    Stops at the first torn or corrupt record; check `record.end` against the
+    file size to tell a clean end from a damaged tail.
+    """
+    with open(path, "rb") as fh:
+        size = os.fstat(fh.fileno()).st_size
+        if size <= start:
+            return
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            pos = start
+            while pos + _RECORD.size <= size:
+                magic, length, crc, spooled_us = _RECORD.unpack_from(mm, pos)
+                end = pos + _RECORD.size + length
+                if magic != RECORD_MAGIC or end > size:
+                    return
+                payload = mm[pos + _RECORD.size : end]
+                if zlib.crc32(payload) != crc:
+                    return
+                yield SpoolRecord(pos, end, spooled_us / 1_000_000, payload)
+                pos = end
+
+
+class Spool:
+    """
+    Append-only on-disk spool of validated ingest rows, for when the primary is
+    down or too slow.
+
+    Each worker process appends to its own segment file (holding an exclusive
+    flock on it), one CRC-checked record per batch; the record payload is a
+    columnar frame. Segments rotate by size or age. A replayer drains closed
+    segments oldest first (segment names start with a nanosecond timestamp),
+    recording its progress in an offset sidecar after every record, so a crash
+    mid-replay re-sends at most one record.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        *,
+        segment_bytes: int = 64 * 1024 * 1024,
+        segment_seconds: float = 60.0,
+        fsync: bool = True,
+        clock=time.time,
+    ):
+        self.directory = directory
+        self.segment_bytes = max(1, int(segment_bytes))
+        self.segment_seconds = max(0.0, float(segment_seconds))
+        self.fsync = fsync
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._fd: int | None = None
+        self._path: str | None = None
+        self._opened_at = 0.0
+        self._size = 0
+        self._pid = os.getpid()
+        os.makedirs(directory, exist_ok=True)
+
+    # ----------------------------
+    # Writer
+    # ----------------------------
+    def _open_segment(self) -> None:
+        name = f"{time.time_ns():020d}-{os.getpid()}{SEGMENT_SUFFIX}"
+        path = os.path.join(self.directory, name)
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600)
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        self._fd, self._path, self._size = fd, path, 0
+        self._opened_at = self._clock()
+
+    def _close_segment(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)  # releases the flock
+        self._fd = self._path = None
+
+    def append(self, rows: Sequence[IngestRow], *, reason: str = "error") -> int:
+        """Durably append `rows` (fsync unless disabled). Returns the number of rows."""
+        if not rows:
+            return 0
+        now = self._clock()
+        spooled_us = int(now * 1_000_000)
+        with self._lock:
+            if self._pid != os.getpid():
+                # Forked worker: the inherited segment (and its lock) belong to the parent.
+                self._fd = self._path = None
+                self._pid = os.getpid()
+            if self._fd is not None and (
+                self._size >= self.segment_bytes or now - self._opened_at >= self.segment_seconds
+            ):
+                self._close_segment()
+            if self._fd is None:
+                self._open_segment()
+
+            parts: list[bytes] = []
+            for i in range(0, len(rows), DEFAULT_FRAME_SIZE):
+                payload = encode_frame(rows[i : i + DEFAULT_FRAME_SIZE])
+                parts.append(
+                    _RECORD.pack(RECORD_MAGIC, len(payload), zlib.crc32(payload), spooled_us)
+                )
+                parts.append(payload)
+            data = b"".join(parts)
+            os.write(self._fd, data)
+            if self.fsync:
+                os.fsync(self._fd)
+            self._size += len(data)
+
+        INGEST_SPOOLED_ROWS.labels(reason=reason).inc(len(rows))
+        self.stats()
+        return len(rows)
+
+    def rotate(self) -> None:
+        """Close the active segment so it can be replayed."""
+        with self._lock:
+            if self._pid == os.getpid():
+                self._close_segment()
+
+    # ----------------------------
+    # Reader
+    # ----------------------------
+    def segments(self) -> list[str]:
+        names = sorted(n for n in os.listdir(self.directory) if n.endswith(SEGMENT_SUFFIX))
+        return [os.path.join(self.directory, n) for n in names]
+
+    def inspect(self) -> list[SegmentInfo]:
+        infos: list[SegmentInfo] = []
+        for path in self.segments():
+            try:
+                size = os.path.getsize(path)
+            except FileNotFoundError:
+                continue
+            replayed = _read_offset(path)
+            records = rows = 0
+            oldest: float | None = None
+            end = replayed
+            for record in iter_records(path, replayed):
+                if oldest is None:
+                    oldest = record.spooled_at
+                records += 1
+                rows += _record_rows(record.payload)
+                end = record.end
+            infos.append(SegmentInfo(path, size, replayed, records, rows, oldest, end < size))
+        return infos
+
+    def stats(self) -> tuple[int, float | None]:
+        """(pending bytes, age in seconds of the oldest pending record); updates the gauges."""
+        pending = 0
+        oldest: float | None = None
+        for path in self.segments():
+            try:
+                size = os.path.getsize(path)
+            except FileNotFoundError:
+                continue
+            offset = _read_offset(path)
+            pending += max(0, size - offset)
+            if oldest is None:
+                first = next(iter_records(path, offset), None)
+                if first is not None:
+                    oldest = first.spooled_at
+        age = max(0.0, self._clock() - oldest) if oldest is not None else None
+        INGEST_SPOOL_BYTES.set(pending)
+        INGEST_SPOOL_OLDEST_SECONDS.set(age or 0.0)
+        return pending, age
+
+    def replay(
+        self, *, writer: Writer | None = None, limit_rows: int | None = None
+    ) -> ReplayResult:
+        """
+        Drain closed segments into the database, oldest first.
+
+        Segments still locked by a live writer are skipped (call rotate() first to
+        include this process's own). Writer errors propagate; progress made so far
+        is kept. A damaged tail is left behind as *.corrupt for inspection.
+        """
+        writer = writer or _default_writer
+        t0 = time.perf_counter()
+        rows = records = segments = 0
+
+        for path in self.segments():
+            if limit_rows is not None and rows >= limit_rows:
+                break
+            try:
+                fd = os.open(path, os.O_RDONLY)
+            except FileNotFoundError:
+                continue
+            try:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    continue  # active segment of a live worker (or another replayer)
+
+                size = os.fstat(fd).st_size
+                offset = _read_offset(path)
+                for record in iter_records(path, offset):
+                    batch = record.rows()
+                    writer(batch)
+                    _write_offset(path, record.end)
+                    INGEST_SPOOL_REPLAYED_ROWS.inc(len(batch))
+                    offset = record.end
+                    rows += len(batch)
+                    records += 1
+                    if limit_rows is not None and rows >= limit_rows:
+                        break
+
+                if limit_rows is not None and rows >= limit_rows and offset < size:
+                    continue
+                if offset < size:
+                    INGEST_SPOOL_CORRUPT_SEGMENTS.inc()
+                    logger.warning(
+                        "Ingest spool segment %s has a damaged tail at byte %d of %d",
+                        path,
+                        offset,
+                        size,
+                    )
+                    os.replace(path, path + CORRUPT_SUFFIX)
+                else:
+                    os.unlink(path)
+                _remove_offset(path)
+                segments += 1
+            finally:
+                os.close(fd)
+
+        result = ReplayResult(rows, records, segments, time.perf_counter() - t0)
+        if rows:
+            INGEST_SPOOL_REPLAY_ROWS_PER_SECOND.set(result.rows_per_sec)
+        self.stats()
+        return result
+
+
+def _record_rows(payload: bytes) -> int:
+    """Event count from the frame header, without decoding the columns."""
+    return len(next(read_frames(io.BytesIO(payload), max_frame_bytes=len(payload))))
+
+
+def _remove_offset(path: str) -> None:
+    try:
+        os.unlink(path + OFFSET_SUFFIX)
+    except FileNotFoundError:
+        pass
+
+
+def _default_writer(rows: Sequence[IngestRow]) -> WriteResult:
+    batch_size = int(getattr(settings, "APM_INGEST_BATCH_SIZE", 1000))
+    return write_rows(rows, batch_size=batch_size, source="spool")
+
+
+# ----------------------------
+# Write path
+# ----------------------------
+@contextmanager
+def statement_timeout(using: str | None, ms: int):
+    """Bound the statements run inside the block (PostgreSQL only; 0 = no bound)."""
+    conn = connections[using or DEFAULT_DB_ALIAS]
+    if ms <= 0 or conn.vendor != "postgresql":
+        yield
+        return
+    with conn.cursor() as cursor:
+        cursor.execute("SET statement_timeout = %s", [int(ms)])
+    try:
+        yield
+    finally:
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("RESET statement_timeout")
+        except SPOOLABLE_ERRORS:
+            pass  # connection is gone; Django discards it at the end of the request
+
+
+def write_or_spool(
+    rows: Sequence[IngestRow],
+    *,
+    spool: Spool,
+    batch_size: int = 1000,
+    source: str = "api",
+    using: str | None = None,
+) -> tuple[WriteResult, int]:
+    """
+    write_rows(), falling back to the spool when the database is unavailable or
+    exceeds APM_INGEST_SPOOL_WRITE_TIMEOUT_MS. Returns (write result, rows spooled).
+    """
+    timeout_ms = int(getattr(settings, "APM_INGEST_SPOOL_WRITE_TIMEOUT_MS", 0))
+    try:
+        with statement_timeout(using, timeout_ms):
+            return write_rows(rows, batch_size=batch_size, source=source, using=using), 0
+    except SPOOLABLE_ERRORS as exc:
+        slow = getattr(exc.__cause__, "sqlstate", None) == _QUERY_CANCELED
+        logger.warning("Ingest write failed (%s); spooling %d rows", exc, len(rows))
+        spooled = spool.append(rows, reason="slow" if slow else "error")
+        get_replayer(spool).start()
+        return WriteResult(0, 0.0, "none"), spooled
+
+
+# ----------------------------
+# Background replayer
+# ----------------------------
+class SpoolReplayer:
+    """Daemon thread draining the spool every `interval` seconds (backoff on failure)."""
+
+    def __init__(self, spool: Spool, *, interval: float = 5.0):
+        self.spool = spool
+        self.interval = max(0.05, float(interval))
+        self._event = threading.Event()
+        self._stopping = False
+        self._backoff = 0.0
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping = False
+                self._thread = threading.Thread(
+                    target=self._run, name="apm-ingest-spool-replayer", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stopping:
+            self._event.wait(self.interval + self._backoff)
+            self._event.clear()
+            if self._stopping:
+                return
+            self.spool.rotate()
+            if not self.spool.segments():
+                self.spool.stats()
+                continue
+            close_old_connections()
+            try:
+                self.spool.replay()
+                self._backoff = 0.0
+            except Exception:
+                self._backoff = min(60.0, max(self.interval, self._backoff * 2))
+                logger.exception("Ingest spool replay failed; retrying in %.1fs", self._backoff)
+            finally:
+                close_old_connections()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stopping = True
+        self._event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+def spool_directory() -> str:
+    return str(
+        getattr(settings, "APM_INGEST_SPOOL_DIR", "")
+        or os.path.join(tempfile.gettempdir(), "apm-ingest-spool")
+    )
+
+
+def make_spool() -> Spool:
+    return Spool(
+        spool_directory(),
+        segment_bytes=int(getattr(settings, "APM_INGEST_SPOOL_SEGMENT_BYTES", 64 * 1024 * 1024)),
+        segment_seconds=float(getattr(settings, "APM_INGEST_SPOOL_SEGMENT_SECONDS", 60.0)),
+        fsync=bool(getattr(settings, "APM_INGEST_SPOOL_FSYNC", True)),
+    )
+
+
+_spool: Spool | None = None
+_replayer: SpoolReplayer | None = None
+_spool_lock = threading.Lock()
+
+
+def get_spool() -> Spool | None:
+    """Process-wide spool, or None when APM_INGEST_SPOOL is off."""
+    global _spool
+    if not bool(getattr(settings, "APM_INGEST_SPOOL", False)):
+        return None
+    if _spool is None:
+        with _spool_lock:
+            if _spool is None:
+                _spool = make_spool()
+                leftovers = bool(_spool.segments())
+            else:
+                leftovers = False
+        if leftovers:
+            # Segments from a previous run (or a dead worker): drain them.
+            get_replayer(_spool).start()
+    return _spool
+
+
+def get_replayer(spool: Spool) -> SpoolReplayer:
+    global _replayer
+    with _spool_lock:
+        if _replayer is None or _replayer.spool is not spool:
+            _replayer = SpoolReplayer(
+                spool, interval=float(getattr(settings, "APM_INGEST_SPOOL_REPLAY_INTERVAL", 5.0))
+            )
+        return _replayer
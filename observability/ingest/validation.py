@@ -0,0 +1,323 @@
+# observability/ingest/validation.py
+from __future__ import annotations
+
+import re
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from typing import Any
+
+from django.utils.dateparse import parse_datetime
+from django.utils.timezone import make_aware
+
+from ..models import ApiRequest
+from ..serializers import ApiRequestIngestItemSerializer
+
+# Column order shared by the validator, the bulk writers and the binary codecs.
+INGEST_COLUMNS: tuple[str, ...] = (
+    "time",
+    "service",
+    "endpoint",
+    "method",
+    "status_code",
+    "latency_ms",
+    "trace_id",
+    "user_ref",
+    "tags",
+)
+
+IngestRow = tuple[Any, ...]
+
+NOT_A_DICT_ERROR = {"non_field_errors": ["Each event must be a JSON object/dict."]}
+
+_MISSING = object()
+
+_METHODS = frozenset(ApiRequest.HttpMethod.values)
+_MAX_LATENCY_MS = 2_147_483_647  # Postgres integer upper bound
+
+# Epoch numbers above this are treated as milliseconds (year 5138 in seconds).
+_EPOCH_MS_THRESHOLD = 100_000_000_000
+
+
+def _field_max_length(name: str) -> int:
+    return ApiRequest._meta.get_field(name).max_length
+
+
+_SERVICE_MAX = _field_max_length("service")
+_ENDPOINT_MAX = _field_max_length("endpoint")
+_TRACE_ID_MAX = _field_max_length("trace_id")
+_USER_REF_MAX = _field_max_length("user_ref")
+
+# NUL and lone surrogates: rejected by DRF's CharField, unstorable by PostgreSQL text.
+_PROHIBITED_CHARS = re.compile("[\x00\ud800-\udfff]")
+
+
+class InvalidEvent:
+    """
+    Placeholder for an event that could not even be decoded (e.g. a bad NDJSON line).
+    Validators report `errors` at its index instead of the generic not-a-dict error.
+    """
+
+    __slots__ = ("errors",)
+
+    def __init__(self, errors: dict[str, Any]):
+        self.errors = errors
+
+
+def _not_a_dict_detail(item: Any) -> dict[str, Any]:
+    if isinstance(item, InvalidEvent):
+        return item.errors
+    return NOT_A_DICT_ERROR
+
+
+@dataclass
+class ValidationResult:
+    """
+    Outcome of validating one ingest payload (or one shard of it).
+
+    rows:    valid events as tuples ordered like INGEST_COLUMNS
+    errors:  per-index error details (capped by max_errors)
+    invalid: number of rejected events (NOT capped)
+    """
+
+    rows: list[IngestRow] = field(default_factory=list)
+    errors: list[dict[str, Any]] = field(default_factory=list)
+    invalid: int = 0
+
+
+def row_as_dict(row: IngestRow) -> dict[str, Any]:
+    return dict(zip(INGEST_COLUMNS, row, strict=True))
+
+
+def row_from_dict(data: dict[str, Any]) -> IngestRow:
+    return (
+        data["time"],
+        data["service"],
+        data["endpoint"],
+        data["method"],
+        data["status_code"],
+        data["latency_ms"],
+        data.get("trace_id"),
+        data.get("user_ref"),
+        data.get("tags") or {},
+    )
+
+
+# ----------------------------
+# Column checks (fast path)
+# ----------------------------
+# Each check receives one column and the shared `bad` flags. It returns the
+# cleaned column and flags every value it cannot accept *without coercion*.
+# Flagged rows are re-validated by the DRF serializer, which decides the final
+# outcome and produces the exact same error details as the per-item loop.
+def _aware(dt: datetime) -> datetime | None:
+    """
+    A naive time read in the current time zone (TIME_ZONE), like DRF's
+    DateTimeField. None when that is not exact (overflow, a DST gap): the row
+    is flagged and the serializer decides.
+    """
+    try:
+        aware = make_aware(dt)
+        if aware.astimezone(UTC).astimezone(aware.tzinfo).replace(tzinfo=None) != dt:
+            return None
+    except OverflowError:
+        return None
+    return aware
+
+
+def _check_time(col: list[Any], bad: bytearray) -> list[Any]:
+    out: list[Any] = [None] * len(col)
+    fromiso = datetime.fromisoformat
+    for i, v in enumerate(col):
+        tv = type(v)
+        if tv is str:
+            try:
+                dt = fromiso(v)
+            except ValueError:
+                dt = parse_datetime(v)
+                if dt is None:
+                    bad[i] = 1
+                    continue
+        elif tv is datetime:
+            dt = v
+        elif tv is int or tv is float:
+            ts = v / 1000 if abs(v) >= _EPOCH_MS_THRESHOLD else v
+            try:
+                out[i] = datetime.fromtimestamp(ts, tz=UTC)
+            except (OverflowError, OSError, ValueError):
+                bad[i] = 1
+            continue
+        else:
+            bad[i] = 1
+            continue
+
+        if dt.tzinfo is None:
+            dt = _aware(dt)
+            if dt is None:
+                bad[i] = 1
+                continue
+        out[i] = dt.astimezone(UTC)
+    return out
+
+
+def _check_required_text(col: list[Any], bad: bytearray, max_length: int) -> list[Any]:
+    out: list[Any] = [None] * len(col)
+    for i, v in enumerate(col):
+        if type(v) is not str:
+            bad[i] = 1
+            continue
+        s = v.strip()
+        if not s or len(s) > max_length or _PROHIBITED_CHARS.search(s):
+            bad[i] = 1
+            continue
+        out[i] = s
+    return out
+
+
+def _check_optional_text(col: list[Any], bad: bytearray, max_length: int) -> list[Any]:
+    out: list[Any] = [None] * len(col)
+    for i, v in enumerate(col):
+        if v is _MISSING or v is None:
+            continue
+        if type(v) is not str:
+            bad[i] = 1
+            continue
+        s = v.strip()
+        if len(s) > max_length or _PROHIBITED_CHARS.search(s):
+            bad[i] = 1
+            continue
+        out[i] = s
+    return out
+
+
+def _check_choice(col: list[Any], bad: bytearray, choices: frozenset[str]) -> list[Any]:
+    for i, v in enumerate(col):
+        if type(v) is not str or v not in choices:
+            bad[i] = 1
+    return col
+
+
+def _check_int_range(col: list[Any], bad: bytearray, lo: int, hi: int) -> list[Any]:
+    for i, v in enumerate(col):
+        if type(v) is not int or v < lo or v > hi:
+            bad[i] = 1
+    return col
+
+
+def _check_tags(col: list[Any], bad: bytearray) -> list[Any]:
+    out: list[Any] = [None] * len(col)
+    for i, v in enumerate(col):
+        if v is _MISSING:
+            out[i] = {}
+        elif type(v) is dict:
+            out[i] = v
+        else:
+            bad[i] = 1
+    return out
+
+
+def validate_events(
+    events: Sequence[Any],
+    *,
+    max_errors: int,
+    start_index: int = 0,
+) -> ValidationResult:
+    """
+    Batch validator for ingest payloads (fast path).
+
+    Checks the payload column-by-column instead of instantiating one DRF
+    serializer per event. Only rows flagged by a column check go through
+    ApiRequestIngestItemSerializer, so accepted rows and error details are the
+    same as the per-item loop. One extension: `time` may also be a Unix epoch
+    number (seconds, or milliseconds for large values).
+
+    start_index offsets the reported error indexes (used for chunked payloads).
+    """
+    n = len(events)
+    bad = bytearray(n)
+    not_dict = bytearray(n)
+
+    items: list[dict[str, Any]] = []
+    empty: dict[str, Any] = {}
+    for i, item in enumerate(events):
+        if type(item) is dict:
+            items.append(item)
+        else:
+            not_dict[i] = 1
+            bad[i] = 1
+            items.append(empty)
+
+    def column(name: str) -> list[Any]:
+        return [item.get(name, _MISSING) for item in items]
+
+    times = _check_time(column("time"), bad)
+    services = _check_required_text(column("service"), bad, _SERVICE_MAX)
+    endpoints = _check_required_text(column("endpoint"), bad, _ENDPOINT_MAX)
+    methods = _check_choice(column("method"), bad, _METHODS)
+    statuses = _check_int_range(column("status_code"), bad, 100, 599)
+    latencies = _check_int_range(column("latency_ms"), bad, 0, _MAX_LATENCY_MS)
+    trace_ids = _check_optional_text(column("trace_id"), bad, _TRACE_ID_MAX)
+    user_refs = _check_optional_text(column("user_ref"), bad, _USER_REF_MAX)
+    tags = _check_tags(column("tags"), bad)
+
+    columns = (times, services, endpoints, methods, statuses, latencies, trace_ids, user_refs, tags)
+
+    result = ValidationResult()
+    if not any(bad):
+        result.rows = list(zip(*columns, strict=True))
+        return result
+
+    rows = result.rows
+    errors = result.errors
+    for i, row in enumerate(zip(*columns, strict=True)):
+        if not bad[i]:
+            rows.append(row)
+            continue
+
+        if not_dict[i]:
+            detail: Any = _not_a_dict_detail(events[i])
+        else:
+            item = items[i]
+            if times[i] is not None and type(item.get("time")) in (int, float):
+                # Keep the epoch extension when the row fails for another reason.
+                item = {**item, "time": times[i]}
+            ser = ApiRequestIngestItemSerializer(data=item)
+            if ser.is_valid():
+                rows.append(row_from_dict(ser.validated_data))
+                continue
+            detail = ser.errors
+
+        result.invalid += 1
+        if len(errors) < max_errors:
+            errors.append({"index": start_index + i, "errors": detail})
+
+    return result
+
+
+def validate_events_with_serializer(
+    events: Sequence[Any],
+    *,
+    max_errors: int,
+    start_index: int = 0,
+) -> ValidationResult:
+    """
+    Reference validator: one ApiRequestIngestItemSerializer per event.
+    Kept for APM_INGEST_FAST_VALIDATION=False and as the benchmark baseline.
+    """
+    result = ValidationResult()
+    for idx, item in enumerate(events, start=start_index):
+        if not isinstance(item, dict):
+            result.invalid += 1
+            if len(result.errors) < max_errors:
+                result.errors.append({"index": idx, "errors": _not_a_dict_detail(item)})
+            continue
+
+        ser = ApiRequestIngestItemSerializer(data=item)
+        if ser.is_valid():
+            result.rows.append(row_from_dict(ser.validated_data))
+        else:
+            result.invalid += 1
+            if len(result.errors) < max_errors:
+                result.errors.append({"index": idx, "errors": ser.errors})
+
+    return result
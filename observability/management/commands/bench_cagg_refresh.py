@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from observability.analytics.sql import (
+    DAILY_DIM_CAGG,
+    HOURLY_DIM_CAGG,
+    MINUTE_DIM_CAGG,
+    RAW_TABLE,
+    STATUS_CLASSES,
+    STATUS_CODES,
+    status_count_columns_sql,
+)
+
+_COUNTERS = [f"s{k}xx" for k in STATUS_CLASSES] + [f"c{code}" for code in STATUS_CODES]
+
+# (layout, view, width, source or None for raw, refresh window) - the policies of 0011 / 0015.
+_LEVELS = [
+    ("flat", "hourly <- raw", "1 hour", None, "7 days"),
+    ("flat", "daily <- raw", "1 day", None, "30 days"),
+    ("hierarchical", "minute <- raw", "1 minute", None, "7 days"),
+    ("hierarchical", "hourly <- minute", "1 hour", MINUTE_DIM_CAGG, "7 days"),
+    ("hierarchical", "daily <- hourly", "1 day", HOURLY_DIM_CAGG, "30 days"),
+]
+
+_REFRESH_VIEWS = [
+    (MINUTE_DIM_CAGG, "7 days"),
+    (HOURLY_DIM_CAGG, "7 days"),
+    (DAILY_DIM_CAGG, "30 days"),
+]
+
+
+def rollup_query(width: str, source: str | None, window: str) -> str:
+    """The aggregation one refresh of a *_dim level runs over its whole window."""
+    if source is None:
+        select = f"""
+            SELECT time_bucket(INTERVAL '{width}', time) AS bucket, dim_id,
+                   COUNT(*) AS hits, {status_count_columns_sql()},
+                   SUM(latency_ms) AS sum_latency_ms, MAX(latency_ms) AS max_latency_ms
+            FROM {RAW_TABLE}
+            WHERE time >= now() - INTERVAL '{window}'
+            GROUP BY 1, 2
+        """
+    else:
+        counters = ", ".join(f"SUM({c}) AS {c}" for c in _COUNTERS)
+        select = f"""
+            SELECT time_bucket(INTERVAL '{width}', bucket) AS bucket, dim_id,
+                   SUM(hits) AS hits, {counters},
+                   SUM(sum_latency_ms) AS sum_latency_ms, MAX(max_latency_ms) AS max_latency_ms
+            FROM {source}
+            WHERE bucket >= now() - INTERVAL '{window}'
+            GROUP BY 1, 2
+        """
+    return f"SELECT COUNT(*) FROM ({select}) q"
+
+
+class Command(BaseCommand):
+    help = (
+        "Refresh cost of the flat (raw-fed hourly + daily) vs hierarchical "
+        "(minute <- raw, hourly <- minute, daily <- hourly) rollups: the aggregation each "
+        "policy run performs over its window, on the current data (PostgreSQL + TimescaleDB)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=3, help="Runs per query (best kept).")
+        parser.add_argument(
+            "--refresh",
+            action="store_true",
+            help="Also time refresh_continuous_aggregate() on each *_dim level over its window.",
+        )
+
+    def _best_of(self, sql: str, repeat: int) -> tuple[float, int]:
+        best, rows = float("inf"), 0
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            with connection.cursor() as cursor:
+                cursor.execute(sql)
+                rows = int(cursor.fetchone()[0])
+            best = min(best, time.perf_counter() - t0)
+        return best, rows
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("This command requires PostgreSQL + TimescaleDB (not SQLite).")
+        repeat = int(options["repeat"])
+        if repeat <= 0:
+            raise CommandError("--repeat must be > 0.")
+
+        header = f"{'layout':<13} {'level':<17} {'window':>8} {'rows out':>10} {'seconds':>9}"
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        totals: dict[str, float] = {}
+        for layout, label, width, source, window in _LEVELS:
+            seconds, rows = self._best_of(rollup_query(width, source, window), repeat)
+            totals[layout] = totals.get(layout, 0.0) + seconds
+            self.stdout.write(f"{layout:<13} {label:<17} {window:>8} {rows:>10,} {seconds:>9.3f}")
+
+        self.stdout.write("")
+        for layout, seconds in totals.items():
+            self.stdout.write(f"{layout}: {seconds:.3f}s for one full-window run of every level")
+
+        if options["refresh"]:
+            self.stdout.write("")
+            for view, window in _REFRESH_VIEWS:
+                t0 = time.perf_counter()
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        f"CALL refresh_continuous_aggregate('{view}', "
+                        f"now() - INTERVAL '{window}', now());"
+                    )
+                self.stdout.write(f"refresh {view} ({window}): {time.perf_counter() - t0:.3f}s")
+
+        self.stdout.write(self.style.SUCCESS("Benchmark completed."))
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+# Same synthetic table twice: strings inline vs a 4-byte dimension id.
+_SETUP = [
+    "DROP TABLE IF EXISTS bench_dim, bench_rows_text, bench_rows_dim",
+    """
+    CREATE UNLOGGED TABLE bench_dim AS
+    SELECT
+        row_number() OVER ()::int AS id,
+        'service-' || s AS service,
+        '/api/v1/resource-' || e || '/items' AS endpoint,
+        (ARRAY['GET', 'POST', 'PUT', 'DELETE'])[m] AS method
+    FROM generate_series(1, %(services)s) s,
+         generate_series(1, %(endpoints)s) e,
+         generate_series(1, 4) m
+    """,
+    "ALTER TABLE bench_dim ADD PRIMARY KEY (id)",
+    """
+    CREATE UNLOGGED TABLE bench_rows_dim AS
+    SELECT
+        TIMESTAMPTZ '2025-01-01' + (g * INTERVAL '10 milliseconds') AS time,
+        (1 + (hashint4(g::int) & 2147483647) %% %(dims)s)::int AS dim_id,
+        (200 + 300 * ((g %% 13) / 12))::smallint AS status_code,
+        (g %% 1500)::int AS latency_ms
+    FROM generate_series(1, %(rows)s) g
+    """,
+    """
+    CREATE UNLOGGED TABLE bench_rows_text AS
+    SELECT r.time, d.service, d.endpoint, d.method, r.status_code, r.latency_ms
+    FROM bench_rows_dim r JOIN bench_dim d ON d.id = r.dim_id
+    """,
+    "CREATE INDEX ON bench_rows_text (service, endpoint, time DESC)",
+    "CREATE INDEX ON bench_rows_dim (dim_id, time DESC)",
+    "ANALYZE bench_dim",
+    "ANALYZE bench_rows_text",
+    "ANALYZE bench_rows_dim",
+]
+
+_QUERIES = {
+    "text": """
+        SELECT service, endpoint, COUNT(*), AVG(latency_ms)
+        FROM bench_rows_text
+        GROUP BY service, endpoint
+        ORDER BY 3 DESC
+        LIMIT 20
+    """,
+    "dim": """
+        WITH per_dim AS (
+            SELECT dim_id, COUNT(*) AS hits, SUM(latency_ms) AS latency_sum
+            FROM bench_rows_dim
+            GROUP BY dim_id
+        )
+        SELECT d.service, d.endpoint, SUM(p.hits), SUM(p.latency_sum) / SUM(p.hits)
+        FROM per_dim p JOIN bench_dim d ON d.id = p.dim_id
+        GROUP BY d.service, d.endpoint
+        ORDER BY 3 DESC
+        LIMIT 20
+    """,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare table/index size and GROUP BY speed of string-keyed vs dimension-id-keyed "
+        "request rows on synthetic data (PostgreSQL; creates and drops bench_* tables)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10_000_000)
+        parser.add_argument("--services", type=int, default=50)
+        parser.add_argument("--endpoints", type=int, default=200, help="Per service.")
+        parser.add_argument("--repeat", type=int, default=3, help="Query runs (best kept).")
+        parser.add_argument("--keep", action="store_true", help="Keep the bench_* tables.")
+
+    def _size(self, cursor, table: str) -> tuple[int, int]:
+        cursor.execute("SELECT pg_table_size(%s), pg_indexes_size(%s)", [table, table])
+        return cursor.fetchone()
+
+    def _best_of(self, cursor, sql: str, repeat: int) -> float:
+        best = float("inf")
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            cursor.execute(sql)
+            cursor.fetchall()
+            best = min(best, time.perf_counter() - t0)
+        return best
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("This command requires PostgreSQL (not SQLite).")
+        rows = int(options["rows"])
+        repeat = int(options["repeat"])
+        if rows <= 0 or repeat <= 0:
+            raise CommandError("--rows and --repeat must be > 0.")
+
+        params = {
+            "rows": rows,
+            "services": int(options["services"]),
+            "endpoints": int(options["endpoints"]),
+            "dims": int(options["services"]) * int(options["endpoints"]) * 4,
+        }
+
+        with connection.cursor() as cursor:
+            self.stdout.write(f"Building {rows:,} rows over {params['dims']:,} dimensions ...")
+            t0 = time.perf_counter()
+            for sql in _SETUP:
+                cursor.execute(sql % params if "%(" in sql else sql)
+            self.stdout.write(f"Built in {time.perf_counter() - t0:.1f}s\n")
+
+            header = f"{'layout':<6} {'table MB':>10} {'index MB':>10} {'group-by s':>11}"
+            self.stdout.write(header)
+            self.stdout.write("-" * len(header))
+            baseline = None
+            for name, table in (("text", "bench_rows_text"), ("dim", "bench_rows_dim")):
+                table_bytes, index_bytes = self._size(cursor, table)
+                seconds = self._best_of(cursor, _QUERIES[name], repeat)
+                baseline = baseline or (table_bytes, index_bytes, seconds)
+                self.stdout.write(
+                    f"{name:<6} {table_bytes / 2**20:>10,.1f} {index_bytes / 2**20:>10,.1f} "
+                    f"{seconds:>11.3f}"
+                )
+            self.stdout.write(
+                f"dim/text: table {table_bytes / baseline[0]:.2f}x, "
+                f"index {index_bytes / baseline[1]:.2f}x, query {seconds / baseline[2]:.2f}x"
+            )
+
+            if not options["keep"]:
+                cursor.execute("DROP TABLE IF EXISTS bench_dim, bench_rows_text, bench_rows_dim")
+
+        self.stdout.write(self.style.SUCCESS("Benchmark completed."))
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import io
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from observability.ingest import validate_events
+from observability.ingest.columnar import decode_frame, encode_batch, read_frames
+from observability.ingest.compression import compress_body
+from observability.ingest.ndjson import iter_chunks, iter_ndjson
+
+from .bench_ingest_validation import _parse_sizes, build_payload
+
+
+def _decode_json(body: bytes, *, max_errors: int, batch_size: int) -> int:
+    return len(validate_events(json.loads(body), max_errors=max_errors).rows)
+
+
+def _decode_ndjson(body: bytes, *, max_errors: int, batch_size: int) -> int:
+    accepted = 0
+    start = 0
+    for chunk in iter_chunks(iter_ndjson(io.BytesIO(body)), batch_size):
+        accepted += len(validate_events(chunk, max_errors=max_errors, start_index=start).rows)
+        start += len(chunk)
+    return accepted
+
+
+def _decode_columnar(body: bytes, *, max_errors: int, batch_size: int) -> int:
+    accepted = 0
+    start = 0
+    for frame in read_frames(io.BytesIO(body), max_frame_bytes=len(body)):
+        accepted += len(decode_frame(frame, max_errors=max_errors, start_index=start).rows)
+        start += len(frame)
+    return accepted
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark ingest body formats: bytes on the wire (raw and gzip) and server-side "
+        "decode+validate events/sec for JSON, NDJSON and the binary columnar format."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            default="1000,10000,50000",
+            help="Comma-separated payload sizes (default: 1000,10000,50000).",
+        )
+        parser.add_argument("--repeat", type=int, default=3, help="Runs per size (best kept).")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=10_000,
+            help="NDJSON chunk size / columnar frame size (default 10000).",
+        )
+        parser.add_argument("--max-errors", type=int, default=25)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def _best_of(self, fn, body: bytes, *, repeat: int, **kwargs) -> tuple[float, int]:
+        best = float("inf")
+        accepted = 0
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            accepted = fn(body, **kwargs)
+            best = min(best, time.perf_counter() - t0)
+        return best, accepted
+
+    def handle(self, *args, **options):
+        sizes = _parse_sizes(options["sizes"])
+        repeat = int(options["repeat"])
+        if repeat <= 0:
+            raise CommandError("--repeat must be > 0.")
+        batch_size = int(options["batch_size"])
+        if batch_size <= 0:
+            raise CommandError("--batch-size must be > 0.")
+        max_errors = int(options["max_errors"])
+
+        header = (
+            f"{'events':>8}  {'format':<9} {'bytes':>11} {'gzip bytes':>11} "
+            f"{'seconds':>9} {'events/sec':>12} {'speedup':>8}"
+        )
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+
+        for size in sizes:
+            events = build_payload(size, invalid_rate=0.0, seed=options["seed"])
+            rows = validate_events(events, max_errors=0).rows
+            bodies = {
+                "json": json.dumps(events).encode("utf-8"),
+                "ndjson": b"\n".join(json.dumps(e).encode("utf-8") for e in events) + b"\n",
+                "columnar": encode_batch(rows, frame_size=batch_size),
+            }
+            decoders = {
+                "json": _decode_json,
+                "ndjson": _decode_ndjson,
+                "columnar": _decode_columnar,
+            }
+
+            baseline = None
+            for name, body in bodies.items():
+                seconds, accepted = self._best_of(
+                    decoders[name],
+                    body,
+                    repeat=repeat,
+                    max_errors=max_errors,
+                    batch_size=batch_size,
+                )
+                if accepted != size:
+                    raise CommandError(f"{name} accepted {accepted} of {size} events.")
+                baseline = baseline or seconds
+                gz = len(compress_body(body, "gzip"))
+                self.stdout.write(
+                    f"{size:>8}  {name:<9} {len(body):>11,} {gz:>11,} "
+                    f"{seconds:>9.3f} {size / seconds:>12,.0f} {baseline / seconds:>7.1f}x"
+                )
+
+        self.stdout.write(self.style.SUCCESS("Benchmark completed."))
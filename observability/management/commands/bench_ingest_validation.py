@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import multiprocessing
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import UTC, datetime, timedelta
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+
+from observability.ingest import (
+    ValidationResult,
+    validate_events,
+    validate_events_with_serializer,
+)
+from observability.ingest.ndjson import iter_chunks
+from observability.ingest.parallel import iter_validated_parallel
+
+SERVICES = ["api", "web", "auth", "billing"]
+ENDPOINTS = ["/health", "/login", "/orders", "/home", "/search", "/api/v1/invoices"]
+METHODS = ["GET", "POST", "PUT", "DELETE"]
+
+
+def _parse_sizes(raw: str) -> list[int]:
+    try:
+        sizes = [int(s.strip()) for s in raw.split(",") if s.strip()]
+    except ValueError as exc:
+        raise CommandError("--sizes must be a comma-separated list of integers.") from exc
+    if not sizes or any(s <= 0 for s in sizes):
+        raise CommandError("--sizes must contain positive integers.")
+    return sizes
+
+
+def build_payload(count: int, *, invalid_rate: float, seed: int) -> list[dict]:
+    """
+    JSON-decoded events, shaped like what JSONParser hands to the ingest view.
+    """
+    rng = random.Random(seed)
+    base = datetime(2025, 12, 14, tzinfo=UTC)
+    events: list[dict] = []
+    for i in range(count):
+        event = {
+            "time": (base + timedelta(milliseconds=i * 37)).isoformat().replace("+00:00", "Z"),
+            "service": rng.choice(SERVICES),
+            "endpoint": rng.choice(ENDPOINTS),
+            "method": rng.choice(METHODS),
+            "status_code": rng.choice([200, 200, 200, 201, 204, 404, 500]),
+            "latency_ms": rng.randint(1, 1500),
+            "trace_id": f"trace-{i}",
+            "user_ref": f"user-{rng.randint(1, 500)}",
+            "tags": {"env": "bench"},
+        }
+        if rng.random() < invalid_rate:
+            event["status_code"] = 700
+        events.append(event)
+    return events
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark ingest validation: per-item DRF serializer loop vs column-wise "
+        "batch validator, optionally sharded over a process pool (events/sec)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            default="1000,10000,50000",
+            help="Comma-separated payload sizes (default: 1000,10000,50000).",
+        )
+        parser.add_argument("--repeat", type=int, default=3, help="Runs per size (best kept).")
+        parser.add_argument(
+            "--invalid-rate",
+            type=float,
+            default=0.01,
+            help="Fraction of invalid events in the payload (default 0.01).",
+        )
+        parser.add_argument("--max-errors", type=int, default=25)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=0,
+            help="Also run the batch validator sharded over N worker processes (0 = skip).",
+        )
+        parser.add_argument(
+            "--shard-size",
+            type=int,
+            default=5000,
+            help="Events per shard for --workers (default 5000).",
+        )
+
+    def _best_of(self, fn, events, *, repeat: int, max_errors: int) -> tuple[float, int]:
+        best = float("inf")
+        accepted = 0
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            result = fn(events, max_errors=max_errors)
+            best = min(best, time.perf_counter() - t0)
+            accepted = len(result.rows)
+        return best, accepted
+
+    def handle(self, *args, **options):
+        sizes = _parse_sizes(options["sizes"])
+        repeat = int(options["repeat"])
+        if repeat <= 0:
+            raise CommandError("--repeat must be > 0.")
+        invalid_rate = float(options["invalid_rate"])
+        if invalid_rate < 0 or invalid_rate > 1:
+            raise CommandError("--invalid-rate must be between 0 and 1.")
+        max_errors = int(options["max_errors"])
+        workers = int(options["workers"])
+        shard_size = int(options["shard_size"])
+        if workers < 0 or shard_size <= 0:
+            raise CommandError("--workers must be >= 0 and --shard-size > 0.")
+
+        pool = None
+        if workers:
+            pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("forkserver"),
+                initializer=django.setup,
+            )
+            # Warm the workers up so process start-up is not timed.
+            list(pool.map(abs, range(workers * 4)))
+
+            def parallel(events, *, max_errors):
+                accepted = []
+                for _, result in iter_validated_parallel(
+                    iter_chunks(events, shard_size),
+                    validate_events,
+                    max_errors=max_errors,
+                    executor=pool,
+                    window=2 * workers,
+                ):
+                    accepted.extend(result.rows)
+                return ValidationResult(rows=accepted)
+
+        header = (
+            f"{'events':>8}  {'validator':<12} {'seconds':>9} {'events/sec':>12} {'speedup':>8}"
+        )
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+
+        for size in sizes:
+            events = build_payload(size, invalid_rate=invalid_rate, seed=options["seed"])
+
+            slow_s, slow_ok = self._best_of(
+                validate_events_with_serializer, events, repeat=repeat, max_errors=max_errors
+            )
+            fast_s, fast_ok = self._best_of(
+                validate_events, events, repeat=repeat, max_errors=max_errors
+            )
+            if slow_ok != fast_ok:
+                raise CommandError(
+                    f"Validators disagree at size={size}: serializer={slow_ok} fast={fast_ok}"
+                )
+
+            self.stdout.write(
+                f"{size:>8}  {'serializer':<12} {slow_s:>9.3f} {size / slow_s:>12,.0f}"
+            )
+            self.stdout.write(
+                f"{size:>8}  {'fast':<12} {fast_s:>9.3f} {size / fast_s:>12,.0f} "
+                f"{slow_s / fast_s:>7.1f}x"
+            )
+            if pool is not None:
+                par_s, par_ok = self._best_of(
+                    parallel, events, repeat=repeat, max_errors=max_errors
+                )
+                if par_ok != fast_ok:
+                    raise CommandError(f"Parallel validator disagrees at size={size}.")
+                label = f"parallel/{workers}"
+                self.stdout.write(
+                    f"{size:>8}  {label:<12} {par_s:>9.3f} {size / par_s:>12,.0f} "
+                    f"{slow_s / par_s:>7.1f}x"
+                )
+
+        if pool is not None:
+            pool.shutdown()
+
+        self.stdout.write(self.style.SUCCESS("Benchmark completed."))
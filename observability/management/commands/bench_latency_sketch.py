@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import math
+import random
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from observability.analytics.sketch import QUANTILES, LatencySketch, quantile_field
+from observability.analytics.sql import (
+    AnalyticsFilters,
+    latency_bins_sql,
+    latency_percentiles_from_raw_sql,
+)
+
+
+def exact_quantile(sorted_values: list[int], q: float) -> float:
+    """percentile_cont: linear interpolation between the closest ranks."""
+    pos = q * (len(sorted_values) - 1)
+    lo = math.floor(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+def synthetic_latencies(count: int, *, seed: int) -> list[int]:
+    """Log-normal body + slow tail (5%), integer ms like latency_ms."""
+    rng = random.Random(seed)
+    out: list[int] = []
+    for _ in range(count):
+        if rng.random() < 0.05:
+            out.append(int(rng.lognormvariate(7.0, 0.8)))
+        else:
+            out.append(int(rng.lognormvariate(4.5, 0.6)))
+    return out
+
+
+class Command(BaseCommand):
+    help = (
+        "Latency sketch accuracy vs exact percentiles on synthetic data (any database), "
+        "and with --db the rollup query vs percentile_cont over raw rows (PostgreSQL)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=1_000_000, help="Synthetic values.")
+        parser.add_argument(
+            "--hours", type=int, default=720, help="Hourly sketches merged (default 30 days)."
+        )
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--db", action="store_true", help="Also time rollups vs raw on the database."
+        )
+        parser.add_argument("--days", type=int, default=30, help="--db window (default 30).")
+        parser.add_argument("--repeat", type=int, default=3, help="--db runs (best kept).")
+
+    def _accuracy(self, count: int, hours: int, seed: int) -> None:
+        values = synthetic_latencies(count, seed=seed)
+
+        t0 = time.perf_counter()
+        hourly = [LatencySketch() for _ in range(max(1, hours))]
+        for i, v in enumerate(values):
+            hourly[i % len(hourly)].add(v)
+        build_s = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        merged = LatencySketch()
+        for sk in hourly:
+            merged.merge(sk)
+        estimates = merged.quantiles(QUANTILES)
+        merge_s = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        ordered = sorted(values)
+        exact = {q: exact_quantile(ordered, q) for q in QUANTILES}
+        exact_s = time.perf_counter() - t0
+
+        self.stdout.write(
+            f"{count:,} values in {len(hourly)} hourly sketches; merged sketch has "
+            f"{len(merged.bins)} bins"
+        )
+        header = f"{'quantile':<16} {'exact':>10} {'sketch':>10} {'rel err':>8}"
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        for q in QUANTILES:
+            e, s = exact[q], estimates[q]
+            err = abs(s - e) / e if e else 0.0
+            self.stdout.write(f"{quantile_field(q):<16} {e:>10.1f} {s:>10.1f} {err:>8.2%}")
+        self.stdout.write(
+            f"build {build_s:.2f}s, merge+quantiles {merge_s * 1000:.1f}ms, "
+            f"exact sort {exact_s * 1000:.0f}ms\n"
+        )
+
+    def _best_of(self, sql: str, params: list, repeat: int) -> tuple[float, list]:
+        best = float("inf")
+        rows: list = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            with connection.cursor() as cursor:
+                cursor.execute(sql, params)
+                rows = cursor.fetchall()
+            best = min(best, time.perf_counter() - t0)
+        return best, rows
+
+    def _database(self, days: int, repeat: int) -> None:
+        if connection.vendor != "postgresql":
+            raise CommandError("--db requires PostgreSQL + TimescaleDB (not SQLite).")
+
+        end = timezone.now()
+        filters = AnalyticsFilters(start=end - timedelta(days=days), end=end)
+        granularity = "hourly" if days <= 2 else "daily"
+
+        raw_sql, raw_params = latency_percentiles_from_raw_sql(filters=filters)
+        raw_s, raw_rows = self._best_of(raw_sql, raw_params, repeat)
+
+        bins_sql, bins_params = latency_bins_sql(granularity=granularity, filters=filters)
+        sketch_s, bin_rows = self._best_of(bins_sql, bins_params, repeat)
+        t0 = time.perf_counter()
+        sketch = LatencySketch.from_bins(bin_rows)
+        estimates = sketch.quantiles(QUANTILES)
+        sketch_s += time.perf_counter() - t0  # merge in Python is part of the query cost
+
+        self.stdout.write(f"Last {days} days, {sketch.count:,} rows ({granularity} rollups):")
+        header = f"{'quantile':<16} {'raw':>10} {'sketch':>10} {'rel err':>8}"
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        exact = raw_rows[0] if raw_rows else (None,) * len(QUANTILES)
+        for q, e in zip(QUANTILES, exact, strict=True):
+            s = estimates[q]
+            if e is None or s is None:
+                self.stdout.write(f"{quantile_field(q):<16} {'-':>10} {'-':>10} {'-':>8}")
+                continue
+            err = abs(s - e) / e if e else 0.0
+            self.stdout.write(f"{quantile_field(q):<16} {e:>10.1f} {s:>10.1f} {err:>8.2%}")
+        speedup = raw_s / sketch_s if sketch_s else float("inf")
+        self.stdout.write(
+            f"percentile_cont {raw_s:.3f}s vs rollups {sketch_s:.3f}s ({speedup:,.0f}x)"
+        )
+
+    def handle(self, *args, **options):
+        count = int(options["count"])
+        repeat = int(options["repeat"])
+        if count <= 0 or repeat <= 0:
+            raise CommandError("--count and --repeat must be > 0.")
+
+        self._accuracy(count, int(options["hours"]), int(options["seed"]))
+        if options["db"]:
+            self._database(int(options["days"]), repeat)
+
+        self.stdout.write(self.style.SUCCESS("Benchmark completed."))
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from observability.ingest.spool import Spool, make_spool
+
+
+def _fmt_time(ts: float | None) -> str:
+    if ts is None:
+        return "-"
+    return datetime.fromtimestamp(ts, tz=UTC).strftime("%Y-%m-%d %H:%M:%S")
+
+
+class Command(BaseCommand):
+    help = (
+        "Inspect or replay the local ingest spool (APM_INGEST_SPOOL_DIR). Segments still "
+        "held by a running worker are listed but skipped by --replay."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--replay",
+            action="store_true",
+            help="Drain closed segments into the database, oldest first.",
+        )
+        parser.add_argument(
+            "--limit-rows",
+            type=int,
+            default=None,
+            help="Stop replaying after about this many rows.",
+        )
+        parser.add_argument("--dir", default=None, help="Spool directory (default: settings).")
+
+    def _list(self, spool: Spool) -> None:
+        infos = spool.inspect()
+        if not infos:
+            self.stdout.write("Spool is empty.")
+            return
+
+        header = f"{'segment':<40} {'bytes':>12} {'records':>8} {'rows':>10}  {'oldest (UTC)':<19}"
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        for info in infos:
+            name = info.path.rsplit("/", 1)[-1]
+            flag = "  (damaged tail)" if info.corrupt_tail else ""
+            self.stdout.write(
+                f"{name:<40} {info.size - info.replayed:>12,} {info.records:>8} "
+                f"{info.rows:>10,}  {_fmt_time(info.oldest):<19}{flag}"
+            )
+
+        pending, age = spool.stats()
+        rows = sum(i.rows for i in infos)
+        oldest = f", oldest {age:.0f}s ago" if age is not None else ""
+        self.stdout.write(f"{len(infos)} segment(s), {rows:,} rows, {pending:,} bytes{oldest}.")
+
+    def handle(self, *args, **options):
+        limit = options["limit_rows"]
+        if limit is not None and limit <= 0:
+            raise CommandError("--limit-rows must be > 0.")
+
+        spool = Spool(options["dir"]) if options["dir"] else make_spool()
+        if not options["replay"]:
+            self._list(spool)
+            return
+
+        result = spool.replay(limit_rows=limit)
+        self.stdout.write(
+            f"Replayed {result.rows:,} rows from {result.records} record(s), "
+            f"{result.segments} segment(s) drained in {result.seconds:.2f}s "
+            f"({result.rows_per_sec:,.0f} rows/s)."
+        )
+        left = spool.inspect()
+        if left:
+            self.stdout.write(
+                f"{len(left)} segment(s) left ({sum(i.rows for i in left):,} rows); "
+                "active segments are drained by their worker's replayer."
+            )
+        self.stdout.write(self.style.SUCCESS("Done."))
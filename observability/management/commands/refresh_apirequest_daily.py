@@ -7,6 +7,8 @@ from django.db import connection
 from django.utils import timezone
 from django.utils.dateparse import parse_date, parse_datetime
 
+from observability.analytics.cache import get_result_cache
+
 
 def _parse_dt_or_date(value: str, *, end_of_day: bool) -> datetime:
     """
@@ -39,7 +41,9 @@ def _parse_dt_or_date(value: str, *, end_of_day: bool) -> datetime:
 
 class Command(BaseCommand):
     help = (
-        "Manually refresh Timescale continuous aggregate: apirequest_daily. "
+        "Manually refresh the daily Timescale continuous aggregates (apirequest_daily_dim, "
+        "apirequest_latency_daily; apirequest_daily is a view over them), after the minute "
+        "and hourly ones they roll up from. "
         "Example: python manage.py refresh_apirequest_daily --start 2025-12-01 --end 2025-12-14"
     )
 
@@ -74,16 +78,40 @@ class Command(BaseCommand):
         if connection.vendor != "postgresql":
             raise CommandError("This command requires PostgreSQL (TimescaleDB).")
 
-        sql = "CALL refresh_continuous_aggregate('apirequest_daily', %s, %s);"
-
-        try:
-            with connection.cursor() as cursor:
-                cursor.execute(sql, [start, end])
-        except Exception as exc:
-            raise CommandError(f"Failed to refresh apirequest_daily: {exc}") from exc
-
-        self.stdout.write(
-            self.style.SUCCESS(
-                f"Refreshed apirequest_daily from {start.isoformat()} to {end.isoformat()}"
-            )
+        # Dim-keyed views (apirequest_daily reads from them). Daily rolls up hourly,
+        # which rolls up minute (0013): refresh the finer levels over the same range
+        # first, or an old range is re-aggregated from empty hourly buckets.
+        views = (
+            "apirequest_minute_dim",
+            "apirequest_latency_minute",
+            "apirequest_hourly_dim",
+            "apirequest_latency_hourly",
+            "apirequest_daily_dim",
+            "apirequest_latency_daily",
         )
+        for view in views:
+            sql = f"CALL refresh_continuous_aggregate('{view}', %s, %s);"
+
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute(sql, [start, end])
+            except Exception as exc:
+                raise CommandError(f"Failed to refresh {view}: {exc}") from exc
+
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Refreshed {view} from {start.isoformat()} to {end.isoformat()}"
+                )
+            )
+
+        # Cached analytics results read the refreshed views: invalidate on all workers.
+        cache = get_result_cache()
+        if cache is not None:
+            cache.bump(views)
+            if not cache.shared:
+                self.stdout.write(
+                    self.style.WARNING(
+                        "APM_ANALYTICS_CACHE_ALIAS is a per-process cache: results cached by "
+                        "the web workers are not invalidated and expire after their TTL."
+                    )
+                )
@@ -7,9 +7,15 @@ from django.db import connection
 from django.utils import timezone
 from django.utils.dateparse import parse_datetime
 
+from observability.analytics.cache import get_result_cache
+
 
 class Command(BaseCommand):
-    help = "Manually refresh the Timescale continuous aggregate: apirequest_hourly"
+    help = (
+        "Manually refresh the minute + hourly Timescale continuous aggregates "
+        "(apirequest_{minute,hourly}_dim, apirequest_latency_{minute,hourly}; "
+        "apirequest_hourly is a view over them)"
+    )
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -54,14 +60,34 @@ class Command(BaseCommand):
         if start > end:
             raise CommandError("start must be <= end")
 
-        # Timescale refresh function
-        sql = "CALL refresh_continuous_aggregate('apirequest_hourly'::regclass, %s, %s);"
-
-        self.stdout.write(
-            f"Refreshing apirequest_hourly from {start.isoformat()} to {end.isoformat()} ..."
+        # Timescale refresh function: minute first, the hourly views roll up from it
+        # (apirequest_hourly reads from them)
+        views = (
+            "apirequest_minute_dim",
+            "apirequest_hourly_dim",
+            "apirequest_latency_minute",
+            "apirequest_latency_hourly",
         )
+        for view in views:
+            sql = f"CALL refresh_continuous_aggregate('{view}'::regclass, %s, %s);"
+
+            self.stdout.write(
+                f"Refreshing {view} from {start.isoformat()} to {end.isoformat()} ..."
+            )
+
+            with connection.cursor() as cursor:
+                cursor.execute(sql, [start, end])
 
-        with connection.cursor() as cursor:
-            cursor.execute(sql, [start, end])
+        # Cached analytics results read the refreshed views: invalidate on all workers.
+        cache = get_result_cache()
+        if cache is not None:
+            cache.bump(views)
+            if not cache.shared:
+                self.stdout.write(
+                    self.style.WARNING(
+                        "APM_ANALYTICS_CACHE_ALIAS is a per-process cache: results cached by "
+                        "the web workers are not invalidated and expire after their TTL."
+                    )
+                )
 
         self.stdout.write(self.style.SUCCESS("Refresh completed."))
@@ -4,6 +4,7 @@ import json
 import os
 import random
 import ssl
+import time
 import urllib.error
 import urllib.request
 from collections.abc import Iterable
@@ -12,11 +13,13 @@ from datetime import UTC, datetime, timedelta
 
 from django.conf import settings
 from django.core.management.base import BaseCommand, CommandError
-from django.db import transaction
 from django.utils import timezone
 from django.utils.dateparse import parse_date, parse_datetime
 from faker import Faker
 
+from observability.ingest import IngestRow, row_from_dict, write_rows
+from observability.ingest.compression import ZSTD_AVAILABLE, compress_body
+from observability.ingest.copy_writer import EMPTY_WRITE
 from observability.models import ApiRequest
 from observability.serializers import ApiRequestIngestItemSerializer
 
@@ -167,18 +170,27 @@ def _build_event(
     }
 
 
+def _encode_events(events: Iterable[dict], compress: str) -> tuple[bytes, int]:
+    """JSON body (optionally compressed) and its uncompressed size."""
+    payload = json.dumps({"events": list(events)}).encode("utf-8")
+    return compress_body(payload, compress) if compress else payload, len(payload)
+
+
 def _post_events(
     ingest_url: str,
-    events: Iterable[dict],
+    payload: bytes,
     *,
     insecure: bool,
     timeout: float,
+    compress: str = "",
 ) -> dict:
-    payload = json.dumps({"events": list(events)}).encode("utf-8")
+    headers = {"Content-Type": "application/json"}
+    if compress:
+        headers["Content-Encoding"] = compress
     req = urllib.request.Request(
         ingest_url,
         data=payload,
-        headers={"Content-Type": "application/json"},
+        headers=headers,
         method="POST",
     )
 
@@ -269,6 +281,14 @@ class Command(BaseCommand):
             default=30.0,
             help="HTTP timeout (seconds) for API mode.",
         )
+        parser.add_argument(
+            "--compress",
+            nargs="?",
+            const="gzip",
+            default="",
+            choices=["gzip", "zstd"],
+            help="API mode: send Content-Encoding gzip (default) or zstd request bodies.",
+        )
 
     def handle(self, *args, **options):
         count = int(options["count"])
@@ -320,6 +340,12 @@ class Command(BaseCommand):
             if ssl_verify in ("0", "false", "no"):
                 insecure = True
 
+        compress = str(options.get("compress") or "")
+        if compress and not use_api:
+            raise CommandError("--compress requires --via-api.")
+        if compress == "zstd" and not ZSTD_AVAILABLE:
+            raise CommandError("--compress zstd needs Python 3.14+ or the zstandard package.")
+
         inserted = 0
         rejected = 0
 
@@ -331,6 +357,24 @@ class Command(BaseCommand):
 
             ingest_url = base_url.rstrip("/") + "/api/requests/ingest/?strict=false"
             batch_payload: list[dict] = []
+            raw_bytes = 0
+            wire_bytes = 0
+            t0 = time.perf_counter()
+
+            def send(events: list[dict]) -> None:
+                nonlocal inserted, rejected, raw_bytes, wire_bytes
+                body, raw_len = _encode_events(events, compress)
+                raw_bytes += raw_len
+                wire_bytes += len(body)
+                response = _post_events(
+                    ingest_url,
+                    body,
+                    insecure=insecure,
+                    timeout=options["timeout"],
+                    compress=compress,
+                )
+                inserted += int(response.get("inserted", 0) or 0)
+                rejected += int(response.get("rejected", 0) or 0)
 
             for _ in range(count):
                 event = _build_event(fake, services, endpoints_override, window, error_rate)
@@ -346,28 +390,28 @@ class Command(BaseCommand):
                 batch_payload.append(payload)
 
                 if len(batch_payload) >= batch_size:
-                    response = _post_events(
-                        ingest_url, batch_payload, insecure=insecure, timeout=options["timeout"]
-                    )
-                    inserted += int(response.get("inserted", 0) or 0)
-                    rejected += int(response.get("rejected", 0) or 0)
+                    send(batch_payload)
                     batch_payload = []
 
             if batch_payload:
-                response = _post_events(
-                    ingest_url, batch_payload, insecure=insecure, timeout=options["timeout"]
-                )
-                inserted += int(response.get("inserted", 0) or 0)
-                rejected += int(response.get("rejected", 0) or 0)
+                send(batch_payload)
 
+            elapsed = time.perf_counter() - t0
+            ratio = raw_bytes / wire_bytes if wire_bytes else 0.0
             self.stdout.write(
                 self.style.SUCCESS(
                     f"Seeded via API: inserted={inserted}, rejected={rejected}, url={ingest_url}"
                 )
             )
+            self.stdout.write(
+                f"encoding={compress or 'identity'}, body_bytes={raw_bytes}, "
+                f"wire_bytes={wire_bytes}, ratio={ratio:.1f}x, seconds={elapsed:.2f}, "
+                f"events/sec={count / elapsed if elapsed > 0 else 0:,.0f}"
+            )
             return
 
-        batch: list[ApiRequest] = []
+        batch: list[IngestRow] = []
+        written = EMPTY_WRITE
         for idx in range(count):
             event = _build_event(fake, services, endpoints_override, window, error_rate)
             if options["validate"]:
@@ -375,12 +419,15 @@ class Command(BaseCommand):
                 ser.is_valid(raise_exception=True)
                 event = ser.validated_data
 
-            batch.append(ApiRequest(**event))
+            batch.append(row_from_dict(event))
 
             if len(batch) >= batch_size or idx == count - 1:
-                with transaction.atomic():
-                    ApiRequest.objects.bulk_create(batch, batch_size=batch_size)
-                inserted += len(batch)
+                written += write_rows(batch, batch_size=batch_size, source="seed")
                 batch = []
 
-        self.stdout.write(self.style.SUCCESS(f"Seeded via ORM: inserted={inserted}"))
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Seeded via ORM: inserted={written.rows}, method={written.method}, "
+                f"rows/sec={written.rows_per_sec:,.0f}"
+            )
+        )
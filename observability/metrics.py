@@ -0,0 +1,184 @@
+# observability/metrics.py
+"""
+Application-level Prometheus metrics.
+
+Exported on /metrics next to the django_prometheus request/DB metrics
+(same default registry).
+"""
+
+from __future__ import annotations
+
+from prometheus_client import Counter, Gauge, Histogram
+
+INGEST_ROWS_WRITTEN = Counter(
+    "apm_ingest_rows_written_total",
+    "Rows written to observability_apirequest by the ingest bulk writer.",
+    ["source", "method"],
+)
+
+INGEST_WRITE_SECONDS = Histogram(
+    "apm_ingest_write_seconds",
+    "Duration of one bulk write call (COPY or bulk_create).",
+    ["source", "method"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+
+INGEST_WRITE_ROWS_PER_SECOND = Gauge(
+    "apm_ingest_write_rows_per_second",
+    "Throughput of the most recent bulk write call.",
+    ["source", "method"],
+)
+
+# ----------------------------
+# Write-behind ingest buffer
+# ----------------------------
+INGEST_BUFFER_DEPTH = Gauge(
+    "apm_ingest_buffer_depth_rows",
+    "Rows queued in the in-process write-behind buffer (per worker).",
+)
+
+INGEST_BUFFER_FLUSH_SECONDS = Histogram(
+    "apm_ingest_buffer_flush_seconds",
+    "Duration of one write-behind buffer flush.",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+
+INGEST_BUFFER_FLUSH_FAILURES = Counter(
+    "apm_ingest_buffer_flush_failures_total",
+    "Buffer writes that failed (transient: re-queued and retried; otherwise bisected).",
+)
+
+INGEST_BUFFER_DROPPED_ROWS = Counter(
+    "apm_ingest_buffer_dropped_rows_total",
+    "Validated rows the write-behind buffer refused (full) or dead-lettered (rejected).",
+    ["reason"],  # block | drop | too_large | rejected
+)
+
+INGEST_BODY_BYTES = Counter(
+    "apm_ingest_body_bytes_total",
+    "Compressed ingest body bytes on the wire vs after decoding.",
+    ["encoding", "stage"],
+)
+
+# ----------------------------
+# Ingest dedup
+# ----------------------------
+INGEST_IDEMPOTENCY = Counter(
+    "apm_ingest_idempotency_total",
+    "Ingest requests carrying an Idempotency-Key, by outcome.",
+    ["outcome"],  # stored | replayed | in_progress
+)
+
+INGEST_DUPLICATES_DROPPED = Counter(
+    "apm_ingest_duplicates_dropped_total",
+    "Events dropped by the (trace_id, time, endpoint) Bloom filter.",
+)
+
+# ----------------------------
+# Ingest rate limiting
+# ----------------------------
+INGEST_RATE_LIMIT_DECISIONS = Counter(
+    "apm_ingest_rate_limit_decisions_total",
+    "Token-bucket admission decisions for ingest chunks.",
+    ["decision"],  # allowed | limited
+)
+
+INGEST_RATE_LIMITED_EVENTS = Counter(
+    "apm_ingest_rate_limited_events_total",
+    "Events refused with 429, by the bucket that refused them.",
+    ["bucket"],  # "*" (global) or service name
+)
+
+# ----------------------------
+# Ingest spool
+# ----------------------------
+INGEST_SPOOLED_ROWS = Counter(
+    "apm_ingest_spooled_rows_total",
+    "Rows written to the local spool instead of the database.",
+    ["reason"],  # error | slow
+)
+
+INGEST_SPOOL_BYTES = Gauge(
+    "apm_ingest_spool_bytes",
+    "Bytes waiting in the local ingest spool.",
+)
+
+INGEST_SPOOL_OLDEST_SECONDS = Gauge(
+    "apm_ingest_spool_oldest_seconds",
+    "Age of the oldest record waiting in the local ingest spool.",
+)
+
+INGEST_SPOOL_REPLAYED_ROWS = Counter(
+    "apm_ingest_spool_replayed_rows_total",
+    "Rows replayed from the local spool into the database.",
+)
+
+INGEST_SPOOL_REPLAY_ROWS_PER_SECOND = Gauge(
+    "apm_ingest_spool_replay_rows_per_second",
+    "Throughput of the last spool replay run.",
+)
+
+INGEST_SPOOL_CORRUPT_SEGMENTS = Counter(
+    "apm_ingest_spool_corrupt_segments_total",
+    "Spool segments set aside because of a torn or corrupt tail.",
+)
+
+# ----------------------------
+# Endpoint dimension
+# ----------------------------
+INGEST_DIM_LOOKUPS = Counter(
+    "apm_ingest_dim_lookups_total",
+    "(service, endpoint, method) -> dim_id lookups by the ingest LRU cache.",
+    ["result"],  # hit | miss
+)
+
+# ----------------------------
+# Endpoint normalization
+# ----------------------------
+INGEST_ENDPOINTS_TEMPLATED = Counter(
+    "apm_ingest_endpoints_templated_total",
+    "Events whose raw path was rewritten to an endpoint template at ingest.",
+)
+
+INGEST_ENDPOINTS_FOLDED = Counter(
+    "apm_ingest_endpoints_folded_total",
+    "Events folded into __other__ by the per-service endpoint cardinality cap.",
+    ["service"],
+)
+
+# ----------------------------
+# Analytics query planning
+# ----------------------------
+ANALYTICS_PLAN_SPANS = Counter(
+    "apm_analytics_plan_spans_total",
+    "Spans of stitched analytics queries, by the source the cost model chose.",
+    ["source"],  # raw | minute | hourly | daily
+)
+ANALYTICS_CACHE_REQUESTS = Counter(
+    "apm_analytics_cache_requests_total",
+    "Analytics result cache lookups.",
+    ["view", "result"],  # result: hit | miss | bypass
+)
+ANALYTICS_COALESCED_QUERIES = Counter(
+    "apm_analytics_coalesced_queries_total",
+    "Analytics queries answered by an identical in-flight execution instead of running.",
+    ["scope"],  # worker (same process) | host (another worker, via the lock file)
+)
+
+# ----------------------------
+# List counts
+# ----------------------------
+LIST_COUNTS = Counter(
+    "apm_list_counts_total",
+    "Result counts for the request list and admin changelist.",
+    ["kind"],  # estimated | exact
+)
+
+# ----------------------------
+# Export
+# ----------------------------
+EXPORT_ROWS = Counter(
+    "apm_export_rows_total",
+    "Rows streamed by /api/requests/export/.",
+    ["format"],  # ndjson | csv
+)
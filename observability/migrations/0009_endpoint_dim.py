@@ -0,0 +1,230 @@
+# observability/migrations/0009_endpoint_dim.py
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+DIM_TABLE = "observability_endpointdim"
+RAW_TABLE = "observability_apirequest"
+
+# dim_id backfill batch: the hypertable's chunk_time_interval (0002).
+BACKFILL_WINDOW = timedelta(days=1)
+
+# (view, bucket width, start_offset, end_offset, schedule_interval) - same policies as 0003/0004
+DIM_CAGGS = [
+    ("apirequest_hourly_dim", "1 hour", "7 days", "1 hour", "15 minutes"),
+    ("apirequest_daily_dim", "1 day", "30 days", "1 day", "1 hour"),
+]
+
+FILL_DIM_TRIGGER = f"""
+CREATE OR REPLACE FUNCTION apirequest_fill_dim_id() RETURNS trigger AS $$
+BEGIN
+    -- Rows written without a resolved id (ORM saves, manual INSERTs) get one here.
+    SELECT id INTO NEW.dim_id FROM {DIM_TABLE}
+     WHERE service = NEW.service AND endpoint = NEW.endpoint AND method = NEW.method;
+    IF NEW.dim_id IS NULL THEN
+        INSERT INTO {DIM_TABLE} (service, endpoint, method)
+        VALUES (NEW.service, NEW.endpoint, NEW.method)
+        ON CONFLICT (service, endpoint, method) DO NOTHING;
+        SELECT id INTO NEW.dim_id FROM {DIM_TABLE}
+         WHERE service = NEW.service AND endpoint = NEW.endpoint AND method = NEW.method;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS apirequest_fill_dim_id ON {RAW_TABLE};
+CREATE TRIGGER apirequest_fill_dim_id
+    BEFORE INSERT ON {RAW_TABLE}
+    FOR EACH ROW WHEN (NEW.dim_id IS NULL)
+    EXECUTE FUNCTION apirequest_fill_dim_id();
+"""
+
+
+def _policy_sql(view: str, start_offset: str, end_offset: str, schedule: str) -> str:
+    return f"""
+    DO $$
+    BEGIN
+        BEGIN
+            PERFORM add_continuous_aggregate_policy(
+                '{view}'::regclass,
+                start_offset => INTERVAL '{start_offset}',
+                end_offset => INTERVAL '{end_offset}',
+                schedule_interval => INTERVAL '{schedule}',
+                if_not_exists => TRUE
+            );
+        EXCEPTION
+            WHEN undefined_function THEN
+                PERFORM add_continuous_aggregate_policy(
+                    '{view}'::regclass,
+                    start_offset => INTERVAL '{start_offset}',
+                    end_offset => INTERVAL '{end_offset}',
+                    schedule_interval => INTERVAL '{schedule}'
+                );
+            WHEN others THEN
+                -- If anything unexpected happens, don't block migration
+                NULL;
+        END;
+    END $$;
+    """
+
+
+def _windows(first: datetime, last: datetime) -> list[tuple[datetime, datetime]]:
+    """[lo, lo + BACKFILL_WINDOW) ranges covering [first, last], aligned on UTC midnight."""
+    lo = first.astimezone(UTC).replace(hour=0, minute=0, second=0, microsecond=0)
+    out = []
+    while lo <= last:
+        out.append((lo, lo + BACKFILL_WINDOW))
+        lo += BACKFILL_WINDOW
+    return out
+
+
+def _backfill_dim_ids(cursor) -> None:
+    """
+    Set dim_id on existing rows one window per statement. The migration is not
+    atomic, so each UPDATE commits on its own: row locks and dead tuples are
+    bounded by one chunk instead of the whole hypertable.
+    """
+    cursor.execute(f"SELECT MIN(time), MAX(time) FROM {RAW_TABLE};")
+    first, last = cursor.fetchone()
+    if first is None:
+        return
+    for lo, hi in _windows(first, last):
+        cursor.execute(
+            f"""
+            UPDATE {RAW_TABLE} r
+               SET dim_id = d.id
+              FROM {DIM_TABLE} d
+             WHERE r.time >= %s AND r.time < %s
+               AND r.dim_id IS NULL
+               AND d.service = r.service
+               AND d.endpoint = r.endpoint
+               AND d.method = r.method;
+            """,
+            [lo, hi],
+        )
+
+
+def forwards(apps, schema_editor):
+    """
+    Dictionary-encode (service, endpoint, method):
+      - backfill observability_endpointdim from existing rows
+      - BEFORE INSERT trigger resolving dim_id for rows that arrive without one
+      - set dim_id on existing rows, one day (one hypertable chunk) per UPDATE
+      - hourly/daily CAGGs grouped by (bucket, dim_id) instead of the strings:
+        apirequest_hourly_dim, apirequest_daily_dim (realtime + refresh policies)
+
+    The name-keyed apirequest_hourly/apirequest_daily stay for the /hourly/ and
+    /daily/ row endpoints; the analytics SQL builders read the *_dim views.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"""
+            INSERT INTO {DIM_TABLE} (service, endpoint, method)
+            SELECT DISTINCT service, endpoint, method FROM {RAW_TABLE}
+            ON CONFLICT (service, endpoint, method) DO NOTHING;
+            """)
+        # Trigger first: rows written during the backfill get their id on insert.
+        cursor.execute(FILL_DIM_TRIGGER)
+        _backfill_dim_ids(cursor)
+
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'timescaledb';")
+        if not cursor.fetchone():
+            # TimescaleDB not available, skip continuous aggregate creation
+            return
+
+        for view, width, start_offset, end_offset, schedule in DIM_CAGGS:
+            cursor.execute(f"""
+                CREATE MATERIALIZED VIEW IF NOT EXISTS {view}
+                WITH (timescaledb.continuous) AS
+                SELECT
+                    time_bucket(INTERVAL '{width}', time) AS bucket,
+                    dim_id,
+                    COUNT(*)::bigint AS hits,
+                    COUNT(*) FILTER (WHERE status_code >= 500)::bigint AS errors,
+                    AVG(latency_ms)::double precision AS avg_latency_ms,
+                    MAX(latency_ms)::integer AS max_latency_ms
+                FROM {RAW_TABLE}
+                GROUP BY 1, 2
+                WITH NO DATA;
+                """)
+            cursor.execute(
+                f"ALTER MATERIALIZED VIEW {view} SET (timescaledb.materialized_only = false);"
+            )
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {view}_bucket_desc_idx ON {view} (bucket DESC);"
+            )
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {view}_dim_bucket_desc_idx "
+                f"ON {view} (dim_id, bucket DESC);"
+            )
+            cursor.execute(_policy_sql(view, start_offset, end_offset, schedule))
+
+
+def backwards(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        for view, *_ in DIM_CAGGS:
+            cursor.execute(f"""
+                DO $$
+                BEGIN
+                    PERFORM remove_continuous_aggregate_policy('{view}'::regclass, if_exists => TRUE);
+                EXCEPTION
+                    WHEN others THEN NULL;
+                END $$;
+                """)
+            cursor.execute(f"DROP MATERIALIZED VIEW IF EXISTS {view};")
+        cursor.execute(f"DROP TRIGGER IF EXISTS apirequest_fill_dim_id ON {RAW_TABLE};")
+        cursor.execute("DROP FUNCTION IF EXISTS apirequest_fill_dim_id();")
+
+
+class Migration(migrations.Migration):
+    # The dim_id backfill commits window by window (see _backfill_dim_ids).
+    atomic = False
+
+    dependencies = [
+        ("observability", "0008_embeddings"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EndpointDim",
+            fields=[
+                ("id", models.AutoField(primary_key=True, serialize=False)),
+                ("service", models.CharField(max_length=100)),
+                ("endpoint", models.CharField(max_length=255)),
+                ("method", models.CharField(max_length=10)),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("service", "endpoint", "method"),
+                        name="endpoint_dim_svc_ep_method_uniq",
+                    )
+                ],
+            },
+        ),
+        migrations.AddField(
+            model_name="apirequest",
+            name="dim",
+            field=models.ForeignKey(
+                blank=True,
+                db_constraint=False,
+                null=True,
+                on_delete=django.db.models.deletion.DO_NOTHING,
+                related_name="+",
+                to="observability.endpointdim",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="apirequest",
+            index=models.Index(fields=["dim", "-time"], name="api_req_dim_time_idx"),
+        ),
+        migrations.RunPython(forwards, backwards),
+    ]
@@ -0,0 +1,123 @@
+# observability/migrations/0010_latency_sketch.py
+from __future__ import annotations
+
+from django.db import migrations
+
+RAW_TABLE = "observability_apirequest"
+
+# Frozen copy of observability.analytics.sketch.latency_bin_sql() at 1% relative
+# accuracy (gamma = 1.01 / 0.99); changing it requires new views.
+LATENCY_BIN_SQL = (
+    "(CASE WHEN latency_ms <= 0 THEN -32768 "
+    "ELSE CEIL(LN(latency_ms::double precision) / LN(1.02020202020202::double precision)) "
+    "END)::smallint"
+)
+
+# (view, bucket width, start_offset, end_offset, schedule_interval) - same policies as 0003/0004
+LATENCY_CAGGS = [
+    ("apirequest_latency_hourly", "1 hour", "7 days", "1 hour", "15 minutes"),
+    ("apirequest_latency_daily", "1 day", "30 days", "1 day", "1 hour"),
+]
+
+
+def _policy_sql(view: str, start_offset: str, end_offset: str, schedule: str) -> str:
+    return f"""
+    DO $$
+    BEGIN
+        BEGIN
+            PERFORM add_continuous_aggregate_policy(
+                '{view}'::regclass,
+                start_offset => INTERVAL '{start_offset}',
+                end_offset => INTERVAL '{end_offset}',
+                schedule_interval => INTERVAL '{schedule}',
+                if_not_exists => TRUE
+            );
+        EXCEPTION
+            WHEN undefined_function THEN
+                PERFORM add_continuous_aggregate_policy(
+                    '{view}'::regclass,
+                    start_offset => INTERVAL '{start_offset}',
+                    end_offset => INTERVAL '{end_offset}',
+                    schedule_interval => INTERVAL '{schedule}'
+                );
+            WHEN others THEN
+                -- If anything unexpected happens, don't block migration
+                NULL;
+        END;
+    END $$;
+    """
+
+
+def forwards(apps, schema_editor):
+    """
+    Mergeable latency sketches as continuous aggregates:
+      apirequest_latency_hourly / apirequest_latency_daily
+      group by (bucket, dim_id, bin) -> n = COUNT(*)
+
+    `bin` is the DDSketch log bucket of latency_ms (1% relative error), so a
+    sketch for any window/filter is SUM(n) GROUP BY bin over these rows and
+    p50/p90/p95/p99 never need percentile_cont over the raw hypertable.
+
+    Realtime (materialized_only = false) + the same refresh policies as the
+    hourly/daily CAGGs.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'timescaledb';")
+        if not cursor.fetchone():
+            # TimescaleDB not available, skip continuous aggregate creation
+            return
+
+        for view, width, start_offset, end_offset, schedule in LATENCY_CAGGS:
+            cursor.execute(f"""
+                CREATE MATERIALIZED VIEW IF NOT EXISTS {view}
+                WITH (timescaledb.continuous) AS
+                SELECT
+                    time_bucket(INTERVAL '{width}', time) AS bucket,
+                    dim_id,
+                    {LATENCY_BIN_SQL} AS bin,
+                    COUNT(*)::bigint AS n
+                FROM {RAW_TABLE}
+                GROUP BY 1, 2, 3
+                WITH NO DATA;
+                """)
+            cursor.execute(
+                f"ALTER MATERIALIZED VIEW {view} SET (timescaledb.materialized_only = false);"
+            )
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {view}_bucket_desc_idx ON {view} (bucket DESC);"
+            )
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {view}_dim_bucket_desc_idx "
+                f"ON {view} (dim_id, bucket DESC);"
+            )
+            cursor.execute(_policy_sql(view, start_offset, end_offset, schedule))
+
+
+def backwards(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        for view, *_ in LATENCY_CAGGS:
+            cursor.execute(f"""
+                DO $$
+                BEGIN
+                    PERFORM remove_continuous_aggregate_policy('{view}'::regclass, if_exists => TRUE);
+                EXCEPTION
+                    WHEN others THEN NULL;
+                END $$;
+                """)
+            cursor.execute(f"DROP MATERIALIZED VIEW IF EXISTS {view};")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("observability", "0009_endpoint_dim"),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
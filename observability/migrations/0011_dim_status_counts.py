@@ -0,0 +1,138 @@
+# observability/migrations/0011_dim_status_counts.py
+from __future__ import annotations
+
+from django.db import migrations
+
+RAW_TABLE = "observability_apirequest"
+
+# Frozen copy of observability.analytics.sql.STATUS_CLASSES / STATUS_CODES.
+STATUS_CLASSES = (1, 2, 3, 4, 5)
+STATUS_CODES = (400, 401, 403, 404, 408, 409, 422, 429, 500, 502, 503, 504)
+
+STATUS_COUNT_COLUMNS = ",\n    ".join(
+    [
+        f"COUNT(*) FILTER (WHERE status_code BETWEEN {k}00 AND {k}99)::bigint AS s{k}xx"
+        for k in STATUS_CLASSES
+    ]
+    + [f"COUNT(*) FILTER (WHERE status_code = {code})::bigint AS c{code}" for code in STATUS_CODES]
+)
+
+# (view, bucket width, start_offset, end_offset, schedule_interval) - same as 0009
+DIM_CAGGS = [
+    ("apirequest_hourly_dim", "1 hour", "7 days", "1 hour", "15 minutes"),
+    ("apirequest_daily_dim", "1 day", "30 days", "1 day", "1 hour"),
+]
+
+
+def _policy_sql(view: str, start_offset: str, end_offset: str, schedule: str) -> str:
+    return f"""
+    DO $$
+    BEGIN
+        BEGIN
+            PERFORM add_continuous_aggregate_policy(
+                '{view}'::regclass,
+                start_offset => INTERVAL '{start_offset}',
+                end_offset => INTERVAL '{end_offset}',
+                schedule_interval => INTERVAL '{schedule}',
+                if_not_exists => TRUE
+            );
+        EXCEPTION
+            WHEN undefined_function THEN
+                PERFORM add_continuous_aggregate_policy(
+                    '{view}'::regclass,
+                    start_offset => INTERVAL '{start_offset}',
+                    end_offset => INTERVAL '{end_offset}',
+                    schedule_interval => INTERVAL '{schedule}'
+                );
+            WHEN others THEN
+                -- If anything unexpected happens, don't block migration
+                NULL;
+        END;
+    END $$;
+    """
+
+
+def _drop_view_sql(view: str) -> list[str]:
+    return [
+        f"""
+        DO $$
+        BEGIN
+            PERFORM remove_continuous_aggregate_policy('{view}'::regclass, if_exists => TRUE);
+        EXCEPTION
+            WHEN others THEN NULL;
+        END $$;
+        """,
+        f"DROP MATERIALIZED VIEW IF EXISTS {view};",
+    ]
+
+
+def _rebuild(schema_editor, *, with_status: bool) -> None:
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'timescaledb';")
+        if not cursor.fetchone():
+            # TimescaleDB not available, skip continuous aggregate creation
+            return
+
+        status_columns = f"{STATUS_COUNT_COLUMNS}," if with_status else ""
+        for view, width, start_offset, end_offset, schedule in DIM_CAGGS:
+            for sql in _drop_view_sql(view):
+                cursor.execute(sql)
+            cursor.execute(f"""
+                CREATE MATERIALIZED VIEW IF NOT EXISTS {view}
+                WITH (timescaledb.continuous) AS
+                SELECT
+                    time_bucket(INTERVAL '{width}', time) AS bucket,
+                    dim_id,
+                    COUNT(*)::bigint AS hits,
+                    COUNT(*) FILTER (WHERE status_code >= 500)::bigint AS errors,
+                    {status_columns}
+                    AVG(latency_ms)::double precision AS avg_latency_ms,
+                    MAX(latency_ms)::integer AS max_latency_ms
+                FROM {RAW_TABLE}
+                GROUP BY 1, 2
+                WITH NO DATA;
+                """)
+            cursor.execute(
+                f"ALTER MATERIALIZED VIEW {view} SET (timescaledb.materialized_only = false);"
+            )
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {view}_bucket_desc_idx ON {view} (bucket DESC);"
+            )
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {view}_dim_bucket_desc_idx "
+                f"ON {view} (dim_id, bucket DESC);"
+            )
+            cursor.execute(_policy_sql(view, start_offset, end_offset, schedule))
+
+
+def forwards(apps, schema_editor):
+    """
+    Rebuild apirequest_hourly_dim / apirequest_daily_dim with status counters:
+      s1xx..s5xx  = COUNT(*) per status class
+      c400..c504  = COUNT(*) for common codes (see STATUS_CODES)
+
+    Any error_from threshold whose class prefix is covered by the per-code
+    counters (100/200/.../500, 401, 501, ...) is then answered from the CAGGs.
+    `errors` (>= 500) stays for compatibility.
+
+    The views are recreated WITH NO DATA; the refresh policies repopulate the
+    policy windows, and 0016_backfill_rollups refreshes older history.
+    """
+    _rebuild(schema_editor, with_status=True)
+
+
+def backwards(apps, schema_editor):
+    _rebuild(schema_editor, with_status=False)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("observability", "0010_latency_sketch"),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
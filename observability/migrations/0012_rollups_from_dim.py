@@ -0,0 +1,214 @@
+# observability/migrations/0012_rollups_from_dim.py
+from __future__ import annotations
+
+from django.db import migrations
+
+DIM_TABLE = "observability_endpointdim"
+RAW_TABLE = "observability_apirequest"
+
+# Frozen copy of observability.analytics.sketch.latency_value_sql("p.p95_bin").
+LATENCY_VALUE_SQL = (
+    "(CASE WHEN p.p95_bin = -32768 THEN 0 "
+    "ELSE 2 * POWER(1.02020202020202::double precision, p.p95_bin) / 2.02020202020202 "
+    "END)::double precision"
+)
+
+# avg over the (service, endpoint, method) rows of one bucket, weighted by hits.
+_WEIGHTED_AVG = "(SUM(r.avg_latency_ms * r.hits) / NULLIF(SUM(r.hits), 0))::double precision"
+
+HOURLY_VIEW_SQL = f"""
+CREATE VIEW apirequest_hourly AS
+SELECT
+    r.bucket,
+    d.service,
+    d.endpoint,
+    SUM(r.hits)::bigint AS hits,
+    SUM(r.errors)::bigint AS errors,
+    {_WEIGHTED_AVG} AS avg_latency_ms,
+    MAX(r.max_latency_ms)::integer AS max_latency_ms
+FROM apirequest_hourly_dim r
+JOIN {DIM_TABLE} d ON d.id = r.dim_id
+GROUP BY 1, 2, 3;
+"""
+
+# p95 walks the merged daily latency sketch of each (bucket, service, endpoint)
+# row: first bin whose cumulative count passes rank 0.95 * (n - 1), as
+# LatencySketch.quantiles does.
+DAILY_VIEW_SQL = f"""
+CREATE VIEW apirequest_daily AS
+SELECT
+    t.bucket,
+    t.service,
+    t.endpoint,
+    t.hits,
+    t.errors,
+    t.avg_latency_ms,
+    {LATENCY_VALUE_SQL} AS p95_latency_ms,
+    t.max_latency_ms
+FROM (
+    SELECT
+        r.bucket,
+        d.service,
+        d.endpoint,
+        SUM(r.hits)::bigint AS hits,
+        SUM(r.errors)::bigint AS errors,
+        {_WEIGHTED_AVG} AS avg_latency_ms,
+        MAX(r.max_latency_ms)::integer AS max_latency_ms
+    FROM apirequest_daily_dim r
+    JOIN {DIM_TABLE} d ON d.id = r.dim_id
+    GROUP BY 1, 2, 3
+) t
+LEFT JOIN LATERAL (
+    SELECT MIN(c.bin) FILTER (WHERE c.seen > 0.95 * (c.total - 1)) AS p95_bin
+    FROM (
+        SELECT
+            s.bin,
+            SUM(s.n) OVER (ORDER BY s.bin) AS seen,
+            SUM(s.n) OVER () AS total
+        FROM (
+            SELECT l.bin, SUM(l.n) AS n
+            FROM apirequest_latency_daily l
+            JOIN {DIM_TABLE} ld ON ld.id = l.dim_id
+            WHERE l.bucket = t.bucket AND ld.service = t.service AND ld.endpoint = t.endpoint
+            GROUP BY l.bin
+        ) s
+    ) c
+) p ON TRUE;
+"""
+
+# (view, bucket width, start_offset, end_offset, schedule_interval) - as in 0003/0004
+NAMED_CAGGS = [
+    ("apirequest_hourly", "1 hour", "7 days", "1 hour", "15 minutes"),
+    ("apirequest_daily", "1 day", "30 days", "1 day", "1 hour"),
+]
+
+
+def _policy_sql(view: str, start_offset: str, end_offset: str, schedule: str) -> str:
+    return f"""
+    DO $$
+    BEGIN
+        BEGIN
+            PERFORM add_continuous_aggregate_policy(
+                '{view}'::regclass,
+                start_offset => INTERVAL '{start_offset}',
+                end_offset => INTERVAL '{end_offset}',
+                schedule_interval => INTERVAL '{schedule}',
+                if_not_exists => TRUE
+            );
+        EXCEPTION
+            WHEN undefined_function THEN
+                PERFORM add_continuous_aggregate_policy(
+                    '{view}'::regclass,
+                    start_offset => INTERVAL '{start_offset}',
+                    end_offset => INTERVAL '{end_offset}',
+                    schedule_interval => INTERVAL '{schedule}'
+                );
+            WHEN others THEN
+                -- If anything unexpected happens, don't block migration
+                NULL;
+        END;
+    END $$;
+    """
+
+
+def _has_timescale(cursor) -> bool:
+    cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'timescaledb';")
+    return cursor.fetchone() is not None
+
+
+def forwards(apps, schema_editor):
+    """
+    Name-keyed rollups now roll up from the method-level ones:
+      apirequest_hourly = apirequest_hourly_dim JOIN dim, grouped by (bucket, service, endpoint)
+      apirequest_daily  = apirequest_daily_dim JOIN dim (+ p95 from apirequest_latency_daily)
+
+    The *_dim CAGGs are keyed on (bucket, dim_id) where a dim is
+    (service, endpoint, method), so they are the single materialization of the
+    raw hypertable; the two CAGGs that aggregated raw rows a second time (and
+    their refresh jobs) are replaced by plain views with the same columns for
+    the /hourly/ and /daily/ endpoints. Filters on bucket/service/endpoint are
+    pushed below the GROUP BY, so those queries still hit the CAGG indexes.
+
+    Two visible changes for /daily/ and /hourly/:
+      - p95_latency_ms is the latency-sketch estimate (1% relative error)
+        instead of percentile_cont over the raw rows;
+      - history comes from the *_dim rollups, which 0011 left empty outside
+        their policy windows: 0016_backfill_rollups refreshes it.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        if not _has_timescale(cursor):
+            # TimescaleDB not available, the continuous aggregates were never created
+            return
+
+        for view, *_ in NAMED_CAGGS:
+            cursor.execute(f"""
+                DO $$
+                BEGIN
+                    PERFORM remove_continuous_aggregate_policy('{view}'::regclass, if_exists => TRUE);
+                EXCEPTION
+                    WHEN others THEN NULL;
+                END $$;
+                """)
+            cursor.execute(f"DROP MATERIALIZED VIEW IF EXISTS {view};")
+
+        cursor.execute(HOURLY_VIEW_SQL)
+        cursor.execute(DAILY_VIEW_SQL)
+
+
+def backwards(apps, schema_editor):
+    """Restore the raw-fed CAGGs of 0003/0004 (WITH NO DATA; the policies refill them)."""
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        if not _has_timescale(cursor):
+            return
+
+        for view, width, start_offset, end_offset, schedule in NAMED_CAGGS:
+            cursor.execute(f"DROP VIEW IF EXISTS {view};")
+            p95 = (
+                "(percentile_cont(0.95) WITHIN GROUP (ORDER BY latency_ms))"
+                "::double precision AS p95_latency_ms,"
+                if view == "apirequest_daily"
+                else ""
+            )
+            cursor.execute(f"""
+                CREATE MATERIALIZED VIEW IF NOT EXISTS {view}
+                WITH (timescaledb.continuous) AS
+                SELECT
+                    time_bucket(INTERVAL '{width}', time) AS bucket,
+                    service,
+                    endpoint,
+                    COUNT(*)::bigint AS hits,
+                    COUNT(*) FILTER (WHERE status_code >= 500)::bigint AS errors,
+                    AVG(latency_ms)::double precision AS avg_latency_ms,
+                    {p95}
+                    MAX(latency_ms)::integer AS max_latency_ms
+                FROM {RAW_TABLE}
+                GROUP BY 1, 2, 3
+                WITH NO DATA;
+                """)
+            cursor.execute(
+                f"ALTER MATERIALIZED VIEW {view} SET (timescaledb.materialized_only = false);"
+            )
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {view}_bucket_desc_idx ON {view} (bucket DESC);"
+            )
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {view}_svc_ep_bucket_desc_idx "
+                f"ON {view} (service, endpoint, bucket DESC);"
+            )
+            cursor.execute(_policy_sql(view, start_offset, end_offset, schedule))
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("observability", "0011_dim_status_counts"),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
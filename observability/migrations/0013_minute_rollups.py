@@ -0,0 +1,289 @@
+# observability/migrations/0013_minute_rollups.py
+from __future__ import annotations
+
+import importlib
+
+from django.db import migrations
+
+RAW_TABLE = "observability_apirequest"
+
+# Frozen copies of observability.analytics.sql.STATUS_CLASSES / STATUS_CODES,
+# MINUTE_RETENTION and latency_bin_sql() (see 0010 / 0011).
+STATUS_CLASSES = (1, 2, 3, 4, 5)
+STATUS_CODES = (400, 401, 403, 404, 408, 409, 422, 429, 500, 502, 503, 504)
+MINUTE_RETENTION = "3 days"
+LATENCY_BIN_SQL = (
+    "(CASE WHEN latency_ms <= 0 THEN -32768 "
+    "ELSE CEIL(LN(latency_ms::double precision) / LN(1.02020202020202::double precision)) "
+    "END)::smallint"
+)
+
+STATUS_COLUMNS = [f"s{k}xx" for k in STATUS_CLASSES] + [f"c{code}" for code in STATUS_CODES]
+
+# Hierarchy: (view, bucket width, source view or None for raw, policy offsets/schedule).
+# The hourly refresh window (2 days) must stay inside the minute retention, or
+# refreshing hourly would re-aggregate minute buckets that were already dropped.
+DIM_LEVELS = [
+    ("apirequest_minute_dim", "1 minute", None, "1 day", "1 minute", "1 minute"),
+    ("apirequest_hourly_dim", "1 hour", "apirequest_minute_dim", "2 days", "1 hour", "15 minutes"),
+    ("apirequest_daily_dim", "1 day", "apirequest_hourly_dim", "30 days", "1 day", "1 hour"),
+]
+LATENCY_LEVELS = [
+    ("apirequest_latency_minute", "1 minute", None, "1 day", "1 minute", "1 minute"),
+    (
+        "apirequest_latency_hourly",
+        "1 hour",
+        "apirequest_latency_minute",
+        "2 days",
+        "1 hour",
+        "15 minutes",
+    ),
+    (
+        "apirequest_latency_daily",
+        "1 day",
+        "apirequest_latency_hourly",
+        "30 days",
+        "1 day",
+        "1 hour",
+    ),
+]
+
+# Raw-fed hourly/daily policies (0009 / 0010 / 0011), used by backwards() and
+# when TimescaleDB is too old for continuous aggregates on continuous aggregates.
+FLAT_POLICIES = {
+    "1 hour": ("7 days", "1 hour", "15 minutes"),
+    "1 day": ("30 days", "1 day", "1 hour"),
+}
+
+# Plain views over the dim rollups (0012) depend on the views rebuilt here.
+NAMED_VIEWS = ("apirequest_hourly", "apirequest_daily")
+
+
+def _policy_sql(view: str, start_offset: str, end_offset: str, schedule: str) -> str:
+    return f"""
+    DO $$
+    BEGIN
+        BEGIN
+            PERFORM add_continuous_aggregate_policy(
+                '{view}'::regclass,
+                start_offset => INTERVAL '{start_offset}',
+                end_offset => INTERVAL '{end_offset}',
+                schedule_interval => INTERVAL '{schedule}',
+                if_not_exists => TRUE
+            );
+        EXCEPTION
+            WHEN undefined_function THEN
+                PERFORM add_continuous_aggregate_policy(
+                    '{view}'::regclass,
+                    start_offset => INTERVAL '{start_offset}',
+                    end_offset => INTERVAL '{end_offset}',
+                    schedule_interval => INTERVAL '{schedule}'
+                );
+            WHEN others THEN
+                -- If anything unexpected happens, don't block migration
+                NULL;
+        END;
+    END $$;
+    """
+
+
+def _retention_sql(view: str, drop_after: str) -> str:
+    return f"""
+    DO $$
+    BEGIN
+        PERFORM add_retention_policy('{view}'::regclass, drop_after => INTERVAL '{drop_after}',
+                                     if_not_exists => TRUE);
+    EXCEPTION
+        WHEN others THEN NULL;
+    END $$;
+    """
+
+
+def _drop_cagg_sql(view: str) -> list[str]:
+    return [
+        f"""
+        DO $$
+        BEGIN
+            PERFORM remove_continuous_aggregate_policy('{view}'::regclass, if_exists => TRUE);
+        EXCEPTION
+            WHEN others THEN NULL;
+        END $$;
+        """,
+        f"DROP MATERIALIZED VIEW IF EXISTS {view};",
+    ]
+
+
+def _dim_select(width: str, source: str | None, *, with_sum: bool = True) -> str:
+    if source is None:
+        counters = [
+            f"COUNT(*) FILTER (WHERE status_code BETWEEN {k}00 AND {k}99)::bigint AS s{k}xx"
+            for k in STATUS_CLASSES
+        ] + [f"COUNT(*) FILTER (WHERE status_code = {c})::bigint AS c{c}" for c in STATUS_CODES]
+        if with_sum:
+            counters.append("SUM(latency_ms)::bigint AS sum_latency_ms")
+        return f"""
+        SELECT
+            time_bucket(INTERVAL '{width}', time) AS bucket,
+            dim_id,
+            COUNT(*)::bigint AS hits,
+            COUNT(*) FILTER (WHERE status_code >= 500)::bigint AS errors,
+            {", ".join(counters)},
+            AVG(latency_ms)::double precision AS avg_latency_ms,
+            MAX(latency_ms)::integer AS max_latency_ms
+        FROM {RAW_TABLE}
+        GROUP BY 1, 2
+        """
+
+    # Rolled up from the finer level: counters add up, the average is rebuilt
+    # from the summed latency (an average of averages would be skewed).
+    counters = [f"SUM({col})::bigint AS {col}" for col in STATUS_COLUMNS]
+    return f"""
+    SELECT
+        time_bucket(INTERVAL '{width}', bucket) AS bucket,
+        dim_id,
+        SUM(hits)::bigint AS hits,
+        SUM(errors)::bigint AS errors,
+        {", ".join(counters)},
+        SUM(sum_latency_ms)::bigint AS sum_latency_ms,
+        (SUM(sum_latency_ms)::double precision / NULLIF(SUM(hits), 0))::double precision
+            AS avg_latency_ms,
+        MAX(max_latency_ms)::integer AS max_latency_ms
+    FROM {source}
+    GROUP BY 1, 2
+    """
+
+
+def _latency_select(width: str, source: str | None) -> str:
+    if source is None:
+        return f"""
+        SELECT
+            time_bucket(INTERVAL '{width}', time) AS bucket,
+            dim_id,
+            {LATENCY_BIN_SQL} AS bin,
+            COUNT(*)::bigint AS n
+        FROM {RAW_TABLE}
+        GROUP BY 1, 2, 3
+        """
+    return f"""
+    SELECT
+        time_bucket(INTERVAL '{width}', bucket) AS bucket,
+        dim_id,
+        bin,
+        SUM(n)::bigint AS n
+    FROM {source}
+    GROUP BY 1, 2, 3
+    """
+
+
+def _create_cagg(cursor, view: str, select_sql: str, policy: tuple[str, str, str]) -> None:
+    cursor.execute(f"""
+        CREATE MATERIALIZED VIEW IF NOT EXISTS {view}
+        WITH (timescaledb.continuous) AS
+        {select_sql}
+        WITH NO DATA;
+        """)
+    cursor.execute(f"ALTER MATERIALIZED VIEW {view} SET (timescaledb.materialized_only = false);")
+    cursor.execute(f"CREATE INDEX IF NOT EXISTS {view}_bucket_desc_idx ON {view} (bucket DESC);")
+    cursor.execute(
+        f"CREATE INDEX IF NOT EXISTS {view}_dim_bucket_desc_idx ON {view} (dim_id, bucket DESC);"
+    )
+    cursor.execute(_policy_sql(view, *policy))
+
+
+def _timescale_version(cursor) -> tuple[int, ...] | None:
+    cursor.execute("SELECT extversion FROM pg_extension WHERE extname = 'timescaledb';")
+    row = cursor.fetchone()
+    if not row:
+        return None
+    return tuple(int(p) for p in row[0].split("-")[0].split(".")[:2] if p.isdigit())
+
+
+def _drop_all(cursor) -> None:
+    for view in NAMED_VIEWS:
+        cursor.execute(f"DROP VIEW IF EXISTS {view};")
+    # Coarsest first: a view must go before the continuous aggregate it reads from.
+    for view, *_ in reversed(DIM_LEVELS + LATENCY_LEVELS):
+        for sql in _drop_cagg_sql(view):
+            cursor.execute(sql)
+
+
+def _create_named_views(cursor) -> None:
+    named = importlib.import_module("observability.migrations.0012_rollups_from_dim")
+    cursor.execute(named.HOURLY_VIEW_SQL)
+    cursor.execute(named.DAILY_VIEW_SQL)
+
+
+def forwards(apps, schema_editor):
+    """
+    Hierarchical rollups (dim-keyed stats and latency sketches):
+      apirequest_minute_dim  / apirequest_latency_minute  <- raw hypertable
+      apirequest_hourly_dim  / apirequest_latency_hourly  <- minute
+      apirequest_daily_dim   / apirequest_latency_daily   <- hourly
+
+    Only the minute level reads raw rows (refresh window 1 day); hourly
+    re-aggregates at most 60 rows per dim and hour, daily 24. The minute
+    level is kept for MINUTE_RETENTION for live dashboards and is dropped
+    after that; the hourly refresh window stays inside it. sum_latency_ms
+    is added so averages roll up exactly.
+
+    Continuous aggregates on continuous aggregates need TimescaleDB >= 2.9;
+    on older versions hourly/daily stay raw-fed (with their 0011 policies)
+    and only the minute level is added.
+
+    All views are recreated WITH NO DATA; the refresh policies repopulate
+    their windows, and 0016_backfill_rollups refreshes older history (minute
+    first: hourly and daily only see what the level below them holds).
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        version = _timescale_version(cursor)
+        if version is None:
+            # TimescaleDB not available, skip continuous aggregate creation
+            return
+        hierarchical = version >= (2, 9)
+
+        _drop_all(cursor)
+
+        for levels, select in ((DIM_LEVELS, _dim_select), (LATENCY_LEVELS, _latency_select)):
+            for view, width, source, start_offset, end_offset, schedule in levels:
+                policy = (start_offset, end_offset, schedule)
+                if source is not None and not hierarchical:
+                    source, policy = None, FLAT_POLICIES[width]
+                _create_cagg(cursor, view, select(width, source), policy)
+            cursor.execute(_retention_sql(levels[0][0], MINUTE_RETENTION))
+
+        _create_named_views(cursor)
+
+
+def backwards(apps, schema_editor):
+    """Raw-fed hourly/daily rollups as left by 0012 (no minute level, no sum_latency_ms)."""
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        if _timescale_version(cursor) is None:
+            return
+
+        _drop_all(cursor)
+
+        for view, width, source, *_ in DIM_LEVELS:
+            if source is not None:
+                select_sql = _dim_select(width, None, with_sum=False)
+                _create_cagg(cursor, view, select_sql, FLAT_POLICIES[width])
+        for view, width, source, *_ in LATENCY_LEVELS:
+            if source is not None:
+                _create_cagg(cursor, view, _latency_select(width, None), FLAT_POLICIES[width])
+
+        _create_named_views(cursor)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("observability", "0012_rollups_from_dim"),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
@@ -0,0 +1,47 @@
+# observability/migrations/0014_dim_update_trigger.py
+from __future__ import annotations
+
+from django.db import migrations
+
+RAW_TABLE = "observability_apirequest"
+
+# apirequest_fill_dim_id() (0009) resolves NEW.dim_id from NEW's strings, so it serves
+# updates as well: a PUT/PATCH renaming service/endpoint/method moves the row to the
+# matching dimension instead of leaving it under the old one in the rollups.
+UPDATE_DIM_TRIGGER = f"""
+DROP TRIGGER IF EXISTS apirequest_refresh_dim_id ON {RAW_TABLE};
+CREATE TRIGGER apirequest_refresh_dim_id
+    BEFORE UPDATE OF service, endpoint, method ON {RAW_TABLE}
+    FOR EACH ROW WHEN (
+        NEW.service IS DISTINCT FROM OLD.service
+        OR NEW.endpoint IS DISTINCT FROM OLD.endpoint
+        OR NEW.method IS DISTINCT FROM OLD.method
+    )
+    EXECUTE FUNCTION apirequest_fill_dim_id();
+"""
+
+
+def forwards(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(UPDATE_DIM_TRIGGER)
+
+
+def backwards(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"DROP TRIGGER IF EXISTS apirequest_refresh_dim_id ON {RAW_TABLE};")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("observability", "0013_minute_rollups"),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
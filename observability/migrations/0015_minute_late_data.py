@@ -0,0 +1,97 @@
+# observability/migrations/0015_minute_late_data.py
+from __future__ import annotations
+
+from django.db import migrations
+
+# Only the minute level reads raw rows (0013), so its refresh window is the late-data
+# tolerance of every rollup above it. Restore the 7 days the raw-fed hourly policy
+# (0009 / 0011) had: minute and hourly refresh the last 7 days, and minute buckets are
+# kept one day longer, so hourly never re-aggregates a window whose minutes were dropped.
+LATE_DATA_WINDOW = "7 days"
+MINUTE_RETENTION = "8 days"
+
+# (view, start_offset, end_offset, schedule_interval)
+POLICIES = [
+    ("apirequest_minute_dim", LATE_DATA_WINDOW, "1 minute", "1 minute"),
+    ("apirequest_latency_minute", LATE_DATA_WINDOW, "1 minute", "1 minute"),
+    ("apirequest_hourly_dim", LATE_DATA_WINDOW, "1 hour", "15 minutes"),
+    ("apirequest_latency_hourly", LATE_DATA_WINDOW, "1 hour", "15 minutes"),
+]
+MINUTE_VIEWS = ("apirequest_minute_dim", "apirequest_latency_minute")
+
+# As left by 0013 (backwards).
+OLD_POLICIES = [
+    ("apirequest_minute_dim", "1 day", "1 minute", "1 minute"),
+    ("apirequest_latency_minute", "1 day", "1 minute", "1 minute"),
+    ("apirequest_hourly_dim", "2 days", "1 hour", "15 minutes"),
+    ("apirequest_latency_hourly", "2 days", "1 hour", "15 minutes"),
+]
+OLD_MINUTE_RETENTION = "3 days"
+
+
+def _replace_policy_sql(view: str, start_offset: str, end_offset: str, schedule: str) -> str:
+    return f"""
+    DO $$
+    BEGIN
+        PERFORM remove_continuous_aggregate_policy('{view}'::regclass, if_exists => TRUE);
+        PERFORM add_continuous_aggregate_policy(
+            '{view}'::regclass,
+            start_offset => INTERVAL '{start_offset}',
+            end_offset => INTERVAL '{end_offset}',
+            schedule_interval => INTERVAL '{schedule}'
+        );
+    EXCEPTION
+        WHEN others THEN
+            -- View missing (TimescaleDB skipped in 0013): nothing to change
+            NULL;
+    END $$;
+    """
+
+
+def _replace_retention_sql(view: str, drop_after: str) -> str:
+    return f"""
+    DO $$
+    BEGIN
+        PERFORM remove_retention_policy('{view}'::regclass, if_exists => TRUE);
+        PERFORM add_retention_policy('{view}'::regclass, drop_after => INTERVAL '{drop_after}');
+    EXCEPTION
+        WHEN others THEN NULL;
+    END $$;
+    """
+
+
+def _apply(schema_editor, policies, retention: str) -> None:
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'timescaledb';")
+        if not cursor.fetchone():
+            return
+        for view, start_offset, end_offset, schedule in policies:
+            cursor.execute(_replace_policy_sql(view, start_offset, end_offset, schedule))
+        for view in MINUTE_VIEWS:
+            cursor.execute(_replace_retention_sql(view, retention))
+
+
+def forwards(apps, schema_editor):
+    """
+    Widen the minute (and hourly) refresh window from 1 (2) days to 7 days and keep
+    minute buckets 8 days instead of 3: raw rows arriving up to 7 days late reach
+    the minute, hourly and daily rollups again, as with the raw-fed hourly rollup.
+    """
+    _apply(schema_editor, POLICIES, MINUTE_RETENTION)
+
+
+def backwards(apps, schema_editor):
+    _apply(schema_editor, OLD_POLICIES, OLD_MINUTE_RETENTION)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("observability", "0014_dim_update_trigger"),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
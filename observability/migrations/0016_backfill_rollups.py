@@ -0,0 +1,110 @@
+# observability/migrations/0016_backfill_rollups.py
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+
+from django.db import migrations
+
+RAW_TABLE = "observability_apirequest"
+
+# Refresh order: every level before the one that rolls it up (0013).
+ROLLUPS = (
+    "apirequest_minute_dim",
+    "apirequest_latency_minute",
+    "apirequest_hourly_dim",
+    "apirequest_latency_hourly",
+    "apirequest_daily_dim",
+    "apirequest_latency_daily",
+)
+MINUTE_VIEWS = ("apirequest_minute_dim", "apirequest_latency_minute")
+MINUTE_RETENTION = "8 days"  # frozen copy of 0015
+
+# Whole days, so each window refreshes complete daily buckets.
+BACKFILL_WINDOW = timedelta(days=7)
+
+
+def _windows(first: datetime, stop: datetime) -> list[tuple[datetime, datetime]]:
+    """[lo, hi) ranges from the UTC day of `first` up to `stop`, oldest first."""
+    lo = first.astimezone(UTC).replace(hour=0, minute=0, second=0, microsecond=0)
+    out = []
+    while lo < stop:
+        hi = min(lo + BACKFILL_WINDOW, stop)
+        out.append((lo, hi))
+        lo = hi
+    return out
+
+
+def _drop_minute_chunks_sql(view: str) -> str:
+    return f"""
+    DO $$
+    BEGIN
+        PERFORM drop_chunks('{view}'::regclass, older_than => INTERVAL '{MINUTE_RETENTION}');
+    EXCEPTION
+        WHEN others THEN NULL;
+    END $$;
+    """
+
+
+def _existing(cursor, views) -> list[str]:
+    out = []
+    for view in views:
+        cursor.execute("SELECT to_regclass(%s);", [view])
+        if cursor.fetchone()[0] is not None:
+            out.append(view)
+    return out
+
+
+def backfill(cursor, now: datetime) -> None:
+    cursor.execute(f"SELECT MIN(time) FROM {RAW_TABLE};")
+    first = cursor.fetchone()[0]
+    if first is None:
+        return
+    views = _existing(cursor, ROLLUPS)
+    # Up to today's midnight: the refresh policies and real-time aggregation take over.
+    stop = now.astimezone(UTC).replace(hour=0, minute=0, second=0, microsecond=0)
+    for lo, hi in _windows(first, stop):
+        for view in views:
+            cursor.execute(
+                f"CALL refresh_continuous_aggregate('{view}'::regclass, %s, %s);", [lo, hi]
+            )
+        # Minute buckets older than the retention only fed the levels above them.
+        for view in MINUTE_VIEWS:
+            if view in views:
+                cursor.execute(_drop_minute_chunks_sql(view))
+
+
+def forwards(apps, schema_editor):
+    """
+    Materialize the rollups over the whole raw history.
+
+    0011, 0012 and 0013 recreate the dim-keyed rollups WITH NO DATA (and with
+    them the apirequest_hourly/daily views over them); the refresh policies
+    only fill their own windows (7 / 30 days), so older ranges read as empty
+    from /kpis/, /top-endpoints/, /hourly/ and /daily/.
+
+    Windows are refreshed oldest first, finest level first, so each level rolls
+    up a materialized one. The migration is not atomic (refresh_continuous_aggregate
+    cannot run in a transaction): each window commits, and an interrupted run
+    resumes cheaply, since already materialized ranges have nothing to refresh.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'timescaledb';")
+        if not cursor.fetchone():
+            # TimescaleDB not available, no continuous aggregates to fill
+            return
+        backfill(cursor, datetime.now(UTC))
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("observability", "0015_minute_late_data"),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, migrations.RunPython.noop),
+    ]
@@ -4,6 +4,28 @@ from django.db.models import Q
 from pgvector.django import VectorField
 
 
+class EndpointDim(models.Model):
+    """
+    Dictionary of (service, endpoint, method): raw rows and the *_dim rollups key on
+    its compact integer id instead of repeating the strings.
+    """
+
+    id = models.AutoField(primary_key=True)
+    service = models.CharField(max_length=100)
+    endpoint = models.CharField(max_length=255)
+    method = models.CharField(max_length=10)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["service", "endpoint", "method"], name="endpoint_dim_svc_ep_method_uniq"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"#{self.id} {self.service} {self.method} {self.endpoint}"
+
+
 class ApiRequest(models.Model):
     class HttpMethod(models.TextChoices):
         GET = "GET", "GET"
@@ -27,9 +49,22 @@ class ApiRequest(models.Model):
 
     tags = models.JSONField(default=dict, blank=True)
 
+    # Filled by the bulk writer (LRU-cached lookup) or, on PostgreSQL, by triggers (inserts
+    # without one; updates changing service/endpoint/method re-resolve it).
+    # No FK constraint: dimension rows are never deleted, and hypertable inserts stay cheap.
+    dim = models.ForeignKey(
+        EndpointDim,
+        null=True,
+        blank=True,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="+",
+    )
+
     class Meta:
         ordering = ["-time"]
         indexes = [
+            models.Index(fields=["dim", "-time"], name="api_req_dim_time_idx"),
             models.Index(fields=["service", "endpoint", "-time"], name="api_req_svc_ep_time_idx"),
             models.Index(
                 fields=["service", "endpoint", "method", "-time"],
@@ -0,0 +1,237 @@
+# observability/pagination.py
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from functools import reduce
+from operator import or_
+from typing import Any
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Model, Q, QuerySet
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .counting import EstimatedCountPaginator
+
+# ?ordering= value -> keyset (unique, index-backed). Single-column orderings only:
+# time itself, or a column with a (column, -time) index, scanned either way.
+KEYSET_ORDERINGS: dict[str, tuple[str, ...]] = {
+    "-time": ("-time", "-id"),
+    "time": ("time", "id"),
+}
+for _column in ("service", "endpoint", "status_code"):
+    KEYSET_ORDERINGS[_column] = (_column, "-time", "-id")
+    KEYSET_ORDERINGS[f"-{_column}"] = (f"-{_column}", "time", "id")
+
+DEFAULT_KEYSET_ORDERING = "-time"
+
+
+def _flip(key: str) -> str:
+    return key[1:] if key.startswith("-") else f"-{key}"
+
+
+def keyset_after(keys: tuple[str, ...], values: list[Any]) -> Q:
+    """
+    Rows strictly after `values` in `keys` order (mixed directions allowed):
+    k1 > v1 OR (k1 = v1 AND k2 > v2) OR ..., with "<" for descending keys,
+    plus a plain bound on k1 so the index scan starts at the cursor.
+    """
+    clauses: list[Q] = []
+    for i, key in enumerate(keys):
+        name, desc = key.lstrip("-"), key.startswith("-")
+        clause = Q(**{f"{name}__{'lt' if desc else 'gt'}": values[i]})
+        for prev_key, prev_value in zip(keys[:i], values[:i], strict=True):
+            clause &= Q(**{prev_key.lstrip("-"): prev_value})
+        clauses.append(clause)
+
+    first, first_desc = keys[0].lstrip("-"), keys[0].startswith("-")
+    bound = Q(**{f"{first}__{'lte' if first_desc else 'gte'}": values[0]})
+    return bound & reduce(or_, clauses)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination keyed on (time, id): WHERE (time, id) < cursor ORDER BY
+    time DESC, id DESC LIMIT n, so every page costs the same index range scan
+    and there is no COUNT(*). Cursors are opaque (base64 JSON of the ordering,
+    the boundary row's key values and the direction). Orderings without a
+    matching index (see KEYSET_ORDERINGS) are rejected with 400.
+    """
+
+    cursor_query_param = "cursor"
+    ordering_query_param = api_settings.ORDERING_PARAM
+    invalid_cursor_message = "Invalid cursor"
+
+    def get_page_size(self, request) -> int:
+        return int(api_settings.PAGE_SIZE or 50)
+
+    def get_ordering(self, request) -> str:
+        raw = (request.query_params.get(self.ordering_query_param) or "").strip()
+        ordering = raw or DEFAULT_KEYSET_ORDERING
+        if ordering not in KEYSET_ORDERINGS:
+            raise ValidationError(
+                {
+                    self.ordering_query_param: (
+                        "Cursor pagination supports a single ordering of: "
+                        + ", ".join(sorted(KEYSET_ORDERINGS))
+                        + "."
+                    )
+                }
+            )
+        return ordering
+
+    # ----------------------------
+    # Cursor encoding
+    # ----------------------------
+    def encode_cursor(self, ordering: str, values: list[Any], *, reverse: bool) -> str:
+        payload = {"o": ordering, "v": values, "r": int(reverse)}
+        raw = json.dumps(payload, separators=(",", ":"), default=str).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+    def decode_cursor(self, request, ordering: str, model: type[Model]):
+        raw = request.query_params.get(self.cursor_query_param)
+        if not raw:
+            return None
+        try:
+            padded = raw + "=" * (-len(raw) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+            keys = KEYSET_ORDERINGS[payload["o"]]
+            if payload["o"] != ordering or len(payload["v"]) != len(keys):
+                raise ValueError("cursor for another ordering")
+            values = [
+                model._meta.get_field(key.lstrip("-")).to_python(value)
+                for key, value in zip(keys, payload["v"], strict=True)
+            ]
+            return values, bool(payload.get("r"))
+        except (
+            binascii.Error,
+            UnicodeError,
+            ValueError,
+            KeyError,
+            TypeError,
+            DjangoValidationError,
+        ) as exc:
+            raise NotFound(self.invalid_cursor_message) from exc
+
+    def _key_values(self, row: Model, keys: tuple[str, ...]) -> list[Any]:
+        out: list[Any] = []
+        for key in keys:
+            value = getattr(row, key.lstrip("-"))
+            out.append(value.isoformat() if hasattr(value, "isoformat") else value)
+        return out
+
+    # ----------------------------
+    # BasePagination
+    # ----------------------------
+    def paginate_queryset(self, queryset: QuerySet, request, view=None) -> list[Model]:
+        self.request = request
+        self.ordering = self.get_ordering(request)
+        keys = KEYSET_ORDERINGS[self.ordering]
+        page_size = self.get_page_size(request)
+
+        cursor = self.decode_cursor(request, self.ordering, queryset.model)
+        position, reverse = cursor if cursor is not None else (None, False)
+
+        scan = tuple(_flip(k) for k in keys) if reverse else keys
+        queryset = queryset.order_by(*scan)
+        if position is not None:
+            queryset = queryset.filter(keyset_after(scan, position))
+
+        rows = list(queryset[: page_size + 1])
+        more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+
+        self.next_values = self.previous_values = None
+        if rows:
+            has_next = True if reverse else more
+            has_previous = more if reverse else position is not None
+            if has_next:
+                self.next_values = self._key_values(rows[-1], keys)
+            if has_previous:
+                self.previous_values = self._key_values(rows[0], keys)
+        return rows
+
+    def _link(self, values: list[Any] | None, *, reverse: bool) -> str | None:
+        if values is None:
+            return None
+        url = remove_query_param(self.request.build_absolute_uri(), "page")
+        cursor = self.encode_cursor(self.ordering, values, reverse=reverse)
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_next_link(self) -> str | None:
+        return self._link(self.next_values, reverse=False)
+
+    def get_previous_link(self) -> str | None:
+        return self._link(self.previous_values, reverse=True)
+
+    def get_paginated_response(self, data) -> Response:
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+
+class EstimatedPageNumberPagination(PageNumberPagination):
+    """
+    PageNumberPagination whose `count` is estimated for large results (see
+    counting.count_rows); `count_estimated` says whether it is exact.
+    """
+
+    django_paginator_class = EstimatedCountPaginator
+
+    def get_paginated_response(self, data) -> Response:
+        response = super().get_paginated_response(data)
+        response.data["count_estimated"] = self.page.paginator.count_estimated
+        return response
+
+    def get_paginated_response_schema(self, schema):
+        out = super().get_paginated_response_schema(schema)
+        out["properties"]["count_estimated"] = {"type": "boolean", "example": False}
+        return out
+
+
+class ApiRequestPagination(BasePagination):
+    """
+    /api/requests/ list: page numbers (estimated count + OFFSET) or keyset
+    cursors. Cursor mode is used for ?pagination=cursor, for any ?cursor=, or
+    by default with APM_LIST_PAGINATION=cursor.
+    """
+
+    mode_query_param = "pagination"
+    modes = ("page", "cursor")
+
+    def __init__(self):
+        self.page = EstimatedPageNumberPagination()
+        self.keyset = KeysetPagination()
+        self.active: BasePagination = self.page
+
+    def get_mode(self, request) -> str:
+        if request.query_params.get(self.keyset.cursor_query_param):
+            return "cursor"
+        mode = (request.query_params.get(self.mode_query_param) or "").strip().lower()
+        if not mode:
+            mode = str(getattr(settings, "APM_LIST_PAGINATION", "page")).lower()
+        if mode not in self.modes:
+            raise ValidationError({self.mode_query_param: "Must be one of: page, cursor."})
+        return mode
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.active = self.keyset if self.get_mode(request) == "cursor" else self.page
+        return self.active.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data) -> Response:
+        return self.active.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return self.active.get_paginated_response_schema(schema)
@@ -8,6 +8,7 @@ from django.utils import timezone
 from django.utils.dateparse import parse_date, parse_datetime
 from rest_framework import serializers
 
+from .analytics.sql import TIMESERIES_STEPS
 from .models import ApiRequest
 
 
@@ -183,7 +184,7 @@ class KpiQueryParamsSerializer(serializers.Serializer):
     Supported:
       - start/end (ISO datetime or ISO date)
       - service, endpoint, method
-      - granularity: auto|hourly|daily
+      - granularity: auto|minute|hourly|daily
       - error_from: HTTP status threshold for "error" (default 500)
 
     Ensures:
@@ -201,7 +202,7 @@ class KpiQueryParamsSerializer(serializers.Serializer):
     granularity = serializers.ChoiceField(
         required=False,
         default="auto",
-        choices=("auto", "hourly", "daily"),
+        choices=("auto", "minute", "hourly", "daily"),
     )
 
     error_from = serializers.IntegerField(required=False, default=500, min_value=100, max_value=599)
@@ -228,7 +229,7 @@ class TopEndpointsQueryParamsSerializer(serializers.Serializer):
     Supported:
       - start/end (ISO datetime or ISO date)
       - service, endpoint, method
-      - granularity: auto|hourly|daily
+      - granularity: auto|minute|hourly|daily
       - error_from: HTTP status threshold for "error" (default 500)
       - limit: number of rows to return (default 20, max 200)
       - sort_by: hits|errors|error_rate|avg_latency_ms|p95_latency_ms|max_latency_ms
@@ -249,7 +250,7 @@ class TopEndpointsQueryParamsSerializer(serializers.Serializer):
     granularity = serializers.ChoiceField(
         required=False,
         default="auto",
-        choices=("auto", "hourly", "daily"),
+        choices=("auto", "minute", "hourly", "daily"),
     )
 
     error_from = serializers.IntegerField(required=False, default=500, min_value=100, max_value=599)
@@ -288,6 +289,78 @@ class TopEndpointsQueryParamsSerializer(serializers.Serializer):
         return attrs
 
 
+class StatusDistributionQueryParamsSerializer(serializers.Serializer):
+    """
+    Validates query params for GET /api/requests/status-distribution/
+
+    Supported:
+      - start/end (ISO datetime or ISO date)
+      - service, endpoint, method
+      - granularity: auto|minute|hourly|daily (bucket width of the series)
+    """
+
+    start = IsoDateTimeOrDateField(required=False, allow_null=True, end_of_day=False)
+    end = IsoDateTimeOrDateField(required=False, allow_null=True, end_of_day=True)
+
+    service = serializers.CharField(required=False, allow_blank=False, trim_whitespace=True)
+    endpoint = serializers.CharField(required=False, allow_blank=False, trim_whitespace=True)
+    method = serializers.CharField(required=False, allow_blank=False, trim_whitespace=True)
+
+    granularity = serializers.ChoiceField(
+        required=False,
+        default="auto",
+        choices=("auto", "minute", "hourly", "daily"),
+    )
+
+    def validate_method(self, value: str) -> str:
+        v = value.strip().upper()
+        if not v:
+            raise serializers.ValidationError("method cannot be empty.")
+        return v
+
+    def validate(self, attrs):
+        start = attrs.get("start")
+        end = attrs.get("end")
+        if start is not None and end is not None and start > end:
+            raise serializers.ValidationError({"detail": "`start` must be <= `end`."})
+        return attrs
+
+
+class TimeseriesQueryParamsSerializer(serializers.Serializer):
+    """
+    Validates query params for GET /api/requests/timeseries/
+
+    Supported:
+      - start/end (ISO datetime or ISO date)
+      - service, endpoint, method
+      - step: 1m|5m|15m|1h|1d (bucket width of the series, default 1h)
+      - error_from: HTTP status threshold for "error" (default 500)
+    """
+
+    start = IsoDateTimeOrDateField(required=False, allow_null=True, end_of_day=False)
+    end = IsoDateTimeOrDateField(required=False, allow_null=True, end_of_day=True)
+
+    service = serializers.CharField(required=False, allow_blank=False, trim_whitespace=True)
+    endpoint = serializers.CharField(required=False, allow_blank=False, trim_whitespace=True)
+    method = serializers.CharField(required=False, allow_blank=False, trim_whitespace=True)
+
+    step = serializers.ChoiceField(required=False, default="1h", choices=tuple(TIMESERIES_STEPS))
+    error_from = serializers.IntegerField(required=False, default=500, min_value=100, max_value=599)
+
+    def validate_method(self, value: str) -> str:
+        v = value.strip().upper()
+        if not v:
+            raise serializers.ValidationError("method cannot be empty.")
+        return v
+
+    def validate(self, attrs):
+        start = attrs.get("start")
+        end = attrs.get("end")
+        if start is not None and end is not None and start > end:
+            raise serializers.ValidationError({"detail": "`start` must be <= `end`."})
+        return attrs
+
+
 class SemanticSearchQueryParamsSerializer(serializers.Serializer):
     """
     Validates query params for GET /api/requests/semantic-search/
@@ -319,7 +392,9 @@ class DailyAggRowSerializer(serializers.Serializer):
 
     Note:
       - bucket is returned as ISO string via DRF DateTimeField.
-      - p95_latency_ms may be null if the CAGG was created without p95 support.
+      - p95_latency_ms is read from the daily latency sketch (migration 0012): an
+        estimate within 1% relative error, not percentile_cont over raw rows.
+        Null for a bucket without sketch rows.
     """
 
     bucket = serializers.DateTimeField()
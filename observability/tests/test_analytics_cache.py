@@ -0,0 +1,182 @@
+# observability/tests/test_analytics_cache.py
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connection
+from django.test import SimpleTestCase, override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from observability.analytics import cache as result_cache
+from observability.analytics.cache import (
+    BYPASS,
+    CACHE_STATUS_HEADER,
+    HIT,
+    MISS,
+    ResultCache,
+    bypass_requested,
+    cache_parts,
+    plan_ttl_source,
+    rollup_views,
+)
+from observability.analytics.planner import plan_range
+from observability.analytics.sql import HOURLY_DIM_CAGG, HOURLY_LATENCY_CAGG, AnalyticsFilters
+from observability.checks import check_analytics_cache
+from observability.models import ApiRequest
+
+NOW = datetime(2025, 12, 5, 12, 30, tzinfo=UTC)
+
+
+def _cache(**kwargs) -> ResultCache:
+    return ResultCache(LocMemCache("analytics-test", {}), **kwargs)
+
+
+class CacheKeyTests(SimpleTestCase):
+    def test_rollup_ranges_snap_to_bucket_boundaries(self):
+        cache = _cache()
+        a = AnalyticsFilters(
+            start=datetime(2025, 12, 1, 10, 5, tzinfo=UTC),
+            end=datetime(2025, 12, 2, 8, 59, tzinfo=UTC),
+            service="svc",
+        )
+        b = AnalyticsFilters(
+            start=datetime(2025, 12, 1, 10, 55, tzinfo=UTC),
+            end=datetime(2025, 12, 2, 8, 1, tzinfo=UTC),
+            service="svc",
+            endpoint="",
+        )
+        key = cache.key("kpis", cache_parts(a, source="hourly"), sources=["hourly"])
+        self.assertEqual(
+            key, cache.key("kpis", cache_parts(b, source="hourly"), sources=["hourly"])
+        )
+        # Raw ranges are exact, other options and sources are part of the key.
+        self.assertNotEqual(
+            cache.key("kpis", cache_parts(a, source="raw"), sources=["raw"]),
+            cache.key("kpis", cache_parts(b, source="raw"), sources=["raw"]),
+        )
+        self.assertNotEqual(
+            key,
+            cache.key("kpis", cache_parts(a, source="hourly", exact=True), sources=["hourly"]),
+        )
+
+    def test_plan_spans_are_the_range(self):
+        plan = plan_range(NOW - timedelta(days=3), NOW)
+        parts = cache_parts(AnalyticsFilters(start=plan.spans[0].start), source="hourly", plan=plan)
+        self.assertEqual(parts["spans"][0][0], plan.spans[0].source)
+        self.assertNotIn("range", parts)
+
+    def test_refresh_generation_invalidates(self):
+        cache = _cache()
+        parts = cache_parts(AnalyticsFilters(service="svc"), source="hourly")
+        key = cache.key("kpis", parts, sources=["hourly"])
+        self.assertEqual(rollup_views(["raw", "hourly"]), [HOURLY_DIM_CAGG, HOURLY_LATENCY_CAGG])
+
+        cache.bump(["apirequest_daily_dim"])
+        self.assertEqual(key, cache.key("kpis", parts, sources=["hourly"]))
+        cache.bump([HOURLY_DIM_CAGG])
+        self.assertNotEqual(key, cache.key("kpis", parts, sources=["hourly"]))
+
+
+class CacheEntryTests(SimpleTestCase):
+    def test_closed_ranges_cached_long(self):
+        cache = _cache(open_ttl=5, closed_ttl=3600)
+        self.assertEqual(
+            cache.ttl(datetime(2025, 12, 5, 11, 59, tzinfo=UTC), "hourly", now=NOW), 3600
+        )
+        self.assertEqual(cache.ttl(datetime(2025, 12, 5, 12, 10, tzinfo=UTC), "hourly", now=NOW), 5)
+        self.assertEqual(cache.ttl(datetime(2025, 12, 5, 11, 0, tzinfo=UTC), "raw", now=NOW), 5)
+        self.assertEqual(cache.ttl(datetime(2025, 12, 5, 12, 10, tzinfo=UTC), "daily", now=NOW), 5)
+
+    def test_plans_with_raw_spans_use_raw_ttl(self):
+        plan = plan_range(NOW - timedelta(days=3, seconds=30), NOW - timedelta(hours=2))
+        self.assertIn("raw", {span.source for span in plan.spans})
+        self.assertEqual(plan_ttl_source(plan, "hourly"), "raw")
+
+        end = datetime(2025, 12, 3, tzinfo=UTC) - timedelta(microseconds=1)  # inclusive
+        aligned = plan_range(datetime(2025, 12, 1, tzinfo=UTC), end)
+        self.assertNotIn("raw", {span.source for span in aligned.spans})
+        self.assertEqual(plan_ttl_source(aligned, "hourly"), aligned.spans[-1].source)
+        self.assertEqual(plan_ttl_source(None, "daily"), "daily")
+
+    def test_process_local_alias_is_flagged(self):
+        self.assertEqual(check_analytics_cache(), [])
+        with override_settings(APM_ANALYTICS_CACHE=True):
+            self.assertEqual([w.id for w in check_analytics_cache()], ["observability.W002"])
+
+    def test_lookup_store_hit_and_bypass(self):
+        cache = _cache()
+        parts = cache_parts(AnalyticsFilters(), source="daily")
+
+        lookup = cache.lookup("daily", parts, sources=["daily"])
+        self.assertEqual(lookup.status, MISS)
+        lookup.store([{"hits": 1}], end=NOW, source="daily")
+
+        lookup = cache.lookup("daily", parts, sources=["daily"])
+        self.assertEqual((lookup.status, lookup.data), (HIT, [{"hits": 1}]))
+
+        lookup = cache.lookup("daily", parts, sources=["daily"], bypass=True)
+        self.assertEqual(lookup.status, BYPASS)
+        lookup.store([], end=NOW, source="daily")  # not written
+        self.assertEqual(cache.lookup("daily", parts, sources=["daily"]).data, [{"hits": 1}])
+
+    def test_bypass_header_and_live_now(self):
+        self.assertTrue(bypass_requested({"Cache-Control": "no-cache"}))
+        self.assertTrue(bypass_requested({"Cache-Control": "max-age=0, no-store"}))
+        self.assertFalse(bypass_requested({}))
+
+        cache = _cache(open_ttl=5)
+        now = datetime(2025, 12, 5, 12, 30, 7, 250000, tzinfo=UTC)
+        self.assertEqual(cache.live_now(now), datetime(2025, 12, 5, 12, 30, 5, tzinfo=UTC))
+
+
+class CachedKpisEndpointTests(APITestCase):
+    URL = "/api/requests/kpis/"
+
+    def setUp(self):
+        super().setUp()
+        if connection.vendor != "postgresql":
+            self.skipTest("Cached KPI tests require PostgreSQL + TimescaleDB.")
+        result_cache._result_cache = None
+        self.addCleanup(setattr, result_cache, "_result_cache", None)
+
+    @override_settings(APM_ANALYTICS_CACHE=True)
+    def test_second_poll_is_served_from_cache(self):
+        start = timezone.now() - timedelta(days=5)
+        params = {
+            "service": "svc-cache",
+            "start": start.isoformat(),
+            "end": (start + timedelta(days=1)).isoformat(),
+        }
+        ApiRequest.objects.create(
+            time=start + timedelta(hours=1),
+            service="svc-cache",
+            endpoint="/c",
+            method="GET",
+            status_code=200,
+            latency_ms=10,
+            tags={},
+        )
+
+        first = self.client.get(self.URL, params)
+        self.assertEqual(first.status_code, status.HTTP_200_OK, first.data)
+        self.assertEqual(first[CACHE_STATUS_HEADER], MISS)
+
+        ApiRequest.objects.create(
+            time=start + timedelta(hours=2),
+            service="svc-cache",
+            endpoint="/c",
+            method="GET",
+            status_code=200,
+            latency_ms=10,
+            tags={},
+        )
+        second = self.client.get(self.URL, params)
+        self.assertEqual(second[CACHE_STATUS_HEADER], HIT)
+        self.assertEqual(second.data, first.data)
+
+        fresh = self.client.get(self.URL, params, HTTP_CACHE_CONTROL="no-cache")
+        self.assertEqual(fresh[CACHE_STATUS_HEADER], BYPASS)
+        self.assertEqual(fresh.data["hits"], 2)
@@ -0,0 +1,98 @@
+# observability/tests/test_cost_model.py
+from __future__ import annotations
+
+from datetime import UTC, datetime
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from observability.analytics import cost
+from observability.analytics.cost import CostModel, TableStatistics, choose_plan
+from observability.analytics.planner import plan_range
+from observability.analytics.sql import AnalyticsFilters
+
+# Mon 13:27:30 -> Fri 09:10, long past the minute retention
+MON = datetime(2025, 12, 1, 13, 27, 30, tzinfo=UTC)
+FRI = datetime(2025, 12, 5, 9, 10, tzinfo=UTC)
+NOW = datetime(2025, 12, 20, tzinfo=UTC)
+
+
+def _stats(raw: float, hourly: float = 0.0, daily: float = 0.0, dims: int = 50):
+    return TableStatistics(rows_per_hour={"raw": raw, "hourly": hourly, "daily": daily}, dims=dims)
+
+
+class CostModelTests(SimpleTestCase):
+    def test_busy_table_keeps_the_rollups(self):
+        plan = plan_range(MON, FRI, now=NOW)
+        optimized = CostModel().optimize(
+            plan, _stats(raw=100_000, hourly=50, daily=2), 1.0, now=NOW
+        )
+        self.assertEqual([s.source for s in optimized.spans], [s.source for s in plan.spans])
+        self.assertIsNotNone(optimized.estimated_rows)
+        self.assertEqual(optimized.describe()[2]["estimated_rows"], 144)  # 72 h x 2 rows/h
+
+    def test_sparse_or_narrow_queries_read_raw_rows(self):
+        plan = plan_range(MON, FRI, now=NOW)
+
+        # A handful of events per hour: one raw branch beats five UNION ALL branches.
+        sparse = CostModel().optimize(plan, _stats(raw=1, hourly=1, daily=1), 1.0, now=NOW)
+        self.assertEqual(sparse.source, "raw")
+        self.assertEqual(len(sparse.spans), 1)
+        self.assertEqual((sparse.spans[0].start, sparse.spans[0].end), (MON, plan.spans[-1].end))
+
+        # Same table, but the filter matches one dimension out of 1000.
+        busy = _stats(raw=2_000, hourly=1_000, daily=60, dims=1000)
+        wide = CostModel().optimize(plan, busy, 1.0, now=NOW)
+        narrow = CostModel().optimize(plan, busy, 1 / 1000, now=NOW)
+        self.assertEqual(wide.source, "stitched")
+        self.assertEqual(narrow.source, "raw")
+
+    def test_unmaterialized_rollups_fall_back_to_dimension_bound(self):
+        stats = _stats(raw=10_000, dims=20)
+        self.assertEqual(stats.density("hourly"), 20)
+        self.assertEqual(stats.density("minute"), 1200)
+        self.assertEqual(_stats(raw=5, dims=20).density("minute"), 5)
+
+    def test_minute_only_candidate_inside_retention(self):
+        now = datetime(2025, 12, 5, 12, tzinfo=UTC)
+        start = datetime(2025, 12, 5, 9, 10, 20, tzinfo=UTC)
+        end = datetime(2025, 12, 5, 11, 45, 10, tzinfo=UTC)
+        hourly_span = plan_range(start, end, now=now).spans[2]
+        self.assertEqual(cost._candidates(hourly_span, now), ["hourly", "minute", "raw"])
+        self.assertEqual(cost._candidates(hourly_span, NOW), ["hourly", "raw"])
+
+
+class ChoosePlanTests(TestCase):
+    def setUp(self):
+        cost._cost_model = None
+        self.addCleanup(setattr, cost, "_cost_model", None)
+
+    def test_plain_plan_without_statistics(self):
+        # SQLite (no TimescaleDB): the coarsest-first plan, no row estimates.
+        plan = choose_plan(MON, FRI, AnalyticsFilters())
+        self.assertEqual(plan, plan_range(MON, FRI))
+        self.assertIsNone(plan.estimated_rows)
+
+        with override_settings(APM_ANALYTICS_COST_MODEL=False):
+            self.assertIsNone(cost.get_cost_model())
+
+    def test_statistics_are_cached_for_the_ttl(self):
+        model = CostModel(ttl=60)
+        with (
+            mock.patch.object(cost, "collect_statistics", return_value=_stats(raw=1)) as collect,
+            mock.patch.object(cost.time, "monotonic", side_effect=[0.0, 30.0, 90.0]),
+        ):
+            model.statistics()
+            model.statistics()
+            self.assertEqual(collect.call_count, 1)
+            model.statistics()
+            self.assertEqual(collect.call_count, 2)
+
+    def test_selectivity_cached_per_filter(self):
+        model = CostModel(ttl=60)
+        with mock.patch.object(cost, "dim_selectivity", return_value=0.25) as selectivity:
+            self.assertEqual(model.selectivity(AnalyticsFilters(service="a")), 0.25)
+            model.selectivity(AnalyticsFilters(service="a", start=MON))
+            model.selectivity(AnalyticsFilters(service="b"))
+        self.assertEqual(selectivity.call_count, 2)
+        self.assertEqual(cost.dim_selectivity(AnalyticsFilters()), 1.0)
@@ -0,0 +1,122 @@
+# observability/tests/test_counting.py
+from __future__ import annotations
+
+from unittest import mock
+
+from django.contrib.admin import site
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from observability.counting import EstimatedCountPaginator, count_rows, estimate_count
+from observability.models import ApiRequest
+
+
+def _seed(n: int, service: str = "svc") -> None:
+    now = timezone.now()
+    for _ in range(n):
+        ApiRequest.objects.create(
+            time=now,
+            service=service,
+            endpoint="/x",
+            method="GET",
+            status_code=200,
+            latency_ms=10,
+            tags={},
+        )
+
+
+class CountRowsTests(TestCase):
+    def setUp(self):
+        _seed(3)
+
+    def test_exact_below_threshold_or_without_estimate(self):
+        qs = ApiRequest.objects.all()
+        if connection.vendor != "postgresql":
+            self.assertIsNone(estimate_count(qs))
+        self.assertEqual(count_rows(qs, threshold=10**9), (3, False))
+
+        with mock.patch("observability.counting.estimate_count", return_value=8):
+            self.assertEqual(count_rows(qs, threshold=10), (3, False))
+
+    def test_estimate_at_or_above_threshold(self):
+        qs = ApiRequest.objects.all()
+        with mock.patch("observability.counting.estimate_count", return_value=10):
+            self.assertEqual(count_rows(qs, threshold=10), (10, True))
+            with override_settings(APM_COUNT_ESTIMATES=False):
+                self.assertEqual(count_rows(qs, threshold=10), (3, False))
+
+    def test_postgres_estimates(self):
+        if connection.vendor != "postgresql":
+            self.skipTest("Row estimates require PostgreSQL.")
+        self.assertIsInstance(estimate_count(ApiRequest.objects.all()), int)
+        self.assertIsInstance(estimate_count(ApiRequest.objects.filter(service="svc")), int)
+
+
+@mock.patch("observability.counting.estimate_count", return_value=123_456)
+class EstimatedCountViewsTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        _seed(2)
+
+    def test_list_reports_estimated_count(self, _estimate):
+        res = self.client.get("/api/requests/")
+        self.assertEqual(res.data["count"], 123_456)
+        self.assertTrue(res.data["count_estimated"])
+        self.assertEqual(len(res.data["results"]), 2)
+
+        with override_settings(APM_COUNT_EXACT_THRESHOLD=10**9):
+            res = self.client.get("/api/requests/")
+        self.assertEqual((res.data["count"], res.data["count_estimated"]), (2, False))
+
+    def test_admin_changelist_uses_estimate(self, _estimate):
+        request = RequestFactory().get("/admin/observability/apirequest/")
+        request.user = get_user_model().objects.create_superuser("admin", "a@example.com", "pw")
+        changelist = site._registry[ApiRequest].get_changelist_instance(request)
+        self.assertEqual(changelist.result_count, 123_456)
+        self.assertEqual(len(changelist.result_list), 2)
+
+
+@override_settings(APM_COUNT_EXACT_THRESHOLD=10)
+@mock.patch("observability.counting.estimate_count", return_value=30)
+class UnderestimatedCountTests(TestCase):
+    """100 real rows, an estimate of 30: the estimate must not hide rows 30-99."""
+
+    def setUp(self):
+        _seed(100)
+        self.ids = list(ApiRequest.objects.order_by("id").values_list("id", flat=True))
+
+    def test_pages_are_not_clamped_to_the_estimate(self, _estimate):
+        paginator = EstimatedCountPaginator(ApiRequest.objects.order_by("id"), 10)
+
+        page = paginator.page(3)
+        self.assertEqual([r.id for r in page], self.ids[20:30])
+        self.assertTrue(page.has_next())
+
+        page = paginator.page(4)
+        self.assertEqual([r.id for r in page], self.ids[30:40])
+        self.assertEqual((page.start_index(), page.end_index()), (31, 40))
+
+        page = paginator.page(10)
+        self.assertEqual([r.id for r in page], self.ids[90:])
+        self.assertFalse(page.has_next())
+        self.assertEqual(list(paginator.page(11)), [])
+
+    def test_list_serves_pages_past_the_estimate(self, _estimate):
+        res = self.client.get("/api/requests/", {"page": 2, "ordering": "time"})
+        self.assertEqual(res.status_code, 200, res.data)
+        self.assertEqual((res.data["count"], res.data["count_estimated"]), (30, True))
+        self.assertEqual(len(res.data["results"]), 50)
+        self.assertIsNone(res.data["next"])
+        self.assertIsNotNone(res.data["previous"])
+
+    def test_admin_changelist_serves_pages_past_the_estimate(self, _estimate):
+        request = RequestFactory().get("/admin/observability/apirequest/", {"p": 5})
+        request.user = get_user_model().objects.create_superuser("admin", "a@example.com", "pw")
+        model_admin = site._registry[ApiRequest]
+        with mock.patch.object(model_admin, "list_per_page", 10):
+            changelist = model_admin.get_changelist_instance(request)
+        self.assertEqual(changelist.result_count, 30)
+        self.assertEqual([r.id for r in changelist.result_list], self.ids[::-1][40:50])
@@ -0,0 +1,64 @@
+# observability/tests/test_export.py
+from __future__ import annotations
+
+import csv
+import gzip
+import io
+import json
+from datetime import timedelta
+
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from observability.export import EXPORT_FIELDS, iter_batches
+from observability.models import ApiRequest
+
+
+class ExportEndpointTests(APITestCase):
+    URL = "/api/requests/export/"
+
+    def setUp(self):
+        super().setUp()
+        now = timezone.now()
+        for i, svc in enumerate(["auth", "billing", "auth"]):
+            ApiRequest.objects.create(
+                time=now - timedelta(minutes=i),
+                service=svc,
+                endpoint="/x",
+                method="GET",
+                status_code=200 + i,
+                latency_ms=10 + i,
+                trace_id=f"t{i}",
+                tags={"i": i},
+            )
+
+    def _get(self, params: dict) -> tuple[object, bytes]:
+        res = self.client.get(self.URL, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.streaming)
+        return res, b"".join(res.streaming_content)
+
+    def test_ndjson_with_list_filters(self):
+        res, body = self._get({"service": "auth"})
+        self.assertEqual(res["Content-Type"], "application/x-ndjson")
+        rows = [json.loads(line) for line in body.decode().splitlines()]
+        self.assertEqual([r["trace_id"] for r in rows], ["t0", "t2"])  # newest first
+        self.assertEqual(set(rows[0]), set(EXPORT_FIELDS))
+        self.assertEqual(rows[1]["tags"], {"i": 2})
+
+    def test_csv_gzip(self):
+        res, body = self._get({"output": "csv", "gzip": "true", "ordering": "time"})
+        self.assertEqual(res["Content-Encoding"], "gzip")
+        rows = list(csv.reader(io.StringIO(gzip.decompress(body).decode())))
+        self.assertEqual(tuple(rows[0]), EXPORT_FIELDS)
+        self.assertEqual([r[7] for r in rows[1:]], ["t2", "t1", "t0"])
+        self.assertEqual(json.loads(rows[1][-1]), {"i": 2})
+
+    def test_rejects_unknown_output(self):
+        res = self.client.get(self.URL, {"output": "xml"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_batches(self):
+        batches = list(iter_batches(ApiRequest.objects.order_by("id"), batch_size=2))
+        self.assertEqual([len(b) for b in batches], [2, 1])
@@ -0,0 +1,196 @@
+# observability/tests/test_ingest_buffer.py
+from __future__ import annotations
+
+import threading
+from unittest import mock
+
+from django.db import DataError, OperationalError
+from django.test import TestCase, override_settings
+from rest_framework.test import APITestCase
+
+from observability.ingest import row_from_dict
+from observability.ingest.buffer import BufferFull, IngestBuffer
+from observability.ingest.copy_writer import WriteResult
+from observability.models import ApiRequest
+
+from .utils import make_event, make_events, post_ingest, post_ingest_ndjson
+
+
+class _RecordingWriter:
+    def __init__(self, *, fail_times: int = 0, poison: str | None = None):
+        self.batches: list[list[tuple]] = []
+        self.fail_times = fail_times
+        self.poison = poison
+        self.calls = 0
+        self.flushed = threading.Event()
+
+    def __call__(self, rows):
+        self.calls += 1
+        if self.fail_times:
+            self.fail_times -= 1
+            raise OperationalError("primary unavailable")
+        if any(r[6] == self.poison for r in rows):
+            raise DataError("invalid byte sequence")
+        self.batches.append(list(rows))
+        self.flushed.set()
+        return WriteResult(rows=len(rows), seconds=0.001, method="test")
+
+
+def _rows(n: int, prefix: str = "b"):
+    return [row_from_dict(make_event(trace_id=f"{prefix}{i}")) for i in range(n)]
+
+
+def _buffer(writer, **overrides) -> IngestBuffer:
+    opts = {
+        "max_rows": 10,
+        "flush_rows": 5,
+        "flush_interval": 60.0,
+        "policy": "drop",
+        "block_timeout": 0.0,
+        "writer": writer,
+    }
+    opts.update(overrides)
+    return IngestBuffer(**opts)
+
+
+class IngestBufferTests(TestCase):
+    def test_flush_coalesces_submits(self):
+        writer = _RecordingWriter()
+        buf = _buffer(writer, flush_rows=100, max_rows=100)
+        with mock.patch.object(buf, "_ensure_thread"):
+            buf.submit(_rows(2, "a"))
+            buf.submit(_rows(3, "b"))
+
+        self.assertEqual(buf.depth, 5)
+        result = buf.flush()
+        self.assertEqual(result.rows, 5)
+        self.assertEqual(len(writer.batches), 1)
+        self.assertEqual([r[6] for r in writer.batches[0]], ["a0", "a1", "b0", "b1", "b2"])
+        self.assertEqual(buf.depth, 0)
+        self.assertIsNone(buf.flush())
+
+    def test_size_trigger_wakes_flusher(self):
+        writer = _RecordingWriter()
+        buf = _buffer(writer)
+        try:
+            buf.submit(_rows(5))
+            self.assertTrue(writer.flushed.wait(5))
+        finally:
+            buf.stop()
+        self.assertEqual(sum(len(b) for b in writer.batches), 5)
+
+    def test_drop_policy_refuses_when_full(self):
+        buf = _buffer(_RecordingWriter())
+        with mock.patch.object(buf, "_ensure_thread"):
+            buf.submit(_rows(8))
+            with self.assertRaises(BufferFull):
+                buf.submit(_rows(3))
+        self.assertEqual(buf.depth, 8)
+
+    def test_block_policy_times_out(self):
+        buf = _buffer(_RecordingWriter(), policy="block", block_timeout=0.05)
+        with mock.patch.object(buf, "_ensure_thread"):
+            buf.submit(_rows(10))
+            with self.assertRaises(BufferFull):
+                buf.submit(_rows(1))
+
+    def test_block_policy_waits_for_flush(self):
+        buf = _buffer(_RecordingWriter(), policy="block", block_timeout=5.0)
+        with mock.patch.object(buf, "_ensure_thread"):
+            buf.submit(_rows(10))
+            threading.Timer(0.05, buf.flush).start()
+            buf.submit(_rows(4, "late"))
+        self.assertEqual(buf.depth, 4)
+
+    def test_failed_flush_requeues_rows_in_order(self):
+        writer = _RecordingWriter(fail_times=1)
+        buf = _buffer(writer)
+        with mock.patch.object(buf, "_ensure_thread"):
+            buf.submit(_rows(3, "x"))
+            with self.assertRaises(OperationalError):
+                buf.flush()
+            self.assertEqual(buf.depth, 3)
+            buf.flush()
+        self.assertEqual([r[6] for r in writer.batches[0]], ["x0", "x1", "x2"])
+
+    def test_rejected_row_is_isolated_and_dead_lettered(self):
+        writer = _RecordingWriter(poison="x5")
+        dead: list[tuple] = []
+        buf = _buffer(writer, dead_letter=lambda rows, exc: dead.extend(rows))
+        with mock.patch.object(buf, "_ensure_thread"):
+            buf.submit(_rows(8, "x"))
+            result = buf.flush()
+
+        self.assertEqual(result.rows, 7)
+        self.assertEqual(buf.depth, 0)
+        self.assertEqual([r[6] for r in dead], ["x5"])
+        written = [r[6] for batch in writer.batches for r in batch]
+        self.assertEqual(written, ["x0", "x1", "x2", "x3", "x4", "x6", "x7"])
+
+
+class AsyncIngestViewTests(APITestCase):
+    def setUp(self):
+        self.writer = _RecordingWriter()
+        self.buffer = _buffer(self.writer, max_rows=100, flush_rows=100)
+        patcher = mock.patch("observability.views.get_ingest_buffer", return_value=self.buffer)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        ensure = mock.patch.object(self.buffer, "_ensure_thread")
+        ensure.start()
+        self.addCleanup(ensure.stop)
+
+    def test_async_returns_202_and_queues_rows(self):
+        events = make_events(3) + [make_event(status_code=99)]
+        res = post_ingest(self.client, events, **{"async": "true"})
+
+        self.assertEqual(res.status_code, 202, res.data)
+        self.assertEqual(res.data["accepted"], 3)
+        self.assertEqual(res.data["rejected"], 1)
+        self.assertEqual(res.data["errors"][0]["index"], 3)
+        self.assertEqual(len(res.data["batch_id"]), 32)
+        self.assertEqual(self.buffer.depth, 3)
+        self.assertEqual(ApiRequest.objects.count(), 0)
+
+    @override_settings(APM_INGEST_ASYNC=True)
+    def test_setting_enables_async_and_query_param_opts_out(self):
+        res = post_ingest(self.client, make_events(2))
+        self.assertEqual(res.status_code, 202)
+
+        res = post_ingest(self.client, make_events(2), **{"async": "false"})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data["inserted"], 2)
+        self.assertEqual(self.buffer.depth, 2)
+
+    def test_strict_rejection_queues_nothing(self):
+        events = make_events(2) + [make_event(method="FETCH")]
+        res = post_ingest(self.client, events, strict=True, **{"async": "true"})
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(self.buffer.depth, 0)
+
+    def test_ndjson_async(self):
+        res = post_ingest_ndjson(self.client, make_events(4), **{"async": "true"})
+        self.assertEqual(res.status_code, 202, res.data)
+        self.assertEqual(res.data["accepted"], 4)
+        self.assertEqual(self.buffer.depth, 4)
+
+    def test_ndjson_async_is_queued_per_chunk(self):
+        with mock.patch.object(self.buffer, "submit", wraps=self.buffer.submit) as submit:
+            res = post_ingest_ndjson(self.client, make_events(5), batch_size=2, **{"async": "true"})
+        self.assertEqual(res.status_code, 202, res.data)
+        self.assertEqual([len(c.args[0]) for c in submit.call_args_list], [2, 2, 1])
+        self.assertEqual(
+            {c.kwargs["batch_id"] for c in submit.call_args_list}, {res.data["batch_id"]}
+        )
+
+    def test_strict_async_capped_at_buffer_capacity(self):
+        res = post_ingest(self.client, make_events(101), strict=True, **{"async": "true"})
+        self.assertEqual(res.status_code, 503)
+        self.assertEqual(self.buffer.depth, 0)
+
+    def test_full_buffer_returns_503(self):
+        self.buffer.submit(_rows(98))
+        res = post_ingest(self.client, make_events(3), **{"async": "true"})
+        self.assertEqual(res.status_code, 503)
+        self.assertIn("Retry-After", res)
+        self.assertEqual(res.data["accepted"], 0)
+        self.assertEqual(self.buffer.depth, 98)
@@ -0,0 +1,172 @@
+# observability/tests/test_ingest_columnar.py
+from __future__ import annotations
+
+import io
+import json
+from datetime import UTC, datetime, timedelta
+from unittest import mock
+
+from django.test import SimpleTestCase
+from rest_framework.exceptions import ParseError
+from rest_framework.test import APITestCase
+
+from observability.ingest import row_as_dict, row_from_dict, validate_events
+from observability.ingest.columnar import (
+    COLUMNAR_MEDIA_TYPE,
+    _Dictionary,
+    decode_frame,
+    encode_batch,
+    encode_frame,
+    read_frames,
+)
+from observability.ingest.compression import compress_body
+from observability.models import ApiRequest
+
+from .utils import DEFAULT_INGEST_URL
+
+BASE = datetime(2025, 12, 14, 10, 0, tzinfo=UTC)
+
+
+def _rows(n: int, **overrides):
+    rows = []
+    for i in range(n):
+        data = {
+            "time": BASE + timedelta(milliseconds=37 * i, microseconds=i),
+            "service": "billing" if i % 2 else "auth",
+            "endpoint": "/api/v1/invoices",
+            "method": "GET" if i % 3 else "POST",
+            "status_code": 200 if i % 5 else 503,
+            "latency_ms": 10 + i,
+            "trace_id": f"trace-{i}",
+            "user_ref": None if i % 4 else f"user-{i}",
+            "tags": {"env": "test"} if i % 2 else {},
+        }
+        data.update(overrides)
+        rows.append(row_from_dict(data))
+    return rows
+
+
+def _events(rows):
+    return [{**row_as_dict(r), "time": r[0].isoformat().replace("+00:00", "Z")} for r in rows]
+
+
+def _frames(body: bytes):
+    return list(read_frames(io.BytesIO(body), max_frame_bytes=1 << 24))
+
+
+class ColumnarCodecTests(SimpleTestCase):
+    def test_round_trip(self):
+        rows = _rows(50)
+        frames = _frames(encode_batch(rows, frame_size=20))
+        self.assertEqual([len(f) for f in frames], [20, 20, 10])
+
+        decoded = []
+        for frame in frames:
+            result = decode_frame(frame, max_errors=10)
+            self.assertEqual(result.errors, [])
+            decoded.extend(result.rows)
+        self.assertEqual(decoded, rows)
+
+    def test_smaller_than_json(self):
+        rows = _rows(1000)
+        as_json = json.dumps(_events(rows)).encode("utf-8")
+        self.assertLess(len(encode_batch(rows)) * 3, len(as_json))
+
+    def test_errors_match_json_path(self):
+        rows = _rows(6)
+        rows[1] = (*rows[1][:4], 700, *rows[1][5:])
+        rows[4] = (rows[4][0], "   ", *rows[4][2:])
+        (frame,) = _frames(encode_frame(rows))
+        result = decode_frame(frame, max_errors=10, start_index=100)
+
+        self.assertEqual(len(result.rows), 4)
+        self.assertEqual(result.invalid, 2)
+
+        events = _events(rows)
+        expected = validate_events(events, max_errors=10, start_index=100)
+        self.assertEqual(result.errors, expected.errors)
+
+    def test_nul_text_matches_json_path(self):
+        rows = _rows(4)
+        rows[1] = (rows[1][0], "a\x00b", *rows[1][2:])
+        rows[2] = (*rows[2][:7], "nul\x00trace", *rows[2][8:])
+        (frame,) = _frames(encode_frame(rows))
+        result = decode_frame(frame, max_errors=10)
+
+        self.assertEqual(result.invalid, 2)
+        expected = validate_events(_events(rows), max_errors=10)
+        self.assertEqual(result.errors, expected.errors)
+
+    def test_max_errors_cap(self):
+        rows = [(*r[:4], 99, *r[5:]) for r in _rows(5)]
+        (frame,) = _frames(encode_frame(rows))
+        result = decode_frame(frame, max_errors=2)
+        self.assertEqual(result.invalid, 5)
+        self.assertEqual([e["index"] for e in result.errors], [0, 1])
+
+    def test_structural_errors(self):
+        body = encode_frame(_rows(3))
+        with self.assertRaises(ParseError):
+            _frames(b"XXXX" + body[4:])
+        with self.assertRaises(ParseError):
+            _frames(body[:-1])
+        with self.assertRaises(ParseError):
+            list(read_frames(io.BytesIO(body), max_frame_bytes=10))
+
+    def test_negative_dictionary_id(self):
+        ids = _Dictionary.ids
+
+        def negative(self, values):
+            return [-1 for _ in ids(self, values)]
+
+        with mock.patch.object(_Dictionary, "ids", negative):
+            body = encode_frame(_rows(3))
+        (frame,) = _frames(body)
+        with self.assertRaises(ParseError):
+            decode_frame(frame, max_errors=10)
+
+
+class ColumnarIngestTests(APITestCase):
+    def _post(self, body: bytes, url: str = DEFAULT_INGEST_URL, **headers):
+        return self.client.post(url, data=body, content_type=COLUMNAR_MEDIA_TYPE, **headers)
+
+    def test_ingest_columnar(self):
+        rows = _rows(30)
+        rows[7] = (*rows[7][:3], "FETCH", *rows[7][4:])
+        res = self._post(encode_batch(rows, frame_size=10))
+
+        self.assertEqual(res.status_code, 200, res.data)
+        self.assertEqual(res.data["inserted"], 29)
+        self.assertEqual(res.data["rejected"], 1)
+        self.assertEqual(res.data["errors"][0]["index"], 7)
+        self.assertEqual(ApiRequest.objects.count(), 29)
+
+        stored = ApiRequest.objects.get(trace_id="trace-4")
+        self.assertEqual(stored.time, rows[4][0])
+        self.assertEqual(stored.user_ref, "user-4")
+        self.assertEqual(stored.tags, {})
+
+    def test_gzip_columnar(self):
+        body = compress_body(encode_batch(_rows(10)), "gzip")
+        res = self._post(body, HTTP_CONTENT_ENCODING="gzip")
+        self.assertEqual(res.status_code, 200, res.data)
+        self.assertEqual(res.data["inserted"], 10)
+
+    def test_strict_rolls_back(self):
+        rows = _rows(20)
+        rows[15] = (*rows[15][:5], -1, *rows[15][6:])
+        res = self._post(encode_batch(rows, frame_size=10), f"{DEFAULT_INGEST_URL}?strict=true")
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(ApiRequest.objects.count(), 0)
+
+    def test_max_events(self):
+        res = self._post(
+            encode_batch(_rows(12), frame_size=5),
+            f"{DEFAULT_INGEST_URL}?max_events=10&batch_size=5&strict=true",
+        )
+        self.assertEqual(res.status_code, 413)
+        self.assertEqual(ApiRequest.objects.count(), 0)
+
+    def test_malformed_body(self):
+        res = self._post(b"APMC\x01garbage")
+        self.assertEqual(res.status_code, 400)
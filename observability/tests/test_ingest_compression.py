@@ -0,0 +1,96 @@
+# observability/tests/test_ingest_compression.py
+from __future__ import annotations
+
+import io
+import json
+import unittest
+
+from django.test import SimpleTestCase, override_settings
+from rest_framework.exceptions import ParseError
+from rest_framework.test import APITestCase
+
+from observability.ingest.compression import (
+    ZSTD_AVAILABLE,
+    DecompressedBodyTooLarge,
+    DecompressingStream,
+    compress_body,
+)
+from observability.models import ApiRequest
+
+from .utils import DEFAULT_INGEST_URL, make_event, make_events
+
+
+def _ndjson(events) -> bytes:
+    return b"".join(json.dumps(e).encode("utf-8") + b"\n" for e in events)
+
+
+class DecompressingStreamTests(SimpleTestCase):
+    def test_reads_incrementally(self):
+        raw = b"x" * 10_000
+        stream = DecompressingStream(
+            io.BytesIO(compress_body(raw, "gzip")), ["gzip"], max_bytes=20_000
+        )
+        self.assertEqual(stream.read(100), b"x" * 100)
+        self.assertEqual(len(stream.read()), 9_900)
+        self.assertEqual(stream.read(10), b"")
+
+    def test_limit_applies_to_decoded_bytes(self):
+        body = compress_body(b"0" * 5_000, "gzip")
+        self.assertLess(len(body), 100)
+        stream = DecompressingStream(io.BytesIO(body), ["gzip"], max_bytes=4_000)
+        with self.assertRaises(DecompressedBodyTooLarge):
+            stream.read()
+
+    def test_corrupt_body(self):
+        stream = DecompressingStream(io.BytesIO(b"not gzip at all"), ["gzip"], max_bytes=1_000)
+        with self.assertRaises(ParseError):
+            stream.read(10)
+
+
+class CompressedIngestTests(APITestCase):
+    def _post(self, body: bytes, encoding: str, content_type="application/json", url=None):
+        return self.client.post(
+            url or DEFAULT_INGEST_URL,
+            data=body,
+            content_type=content_type,
+            HTTP_CONTENT_ENCODING=encoding,
+        )
+
+    def test_gzip_json(self):
+        body = json.dumps({"events": make_events(5)}).encode("utf-8")
+        res = self._post(compress_body(body, "gzip"), "gzip")
+        self.assertEqual(res.status_code, 200, res.data)
+        self.assertEqual(res.data["inserted"], 5)
+        self.assertEqual(ApiRequest.objects.count(), 5)
+
+    def test_gzip_ndjson(self):
+        events = make_events(3) + [make_event(latency_ms=-1)]
+        res = self._post(compress_body(_ndjson(events), "gzip"), "gzip", "application/x-ndjson")
+        self.assertEqual(res.status_code, 200, res.data)
+        self.assertEqual(res.data["inserted"], 3)
+        self.assertEqual(res.data["errors"][0]["index"], 3)
+
+    @unittest.skipUnless(ZSTD_AVAILABLE, "zstd module not installed")
+    def test_zstd_json(self):
+        body = json.dumps(make_events(4)).encode("utf-8")
+        res = self._post(compress_body(body, "zstd"), "zstd")
+        self.assertEqual(res.status_code, 200, res.data)
+        self.assertEqual(res.data["inserted"], 4)
+
+    def test_unsupported_encoding(self):
+        res = self._post(b"whatever", "br")
+        self.assertEqual(res.status_code, 415)
+
+    def test_corrupt_gzip(self):
+        res = self._post(b"\x1f\x8b garbage", "gzip")
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(ApiRequest.objects.count(), 0)
+
+    @override_settings(
+        APM_INGEST_MAX_EVENTS=10, APM_INGEST_MAX_EVENT_BYTES=100, APM_INGEST_BATCH_SIZE=5
+    )
+    def test_decompressed_size_limit(self):
+        body = _ndjson(make_events(10, endpoint="/" + "a" * 500))
+        res = self._post(compress_body(body, "gzip"), "gzip", "application/x-ndjson")
+        self.assertEqual(res.status_code, 413, res.data)
+        self.assertEqual(ApiRequest.objects.count(), 0)
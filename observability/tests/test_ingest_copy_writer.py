@@ -0,0 +1,72 @@
+# observability/tests/test_ingest_copy_writer.py
+from __future__ import annotations
+
+from datetime import UTC, datetime
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from observability.ingest import row_from_dict, write_rows
+from observability.ingest.copy_writer import EMPTY_WRITE, WriteResult
+from observability.models import ApiRequest
+
+
+def _row(i: int, **overrides):
+    data = {
+        "time": datetime(2025, 12, 14, 10, 0, i, tzinfo=UTC),
+        "service": "svc",
+        "endpoint": "/copy",
+        "method": "GET",
+        "status_code": 200,
+        "latency_ms": 10 + i,
+        "trace_id": f"copy-{i}",
+        "user_ref": None,
+        "tags": {"i": i},
+    }
+    data.update(overrides)
+    return row_from_dict(data)
+
+
+class CopyWriterTests(TestCase):
+    def test_writes_rows_from_generator(self):
+        result = write_rows((_row(i) for i in range(5)), batch_size=2, source="test")
+
+        self.assertEqual(result.rows, 5)
+        self.assertEqual(ApiRequest.objects.count(), 5)
+        expected = "bulk_create" if connection.vendor != "postgresql" else "copy_binary"
+        self.assertEqual(result.method, expected)
+
+        row = ApiRequest.objects.get(trace_id="copy-3")
+        self.assertEqual(row.latency_ms, 13)
+        self.assertEqual(row.tags, {"i": 3})
+        self.assertIsNone(row.user_ref)
+
+    def test_empty_input_is_a_noop(self):
+        self.assertEqual(write_rows([], source="test"), EMPTY_WRITE)
+
+    @override_settings(APM_INGEST_COPY_FORMAT="text")
+    def test_text_copy_format(self):
+        result = write_rows([_row(1)], source="test")
+        expected = "bulk_create" if connection.vendor != "postgresql" else "copy_text"
+        self.assertEqual(result.method, expected)
+        self.assertEqual(ApiRequest.objects.count(), 1)
+
+    def test_results_add_up(self):
+        total = (
+            EMPTY_WRITE + WriteResult(3, 0.5, "copy_binary") + WriteResult(1, 0.5, "copy_binary")
+        )
+        self.assertEqual(total.rows, 4)
+        self.assertEqual(total.method, "copy_binary")
+        self.assertAlmostEqual(total.rows_per_sec, 4.0)
+
+
+class SeedViaWriterTests(TestCase):
+    def test_orm_seed_uses_bulk_writer(self):
+        out = StringIO()
+        call_command("seed_apirequests", count=25, batch_size=10, seed=1, stdout=out)
+
+        self.assertEqual(ApiRequest.objects.count(), 25)
+        self.assertIn("inserted=25", out.getvalue())
+        self.assertIn("rows/sec=", out.getvalue())
@@ -0,0 +1,201 @@
+# observability/tests/test_ingest_dimensions.py
+from __future__ import annotations
+
+import importlib
+from datetime import UTC, datetime
+from unittest import mock
+
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.test import SimpleTestCase, TestCase
+
+from observability.analytics.sql import (
+    DAILY_DIM_CAGG,
+    DIM_TABLE,
+    HOURLY_DIM_CAGG,
+    AnalyticsFilters,
+    build_dim_where_clause,
+    kpis_from_cagg_sql,
+    top_endpoints_from_cagg_sql,
+)
+from observability.ingest import row_from_dict, write_rows
+from observability.ingest.dimensions import DimensionCache, _insert_missing, resolve_dim_ids
+from observability.models import ApiRequest, EndpointDim
+
+endpoint_dim_migration = importlib.import_module("observability.migrations.0009_endpoint_dim")
+
+
+def _row(i: int, service: str = "svc", endpoint: str = "/dim", method: str = "GET"):
+    return row_from_dict(
+        {
+            "time": datetime(2025, 12, 14, 10, 0, i, tzinfo=UTC),
+            "service": service,
+            "endpoint": endpoint,
+            "method": method,
+            "status_code": 200,
+            "latency_ms": 10 + i,
+            "tags": {},
+        }
+    )
+
+
+class DimensionCacheTests(SimpleTestCase):
+    def test_lru_evicts_least_recently_used(self):
+        cache = DimensionCache(maxsize=2)
+        a, b, c = ("s", "/a", "GET"), ("s", "/b", "GET"), ("s", "/c", "GET")
+        cache.put_many({a: 1, b: 2})
+        cache.get_many([a])  # b is now the oldest
+        cache.put_many({c: 3})
+        self.assertEqual(cache.get_many([a, b, c]), {a: 1, c: 3})
+
+
+class DimensionResolutionTests(TestCase):
+    def test_write_rows_sets_dim_ids(self):
+        write_rows(
+            [_row(0), _row(1), _row(2, method="POST"), _row(3, service="other")],
+            source="test",
+        )
+
+        self.assertEqual(EndpointDim.objects.filter(endpoint="/dim").count(), 3)
+        dims = {(r.service, r.method): r.dim_id for r in ApiRequest.objects.order_by("time")}
+        self.assertEqual(len(set(dims.values())), 3)
+        get = EndpointDim.objects.get(service="svc", endpoint="/dim", method="GET")
+        self.assertEqual(dims[("svc", "GET")], get.id)
+
+    def test_existing_dimensions_are_reused(self):
+        write_rows([_row(0)], source="test")
+        write_rows([_row(1), _row(2, endpoint="/new")], source="test")
+        self.assertEqual(EndpointDim.objects.filter(endpoint__in=["/dim", "/new"]).count(), 2)
+        self.assertEqual(
+            ApiRequest.objects.filter(endpoint="/dim").values("dim_id").distinct().count(), 1
+        )
+
+    def test_cache_is_filled_only_after_commit(self):
+        cache = DimensionCache()
+        key = ("svc", "/dim", "GET")
+        with self.captureOnCommitCallbacks(execute=True):
+            ids = resolve_dim_ids({key}, using=DEFAULT_DB_ALIAS, cache=cache)
+            # PostgreSQL commits new dimensions on their own connection: cached at once.
+            committed = connection.vendor == "postgresql"
+            self.assertEqual(cache.get_many([key]), ids if committed else {})
+        self.assertEqual(cache.get_many([key]), ids)
+
+        with mock.patch("observability.ingest.dimensions._fetch_or_create") as fetch:
+            self.assertEqual(resolve_dim_ids({key}, using=DEFAULT_DB_ALIAS, cache=cache), ids)
+        fetch.assert_not_called()
+
+    def test_new_keys_are_inserted_in_sorted_order(self):
+        keys = {("svc", "/b", "GET"), ("svc", "/a", "POST"), ("api", "/z", "GET")}
+        with mock.patch(
+            "observability.ingest.dimensions._insert_missing", wraps=_insert_missing
+        ) as insert:
+            ids = resolve_dim_ids(keys, using=DEFAULT_DB_ALIAS, cache=DimensionCache())
+
+        self.assertEqual(insert.call_args.args[0], sorted(keys))
+        self.assertEqual(set(ids), keys)
+
+    def test_keys_are_batched_per_statement(self):
+        keys = {("svc", f"/batch/{i}", "GET") for i in range(5)}
+        with (
+            mock.patch("observability.ingest.dimensions.DIM_QUERY_BATCH", 2),
+            mock.patch(
+                "observability.ingest.dimensions._insert_missing", wraps=_insert_missing
+            ) as insert,
+        ):
+            ids = resolve_dim_ids(keys, using=DEFAULT_DB_ALIAS, cache=DimensionCache())
+
+        ordered = sorted(keys)
+        batches = [c.args[0] for c in insert.call_args_list]
+        self.assertEqual(batches, [ordered[0:2], ordered[2:4], ordered[4:]])
+        self.assertEqual(set(ids), keys)
+        self.assertEqual(len(set(ids.values())), 5)
+
+    def test_one_side_connection_per_write(self):
+        if connection.vendor != "postgresql":
+            self.skipTest("Separate dimension inserts require PostgreSQL.")
+        rows = [_row(i, endpoint=f"/side/{i}") for i in range(3)]
+        with (
+            mock.patch("observability.ingest.copy_writer.DEFAULT_DIM_CHUNK", 1),
+            mock.patch.object(
+                connections, "create_connection", wraps=connections.create_connection
+            ) as create,
+        ):
+            write_rows(rows, batch_size=1, source="test")
+
+        create.assert_called_once_with(DEFAULT_DB_ALIAS)
+        self.assertEqual(ApiRequest.objects.filter(endpoint__startswith="/side/").count(), 3)
+
+    def test_update_moves_row_to_new_dimension(self):
+        if connection.vendor != "postgresql":
+            self.skipTest("dim_id triggers require PostgreSQL.")
+        write_rows([_row(0)], source="test")
+        row = ApiRequest.objects.get()
+
+        row.endpoint = "/renamed"
+        row.method = "POST"
+        row.save()
+
+        row.refresh_from_db()
+        dim = EndpointDim.objects.get(id=row.dim_id)
+        self.assertEqual((dim.service, dim.endpoint, dim.method), ("svc", "/renamed", "POST"))
+
+        ApiRequest.objects.filter(id=row.id).update(latency_ms=99)
+        row.refresh_from_db()
+        self.assertEqual(row.dim_id, dim.id)
+
+
+class _RecordingCursor:
+    def __init__(self, row):
+        self.row = row
+        self.calls: list[tuple[str, list | None]] = []
+
+    def execute(self, sql, params=None):
+        self.calls.append((sql, params))
+
+    def fetchone(self):
+        return self.row
+
+
+class DimIdBackfillMigrationTests(SimpleTestCase):
+    def test_atomic_off_and_one_update_per_day(self):
+        self.assertFalse(endpoint_dim_migration.Migration.atomic)
+        first = datetime(2025, 12, 1, 13, 5, tzinfo=UTC)
+        last = datetime(2025, 12, 3, 0, 0, tzinfo=UTC)
+        cursor = _RecordingCursor((first, last))
+
+        endpoint_dim_migration._backfill_dim_ids(cursor)
+
+        updates = [params for sql, params in cursor.calls if "UPDATE" in sql]
+        days = [datetime(2025, 12, d, tzinfo=UTC) for d in (1, 2, 3, 4)]
+        self.assertEqual(updates, [[lo, hi] for lo, hi in zip(days, days[1:], strict=False)])
+        self.assertIn("r.time >= %s AND r.time < %s", cursor.calls[1][0])
+
+    def test_empty_table_runs_no_update(self):
+        cursor = _RecordingCursor((None, None))
+        endpoint_dim_migration._backfill_dim_ids(cursor)
+        self.assertEqual(len(cursor.calls), 1)
+
+
+class DimensionSqlTests(SimpleTestCase):
+    def test_name_filters_become_one_dim_subquery(self):
+        start = datetime(2025, 12, 1, tzinfo=UTC)
+        where, params = build_dim_where_clause(
+            AnalyticsFilters(start=start, service="svc", method="GET")
+        )
+        self.assertEqual(
+            where,
+            f"WHERE bucket >= %s AND dim_id IN "
+            f"(SELECT id FROM {DIM_TABLE} WHERE service = %s AND method = %s)",
+        )
+        self.assertEqual(params, [start, "svc", "GET"])
+
+    def test_cagg_builders_read_dimension_rollups(self):
+        sql, _ = kpis_from_cagg_sql(granularity="daily", filters=AnalyticsFilters())
+        self.assertIn(f"FROM {DAILY_DIM_CAGG}", sql)
+        self.assertNotIn(DIM_TABLE, sql)
+
+        sql, params = top_endpoints_from_cagg_sql(
+            granularity="hourly", filters=AnalyticsFilters(endpoint="/x"), limit=5
+        )
+        self.assertIn(f"FROM {HOURLY_DIM_CAGG}", sql)
+        self.assertIn(f"JOIN {DIM_TABLE} d ON d.id = p.dim_id", sql)
+        self.assertEqual(params, ["/x", 5])
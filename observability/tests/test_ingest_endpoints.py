@@ -0,0 +1,121 @@
+# observability/tests/test_ingest_endpoints.py
+from __future__ import annotations
+
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APITestCase
+
+from observability.ingest import endpoints as endpoints_module
+from observability.ingest import validate_events
+from observability.ingest.endpoints import (
+    OTHER_ENDPOINT,
+    CardinalityGuard,
+    EndpointNormalizer,
+    parse_rules,
+    parse_templates,
+    stored_endpoints,
+)
+from observability.models import ApiRequest, EndpointDim
+
+from .utils import make_event, make_events, post_ingest
+
+UUID = "3f2b8c1e-9a4d-4e6f-b1c2-0d9e8f7a6b5c"
+
+
+class EndpointTemplatingTests(SimpleTestCase):
+    def test_builtin_segment_detection(self):
+        n = EndpointNormalizer()
+        self.assertEqual(n.template("svc", "/orders/8812/items/3"), "/orders/{id}/items/{id}")
+        self.assertEqual(n.template("svc", f"/users/{UUID}"), "/users/{uuid}")
+        self.assertEqual(n.template("svc", "/blobs/9f86d081884c7d65"), "/blobs/{hex}")
+        self.assertEqual(n.template("svc", "/api/v1/search?q=42#top"), "/api/v1/search")
+        self.assertEqual(n.template("svc", "/health"), "/health")
+
+    def test_rules_then_service_templates(self):
+        n = EndpointNormalizer(
+            rules=parse_rules('[["^/v\\\\d+/", "/"]]'),
+            templates=parse_templates(
+                {"orders": ["/orders/{order}/items/{item}"], "*": ["/static/{file}"]}
+            ),
+        )
+        self.assertEqual(
+            n.template("orders", "/v2/orders/A-1/items/x"), "/orders/{order}/items/{item}"
+        )
+        # Templates are per service; other services fall back to segment detection.
+        self.assertEqual(n.template("billing", "/orders/7/items/x"), "/orders/{id}/items/x")
+        self.assertEqual(n.template("billing", "/static/app.js"), "/static/{file}")
+        self.assertEqual(n.template("billing", "/static/js/app.js"), "/static/js/app.js")
+
+    def test_cardinality_guard_folds_overflow(self):
+        guard = CardinalityGuard(limit=2)
+        self.assertEqual(guard.admit("svc", "/a"), "/a")
+        self.assertEqual(guard.admit("svc", "/b"), "/b")
+        self.assertEqual(guard.admit("svc", "/c"), OTHER_ENDPOINT)
+        self.assertEqual(guard.admit("svc", "/a"), "/a")
+        self.assertEqual(guard.admit("other", "/c"), "/c")
+        self.assertEqual(guard.distinct("svc"), 2)
+
+    def test_apply_keeps_raw_path_in_tags(self):
+        rows = validate_events(
+            [make_event(endpoint="/orders/1"), make_event(endpoint="/health")], max_errors=1
+        ).rows
+        out = EndpointNormalizer(keep_raw_tag="raw_endpoint").apply(rows)
+
+        self.assertEqual(out[0][2], "/orders/{id}")
+        self.assertEqual(out[0][8], {"env": "test", "raw_endpoint": "/orders/1"})
+        self.assertIs(out[1], rows[1])
+        self.assertNotIn("raw_endpoint", rows[0][8])
+
+
+class StoredCardinalityTests(TestCase):
+    def setUp(self):
+        for endpoint in ("/a", "/b", OTHER_ENDPOINT):
+            EndpointDim.objects.create(service="svc", endpoint=endpoint, method="GET")
+        EndpointDim.objects.create(service="svc", endpoint="/a", method="POST")
+
+    def test_stored_endpoints_count_towards_the_cap(self):
+        self.assertEqual(stored_endpoints("svc", 10), ["/a", "/b"])
+
+        # A fresh process (or another worker) starts with empty sets.
+        guard = CardinalityGuard(limit=2, known=stored_endpoints)
+        self.assertEqual(guard.admit("svc", "/b"), "/b")
+        self.assertEqual(guard.admit("svc", "/c"), OTHER_ENDPOINT)
+        self.assertEqual(guard.admit("other", "/c"), "/c")
+
+    def test_lookups_stop_once_the_service_is_full(self):
+        guard = CardinalityGuard(limit=3, known=stored_endpoints)
+        with self.assertNumQueries(1):
+            self.assertEqual(guard.admit("svc", "/c"), "/c")
+        with self.assertNumQueries(0):
+            self.assertEqual(guard.admit("svc", "/d"), OTHER_ENDPOINT)
+            self.assertEqual(guard.admit("svc", "/a"), "/a")
+
+
+@override_settings(
+    APM_INGEST_ENDPOINT_NORMALIZE=True,
+    APM_INGEST_ENDPOINT_MAX_PER_SERVICE=2,
+    APM_INGEST_ENDPOINT_KEEP_RAW=True,
+)
+class NormalizedIngestTests(APITestCase):
+    def setUp(self):
+        patcher = mock.patch.object(endpoints_module, "_normalizer", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_ingest_stores_templates_and_folds_overflow(self):
+        events = [
+            *make_events(3, endpoint="/orders/1"),
+            *make_events(1, trace_id_prefix="u", endpoint="/orders/2/cancel"),
+            *make_events(1, trace_id_prefix="v", endpoint="/carts/9"),
+        ]
+        res = post_ingest(self.client, events)
+        self.assertEqual(res.status_code, 200, res.data)
+
+        counts = {
+            ep: ApiRequest.objects.filter(endpoint=ep).count()
+            for ep in ApiRequest.objects.values_list("endpoint", flat=True).distinct()
+        }
+        self.assertEqual(counts, {"/orders/{id}": 3, "/orders/{id}/cancel": 1, OTHER_ENDPOINT: 1})
+        folded = ApiRequest.objects.get(endpoint=OTHER_ENDPOINT)
+        self.assertEqual(folded.tags["raw_endpoint"], "/carts/9")
@@ -0,0 +1,132 @@
+# observability/tests/test_ingest_fast_validation.py
+from __future__ import annotations
+
+from datetime import UTC, datetime
+
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from observability.ingest import row_as_dict, validate_events, validate_events_with_serializer
+from observability.models import ApiRequest
+from observability.tests.utils import make_event, make_events, post_ingest
+
+
+def _mixed_payload() -> list:
+    return [
+        make_event(trace_id="ok-1"),
+        make_event(trace_id="bad-status", status_code=700),
+        make_event(trace_id="bad-method", method="NOPE"),
+        make_event(trace_id="blank-service", service="   "),
+        make_event(trace_id="neg-latency", latency_ms=-1),
+        make_event(trace_id="null-tags", tags=None),
+        make_event(trace_id="list-tags", tags=[1]),
+        make_event(trace_id="bool-status", status_code=True),
+        make_event(trace_id="bad-time", time="yesterday"),
+        make_event(trace_id="long-service", service="x" * 101),
+        {"service": "only-service"},
+        "oops",
+        # Coerced by DRF: must still be accepted by the fast path
+        make_event(trace_id="str-status", status_code="201"),
+        make_event(trace_id=" padded ", service="  svc  "),
+    ]
+
+
+class FastValidatorParityTests(TestCase):
+    def test_same_rows_and_errors_as_serializer_loop(self):
+        payload = _mixed_payload()
+
+        fast = validate_events(payload, max_errors=100)
+        slow = validate_events_with_serializer(payload, max_errors=100)
+
+        self.assertEqual(fast.invalid, slow.invalid)
+        self.assertEqual(fast.errors, slow.errors)
+        self.assertEqual(fast.rows, slow.rows)
+
+    def test_nul_and_surrogates_rejected_like_serializer(self):
+        payload = [
+            make_event(trace_id="nul-service", service="a\x00b"),
+            make_event(trace_id="surrogate-endpoint", endpoint="/\ud800"),
+            make_event(trace_id="nul\x00trace"),
+            make_event(user_ref="\udfff"),
+            make_event(trace_id="ok"),
+        ]
+
+        fast = validate_events(payload, max_errors=100)
+        slow = validate_events_with_serializer(payload, max_errors=100)
+
+        self.assertEqual(fast.invalid, 4)
+        self.assertEqual(fast.errors, slow.errors)
+        self.assertEqual(fast.rows, slow.rows)
+
+    @override_settings(TIME_ZONE="Europe/Paris")
+    def test_naive_times_read_in_time_zone_like_serializer(self):
+        payload = [
+            make_event(trace_id="naive", time="2025-01-01T10:00:00"),
+            make_event(trace_id="naive-dst-gap", time="2025-03-30T02:30:00"),
+            make_event(trace_id="naive-bad", time="2025-01-01T10:00:00", status_code=700),
+            make_event(trace_id="aware", time="2025-01-01T10:00:00Z"),
+        ]
+
+        fast = validate_events(payload, max_errors=100)
+        slow = validate_events_with_serializer(payload, max_errors=100)
+
+        self.assertEqual(fast.invalid, slow.invalid)
+        self.assertEqual(fast.errors, slow.errors)
+        self.assertEqual(fast.rows, slow.rows)
+        times = {row_as_dict(r)["trace_id"]: row_as_dict(r)["time"] for r in fast.rows}
+        self.assertEqual(times["naive"], datetime(2025, 1, 1, 9, 0, tzinfo=UTC))
+        self.assertEqual(times["aware"], datetime(2025, 1, 1, 10, 0, tzinfo=UTC))
+
+    def test_max_errors_caps_details_not_invalid_count(self):
+        payload = make_events(2) + [make_event(status_code=700) for _ in range(5)]
+
+        result = validate_events(payload, max_errors=2)
+
+        self.assertEqual(len(result.rows), 2)
+        self.assertEqual(result.invalid, 5)
+        self.assertEqual([e["index"] for e in result.errors], [2, 3])
+
+    def test_start_index_offsets_error_indexes(self):
+        result = validate_events(["oops"], max_errors=5, start_index=1000)
+        self.assertEqual(result.errors[0]["index"], 1000)
+
+    def test_epoch_timestamps_are_accepted(self):
+        seconds = make_event(time=1_765_706_400)
+        millis = make_event(time=1_765_706_400_000)
+
+        result = validate_events([seconds, millis], max_errors=5)
+
+        self.assertEqual(result.invalid, 0)
+        expected = datetime(2025, 12, 14, 10, 0, tzinfo=UTC)
+        self.assertEqual([row_as_dict(r)["time"] for r in result.rows], [expected, expected])
+
+    def test_epoch_time_kept_when_row_fails_elsewhere(self):
+        result = validate_events([make_event(time=1_765_706_400, status_code=700)], max_errors=5)
+
+        self.assertEqual(result.invalid, 1)
+        self.assertEqual(set(result.errors[0]["errors"]), {"status_code"})
+
+
+class FastValidationIngestTests(APITestCase):
+    INGEST_URL = "/api/requests/ingest/"
+
+    def _assert_mixed_ingest(self):
+        res = post_ingest(self.client, _mixed_payload(), ingest_url=self.INGEST_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK, res.data)
+        self.assertEqual(res.data["inserted"], 3)
+        self.assertEqual(res.data["rejected"], 11)
+        self.assertEqual(ApiRequest.objects.count(), 3)
+
+        padded = ApiRequest.objects.get(trace_id="padded")
+        self.assertEqual(padded.service, "svc")
+        return res.data
+
+    def test_fast_and_serializer_paths_return_same_response(self):
+        fast = self._assert_mixed_ingest()
+
+        ApiRequest.objects.all().delete()
+        with override_settings(APM_INGEST_FAST_VALIDATION=False):
+            slow = self._assert_mixed_ingest()
+
+        self.assertEqual(fast, slow)
@@ -0,0 +1,167 @@
+# observability/tests/test_ingest_idempotency.py
+from __future__ import annotations
+
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+from rest_framework.test import APITestCase
+
+from observability.checks import check_idempotency_cache
+from observability.ingest import dedup as dedup_module
+from observability.ingest import validate_events, write_rows
+from observability.ingest.dedup import RotatingBloomFilter
+from observability.ingest.idempotency import REPLAYED_HEADER, get_idempotency_ledger
+from observability.models import ApiRequest
+
+from .utils import DEFAULT_INGEST_URL, make_event, make_events, post_ingest
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class RotatingBloomFilterTests(SimpleTestCase):
+    def _rows(self, events):
+        return validate_events(events, max_errors=10).rows
+
+    def test_drops_remembered_and_in_batch_repeats(self):
+        f = RotatingBloomFilter(window=60, capacity=1000, error_rate=0.001)
+        rows = self._rows(make_events(4))
+
+        kept, digests, dups = f.split(rows + rows[:1])
+        self.assertEqual((len(kept), len(digests), dups), (4, 4, 1))
+
+        # Not remembered yet: a failed write must not poison retries.
+        self.assertEqual(f.split(rows)[2], 0)
+
+        f.remember(digests)
+        kept, digests, dups = f.split(rows)
+        self.assertEqual((kept, digests, dups), ([], [], 4))
+
+    def test_rows_without_trace_id_are_never_duplicates(self):
+        f = RotatingBloomFilter(window=60, capacity=100, error_rate=0.01)
+        rows = self._rows([make_event(trace_id=None)] * 3)
+        kept, digests, dups = f.split(rows)
+        self.assertEqual((len(kept), digests, dups), (3, [], 0))
+
+    def test_generations_expire_after_two_windows(self):
+        clock = _Clock()
+        f = RotatingBloomFilter(window=10, capacity=100, error_rate=0.01, clock=clock)
+        rows = self._rows(make_events(2))
+        f.remember(f.split(rows)[1])
+
+        clock.now = 15  # rotated once: still in the previous generation
+        self.assertEqual(f.split(rows)[2], 2)
+        clock.now = 26  # rotated twice: forgotten
+        self.assertEqual(f.split(rows)[2], 0)
+
+
+class IdempotentIngestTests(APITestCase):
+    def setUp(self):
+        caches["default"].clear()
+
+    def _post(self, events, key):
+        return self.client.post(
+            DEFAULT_INGEST_URL, data=events, format="json", headers={"Idempotency-Key": key}
+        )
+
+    def test_retry_with_same_key_replays_response(self):
+        events = make_events(3)
+        first = self._post(events, "batch-1")
+        second = self._post(events, "batch-1")
+
+        self.assertEqual(first.status_code, 200, first.data)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second[REPLAYED_HEADER], "true")
+        self.assertNotIn(REPLAYED_HEADER, first)
+        self.assertEqual(ApiRequest.objects.count(), 3)
+
+    def test_key_in_flight_returns_409(self):
+        get_idempotency_ledger().begin("batch-2")
+        res = self._post(make_events(2), "batch-2")
+        self.assertEqual(res.status_code, 409)
+        self.assertIn("Retry-After", res)
+        self.assertEqual(ApiRequest.objects.count(), 0)
+
+    def test_failed_attempt_releases_key(self):
+        with mock.patch("observability.views.write_rows", side_effect=RuntimeError("down")):
+            with self.assertRaises(RuntimeError):
+                self._post(make_events(2), "batch-3")
+
+        res = self._post(make_events(2), "batch-3")
+        self.assertEqual(res.status_code, 200, res.data)
+        self.assertEqual(ApiRequest.objects.count(), 2)
+
+    def test_failure_after_a_committed_chunk_keeps_key(self):
+        calls = []
+
+        def flaky(rows, **kwargs):
+            calls.append(len(rows))
+            if len(calls) == 2:
+                raise RuntimeError("primary went away")
+            return write_rows(rows, **kwargs)
+
+        url = f"{DEFAULT_INGEST_URL}?batch_size=2"
+        headers = {"Idempotency-Key": "batch-4"}
+        with mock.patch("observability.views.write_rows", side_effect=flaky):
+            with self.assertRaises(RuntimeError):
+                self.client.post(url, data=make_events(4), format="json", headers=headers)
+
+        res = self.client.post(url, data=make_events(4), format="json", headers=headers)
+        self.assertEqual(res.status_code, 500)
+        self.assertEqual(res[REPLAYED_HEADER], "true")
+        self.assertEqual(res.data["inserted"], 2)
+        self.assertEqual(ApiRequest.objects.count(), 2)
+
+    def test_overlong_key_rejected(self):
+        res = self._post(make_events(1), "k" * 256)
+        self.assertEqual(res.status_code, 400)
+
+    def test_process_local_cache_is_flagged(self):
+        self.assertEqual([w.id for w in check_idempotency_cache()], ["observability.W001"])
+
+        shared = {
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+            "ledger": {
+                "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+                "LOCATION": "apm_cache",
+            },
+        }
+        with override_settings(CACHES=shared, APM_INGEST_IDEMPOTENCY_CACHE="ledger"):
+            self.assertEqual(check_idempotency_cache(), [])
+
+
+@override_settings(APM_INGEST_DEDUP=True)
+class DedupIngestTests(APITestCase):
+    def setUp(self):
+        patcher = mock.patch.object(dedup_module, "_filter", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_resent_events_are_dropped(self):
+        events = make_events(4)
+        first = post_ingest(self.client, events)
+        self.assertEqual(first.data["inserted"], 4)
+        self.assertEqual(first.data["duplicates"], 0)
+
+        second = post_ingest(self.client, events + make_events(1, trace_id_prefix="new"))
+        self.assertEqual(second.status_code, 200, second.data)
+        self.assertEqual(second.data["inserted"], 1)
+        self.assertEqual(second.data["duplicates"], 4)
+        self.assertEqual(second.data["rejected"], 0)
+        self.assertEqual(ApiRequest.objects.count(), 5)
+
+    def test_strict_rejected_batch_is_not_remembered(self):
+        events = make_events(3)
+        res = post_ingest(self.client, events + [make_event(status_code=42)], strict=True)
+        self.assertEqual(res.status_code, 400)
+
+        res = post_ingest(self.client, events, strict=True)
+        self.assertEqual(res.data["inserted"], 3)
+        self.assertEqual(res.data["duplicates"], 0)
@@ -0,0 +1,132 @@
+# observability/tests/test_ingest_ndjson.py
+from __future__ import annotations
+
+import io
+import json
+from unittest import mock
+
+from django.test import SimpleTestCase
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from observability.ingest import InvalidEvent
+from observability.ingest.ndjson import iter_ndjson
+from observability.models import ApiRequest
+from observability.tests.utils import make_event, make_events, post_ingest_ndjson
+
+
+class _CountingStream(io.BytesIO):
+    def __init__(self, data: bytes):
+        super().__init__(data)
+        self.reads = 0
+
+    def read(self, size=-1):
+        self.reads += 1
+        return super().read(size)
+
+
+class IterNdjsonTests(SimpleTestCase):
+    def test_decodes_lines_lazily_across_read_boundaries(self):
+        body = b"\n".join(json.dumps({"n": i}).encode() for i in range(50)) + b"\n"
+        stream = _CountingStream(body)
+
+        it = iter_ndjson(stream, read_size=16)
+        self.assertEqual(next(it), {"n": 0})
+        self.assertLess(stream.reads, 3)
+
+        self.assertEqual([item["n"] for item in it], list(range(1, 50)))
+
+    def test_blank_lines_skipped_and_last_line_without_newline(self):
+        items = list(iter_ndjson(io.BytesIO(b'{"a": 1}\r\n\n  \n{"a": 2}')))
+        self.assertEqual(items, [{"a": 1}, {"a": 2}])
+
+    def test_bad_and_oversized_lines_become_invalid_events(self):
+        body = b'{"a": 1}\n{broken\n' + b'"' + b"x" * 100 + b'"\n{"a": 2}\n'
+        items = list(iter_ndjson(io.BytesIO(body), read_size=8, max_line_bytes=32))
+
+        self.assertEqual(items[0], {"a": 1})
+        self.assertIsInstance(items[1], InvalidEvent)
+        self.assertIsInstance(items[2], InvalidEvent)
+        self.assertIn("exceeds", items[2].errors["non_field_errors"][0])
+        self.assertEqual(items[3], {"a": 2})
+        self.assertEqual(len(items), 4)
+
+
+class NdjsonIngestTests(APITestCase):
+    INGEST_URL = "/api/requests/ingest/"
+
+    def test_valid_stream_is_inserted(self):
+        res = post_ingest_ndjson(self.client, make_events(7, trace_id_prefix="nd-"), batch_size=3)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK, res.data)
+        self.assertEqual(res.data, {"inserted": 7, "rejected": 0, "errors": []})
+        self.assertEqual(ApiRequest.objects.count(), 7)
+
+    def test_invalid_lines_reported_with_global_index(self):
+        payload = make_events(4, trace_id_prefix="nd-") + [
+            "{not json",
+            make_event(status_code=700),
+            "[1, 2]",
+        ]
+
+        res = post_ingest_ndjson(self.client, payload, batch_size=2)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK, res.data)
+        self.assertEqual(res.data["inserted"], 4)
+        self.assertEqual(res.data["rejected"], 3)
+        self.assertEqual([e["index"] for e in res.data["errors"]], [4, 5, 6])
+        self.assertIn("Invalid JSON line", res.data["errors"][0]["errors"]["non_field_errors"][0])
+        self.assertEqual(ApiRequest.objects.count(), 4)
+
+    def test_validation_sees_at_most_batch_size_events(self):
+        from observability.ingest import validate_events
+
+        seen: list[int] = []
+
+        def spy(events, **kwargs):
+            seen.append(len(events))
+            return validate_events(events, **kwargs)
+
+        with mock.patch("observability.views.validate_events", side_effect=spy):
+            res = post_ingest_ndjson(self.client, make_events(10), batch_size=4)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK, res.data)
+        self.assertEqual(seen, [4, 4, 2])
+
+    def test_strict_mode_rolls_back_earlier_chunks(self):
+        payload = make_events(5) + [make_event(status_code=700)] + make_events(2)
+
+        res = post_ingest_ndjson(self.client, payload, batch_size=2, strict="true")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST, res.data)
+        self.assertEqual(res.data["inserted"], 0)
+        self.assertEqual(res.data["rejected"], 8)
+        self.assertEqual(res.data["errors"][0]["index"], 5)
+        self.assertEqual(ApiRequest.objects.count(), 0)
+
+    def test_too_many_events_returns_413_with_committed_chunks(self):
+        # Non-strict ingest commits per chunk: the first chunk is already in.
+        res = post_ingest_ndjson(self.client, make_events(5), max_events=3, batch_size=2)
+
+        self.assertEqual(res.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, res.data)
+        self.assertEqual(res.data["max_events"], 3)
+        self.assertEqual(res.data["inserted"], 2)
+        self.assertEqual(ApiRequest.objects.count(), 2)
+
+    def test_too_many_events_in_strict_mode_inserts_nothing(self):
+        res = post_ingest_ndjson(
+            self.client, make_events(5), max_events=3, batch_size=2, strict="true"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, res.data)
+        self.assertEqual(res.data["inserted"], 0)
+        self.assertEqual(ApiRequest.objects.count(), 0)
+
+    def test_max_errors_cap_applies_across_chunks(self):
+        payload = [make_event(status_code=700) for _ in range(6)]
+
+        res = post_ingest_ndjson(self.client, payload, batch_size=2, max_errors=3)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK, res.data)
+        self.assertEqual(res.data["rejected"], 6)
+        self.assertEqual([e["index"] for e in res.data["errors"]], [0, 1, 2])
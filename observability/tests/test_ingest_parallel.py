@@ -0,0 +1,121 @@
+# observability/tests/test_ingest_parallel.py
+from __future__ import annotations
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from unittest import mock
+
+import django
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from observability.ingest import validate_events
+from observability.ingest.ndjson import iter_chunks
+from observability.ingest.parallel import iter_validated, iter_validated_parallel
+from observability.models import ApiRequest
+from observability.views import ApiRequestViewSet
+
+from .utils import make_event, make_events, post_ingest
+
+
+def _mixed_payload(n: int) -> list:
+    events = make_events(n)
+    for i in range(3, n, 7):
+        events[i] = make_event(trace_id=f"bad-{i}", status_code=700)
+    events[5] = "not-a-dict"
+    return events
+
+
+class ParallelValidationTests(APITestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.pool = ProcessPoolExecutor(
+            max_workers=2,
+            mp_context=multiprocessing.get_context("forkserver"),
+            initializer=django.setup,
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.shutdown(cancel_futures=True)
+        super().tearDownClass()
+
+    def _collect(self, results, max_errors):
+        rows, errors, invalid, sizes = [], [], 0, []
+        for size, result in results:
+            sizes.append(size)
+            rows.extend(result.rows)
+            errors.extend(result.errors[: max_errors - len(errors)])
+            invalid += result.invalid
+        return rows, errors, invalid, sizes
+
+    def test_matches_serial_validation(self):
+        events = _mixed_payload(60)
+        serial = self._collect(
+            iter_validated(iter_chunks(events, 8), validate_events, max_errors=4), 4
+        )
+        parallel = self._collect(
+            iter_validated_parallel(
+                iter_chunks(events, 8),
+                validate_events,
+                max_errors=4,
+                executor=self.pool,
+                window=3,
+            ),
+            4,
+        )
+        self.assertEqual(parallel, serial)
+
+        rows, errors, invalid, sizes = parallel
+        self.assertEqual(sizes, [8] * 7 + [4])
+        self.assertEqual([e["index"] for e in errors], [3, 5, 10, 17])
+        self.assertEqual(invalid, 10)
+        self.assertEqual(len(rows), 50)
+
+    @override_settings(
+        APM_INGEST_VALIDATION_WORKERS=2,
+        APM_INGEST_PARALLEL_THRESHOLD=20,
+        APM_INGEST_PARALLEL_SHARD_SIZE=6,
+    )
+    def test_ingest_view_uses_pool_above_threshold(self):
+        with mock.patch(
+            "observability.ingest.parallel.get_validation_pool", return_value=self.pool
+        ) as get_pool:
+            small = post_ingest(self.client, make_events(5, trace_id_prefix="s"))
+            self.assertEqual(small.status_code, 200)
+            get_pool.assert_not_called()
+
+            res = post_ingest(self.client, _mixed_payload(30))
+            get_pool.assert_called_once()
+
+        self.assertEqual(res.status_code, 200, res.data)
+        self.assertEqual(res.data["inserted"], 25)
+        self.assertEqual(res.data["rejected"], 5)
+        self.assertEqual([e["index"] for e in res.data["errors"]], [3, 5, 10, 17, 24])
+        self.assertEqual(ApiRequest.objects.count(), 30)
+
+    @override_settings(APM_INGEST_VALIDATION_WORKERS=2, APM_INGEST_PARALLEL_SHARD_SIZE=6)
+    def test_shard_size_and_pool_use_one_decision(self):
+        with (
+            mock.patch(
+                "observability.ingest.parallel.get_validation_pool", return_value=self.pool
+            ) as get_pool,
+            mock.patch.object(
+                ApiRequestViewSet, "_use_parallel", side_effect=[True, False]
+            ) as use_parallel,
+        ):
+            res = post_ingest(self.client, make_events(12), batch_size=100)
+
+        self.assertEqual(res.status_code, 200, res.data)
+        use_parallel.assert_called_once()
+        get_pool.assert_called_once()
+
+    @override_settings(APM_INGEST_VALIDATION_WORKERS=2, APM_INGEST_PARALLEL_SHARD_SIZE=6)
+    def test_parallel_strict_rolls_back(self):
+        with mock.patch(
+            "observability.ingest.parallel.get_validation_pool", return_value=self.pool
+        ):
+            res = post_ingest(self.client, _mixed_payload(30), strict=True, parallel="true")
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(ApiRequest.objects.count(), 0)
@@ -0,0 +1,123 @@
+# observability/tests/test_ingest_pipeline.py
+from __future__ import annotations
+
+import time
+from unittest import mock
+
+from django.db import connection
+from django.test import SimpleTestCase
+from rest_framework.test import APITestCase
+
+from observability.ingest import write_rows
+from observability.ingest.pipeline import prefetch
+from observability.models import ApiRequest
+
+from .utils import make_event, make_events, post_ingest
+
+
+class PrefetchTests(SimpleTestCase):
+    def test_preserves_order(self):
+        self.assertEqual(list(prefetch(range(50), depth=3)), list(range(50)))
+
+    def test_producer_runs_at_most_depth_ahead(self):
+        produced = []
+
+        def items():
+            for i in range(10):
+                produced.append(i)
+                yield i
+
+        it = prefetch(items(), depth=2)
+        self.assertEqual(next(it), 0)
+        time.sleep(0.2)
+        # one consumed + two queued + one blocked in put()
+        self.assertLessEqual(len(produced), 4)
+        self.assertEqual(list(it), list(range(1, 10)))
+
+    def test_producer_errors_reach_the_consumer(self):
+        def items():
+            yield 1
+            raise ValueError("boom")
+
+        it = prefetch(items())
+        self.assertEqual(next(it), 1)
+        with self.assertRaisesMessage(ValueError, "boom"):
+            next(it)
+
+    def test_early_exit_stops_and_closes_the_source(self):
+        produced = []
+        closed = []
+
+        def items():
+            try:
+                for i in range(100):
+                    time.sleep(0.01)
+                    produced.append(i)
+                    yield i
+            finally:
+                closed.append(True)
+
+        it = prefetch(items(), depth=1)
+        self.assertEqual(next(it), 0)
+        it.close()
+
+        self.assertEqual(closed, [True])
+        seen = len(produced)
+        time.sleep(0.1)
+        self.assertEqual(len(produced), seen)
+        self.assertLess(seen, 100)
+
+
+def _stage_tables() -> list[str]:
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            cursor.execute("SELECT name FROM sqlite_temp_master WHERE type = 'table'")
+        else:
+            cursor.execute("SELECT tablename FROM pg_tables WHERE schemaname LIKE 'pg_temp%%'")
+        return [r[0] for r in cursor.fetchall() if r[0].startswith("apm_ingest_stage_")]
+
+
+class PipelinedIngestTests(APITestCase):
+    def test_json_payload_is_written_chunk_by_chunk(self):
+        with mock.patch("observability.views.write_rows", wraps=write_rows) as spy:
+            res = post_ingest(self.client, make_events(7), batch_size=3)
+
+        self.assertEqual(res.status_code, 200, res.data)
+        self.assertEqual(res.data["inserted"], 7)
+        self.assertEqual([len(c.args[0]) for c in spy.call_args_list], [3, 3, 1])
+
+    def test_non_strict_commits_each_chunk(self):
+        calls = []
+
+        def flaky(rows, **kwargs):
+            calls.append(len(rows))
+            if len(calls) == 2:
+                raise RuntimeError("primary went away")
+            return write_rows(rows, **kwargs)
+
+        with mock.patch("observability.views.write_rows", side_effect=flaky):
+            with self.assertRaises(RuntimeError):
+                post_ingest(self.client, make_events(6), batch_size=2)
+
+        self.assertEqual(ApiRequest.objects.count(), 2)
+
+    def test_strict_valid_payload_published_from_staging(self):
+        with mock.patch("observability.views.write_rows", wraps=write_rows) as spy:
+            res = post_ingest(self.client, make_events(5), strict=True, batch_size=2)
+
+        self.assertEqual(res.status_code, 200, res.data)
+        self.assertEqual(res.data["inserted"], 5)
+        self.assertEqual(ApiRequest.objects.count(), 5)
+        self.assertTrue(
+            all(c.kwargs["table"].startswith("apm_ingest_stage_") for c in spy.call_args_list)
+        )
+        self.assertEqual(_stage_tables(), [])
+
+    def test_strict_invalid_late_chunk_inserts_nothing(self):
+        events = make_events(5) + [make_event(status_code=42)]
+        res = post_ingest(self.client, events, strict=True, batch_size=2)
+
+        self.assertEqual(res.status_code, 400, res.data)
+        self.assertEqual(res.data["errors"][0]["index"], 5)
+        self.assertEqual(ApiRequest.objects.count(), 0)
+        self.assertEqual(_stage_tables(), [])
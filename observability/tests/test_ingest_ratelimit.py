@@ -0,0 +1,173 @@
+# observability/tests/test_ingest_ratelimit.py
+from __future__ import annotations
+
+import os
+import tempfile
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+from rest_framework.test import APITestCase
+
+from observability.ingest import dedup as dedup_module
+from observability.ingest import ratelimit as ratelimit_module
+from observability.ingest import validate_events
+from observability.ingest.idempotency import REPLAYED_HEADER
+from observability.ingest.ratelimit import (
+    GLOBAL_BUCKET,
+    IngestRateLimiter,
+    MemoryBucketStore,
+    SQLiteBucketStore,
+    parse_service_rates,
+)
+from observability.models import ApiRequest
+
+from .utils import DEFAULT_INGEST_URL, make_events, post_ingest
+
+
+class _Clock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def _rows(n: int, service: str = "billing"):
+    return validate_events(make_events(n, service=service), max_errors=1).rows
+
+
+class TokenBucketTests(SimpleTestCase):
+    def test_refills_at_rate_and_reports_retry_after(self):
+        clock = _Clock()
+        limiter = IngestRateLimiter(MemoryBucketStore(clock), service_rate=10, burst_seconds=1)
+        self.assertTrue(limiter.admit(_rows(10)).allowed)
+
+        denied = limiter.admit(_rows(5))
+        self.assertFalse(denied.allowed)
+        self.assertEqual(denied.bucket, "billing")
+        self.assertAlmostEqual(denied.retry_after, 0.5)
+
+        clock.now += 0.5
+        self.assertTrue(limiter.admit(_rows(5)).allowed)
+
+    def test_services_have_separate_buckets(self):
+        limiter = IngestRateLimiter(
+            MemoryBucketStore(_Clock()),
+            service_rate=5,
+            service_rates={"search": 50},
+            burst_seconds=1,
+        )
+        self.assertTrue(limiter.admit(_rows(5)).allowed)
+        self.assertFalse(limiter.admit(_rows(1)).allowed)
+        self.assertTrue(limiter.admit(_rows(40, service="search")).allowed)
+
+    def test_refusal_debits_nothing(self):
+        limiter = IngestRateLimiter(
+            MemoryBucketStore(_Clock()),
+            global_rate=100,
+            service_rate=5,
+            service_rates={"other": 1000},
+            burst_seconds=1,
+        )
+        self.assertTrue(limiter.admit(_rows(3) + _rows(3, service="search")).allowed)
+        self.assertEqual(limiter.admit(_rows(3)).bucket, "billing")
+        # The global bucket was not charged for the refused chunk: 94 tokens left.
+        self.assertTrue(limiter.admit(_rows(94, service="other")).allowed)
+        self.assertEqual(limiter.admit(_rows(1, service="other")).bucket, GLOBAL_BUCKET)
+
+    def test_chunk_larger_than_burst_waits_for_full_bucket(self):
+        clock = _Clock()
+        limiter = IngestRateLimiter(MemoryBucketStore(clock), global_rate=10, burst_seconds=1)
+        self.assertTrue(limiter.admit(_rows(30)).allowed)  # goes 20 into debt
+        self.assertAlmostEqual(limiter.admit(_rows(1)).retry_after, 2.1)
+
+    def test_sqlite_store_is_shared_between_instances(self):
+        fd, path = tempfile.mkstemp(suffix=".sqlite3")
+        os.close(fd)
+        self.addCleanup(os.unlink, path)
+
+        clock = _Clock()
+        a = IngestRateLimiter(SQLiteBucketStore(path, clock), global_rate=10, burst_seconds=1)
+        b = IngestRateLimiter(SQLiteBucketStore(path, clock), global_rate=10, burst_seconds=1)
+        self.assertTrue(a.admit(_rows(8)).allowed)
+        self.assertFalse(b.admit(_rows(8)).allowed)
+        clock.now += 1
+        self.assertTrue(b.admit(_rows(8)).allowed)
+
+    def test_parse_service_rates(self):
+        self.assertEqual(
+            parse_service_rates(" billing=500, search=2.5,,bad"),
+            {"billing": 500.0, "search": 2.5},
+        )
+
+
+@override_settings(
+    APM_INGEST_RATE_LIMIT=True,
+    APM_INGEST_RATE_LIMIT_STORE="memory",
+    APM_INGEST_RATE_PER_SERVICE=5,
+    APM_INGEST_RATE_GLOBAL=0,
+    APM_INGEST_RATE_BURST_SECONDS=1,
+)
+class RateLimitedIngestTests(APITestCase):
+    def setUp(self):
+        patcher = mock.patch.object(ratelimit_module, "_limiter", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_over_limit_returns_429_with_retry_after(self):
+        ok = post_ingest(self.client, make_events(5))
+        self.assertEqual(ok.status_code, 200, ok.data)
+
+        res = post_ingest(self.client, make_events(3, trace_id_prefix="x"))
+        self.assertEqual(res.status_code, 429, res.data)
+        self.assertEqual(res["Retry-After"], "1")
+        self.assertEqual(res.data["rejected"], 3)
+        self.assertEqual(ApiRequest.objects.count(), 5)
+
+    def test_other_services_are_not_starved(self):
+        post_ingest(self.client, make_events(5))
+        res = post_ingest(self.client, make_events(5, service="search", trace_id_prefix="s"))
+        self.assertEqual(res.status_code, 200, res.data)
+
+    def test_limit_hit_mid_payload_keeps_committed_chunks(self):
+        res = post_ingest(self.client, make_events(8), batch_size=4)
+        self.assertEqual(res.status_code, 429, res.data)
+        self.assertEqual(res.data["inserted"], 4)
+        self.assertEqual(res.data["rejected"], 4)
+        self.assertEqual(ApiRequest.objects.count(), 4)
+
+    def test_async_limit_counts_accepted_rows(self):
+        with mock.patch("observability.views.get_ingest_buffer") as get_buffer:
+            res = post_ingest(self.client, make_events(8), batch_size=4, **{"async": "true"})
+        self.assertEqual(res.status_code, 429, res.data)
+        self.assertEqual((res.data["accepted"], res.data["rejected"]), (4, 4))
+        self.assertEqual(get_buffer.return_value.submit.call_count, 1)
+
+    @override_settings(APM_INGEST_DEDUP=True)
+    def test_limit_does_not_reject_dropped_duplicates(self):
+        with mock.patch.object(dedup_module, "_filter", None):
+            events = make_events(4)
+            post_ingest(self.client, events)
+            res = post_ingest(
+                self.client, events + make_events(4, trace_id_prefix="n"), batch_size=4
+            )
+        self.assertEqual(res.status_code, 429, res.data)
+        self.assertEqual((res.data["inserted"], res.data["rejected"]), (0, 4))
+        self.assertEqual(ApiRequest.objects.count(), 4)
+
+    def test_partial_429_is_stored_under_the_idempotency_key(self):
+        caches["default"].clear()
+        url = f"{DEFAULT_INGEST_URL}?batch_size=4"
+        headers = {"Idempotency-Key": "partial-1"}
+        events = make_events(8)
+
+        first = self.client.post(url, data=events, format="json", headers=headers)
+        self.assertEqual(first.status_code, 429, first.data)
+        self.assertEqual(first.data["inserted"], 4)
+
+        retry = self.client.post(url, data=events, format="json", headers=headers)
+        self.assertEqual(retry.status_code, 429)
+        self.assertEqual(retry[REPLAYED_HEADER], "true")
+        self.assertEqual(retry.data["inserted"], 4)
+        self.assertEqual(ApiRequest.objects.count(), 4)
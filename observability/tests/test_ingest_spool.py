@@ -0,0 +1,162 @@
+# observability/tests/test_ingest_spool.py
+from __future__ import annotations
+
+import io
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.management import call_command
+from django.db.utils import OperationalError
+from django.test import SimpleTestCase, override_settings
+from rest_framework.test import APITestCase
+
+from observability.ingest import dedup as dedup_module
+from observability.ingest import spool as spool_module
+from observability.ingest import validate_events
+from observability.ingest.spool import CORRUPT_SUFFIX, Spool, iter_records
+from observability.models import ApiRequest
+
+from .utils import make_events, post_ingest
+
+
+def _rows(n: int, prefix: str = "t"):
+    return validate_events(make_events(n, trace_id_prefix=prefix), max_errors=1).rows
+
+
+class _TempDirMixin:
+    def setUp(self):
+        super().setUp()
+        self.dir = tempfile.mkdtemp(prefix="apm-spool-test-")
+        self.addCleanup(shutil.rmtree, self.dir, True)
+
+
+class SpoolFileTests(_TempDirMixin, SimpleTestCase):
+    def test_records_round_trip(self):
+        spool = Spool(self.dir, fsync=False)
+        rows = _rows(3)
+        spool.append(rows)
+        spool.append(_rows(2, prefix="u"))
+        spool.rotate()
+
+        [segment] = spool.segments()
+        records = list(iter_records(segment))
+        self.assertEqual(len(records), 2)
+        self.assertEqual(records[0].rows(), rows)
+        self.assertEqual(records[1].offset, records[0].end)
+
+        [info] = spool.inspect()
+        self.assertEqual((info.records, info.rows, info.corrupt_tail), (2, 5, False))
+
+    def test_replay_in_order_and_removes_segments(self):
+        spool = Spool(self.dir, fsync=False, segment_seconds=0)  # one segment per append
+        spool.append(_rows(2, prefix="a"))
+        spool.append(_rows(2, prefix="b"))
+        spool.rotate()
+        self.assertEqual(len(spool.segments()), 2)
+
+        written = []
+        result = spool.replay(writer=lambda rows: written.extend(r[6] for r in rows))
+        self.assertEqual(written, ["a1", "a2", "b1", "b2"])
+        self.assertEqual((result.rows, result.records, result.segments), (4, 2, 2))
+        self.assertEqual(os.listdir(self.dir), [])
+        self.assertEqual(spool.stats(), (0, None))
+
+    def test_failed_replay_resumes_after_last_written_record(self):
+        spool = Spool(self.dir, fsync=False)
+        for prefix in "abc":
+            spool.append(_rows(1, prefix=prefix))
+        spool.rotate()
+
+        written = []
+
+        def flaky(rows):
+            if len(written) == 1:
+                raise OperationalError("primary went away")
+            written.extend(r[6] for r in rows)
+
+        with self.assertRaises(OperationalError):
+            spool.replay(writer=flaky)
+        spool.replay(writer=lambda rows: written.extend(r[6] for r in rows))
+        self.assertEqual(written, ["a1", "b1", "c1"])
+
+    def test_active_segment_is_skipped_until_rotated(self):
+        spool = Spool(self.dir, fsync=False)
+        spool.append(_rows(2))
+        written = []
+        self.assertEqual(spool.replay(writer=written.extend).rows, 0)
+        spool.rotate()
+        self.assertEqual(spool.replay(writer=written.extend).rows, 2)
+
+    def test_torn_tail_is_set_aside(self):
+        spool = Spool(self.dir, fsync=False)
+        spool.append(_rows(2))
+        spool.append(_rows(2, prefix="u"))
+        spool.rotate()
+        [segment] = spool.segments()
+        with open(segment, "r+b") as fh:
+            fh.truncate(os.path.getsize(segment) - 5)
+
+        written = []
+        result = spool.replay(writer=written.extend)
+        self.assertEqual(result.rows, 2)
+        self.assertEqual(os.listdir(self.dir), [os.path.basename(segment) + CORRUPT_SUFFIX])
+
+
+class SpooledIngestTests(_TempDirMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        overrides = override_settings(APM_INGEST_SPOOL=True, APM_INGEST_SPOOL_DIR=self.dir)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        # No background replayer: the test drives replay through the command.
+        for patcher in (
+            mock.patch.object(spool_module, "_spool", None),
+            mock.patch.object(spool_module.SpoolReplayer, "start"),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_failed_write_is_spooled_then_replayed(self):
+        with mock.patch(
+            "observability.ingest.spool.write_rows", side_effect=OperationalError("failover")
+        ):
+            res = post_ingest(self.client, make_events(4))
+
+        self.assertEqual(res.status_code, 202, res.data)
+        self.assertEqual((res.data["inserted"], res.data["spooled"]), (0, 4))
+        self.assertEqual(ApiRequest.objects.count(), 0)
+
+        out = io.StringIO()
+        spool_module.get_spool().rotate()
+        call_command("ingest_spool", stdout=out)
+        self.assertIn("4 rows", out.getvalue())
+
+        call_command("ingest_spool", replay=True, stdout=io.StringIO())
+        self.assertEqual(ApiRequest.objects.count(), 4)
+        self.assertEqual(os.listdir(self.dir), [])
+
+    def test_healthy_write_is_not_spooled(self):
+        res = post_ingest(self.client, make_events(2))
+        self.assertEqual(res.status_code, 200, res.data)
+        self.assertEqual(res.data["spooled"], 0)
+        self.assertEqual(os.listdir(self.dir), [])
+
+    @override_settings(APM_INGEST_DEDUP=True)
+    def test_resent_events_are_dropped_with_spool_enabled(self):
+        with mock.patch.object(dedup_module, "_filter", None):
+            events, late = make_events(3), make_events(2, trace_id_prefix="s")
+            first = post_ingest(self.client, events)
+            self.assertEqual((first.data["inserted"], first.data["duplicates"]), (3, 0))
+
+            with mock.patch(
+                "observability.ingest.spool.write_rows", side_effect=OperationalError("failover")
+            ):
+                spooled = post_ingest(self.client, late)
+            self.assertEqual(spooled.data["spooled"], 2)
+
+            again = post_ingest(self.client, events + late)
+        self.assertEqual(again.status_code, 200, again.data)
+        self.assertEqual((again.data["inserted"], again.data["duplicates"]), (0, 5))
+        self.assertEqual(ApiRequest.objects.count(), 3)
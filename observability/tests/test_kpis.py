@@ -67,7 +67,8 @@ class KpisEndpointTests(APITestCase):
         ApiRequest.objects.bulk_create(rows)
 
     def test_kpis_shape_and_plausible_values(self):
-        # method filter typically forces RAW path (so test doesn't depend on caggs existing)
+        # method is a rollup dimension: the default (unaligned) 24h window is stitched
+        # from hourly/minute rollups and raw tails
         res = self.client.get(self.URL, {"service": "svc", "method": "GET"})
         self.assertEqual(res.status_code, status.HTTP_200_OK, res.data)
 
@@ -103,8 +104,8 @@ class KpisEndpointTests(APITestCase):
         self.assertGreaterEqual(float(j["max_latency_ms"]), float(j["p95_latency_ms"]))
         self.assertGreaterEqual(float(j["p95_latency_ms"]), 0.0)
 
-        # method filter => raw is expected in your implementation
-        self.assertEqual(j["source"], "raw")
+        self.assertEqual(j["source"], "stitched")
+        self.assertEqual({span["source"] for span in j["plan"]}, {"raw", "minute", "hourly"})
 
     def test_kpis_bad_date_param_returns_400(self):
         res = self.client.get(self.URL, {"start": "not-a-date"})
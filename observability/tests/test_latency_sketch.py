@@ -0,0 +1,109 @@
+# observability/tests/test_latency_sketch.py
+from __future__ import annotations
+
+import importlib
+import random
+from datetime import UTC, datetime
+
+from django.test import SimpleTestCase
+
+from observability.analytics.sketch import (
+    ZERO_BIN,
+    LatencySketch,
+    latency_bin_sql,
+    latency_value_sql,
+    quantile_field,
+)
+from observability.analytics.sql import (
+    DAILY_LATENCY_CAGG,
+    DIM_TABLE,
+    HOURLY_LATENCY_CAGG,
+    AnalyticsFilters,
+    latency_bins_by_endpoints_sql,
+    latency_bins_sql,
+    latency_percentiles_from_raw_sql,
+    select_latency_source,
+)
+from observability.management.commands.bench_latency_sketch import exact_quantile
+
+
+class LatencySketchTests(SimpleTestCase):
+    def test_quantiles_within_relative_accuracy(self):
+        rng = random.Random(7)
+        values = [int(rng.lognormvariate(5, 1)) + 1 for _ in range(20_000)]
+        sketch = LatencySketch(0.01)
+        for v in values:
+            sketch.add(v)
+
+        ordered = sorted(values)
+        for q, estimate in sketch.quantiles().items():
+            # The sketch targets the order statistic at index floor(q * (n - 1)).
+            exact = ordered[int(q * (len(values) - 1))]
+            self.assertLessEqual(abs(estimate - exact) / exact, 0.01, quantile_field(q))
+            self.assertAlmostEqual(estimate, exact_quantile(ordered, q), delta=exact * 0.02)
+
+    def test_merged_sketches_equal_one_sketch(self):
+        whole, parts = LatencySketch(), [LatencySketch() for _ in range(4)]
+        for i in range(1, 5000):
+            whole.add(i)
+            parts[i % 4].add(i)
+        merged = LatencySketch()
+        for part in parts:
+            merged.merge(part)
+
+        self.assertEqual(merged.bins, whole.bins)
+        self.assertEqual(merged.quantiles(), whole.quantiles())
+
+    def test_zero_latency_and_empty_sketch(self):
+        sketch = LatencySketch()
+        self.assertEqual(sketch.quantile(0.5), None)
+        sketch.add(0, count=3)
+        sketch.add(100)
+        self.assertEqual(sketch.bins[ZERO_BIN], 3)
+        self.assertEqual(sketch.quantile(0.5), 0.0)
+        self.assertAlmostEqual(sketch.quantile(1.0), 100, delta=1)
+
+    def test_from_bins_round_trip(self):
+        sketch = LatencySketch()
+        for v in (1, 5, 5, 80, 1200):
+            sketch.add(v)
+        self.assertEqual(LatencySketch.from_bins(sketch.bins.items()).bins, sketch.bins)
+
+    def test_bin_sql_matches_migration(self):
+        migration = importlib.import_module("observability.migrations.0010_latency_sketch")
+        self.assertEqual(latency_bin_sql(), migration.LATENCY_BIN_SQL)
+
+        migration = importlib.import_module("observability.migrations.0012_rollups_from_dim")
+        self.assertEqual(latency_value_sql("p.p95_bin"), migration.LATENCY_VALUE_SQL)
+
+
+class LatencySqlTests(SimpleTestCase):
+    def test_source_selection(self):
+        start = datetime(2025, 12, 1, tzinfo=UTC)
+        short = AnalyticsFilters(start=start, end=datetime(2025, 12, 1, 6, tzinfo=UTC))
+        self.assertEqual(select_latency_source(filters=short), "hourly")
+        self.assertEqual(select_latency_source(filters=AnalyticsFilters()), "daily")
+        self.assertEqual(select_latency_source(filters=short, exact=True), "raw")
+        self.assertEqual(select_latency_source(filters=AnalyticsFilters(method="GET")), "daily")
+
+    def test_bins_queries_read_rollups(self):
+        sql, params = latency_bins_sql(
+            granularity="hourly", filters=AnalyticsFilters(service="svc")
+        )
+        self.assertIn(f"FROM {HOURLY_LATENCY_CAGG}", sql)
+        self.assertIn("GROUP BY bin", sql)
+        self.assertEqual(params, ["svc"])
+
+        sql, params = latency_bins_by_endpoints_sql(
+            granularity="daily",
+            filters=AnalyticsFilters(service="svc"),
+            endpoints=[("svc", "/a"), ("svc", "/b")],
+        )
+        self.assertIn(f"FROM {DAILY_LATENCY_CAGG}", sql)
+        self.assertIn(f"JOIN {DIM_TABLE} d ON d.id = p.dim_id", sql)
+        self.assertEqual(params, ["svc", "svc", "/a", "svc", "/b"])
+
+    def test_raw_percentiles_one_column_per_quantile(self):
+        sql, _ = latency_percentiles_from_raw_sql(filters=AnalyticsFilters(), quantiles=(0.5, 0.99))
+        self.assertIn("percentile_cont(0.5)", sql)
+        self.assertIn("AS p99_latency_ms", sql)
@@ -350,7 +350,7 @@ class Step5AnalyticsApiTests(APITestCase):
     # Tests: KPI correctness
     # ----------------------------
     def test_kpis_error_rate_correct_and_p95_numeric(self):
-        # method=GET forces RAW path (so tests don't depend on caggs existing)
+        # method=GET is a rollup dimension: the default 24h window is stitched from rollups
         res = self.client.get(self.KPIS_URL, {"service": "api", "method": "GET"})
         self.assertEqual(res.status_code, status.HTTP_200_OK, res.data)
 
@@ -378,8 +378,7 @@ class Step5AnalyticsApiTests(APITestCase):
         self.assertIsNotNone(j["p95_latency_ms"])
         self.assertTrue(isinstance(j["p95_latency_ms"], (float, int)))
 
-        # method filter => raw
-        self.assertEqual(j["source"], "raw")
+        self.assertEqual(j["source"], "stitched")
 
     # ----------------------------
     # Tests: Top endpoints sorting + limit
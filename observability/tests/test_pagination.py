@@ -0,0 +1,125 @@
+# observability/tests/test_pagination.py
+from __future__ import annotations
+
+from datetime import timedelta
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
+
+from django.test import SimpleTestCase, override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from observability.models import ApiRequest
+from observability.pagination import KeysetPagination, keyset_after
+
+
+def _cursor(link: str | None) -> str | None:
+    if link is None:
+        return None
+    return parse_qs(urlparse(link).query)["cursor"][0]
+
+
+@mock.patch.object(KeysetPagination, "get_page_size", return_value=2)
+class KeysetPaginationTests(APITestCase):
+    LIST_URL = "/api/requests/"
+
+    def setUp(self):
+        super().setUp()
+        now = timezone.now()
+        same = now - timedelta(hours=3)  # two rows share a timestamp: id breaks the tie
+        specs = [
+            (now - timedelta(hours=5), "auth", 200),
+            (now - timedelta(hours=4), "billing", 500),
+            (same, "billing", 200),
+            (same, "auth", 404),
+            (now - timedelta(hours=1), "auth", 200),
+        ]
+        self.rows = [
+            ApiRequest.objects.create(
+                time=t,
+                service=svc,
+                endpoint="/x",
+                method="GET",
+                status_code=code,
+                latency_ms=10,
+                tags={},
+            )
+            for t, svc, code in specs
+        ]
+
+    def _walk(self, params: dict) -> tuple[list[int], list[dict]]:
+        ids: list[int] = []
+        pages: list[dict] = []
+        cursor = None
+        while True:
+            query = dict(params, pagination="cursor")
+            if cursor:
+                query["cursor"] = cursor
+            res = self.client.get(self.LIST_URL, query)
+            self.assertEqual(res.status_code, status.HTTP_200_OK, res.data)
+            self.assertNotIn("count", res.data)
+            pages.append(res.data)
+            ids += [r["id"] for r in res.data["results"]]
+            cursor = _cursor(res.data["next"])
+            if cursor is None:
+                return ids, pages
+
+    def test_walks_newest_first_without_gaps_or_duplicates(self, _page_size):
+        ids, pages = self._walk({})
+        expected = [r.id for r in sorted(self.rows, key=lambda r: (r.time, r.id), reverse=True)]
+        self.assertEqual(ids, expected)
+        self.assertEqual(len(pages), 3)
+        self.assertIsNone(pages[0]["previous"])
+
+    def test_previous_link_returns_the_prior_page(self, _page_size):
+        _, pages = self._walk({})
+        res = self.client.get(
+            self.LIST_URL, {"pagination": "cursor", "cursor": _cursor(pages[1]["previous"])}
+        )
+        self.assertEqual(res.data["results"], pages[0]["results"])
+        self.assertIsNone(res.data["previous"])
+
+    def test_column_ordering_and_filters(self, _page_size):
+        ids, _ = self._walk({"ordering": "service"})
+        by_service = sorted(self.rows, key=lambda r: (r.time, r.id), reverse=True)
+        by_service.sort(key=lambda r: r.service)
+        self.assertEqual(ids, [r.id for r in by_service])
+
+        ids, _ = self._walk({"ordering": "time", "service": "auth"})
+        auth = sorted((r for r in self.rows if r.service == "auth"), key=lambda r: (r.time, r.id))
+        self.assertEqual(ids, [r.id for r in auth])
+
+    def test_unsupported_ordering_and_bad_cursor(self, _page_size):
+        res = self.client.get(self.LIST_URL, {"pagination": "cursor", "ordering": "latency_ms"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.client.get(self.LIST_URL, {"cursor": "not-a-cursor"})
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+        # A cursor only continues the ordering it was issued for.
+        _, pages = self._walk({})
+        res = self.client.get(
+            self.LIST_URL, {"cursor": _cursor(pages[0]["next"]), "ordering": "time"}
+        )
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_page_numbers_stay_the_default(self, _page_size):
+        res = self.client.get(self.LIST_URL)
+        self.assertEqual(res.data["count"], len(self.rows))
+
+        with override_settings(APM_LIST_PAGINATION="cursor"):
+            res = self.client.get(self.LIST_URL)
+        self.assertNotIn("count", res.data)
+        self.assertIsNotNone(res.data["next"])
+
+
+class KeysetFilterTests(SimpleTestCase):
+    def test_mixed_direction_predicate(self):
+        q = keyset_after(("service", "-time", "-id"), ["a", "T", 7])
+        self.assertEqual(
+            str(q),
+            "(AND: ('service__gte', 'a'), (OR: ('service__gt', 'a'), "
+            "(AND: ('time__lt', 'T'), ('service', 'a')), "
+            "(AND: ('id__lt', 7), ('service', 'a'), ('time', 'T'))))",
+        )
@@ -0,0 +1,159 @@
+# observability/tests/test_query_planner.py
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+
+from django.db import connection
+from django.test import SimpleTestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from observability.analytics.planner import (
+    plan_range,
+    stitched_kpis_sql,
+    stitched_latency_bins_sql,
+    stitched_top_endpoints_sql,
+)
+from observability.analytics.sketch import latency_bin_sql
+from observability.analytics.sql import (
+    DAILY_DIM_CAGG,
+    HOURLY_DIM_CAGG,
+    HOURLY_LATENCY_CAGG,
+    MINUTE_DIM_CAGG,
+    AnalyticsFilters,
+)
+from observability.models import ApiRequest
+
+# Mon 13:27:30 -> Fri 09:10 (long past the minute retention)
+MON = datetime(2025, 12, 1, 13, 27, 30, tzinfo=UTC)
+FRI = datetime(2025, 12, 5, 9, 10, tzinfo=UTC)
+
+
+def _spans(plan):
+    return [(s.source, s.start, s.end) for s in plan.spans]
+
+
+class PlanRangeTests(SimpleTestCase):
+    def test_daily_body_hourly_edges_raw_tails(self):
+        plan = plan_range(MON, FRI)
+        self.assertEqual(
+            _spans(plan),
+            [
+                ("raw", MON, datetime(2025, 12, 1, 14, tzinfo=UTC)),
+                (
+                    "hourly",
+                    datetime(2025, 12, 1, 14, tzinfo=UTC),
+                    datetime(2025, 12, 2, tzinfo=UTC),
+                ),
+                ("daily", datetime(2025, 12, 2, tzinfo=UTC), datetime(2025, 12, 5, tzinfo=UTC)),
+                ("hourly", datetime(2025, 12, 5, tzinfo=UTC), datetime(2025, 12, 5, 9, tzinfo=UTC)),
+                ("raw", datetime(2025, 12, 5, 9, tzinfo=UTC), FRI + timedelta(microseconds=1)),
+            ],
+        )
+        self.assertEqual(plan.source, "stitched")
+
+    def test_minute_spans_inside_retention(self):
+        now = datetime(2025, 12, 5, 12, tzinfo=UTC)
+        start = datetime(2025, 12, 5, 9, 10, 20, tzinfo=UTC)
+        end = datetime(2025, 12, 5, 11, 45, 10, tzinfo=UTC)
+        kinds = [s.source for s in plan_range(start, end, now=now).spans]
+        self.assertEqual(kinds, ["raw", "minute", "hourly", "minute", "raw"])
+
+    def test_spans_are_contiguous_and_cover_the_range(self):
+        start = timezone.now() - timedelta(days=2, minutes=17, seconds=3)
+        end = timezone.now()
+        plan = plan_range(start, end)
+        self.assertEqual(plan.spans[0].start, start)
+        self.assertEqual(plan.spans[-1].end, end + timedelta(microseconds=1))
+        for a, b in zip(plan.spans, plan.spans[1:], strict=False):
+            self.assertEqual(a.end, b.start)
+
+    def test_aligned_days_use_one_source(self):
+        end = datetime(2025, 12, 7, tzinfo=UTC) - timedelta(microseconds=1)
+        plan = plan_range(datetime(2025, 12, 1, tzinfo=UTC), end)
+        self.assertEqual(plan.source, "daily")
+        self.assertEqual(plan.describe()[0]["end"], "2025-12-07T00:00:00Z")
+
+
+class StitchedSqlTests(SimpleTestCase):
+    def test_kpis_union_per_span(self):
+        plan = plan_range(MON, FRI)
+        sql, params = stitched_kpis_sql(
+            plan=plan, filters=AnalyticsFilters(service="svc", method="GET"), error_from=400
+        )
+        self.assertEqual(sql.count("UNION ALL"), len(plan.spans) - 1)
+        self.assertIn(f"FROM {DAILY_DIM_CAGG}", sql)
+        self.assertIn(f"FROM {HOURLY_DIM_CAGG}", sql)
+        self.assertNotIn(MINUTE_DIM_CAGG, sql)
+        self.assertIn("(SUM(s4xx) + SUM(s5xx))::bigint AS errors", sql)
+        # raw head: error_from, names, bounds; then hourly: names (dim subquery), bounds
+        self.assertEqual(params[:4], [400, "svc", "GET", MON])
+        self.assertEqual(params[5:9], ["svc", "GET", plan.spans[1].start, plan.spans[1].end])
+        self.assertEqual(len(params), sql.count("%s"))
+
+    def test_top_endpoints_and_latency_bins(self):
+        plan = plan_range(MON, FRI)
+        sql, params = stitched_top_endpoints_sql(plan=plan, filters=AnalyticsFilters(), limit=5)
+        self.assertIn("GROUP BY dim_id", sql)
+        self.assertEqual(params[-1], 5)
+        self.assertEqual(len(params), sql.count("%s"))
+
+        sql, params = stitched_latency_bins_sql(
+            plan=plan, filters=AnalyticsFilters(), endpoints=[("svc", "/a")]
+        )
+        self.assertIn(latency_bin_sql(), sql)
+        self.assertIn(f"FROM {HOURLY_LATENCY_CAGG}", sql)
+        self.assertIn("SELECT d.service, d.endpoint, s.bin", sql)
+        self.assertEqual(len(params), sql.count("%s"))
+
+
+class StitchedKpisEndpointTests(APITestCase):
+    URL = "/api/requests/kpis/"
+
+    def setUp(self):
+        super().setUp()
+        if connection.vendor != "postgresql":
+            self.skipTest("Stitched KPI tests require PostgreSQL + TimescaleDB.")
+
+        # Rows just inside and just outside each edge of an unaligned range.
+        self.start = (timezone.now() - timedelta(days=10)).replace(
+            hour=13, minute=27, second=0, microsecond=0
+        )
+        self.end = self.start + timedelta(days=3, hours=19, minutes=43)
+        times = [
+            self.start - timedelta(minutes=1),  # outside
+            self.start + timedelta(minutes=1),
+            self.start + timedelta(hours=1),
+            self.start + timedelta(days=2),
+            self.end - timedelta(minutes=1),
+            self.end + timedelta(minutes=1),  # outside
+        ]
+        ApiRequest.objects.bulk_create(
+            [
+                ApiRequest(
+                    time=t,
+                    service="svc",
+                    endpoint="/stitched",
+                    method="GET",
+                    status_code=500 if i % 2 else 200,
+                    latency_ms=10 * (i + 1),
+                    tags={},
+                )
+                for i, t in enumerate(times)
+            ]
+        )
+
+    def test_stitched_totals_match_the_exact_range(self):
+        params = {"service": "svc", "start": self.start.isoformat(), "end": self.end.isoformat()}
+        res = self.client.get(self.URL, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK, res.data)
+        self.assertEqual(res.data["source"], "stitched")
+        self.assertEqual((res.data["hits"], res.data["errors"]), (4, 2))
+        self.assertEqual(res.data["max_latency_ms"], 50)
+
+        # An explicit daily granularity reads whole buckets: the first partial day is
+        # dropped (bucket < start) and the last one counted past `end`.
+        res = self.client.get(self.URL, {**params, "granularity": "daily"})
+        self.assertEqual(res.data["source"], "daily")
+        self.assertEqual(res.data["hits"], 3)
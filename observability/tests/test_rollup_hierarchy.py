@@ -0,0 +1,180 @@
+# observability/tests/test_rollup_hierarchy.py
+from __future__ import annotations
+
+import importlib
+import io
+from datetime import UTC, datetime, timedelta
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+from django.utils import timezone
+
+from observability.analytics.sketch import latency_bin_sql
+from observability.analytics.sql import (
+    MINUTE_DIM_CAGG,
+    MINUTE_LATENCY_CAGG,
+    MINUTE_RETENTION,
+    STATUS_CLASSES,
+    STATUS_CODES,
+    AnalyticsFilters,
+    _auto_granularity,
+    kpis_from_cagg_sql,
+    latency_bins_sql,
+    select_kpis_source,
+    select_status_distribution_source,
+    status_distribution_from_raw_sql,
+)
+from observability.management.commands.bench_cagg_refresh import rollup_query
+
+migration = importlib.import_module("observability.migrations.0013_minute_rollups")
+late_data = importlib.import_module("observability.migrations.0015_minute_late_data")
+backfill = importlib.import_module("observability.migrations.0016_backfill_rollups")
+
+
+class _FakeCursor:
+    """Answers MIN(time) and to_regclass() lookups, records every statement."""
+
+    def __init__(self, first, missing=()):
+        self.first = first
+        self.missing = set(missing)
+        self.calls: list[tuple[str, list | None]] = []
+        self._row = None
+
+    def execute(self, sql, params=None):
+        self.calls.append((sql, params))
+        if "MIN(time)" in sql:
+            self._row = (self.first,)
+        elif "to_regclass" in sql:
+            self._row = (None if params[0] in self.missing else params[0],)
+
+    def fetchone(self):
+        return self._row
+
+    def refreshes(self):
+        return [
+            (sql.split("'")[1], params) for sql, params in self.calls if "refresh_continuous" in sql
+        ]
+
+
+class MinuteGranularityTests(SimpleTestCase):
+    def test_auto_picks_minute_for_short_recent_ranges(self):
+        now = timezone.now()
+        self.assertEqual(_auto_granularity(now - timedelta(hours=1), now), "minute")
+        self.assertEqual(_auto_granularity(now - timedelta(hours=24), now), "hourly")
+        self.assertEqual(_auto_granularity(now - timedelta(days=7), now), "daily")
+
+        # Short range, but older than the minute retention.
+        old = now - MINUTE_RETENTION - timedelta(hours=2)
+        self.assertEqual(_auto_granularity(old, old + timedelta(hours=1)), "hourly")
+
+    def test_explicit_minute_outside_retention_is_served_hourly(self):
+        now = timezone.now()
+        recent = AnalyticsFilters(start=now - timedelta(hours=3), end=now)
+        old = AnalyticsFilters(start=now - timedelta(days=10), end=now - timedelta(days=9))
+        self.assertEqual(select_kpis_source(filters=recent, granularity="minute"), "minute")
+        self.assertEqual(select_kpis_source(filters=old, granularity="minute"), "hourly")
+        self.assertEqual(
+            select_status_distribution_source(filters=recent, granularity="auto"),
+            ("minute", "minute"),
+        )
+
+    def test_minute_builders(self):
+        sql, _ = kpis_from_cagg_sql(granularity="minute", filters=AnalyticsFilters())
+        self.assertIn(f"FROM {MINUTE_DIM_CAGG}", sql)
+        sql, _ = latency_bins_sql(granularity="minute", filters=AnalyticsFilters())
+        self.assertIn(f"FROM {MINUTE_LATENCY_CAGG}", sql)
+        sql, _ = status_distribution_from_raw_sql(granularity="minute", filters=AnalyticsFilters())
+        self.assertIn("date_trunc('minute', time)", sql)
+
+
+class HierarchyMigrationTests(SimpleTestCase):
+    def test_frozen_copies_match_app(self):
+        self.assertEqual(migration.STATUS_CLASSES, STATUS_CLASSES)
+        self.assertEqual(migration.STATUS_CODES, STATUS_CODES)
+        self.assertEqual(migration.LATENCY_BIN_SQL, latency_bin_sql())
+        self.assertEqual(late_data.MINUTE_RETENTION, f"{MINUTE_RETENTION.days} days")
+
+    def test_levels_roll_up_from_the_finer_one(self):
+        for levels in (migration.DIM_LEVELS, migration.LATENCY_LEVELS):
+            self.assertIsNone(levels[0][2])
+            self.assertEqual([lvl[2] for lvl in levels[1:]], [lvl[0] for lvl in levels[:-1]])
+
+        hourly = migration._dim_select("1 hour", MINUTE_DIM_CAGG)
+        for column in migration.STATUS_COLUMNS:
+            self.assertIn(f"SUM({column})::bigint AS {column}", hourly)
+        self.assertIn("SUM(sum_latency_ms)::double precision / NULLIF(SUM(hits), 0)", hourly)
+        self.assertNotIn("sum_latency_ms", migration._dim_select("1 hour", None, with_sum=False))
+
+    def test_hourly_refresh_window_inside_minute_retention(self):
+        days = {view: int(start.split()[0]) for view, start, *_ in late_data.POLICIES}
+        self.assertLess(days["apirequest_hourly_dim"], int(late_data.MINUTE_RETENTION.split()[0]))
+
+    def test_minute_window_keeps_raw_fed_late_data_tolerance(self):
+        flat_hourly_window = migration.FLAT_POLICIES["1 hour"][0]
+        for view, start_offset, *_ in late_data.POLICIES:
+            self.assertEqual(start_offset, flat_hourly_window, view)
+
+    def test_bench_query_shape(self):
+        sql = rollup_query("1 hour", MINUTE_DIM_CAGG, "2 days")
+        self.assertIn(f"FROM {MINUTE_DIM_CAGG}", sql)
+        self.assertIn("time_bucket(INTERVAL '1 hour', bucket)", sql)
+
+
+class RollupBackfillMigrationTests(SimpleTestCase):
+    def test_frozen_copies_and_refresh_order(self):
+        self.assertFalse(backfill.Migration.atomic)
+        self.assertEqual(backfill.MINUTE_RETENTION, late_data.MINUTE_RETENTION)
+        order = {view: i for i, view in enumerate(backfill.ROLLUPS)}
+        self.assertEqual(
+            set(order), {lvl[0] for lvl in migration.DIM_LEVELS + migration.LATENCY_LEVELS}
+        )
+        for levels in (migration.DIM_LEVELS, migration.LATENCY_LEVELS):
+            for view, _, source, *_ in levels[1:]:
+                self.assertLess(order[source], order[view], view)
+
+    def test_whole_history_in_windows_oldest_first(self):
+        now = datetime(2025, 12, 20, 15, 30, tzinfo=UTC)
+        cursor = _FakeCursor(datetime(2025, 12, 3, 22, 0, tzinfo=UTC))
+
+        backfill.backfill(cursor, now)
+
+        windows = [
+            (datetime(2025, 12, 3, tzinfo=UTC), datetime(2025, 12, 10, tzinfo=UTC)),
+            (datetime(2025, 12, 10, tzinfo=UTC), datetime(2025, 12, 17, tzinfo=UTC)),
+            (datetime(2025, 12, 17, tzinfo=UTC), datetime(2025, 12, 20, tzinfo=UTC)),
+        ]
+        expected = [(view, [lo, hi]) for lo, hi in windows for view in backfill.ROLLUPS]
+        self.assertEqual(cursor.refreshes(), expected)
+        drops = [sql for sql, _ in cursor.calls if "drop_chunks" in sql]
+        self.assertEqual(len(drops), len(windows) * len(backfill.MINUTE_VIEWS))
+
+    def test_skips_missing_views_and_empty_tables(self):
+        cursor = _FakeCursor(None)
+        backfill.backfill(cursor, datetime(2025, 12, 20, tzinfo=UTC))
+        self.assertEqual(cursor.refreshes(), [])
+
+        now = datetime(2025, 12, 20, tzinfo=UTC)
+        cursor = _FakeCursor(datetime(2025, 12, 19, tzinfo=UTC), missing=backfill.MINUTE_VIEWS)
+        backfill.backfill(cursor, now)
+        self.assertEqual(
+            [view for view, _ in cursor.refreshes()],
+            [view for view in backfill.ROLLUPS if view not in backfill.MINUTE_VIEWS],
+        )
+        self.assertFalse(any("drop_chunks" in sql for sql, _ in cursor.calls))
+
+    def test_daily_command_refreshes_finer_levels_first(self):
+        cursor = _FakeCursor(None)
+        with mock.patch(
+            "observability.management.commands.refresh_apirequest_daily.connection"
+        ) as conn:
+            conn.vendor = "postgresql"
+            conn.cursor.return_value.__enter__.return_value = cursor
+            call_command(
+                "refresh_apirequest_daily",
+                start="2025-10-01",
+                end="2025-10-31",
+                stdout=io.StringIO(),
+            )
+
+        self.assertEqual([view for view, _ in cursor.refreshes()], list(backfill.ROLLUPS))
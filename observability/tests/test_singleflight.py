@@ -0,0 +1,155 @@
+# observability/tests/test_singleflight.py
+from __future__ import annotations
+
+import os
+import stat
+import tempfile
+import threading
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase
+
+from observability.analytics.singleflight import (
+    RESULT_SUFFIX,
+    SingleFlight,
+    fetch_all,
+    query_key,
+)
+
+
+def _run_threads(n: int, target) -> list[threading.Thread]:
+    threads = [threading.Thread(target=target) for _ in range(n)]
+    for t in threads:
+        t.start()
+    return threads
+
+
+class WorkerCoalescingTests(SimpleTestCase):
+    def test_concurrent_callers_share_one_execution(self):
+        flight = SingleFlight()
+        release = threading.Event()
+        calls: list[int] = []
+        results: list[object] = []
+
+        def query():
+            calls.append(1)
+            release.wait(5)
+            return [(42,)]
+
+        threads = _run_threads(8, lambda: results.append(flight.do("k", query)))
+        time.sleep(0.05)
+        release.set()
+        for t in threads:
+            t.join(5)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [[(42,)]] * 8)
+        # Finished calls are forgotten: the next caller runs again.
+        flight.do("k", query)
+        self.assertEqual(len(calls), 2)
+
+    def test_errors_reach_every_waiter(self):
+        flight = SingleFlight()
+        release = threading.Event()
+        errors: list[BaseException] = []
+
+        def query():
+            release.wait(5)
+            raise RuntimeError("boom")
+
+        def call():
+            try:
+                flight.do("k", query)
+            except RuntimeError as exc:
+                errors.append(exc)
+
+        threads = _run_threads(4, call)
+        time.sleep(0.05)
+        release.set()
+        for t in threads:
+            t.join(5)
+        self.assertEqual(len(errors), 4)
+
+    def test_key_covers_sql_and_params(self):
+        self.assertEqual(query_key("SELECT %s", [1]), query_key("SELECT %s", [1]))
+        self.assertNotEqual(query_key("SELECT %s", [1]), query_key("SELECT %s", [2]))
+
+
+class CrossWorkerTests(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_waiting_worker_reads_the_running_workers_result(self):
+        # Two coalescers on one directory behave like two worker processes.
+        worker_a = SingleFlight(self.tmp.name)
+        worker_b = SingleFlight(self.tmp.name)
+        started, release = threading.Event(), threading.Event()
+        out: dict[str, object] = {}
+
+        def slow():
+            started.set()
+            release.wait(5)
+            return [("a",)]
+
+        a = threading.Thread(target=lambda: out.setdefault("a", worker_a.do("k", slow)))
+        a.start()
+        started.wait(5)
+        b = threading.Thread(target=lambda: out.setdefault("b", worker_b.do("k", lambda: [("b",)])))
+        b.start()
+        time.sleep(0.05)
+        release.set()
+        a.join(5)
+        b.join(5)
+
+        self.assertEqual(out, {"a": [("a",)], "b": [("a",)]})
+
+    def test_old_results_are_not_reused(self):
+        flight = SingleFlight(self.tmp.name)
+        self.assertEqual(flight.do("k", lambda: 1), 1)
+        path = os.path.join(self.tmp.name, "k" + RESULT_SUFFIX)
+        self.assertTrue(os.path.exists(path))
+        # Uncontended: the query runs, the previous result is never read.
+        self.assertEqual(flight.do("k", lambda: 2), 2)
+
+    def test_directory_is_private(self):
+        path = os.path.join(self.tmp.name, "flights")
+        self.assertEqual(SingleFlight(path).directory, path)
+        self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o700)
+
+        os.chmod(path, 0o777)
+        self.assertEqual(SingleFlight(path).directory, path)
+        self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o700)
+
+    def test_foreign_directory_is_not_used(self):
+        with mock.patch("os.geteuid", return_value=os.geteuid() + 1):
+            with self.assertLogs("observability.analytics.singleflight", "WARNING"):
+                flight = SingleFlight(self.tmp.name)
+        self.assertIsNone(flight.directory)
+        self.assertEqual(flight.do("k", lambda: 1), 1)
+        self.assertEqual(os.listdir(self.tmp.name), [])
+
+    def test_wait_timeout_runs_the_query(self):
+        worker_a = SingleFlight(self.tmp.name)
+        worker_b = SingleFlight(self.tmp.name, wait_timeout=0.05)
+        started, release = threading.Event(), threading.Event()
+
+        def slow():
+            started.set()
+            release.wait(5)
+            return "a"
+
+        a = threading.Thread(target=lambda: worker_a.do("k", slow))
+        a.start()
+        started.wait(5)
+        try:
+            self.assertEqual(worker_b.do("k", lambda: "b"), "b")
+        finally:
+            release.set()
+            a.join(5)
+
+
+class FetchAllTests(TestCase):
+    def test_runs_directly_inside_a_transaction(self):
+        self.assertEqual(fetch_all("SELECT 1", []), [(1,)])
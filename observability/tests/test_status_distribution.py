@@ -0,0 +1,107 @@
+# observability/tests/test_status_distribution.py
+from __future__ import annotations
+
+import importlib
+from datetime import timedelta
+
+from django.db import connection
+from django.test import SimpleTestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from observability.analytics.sql import (
+    AnalyticsFilters,
+    errors_from_status_sql,
+    kpis_from_cagg_sql,
+    select_kpis_source,
+    select_status_distribution_source,
+    select_top_endpoints_source,
+    status_count_columns_sql,
+    top_endpoints_from_cagg_sql,
+)
+from observability.models import ApiRequest
+
+
+class StatusCounterSqlTests(SimpleTestCase):
+    def test_errors_expression_per_threshold(self):
+        self.assertEqual(errors_from_status_sql(500), "(SUM(s5xx))")
+        self.assertEqual(errors_from_status_sql(400), "(SUM(s4xx) + SUM(s5xx))")
+        self.assertEqual(errors_from_status_sql(401), "(SUM(s4xx) + SUM(s5xx) - SUM(c400))")
+        self.assertEqual(errors_from_status_sql(501), "(SUM(s5xx) - SUM(c500))")
+        # 402 / 501 have no counter, so >= 403 / >= 502 cannot be derived.
+        self.assertIsNone(errors_from_status_sql(403))
+        self.assertIsNone(errors_from_status_sql(502))
+
+    def test_selectors_stay_on_caggs_for_derivable_thresholds(self):
+        f = AnalyticsFilters()
+        self.assertEqual(select_kpis_source(filters=f, error_from=400), "daily")
+        self.assertEqual(select_kpis_source(filters=f, error_from=405), "raw")
+        self.assertEqual(select_top_endpoints_source(filters=f, error_from=401), "daily")
+        self.assertEqual(
+            select_status_distribution_source(filters=AnalyticsFilters(method="GET")),
+            ("daily", "daily"),
+        )
+
+    def test_builders_use_status_counters(self):
+        sql, _ = kpis_from_cagg_sql(
+            granularity="hourly", filters=AnalyticsFilters(), error_from=400
+        )
+        self.assertIn("COALESCE((SUM(s4xx) + SUM(s5xx)), 0)::bigint AS errors", sql)
+
+        sql, _ = top_endpoints_from_cagg_sql(
+            granularity="daily", filters=AnalyticsFilters(), error_from=501
+        )
+        self.assertIn("(SUM(s5xx) - SUM(c500)) AS errors", sql)
+
+        with self.assertRaises(ValueError):
+            kpis_from_cagg_sql(granularity="daily", filters=AnalyticsFilters(), error_from=405)
+
+    def test_counter_columns_match_migration(self):
+        migration = importlib.import_module("observability.migrations.0011_dim_status_counts")
+        self.assertEqual(status_count_columns_sql(), migration.STATUS_COUNT_COLUMNS)
+
+
+class StatusDistributionEndpointTests(APITestCase):
+    URL = "/api/requests/status-distribution/"
+
+    def setUp(self):
+        super().setUp()
+        if connection.vendor != "postgresql":
+            self.skipTest("Status distribution tests require PostgreSQL.")
+
+        now = timezone.now()
+        codes = [200, 200, 201, 301, 404, 404, 429, 500, 503]
+        ApiRequest.objects.bulk_create(
+            [
+                ApiRequest(
+                    time=now - timedelta(minutes=5 + i),
+                    service="svc",
+                    endpoint="/status",
+                    method="GET",
+                    status_code=code,
+                    latency_ms=10,
+                    tags={},
+                )
+                for i, code in enumerate(codes)
+            ]
+        )
+
+    def test_counts_per_class_and_code(self):
+        for params in ({"service": "svc"}, {"service": "svc", "method": "GET"}):
+            res = self.client.get(self.URL, {**params, "granularity": "daily"})
+            self.assertEqual(res.status_code, status.HTTP_200_OK, res.data)
+
+            classes = {"1xx": 0, "2xx": 0, "3xx": 0, "4xx": 0, "5xx": 0}
+            codes: dict[str, int] = {}
+            hits = 0
+            for bucket in res.data["results"]:
+                hits += bucket["hits"]
+                for k, n in bucket["classes"].items():
+                    classes[k] += n
+                for k, n in bucket["codes"].items():
+                    codes[k] = codes.get(k, 0) + n
+
+            self.assertEqual(hits, 9)
+            self.assertEqual(classes, {"1xx": 0, "2xx": 3, "3xx": 1, "4xx": 3, "5xx": 2})
+            self.assertEqual((codes["404"], codes["429"], codes["503"]), (2, 1, 1))
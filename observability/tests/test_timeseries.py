@@ -0,0 +1,118 @@
+# observability/tests/test_timeseries.py
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+
+from django.db import connection
+from django.test import SimpleTestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from observability.analytics.planner import bucket_window
+from observability.analytics.sql import (
+    TIMESERIES_STEPS,
+    AnalyticsFilters,
+    select_timeseries_source,
+    timeseries_sql,
+)
+from observability.models import ApiRequest
+
+
+class TimeseriesSourceTests(SimpleTestCase):
+    def test_coarsest_rollup_that_tiles_the_step(self):
+        recent = AnalyticsFilters(start=timezone.now() - timedelta(hours=6))
+        expected = {"1m": "minute", "5m": "minute", "15m": "minute", "1h": "hourly", "1d": "daily"}
+        for name, source in expected.items():
+            self.assertEqual(
+                select_timeseries_source(step=TIMESERIES_STEPS[name], filters=recent), source
+            )
+
+    def test_raw_past_minute_retention_or_for_underived_errors(self):
+        old = AnalyticsFilters(start=timezone.now() - timedelta(days=10))
+        self.assertEqual(select_timeseries_source(step=TIMESERIES_STEPS["5m"], filters=old), "raw")
+        self.assertEqual(
+            select_timeseries_source(step=TIMESERIES_STEPS["1h"], filters=old), "hourly"
+        )
+        self.assertEqual(
+            select_timeseries_source(step=TIMESERIES_STEPS["1d"], filters=old, error_from=405),
+            "raw",
+        )
+
+    def test_window_covers_whole_buckets(self):
+        start = datetime(2025, 12, 5, 10, 7, tzinfo=UTC)
+        end = datetime(2025, 12, 5, 10, 31, tzinfo=UTC)
+        self.assertEqual(
+            bucket_window(start, end, TIMESERIES_STEPS["15m"]),
+            (datetime(2025, 12, 5, 10, 0, tzinfo=UTC), datetime(2025, 12, 5, 10, 45, tzinfo=UTC)),
+        )
+
+    def test_gapfilled_sql_on_rollups_and_raw(self):
+        step = TIMESERIES_STEPS["5m"]
+        f = AnalyticsFilters(
+            start=datetime(2025, 12, 5, 10, tzinfo=UTC),
+            end=datetime(2025, 12, 5, 11, tzinfo=UTC),
+            service="svc",
+        )
+        sql, params = timeseries_sql(source="minute", step=step, filters=f, error_from=400)
+        self.assertIn("time_bucket_gapfill(%s::interval, bucket, %s, %s)", sql)
+        self.assertIn("FROM apirequest_minute_dim", sql)
+        self.assertIn("(SUM(s4xx) + SUM(s5xx))::bigint AS errors", sql)
+        self.assertEqual(params, [step, f.start, f.end, "svc", f.start, f.end])
+
+        sql, params = timeseries_sql(source="raw", step=step, filters=f, error_from=400)
+        self.assertIn("time_bucket_gapfill(%s::interval, time, %s, %s)", sql)
+        self.assertEqual(params, [step, f.start, f.end, 400, "svc", f.start, f.end])
+
+
+class TimeseriesEndpointTests(APITestCase):
+    URL = "/api/requests/timeseries/"
+
+    def setUp(self):
+        super().setUp()
+        if connection.vendor != "postgresql":
+            self.skipTest("Time series tests require PostgreSQL + TimescaleDB.")
+
+    def test_gap_filled_arrays(self):
+        end = timezone.now().replace(second=0, microsecond=0) - timedelta(minutes=30)
+        start = end - timedelta(minutes=29)
+        for minutes, code in ((1, 200), (1, 500), (20, 200)):
+            ApiRequest.objects.create(
+                time=start + timedelta(minutes=minutes),
+                service="svc-ts",
+                endpoint="/ts",
+                method="GET",
+                status_code=code,
+                latency_ms=10,
+                tags={},
+            )
+
+        res = self.client.get(
+            self.URL,
+            {
+                "service": "svc-ts",
+                "step": "5m",
+                "start": start.isoformat(),
+                "end": end.isoformat(),
+            },
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK, res.data)
+        data = res.data
+        self.assertEqual(len(data["timestamps"]), len(data["series"]["hits"]))
+        self.assertEqual(
+            set(data["series"]),
+            {"hits", "errors", "error_rate", "avg_latency_ms", "max_latency_ms"},
+        )
+        steps = {b - a for a, b in zip(data["timestamps"], data["timestamps"][1:], strict=False)}
+        self.assertEqual(steps, {300})
+        self.assertEqual(sum(data["series"]["hits"]), 3)
+        self.assertEqual(sum(data["series"]["errors"]), 1)
+        self.assertIn(0, data["series"]["hits"])  # gap-filled buckets
+
+    def test_rejects_unknown_step_and_too_many_points(self):
+        res = self.client.get(self.URL, {"step": "2m"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.client.get(self.URL, {"step": "1m", "start": "2025-01-01", "end": "2025-12-31"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("step", res.data)
@@ -1,6 +1,7 @@
 # observability/tests/utils.py
 from __future__ import annotations
 
+import json
 from collections.abc import Mapping, Sequence
 from typing import Any
 from urllib.parse import urlencode
@@ -80,3 +81,29 @@ def post_ingest(
         payload = list(events)
 
     return client.post(url, data=payload, format="json")
+
+
+def post_ingest_ndjson(
+    client: Any,
+    events: Sequence[Any],
+    ingest_url: str = DEFAULT_INGEST_URL,
+    **query: Any,
+):
+    """
+    Post events as NDJSON (one JSON document per line).
+    Items that are already str/bytes are sent verbatim (to inject broken lines).
+    """
+    lines: list[bytes] = []
+    for item in events:
+        if isinstance(item, bytes):
+            lines.append(item)
+        elif isinstance(item, str):
+            lines.append(item.encode("utf-8"))
+        else:
+            lines.append(json.dumps(item).encode("utf-8"))
+
+    url = ingest_url
+    if query:
+        url = f"{ingest_url}?{urlencode(query, doseq=True)}"
+
+    return client.post(url, data=b"\n".join(lines) + b"\n", content_type="application/x-ndjson")
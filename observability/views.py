@@ -1,12 +1,17 @@
 # observability/views.py
 from __future__ import annotations
 
+import math
+import uuid
+from collections.abc import Callable, Iterable, Iterator, Sized
+from contextlib import ExitStack, closing
 from datetime import UTC, datetime, time, timedelta
 from typing import Any
 
 from django.conf import settings
-from django.db import connection, transaction
+from django.db import connection, router
 from django.db.utils import ProgrammingError
+from django.http import StreamingHttpResponse
 from django.utils import timezone
 from django.utils.dateparse import parse_date, parse_datetime
 from django_filters import rest_framework as df_filters
@@ -19,31 +24,134 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from .ai.gemini import GeminiEmbedError, embed_texts
+from .analytics.cache import (
+    CACHE_STATUS_HEADER,
+    HIT,
+    CacheLookup,
+    bypass_requested,
+    cache_parts,
+    get_result_cache,
+    plan_ttl_source,
+)
+from .analytics.cost import choose_plan
+from .analytics.planner import (
+    QueryPlan,
+    bucket_window,
+    stitched_kpis_sql,
+    stitched_latency_bins_sql,
+    stitched_top_endpoints_sql,
+)
+from .analytics.singleflight import fetch_all
+from .analytics.sketch import QUANTILES, LatencySketch, quantile_field
 from .analytics.sql import (
+    TIMESERIES_STEPS,
     AnalyticsFilters,
     kpis_from_cagg_sql,
     kpis_from_raw_sql,
+    latency_bins_by_endpoints_sql,
+    latency_bins_sql,
+    latency_percentiles_from_raw_sql,
     p95_by_endpoints_from_raw_sql,
-    p95_global_from_raw_sql,
     select_kpis_source,
+    select_latency_source,
+    select_status_distribution_source,
+    select_timeseries_source,
     select_top_endpoints_source,
+    status_distribution_from_cagg_sql,
+    status_distribution_from_raw_sql,
+    timeseries_sql,
     top_endpoints_from_cagg_sql,
     top_endpoints_from_raw_sql,
 )
+from .export import DEFAULT_EXPORT_BATCH_SIZE, EXPORT_FORMATS, export_stream
 from .filters import ApiRequestFilter
 from .guards import postgres_required
+from .ingest import (
+    IngestRow,
+    ValidationResult,
+    validate_events,
+    validate_events_with_serializer,
+    write_rows,
+)
+from .ingest.buffer import BufferFull, IngestBuffer, get_ingest_buffer
+from .ingest.columnar import ColumnarStream, IngestColumnarParser, decode_frame
+from .ingest.compression import IngestJSONParser, IngestNDJSONParser
+from .ingest.dedup import get_dedup_filter
+from .ingest.endpoints import get_endpoint_normalizer
+from .ingest.idempotency import (
+    DONE,
+    IDEMPOTENCY_HEADER,
+    MAX_KEY_LENGTH,
+    REPLAYED_HEADER,
+    get_idempotency_ledger,
+)
+from .ingest.ndjson import NDJSONStream, iter_chunks
+from .ingest.parallel import (
+    ValidatedChunk,
+    iter_validated,
+    iter_validated_parallel,
+    validation_workers,
+)
+from .ingest.pipeline import prefetch, staging_table
+from .ingest.ratelimit import GLOBAL_BUCKET, Decision, get_rate_limiter
+from .ingest.spool import get_spool, write_or_spool
+from .metrics import ANALYTICS_CACHE_REQUESTS, INGEST_DUPLICATES_DROPPED, INGEST_IDEMPOTENCY
 from .models import ApiRequest, ApiRequestEmbedding
+from .pagination import ApiRequestPagination
 from .serializers import (
-    ApiRequestIngestItemSerializer,
     ApiRequestSerializer,
     DailyAggRowSerializer,
     DailyQueryParamsSerializer,
     KpiQueryParamsSerializer,
     SemanticSearchQueryParamsSerializer,
+    StatusDistributionQueryParamsSerializer,
+    TimeseriesQueryParamsSerializer,
     TopEndpointsQueryParamsSerializer,
 )
 
 
+def _cap(value: float | None, ceiling: int | None) -> float | None:
+    if value is None or ceiling is None:
+        return value
+    return min(value, float(ceiling))
+
+
+def _plan_metadata(plan: QueryPlan | None) -> dict[str, Any]:
+    """Response keys describing a stitched plan (spans and cost-model row estimate)."""
+    if plan is None:
+        return {}
+    out: dict[str, Any] = {"plan": plan.describe()}
+    if plan.estimated_rows is not None:
+        out["estimated_rows"] = plan.estimated_rows
+    return out
+
+
+class _IngestAborted(Exception):
+    """Raised inside the ingest pipeline to stop it and return `response`."""
+
+    def __init__(self, response: Response):
+        super().__init__(response.data)
+        self.response = response
+
+
+class _IngestProgress:
+    """Rows of one ingest request already made durable (committed, spooled or queued)."""
+
+    __slots__ = ("inserted", "spooled", "accepted")
+
+    def __init__(self):
+        self.inserted = 0
+        self.spooled = 0
+        self.accepted = 0
+
+    @property
+    def committed(self) -> int:
+        return self.inserted + self.spooled + self.accepted
+
+    def as_data(self) -> dict[str, Any]:
+        return {"inserted": self.inserted, "spooled": self.spooled, "accepted": self.accepted}
+
+
 class ApiRequestViewSet(viewsets.ModelViewSet):
     queryset = ApiRequest.objects.all()
     serializer_class = ApiRequestSerializer
@@ -54,6 +162,7 @@ class ApiRequestViewSet(viewsets.ModelViewSet):
         drf_filters.SearchFilter,
     ]
     filterset_class = ApiRequestFilter
+    pagination_class = ApiRequestPagination
 
     ordering_fields = [
         "time",
@@ -138,6 +247,89 @@ class ApiRequestViewSet(viewsets.ModelViewSet):
             {name: "Must be an ISO datetime or date (e.g. 2025-12-14T10:00:00Z or 2025-12-14)."}
         )
 
+    # ----------------------------
+    # Helpers (analytics result cache)
+    # ----------------------------
+    def _analytics_now(self) -> datetime:
+        """Default `end` of analytics ranges (stepped by the open-bucket TTL when cached)."""
+        now = timezone.now().astimezone(UTC)
+        cache = get_result_cache()
+        return cache.live_now(now) if cache is not None else now
+
+    def _cache_lookup(
+        self, request, view: str, parts: dict[str, Any], *, sources: Iterable[str]
+    ) -> tuple[CacheLookup | None, Response | None]:
+        """(lookup, cached response on a hit); (None, None) when the cache is off."""
+        cache = get_result_cache()
+        if cache is None:
+            return None, None
+        lookup = cache.lookup(
+            view, parts, sources=sources, bypass=bypass_requested(request.headers)
+        )
+        ANALYTICS_CACHE_REQUESTS.labels(view=view, result=lookup.status).inc()
+        if lookup.status == HIT:
+            return lookup, Response(
+                lookup.data, status=status.HTTP_200_OK, headers={CACHE_STATUS_HEADER: HIT}
+            )
+        return lookup, None
+
+    def _cache_store(
+        self, lookup: CacheLookup | None, response: Response, *, end: datetime, source: str
+    ) -> Response:
+        if lookup is None:
+            return response
+        if response.status_code == status.HTTP_200_OK:
+            lookup.store(response.data, end=end, source=source)
+        response[CACHE_STATUS_HEADER] = lookup.status
+        return response
+
+    # ----------------------------
+    # Helpers (latency percentiles)
+    # ----------------------------
+    def _latency_percentiles(
+        self,
+        filters: AnalyticsFilters,
+        *,
+        granularity: str,
+        exact: bool,
+        max_latency_ms: int | None,
+        plan: QueryPlan | None = None,
+    ) -> tuple[dict[str, float | None], str]:
+        """
+        p50/p90/p95/p99 from the merged latency sketches (rollups, stitched per
+        `plan` when given), or percentile_cont over raw when exact is requested or
+        the rollups are missing. Sketch values are capped at the exact max (a bin
+        representative can overshoot it by up to the 1% relative error).
+        """
+        source = select_latency_source(filters=filters, granularity=granularity, exact=exact)
+        if plan is not None and plan.source == "raw":
+            # The cost model put every span on raw rows: percentile_cont is exact there.
+            source = "raw"
+        if source != "raw":
+            try:
+                if plan is not None:
+                    source = plan.source
+                    sql, params = stitched_latency_bins_sql(plan=plan, filters=filters)
+                else:
+                    sql, params = latency_bins_sql(granularity=source, filters=filters)
+                sketch = LatencySketch.from_bins(fetch_all(sql, params))
+            except ProgrammingError:
+                # Missing latency CAGG => raw fallback
+                source = "raw"
+            else:
+                values = sketch.quantiles(QUANTILES)
+                return {
+                    quantile_field(q): _cap(v, max_latency_ms) for q, v in values.items()
+                }, source
+
+        sql, params = latency_percentiles_from_raw_sql(filters=filters)
+        rows = fetch_all(sql, params)
+        row = rows[0] if rows else (None,) * len(QUANTILES)
+        return {
+            quantile_field(q): float(v) if v is not None else None
+            for q, v in zip(QUANTILES, row, strict=True)
+        }, source
+
     def _parse_ingest_payload(self, data: Any) -> list[Any]:
         if isinstance(data, list):
             return data
@@ -154,11 +346,344 @@ class ApiRequestViewSet(viewsets.ModelViewSet):
 
         raise ValidationError({"detail": "Expected JSON list or object payload."})
 
+    def _ingest_validator(self):
+        if bool(getattr(settings, "APM_INGEST_FAST_VALIDATION", True)):
+            return validate_events
+        return validate_events_with_serializer
+
+    def _too_many_events_response(self, got: str, max_events: int) -> Response:
+        return Response(
+            {
+                "detail": f"Too many events: got {got}, max allowed is {max_events}.",
+                "max_events": max_events,
+            },
+            status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        )
+
+    def _strict_rejected_response(self, total: int, errors: list[dict[str, Any]]) -> Response:
+        return Response(
+            {
+                "detail": (
+                    "Strict mode enabled: payload contains invalid items. Nothing was inserted."
+                ),
+                "inserted": 0,
+                "rejected": total,
+                "errors": errors,
+            },
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    def _buffer_full_response(
+        self, exc: BufferFull, *, accepted: int, rejected: int, errors: list[dict[str, Any]]
+    ) -> Response:
+        """Async ingest: 503 + Retry-After; `accepted` rows were queued before the buffer filled."""
+        response = Response(
+            {"detail": str(exc), "accepted": accepted, "rejected": rejected, "errors": errors},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+        response["Retry-After"] = str(max(1, math.ceil(exc.retry_after)))
+        return response
+
+    def _rate_limited_response(self, decision: Decision, rejected: int) -> Response:
+        bucket = "global" if decision.bucket == GLOBAL_BUCKET else f"service {decision.bucket!r}"
+        response = Response(
+            {
+                "detail": f"Ingest rate limit exceeded ({bucket}).",
+                "retry_after": round(decision.retry_after, 3),
+                "rejected": rejected,
+            },
+            status=status.HTTP_429_TOO_MANY_REQUESTS,
+        )
+        response["Retry-After"] = str(max(1, math.ceil(decision.retry_after)))
+        return response
+
+    def _capped_chunks(self, chunks: Iterable[Sized], max_events: int) -> Iterator[Sized]:
+        total = 0
+        for chunk in chunks:
+            total += len(chunk)
+            if total > max_events:
+                raise _IngestAborted(
+                    self._too_many_events_response(f"more than {max_events}", max_events)
+                )
+            yield chunk
+
+    def _use_parallel(self, request, size: int | None) -> bool:
+        """
+        Shard validation over the process pool? ?parallel=true|false wins; otherwise
+        JSON payloads of at least APM_INGEST_PARALLEL_THRESHOLD events (size is None
+        for streamed bodies, whose length is unknown up front).
+        """
+        if validation_workers() < 2:
+            return False
+        threshold = int(getattr(settings, "APM_INGEST_PARALLEL_THRESHOLD", 20_000))
+        auto = size is not None and threshold > 0 and size >= threshold
+        return self._get_bool_qp(request, "parallel", default=auto)
+
+    def _validated_chunks(
+        self,
+        chunks: Iterable[Sized],
+        validate: Callable[..., ValidationResult],
+        *,
+        max_events: int,
+        max_errors: int,
+        parallel: bool,
+    ) -> Iterator[ValidatedChunk]:
+        chunks = self._capped_chunks(chunks, max_events)
+        if parallel:
+            return iter_validated_parallel(chunks, validate, max_errors=max_errors)
+        return iter_validated(chunks, validate, max_errors=max_errors)
+
+    def _ingest_stream(
+        self,
+        results: Iterable[ValidatedChunk],
+        *,
+        max_errors: int,
+        batch_size: int,
+        strict: bool,
+        buffer: IngestBuffer | None = None,
+        progress: _IngestProgress | None = None,
+    ) -> Response:
+        """
+        Pipelined ingest: chunk N is written while chunk N+1 is validated on a
+        prefetch thread (see _validated_chunks), so at most
+        APM_INGEST_PIPELINE_DEPTH + 2 chunks are resident whatever the body size.
+
+        - non-strict: every chunk commits on its own; no lock outlives a chunk.
+          If max_events is exceeded mid-stream the 413 reports what was inserted.
+        - strict: chunks go to a TEMP staging table and are published with one
+          INSERT ... SELECT only when the whole body is valid (all-or-nothing).
+        - async (`buffer`): non-strict chunks are queued as they are validated
+          (one batch id per request); strict bodies are collected and queued in
+          one submit at the end, and may not exceed the buffer's capacity.
+
+        `progress` is kept up to date as rows become durable, so the caller still
+        knows what was stored when the pipeline stops with an exception.
+        """
+        alias = router.db_for_write(ApiRequest)
+        depth = int(getattr(settings, "APM_INGEST_PIPELINE_DEPTH", 2))
+
+        normalizer = get_endpoint_normalizer()
+        dedup = get_dedup_filter()
+        limiter = get_rate_limiter()
+        spool = get_spool()
+
+        total = 0
+        inserted = 0
+        invalid = 0
+        duplicates = 0
+        spooled = 0
+        accepted = 0
+        batch_id = uuid.uuid4().hex
+        if progress is None:
+            progress = _IngestProgress()
+        errors: list[dict[str, Any]] = []
+        queued: list[IngestRow] = []
+        unpublished: list[bytes] = []
+
+        try:
+            with ExitStack() as stack:
+                stage = None
+                if strict and buffer is None:
+                    stage = stack.enter_context(staging_table(alias))
+
+                # closing(): an abort stops the prefetch thread before the response is sent.
+                validated = stack.enter_context(closing(prefetch(results, depth=depth)))
+                for size, result in validated:
+                    total += size
+                    errors.extend(result.errors[: max_errors - len(errors)])
+                    invalid += result.invalid
+
+                    if strict and invalid:
+                        # Keep reading to report totals; the staging table is dropped below.
+                        continue
+
+                    rows = result.rows
+                    if normalizer is not None:
+                        rows = normalizer.apply(rows)
+
+                    digests: list[bytes] = []
+                    if dedup is not None:
+                        rows, digests, dropped = dedup.split(rows)
+                        duplicates += dropped
+
+                    if limiter is not None:
+                        decision = limiter.admit(rows)
+                        if not decision.allowed:
+                            handled = inserted + accepted + spooled + duplicates
+                            raise _IngestAborted(
+                                self._rate_limited_response(decision, total - handled)
+                            )
+
+                    if buffer is not None and strict:
+                        queued.extend(rows)
+                        unpublished.extend(digests)
+                        if len(queued) > buffer.max_rows:
+                            full = BufferFull(
+                                f"Strict batch exceeds buffer capacity ({buffer.max_rows}).",
+                                retry_after=buffer.flush_interval,
+                            )
+                            raise _IngestAborted(
+                                self._buffer_full_response(
+                                    full,
+                                    accepted=0,
+                                    rejected=total,
+                                    errors=errors,
+                                )
+                            )
+                    elif buffer is not None:
+                        try:
+                            buffer.submit(rows, batch_id=batch_id)
+                        except BufferFull as exc:
+                            raise _IngestAborted(
+                                self._buffer_full_response(
+                                    exc,
+                                    accepted=accepted,
+                                    rejected=total - accepted - duplicates,
+                                    errors=errors,
+                                )
+                            ) from exc
+                        accepted += len(rows)
+                        progress.accepted = accepted
+                        if dedup is not None:
+                            # Queued rows will be stored: they count as seen.
+                            dedup.remember(digests)
+                    elif stage is not None:
+                        write_rows(
+                            rows,
+                            batch_size=batch_size,
+                            source="staging",
+                            using=alias,
+                            table=stage.name,
+                        )
+                        unpublished.extend(digests)
+                    elif spool is not None:
+                        written, n_spooled = write_or_spool(
+                            rows, spool=spool, batch_size=batch_size, source="api", using=alias
+                        )
+                        inserted += written.rows
+                        spooled += n_spooled
+                        progress.inserted, progress.spooled = inserted, spooled
+                        if dedup is not None:
+                            # Written or spooled, every row will be stored: they count as seen.
+                            dedup.remember(digests)
+                    else:
+                        inserted += write_rows(
+                            rows, batch_size=batch_size, source="api", using=alias
+                        ).rows
+                        progress.inserted = inserted
+                        if dedup is not None:
+                            # Only events that are stored count as seen.
+                            dedup.remember(digests)
+
+                if strict and invalid:
+                    raise _IngestAborted(self._strict_rejected_response(total, errors))
+                if stage is not None:
+                    inserted = stage.publish()
+                    progress.inserted = inserted
+        except _IngestAborted as aborted:
+            aborted.response.data.setdefault("inserted", inserted)
+            if buffer is not None:
+                aborted.response.data.setdefault("accepted", accepted)
+            return aborted.response
+        finally:
+            if duplicates:
+                INGEST_DUPLICATES_DROPPED.inc(duplicates)
+
+        if buffer is not None:
+            if queued:
+                try:
+                    buffer.submit(queued, batch_id=batch_id)
+                except BufferFull as exc:
+                    return self._buffer_full_response(
+                        exc, accepted=0, rejected=total - duplicates, errors=errors
+                    )
+                accepted = len(queued)
+                progress.accepted = accepted
+            response = Response(
+                {
+                    "batch_id": batch_id,
+                    "accepted": accepted,
+                    "rejected": total - accepted - duplicates,
+                    "errors": errors,
+                },
+                status=status.HTTP_202_ACCEPTED,
+            )
+        else:
+            data: dict[str, Any] = {
+                "inserted": inserted,
+                "rejected": total - inserted - spooled - duplicates,
+                "errors": errors,
+            }
+            if spool is not None:
+                data["spooled"] = spooled
+            # 202: part of the batch is durable on local disk but not in the database yet.
+            response = Response(
+                data, status=status.HTTP_202_ACCEPTED if spooled else status.HTTP_200_OK
+            )
+
+        if dedup is not None:
+            if response.status_code < 300:
+                dedup.remember(unpublished)
+            response.data["duplicates"] = duplicates
+        return response
+
     # ----------------------------
     # Step 2 endpoint: /api/requests/ingest/
     # ----------------------------
-    @action(detail=False, methods=["post"], url_path="ingest")
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="ingest",
+        parser_classes=[IngestJSONParser, IngestNDJSONParser, IngestColumnarParser],
+    )
     def ingest(self, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return self._ingest(request)
+
+        key = key.strip()
+        if not key or len(key) > MAX_KEY_LENGTH:
+            raise ValidationError({IDEMPOTENCY_HEADER: f"Must be 1..{MAX_KEY_LENGTH} characters."})
+
+        ledger = get_idempotency_ledger()
+        entry = ledger.begin(key)
+        if entry is not None:
+            if entry.get("state") == DONE:
+                INGEST_IDEMPOTENCY.labels(outcome="replayed").inc()
+                return Response(
+                    entry["data"], status=entry["status"], headers={REPLAYED_HEADER: "true"}
+                )
+            INGEST_IDEMPOTENCY.labels(outcome="in_progress").inc()
+            return Response(
+                {"detail": "A request with this Idempotency-Key is still being processed."},
+                status=status.HTTP_409_CONFLICT,
+                headers={"Retry-After": "1"},
+            )
+
+        progress = _IngestProgress()
+        try:
+            response = self._ingest(request, progress=progress)
+        except BaseException:
+            if progress.committed:
+                # Part of the body is stored: a retry with this key must not store it again.
+                data = {"detail": "Ingest failed after part of the batch was stored."}
+                ledger.complete(
+                    key, status.HTTP_500_INTERNAL_SERVER_ERROR, data | progress.as_data()
+                )
+            else:
+                ledger.abandon(key)
+            raise
+
+        retryable = response.status_code >= 500 or response.status_code == 429
+        if retryable and not progress.committed:
+            # Buffer full, rate limited, nothing stored yet: the client may retry with this key.
+            ledger.abandon(key)
+        else:
+            ledger.complete(key, response.status_code, response.data)
+            INGEST_IDEMPOTENCY.labels(outcome="stored").inc()
+        return response
+
+    def _ingest(self, request, *, progress: _IngestProgress | None = None):
         settings_max_events = int(getattr(settings, "APM_INGEST_MAX_EVENTS", 50_000))
         settings_max_errors = int(getattr(settings, "APM_INGEST_MAX_ERRORS", 25))
         settings_batch_size = int(getattr(settings, "APM_INGEST_BATCH_SIZE", 1000))
@@ -173,72 +698,80 @@ class ApiRequestViewSet(viewsets.ModelViewSet):
             request, "batch_size", settings_batch_size, min_value=1, max_value=max(1, max_events)
         )
         strict = self._get_bool_qp(request, "strict", default=False)
+        async_mode = self._get_bool_qp(
+            request, "async", default=bool(getattr(settings, "APM_INGEST_ASYNC", False))
+        )
+        buffer = get_ingest_buffer() if async_mode else None
+
+        if isinstance(request.data, ColumnarStream):
+            chunks, validate = request.data, decode_frame
+            parallel = self._use_parallel(request, None)
+        elif isinstance(request.data, NDJSONStream):
+            chunks, validate = iter_chunks(request.data, batch_size), self._ingest_validator()
+            parallel = self._use_parallel(request, None)
+        else:
+            events = self._parse_ingest_payload(request.data)
+            size = len(events)
+            if size > max_events:
+                return self._too_many_events_response(str(size), max_events)
+            # Decided once: the shard size and the pool must agree.
+            parallel = self._use_parallel(request, size)
+            chunk_size = batch_size
+            if parallel:
+                chunk_size = int(getattr(settings, "APM_INGEST_PARALLEL_SHARD_SIZE", 5000))
+            chunks, validate = iter_chunks(events, max(1, chunk_size)), self._ingest_validator()
+
+        results = self._validated_chunks(
+            chunks,
+            validate,
+            max_events=max_events,
+            max_errors=max_errors,
+            parallel=parallel,
+        )
+        return self._ingest_stream(
+            results,
+            max_errors=max_errors,
+            batch_size=batch_size,
+            strict=strict,
+            buffer=buffer,
+            progress=progress,
+        )
 
-        events = self._parse_ingest_payload(request.data)
-
-        if len(events) > max_events:
-            return Response(
-                {
-                    "detail": f"Too many events: got {len(events)}, max allowed is {max_events}.",
-                    "max_events": max_events,
-                },
-                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-            )
-
-        validated_rows: list[dict[str, Any]] = []
-        errors: list[dict[str, Any]] = []
-        invalid_found = False
-
-        for idx, item in enumerate(events):
-            if not isinstance(item, dict):
-                invalid_found = True
-                if len(errors) < max_errors:
-                    errors.append(
-                        {
-                            "index": idx,
-                            "errors": {
-                                "non_field_errors": ["Each event must be a JSON object/dict."]
-                            },
-                        }
-                    )
-                continue
-
-            ser = ApiRequestIngestItemSerializer(data=item)
-            if ser.is_valid():
-                validated_rows.append(ser.validated_data)
-            else:
-                invalid_found = True
-                if len(errors) < max_errors:
-                    errors.append({"index": idx, "errors": ser.errors})
-
-        if strict and invalid_found:
-            return Response(
-                {
-                    "detail": (
-                        "Strict mode enabled: payload contains invalid items. "
-                        "Nothing was inserted."
-                    ),
-                    "inserted": 0,
-                    "rejected": len(events),
-                    "errors": errors,
-                },
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-
-        instances: list[ApiRequest] = [ApiRequest(**row) for row in validated_rows]
-
-        inserted = 0
-        if instances:
-            with transaction.atomic():
-                ApiRequest.objects.bulk_create(instances, batch_size=batch_size)
-            inserted = len(instances)
+    # ----------------------------
+    # Export: /api/requests/export/
+    # ----------------------------
+    @action(detail=False, methods=["get"], url_path="export")
+    def export(self, request, *args, **kwargs):
+        """
+        Streams every row matching the list filters (ApiRequestFilter, search,
+        ordering) as NDJSON or CSV (?output=), optionally gzipped (?gzip=true).
+        No pagination: rows come off a server-side cursor one batch at a time.
+        """
+        fmt = (request.query_params.get("output") or "ndjson").strip().lower()
+        if fmt not in EXPORT_FORMATS:
+            raise ValidationError({"output": "Must be one of: ndjson, csv."})
+        gzip = self._get_bool_qp(request, "gzip", default=False)
+        batch_size = self._get_int_qp(
+            request,
+            "batch_size",
+            default=int(getattr(settings, "APM_EXPORT_BATCH_SIZE", DEFAULT_EXPORT_BATCH_SIZE)),
+            min_value=100,
+            max_value=50_000,
+        )
 
-        rejected = len(events) - inserted
+        queryset = self.filter_queryset(self.get_queryset())
+        # Resolve the read database now: the DB role routing context is reset
+        # before the response body is streamed.
+        queryset = queryset.using(queryset.db)
 
-        return Response(
-            {"inserted": inserted, "rejected": rejected, "errors": errors},
-            status=status.HTTP_200_OK,
+        response = StreamingHttpResponse(
+            export_stream(queryset, fmt=fmt, batch_size=batch_size, gzip=gzip),
+            content_type=EXPORT_FORMATS[fmt],
         )
+        response["Content-Disposition"] = f'attachment; filename="requests.{fmt}"'
+        if gzip:
+            response["Content-Encoding"] = "gzip"
+        return response
 
     # ----------------------------
     # Step 3 endpoint: /api/requests/hourly/
@@ -253,7 +786,7 @@ class ApiRequestViewSet(viewsets.ModelViewSet):
         start = self._get_dt_or_date_qp(request, "start", end_of_day=False)
         end = self._get_dt_or_date_qp(request, "end", end_of_day=True)
 
-        now = timezone.now().astimezone(UTC)
+        now = self._analytics_now()
         if end is None:
             end = now
         if start is None:
@@ -278,6 +811,19 @@ class ApiRequestViewSet(viewsets.ModelViewSet):
 
         where_sql = " AND ".join(where_clauses)
 
+        lookup, cached = self._cache_lookup(
+            request,
+            "hourly",
+            cache_parts(
+                AnalyticsFilters(start=start, end=end, service=service, endpoint=endpoint),
+                source="hourly",
+                limit=limit,
+            ),
+            sources=["hourly"],
+        )
+        if cached is not None:
+            return cached
+
         sql = f"""
             SELECT
                 bucket,
@@ -330,7 +876,9 @@ class ApiRequestViewSet(viewsets.ModelViewSet):
                 }
             )
 
-        return Response(results, status=status.HTTP_200_OK)
+        return self._cache_store(
+            lookup, Response(results, status=status.HTTP_200_OK), end=end, source="hourly"
+        )
 
     # ----------------------------
     # Step 5 endpoint: /api/requests/kpis/
@@ -344,7 +892,7 @@ class ApiRequestViewSet(viewsets.ModelViewSet):
         qp.is_valid(raise_exception=True)
         v = qp.validated_data
 
-        now = timezone.now().astimezone(UTC)
+        now = self._analytics_now()
         end = v.get("end") or now
         start = v.get("start") or (end - timedelta(hours=24))
 
@@ -368,31 +916,55 @@ class ApiRequestViewSet(viewsets.ModelViewSet):
         source = select_kpis_source(
             filters=filters_obj, granularity=granularity, error_from=error_from
         )
+        # auto => stitched daily/hourly/minute/raw spans (exact at unaligned edges),
+        # each span's source picked by the cost model
+        plan = (
+            choose_plan(start, end, filters_obj)
+            if granularity == "auto" and source != "raw"
+            else None
+        )
+        exact = self._get_bool_qp(request, "exact", default=False)
+
+        # Same normalized filters/source/range since the last CAGG refresh => cached body
+        ttl_source = plan_ttl_source(plan, source)
+        lookup, cached = self._cache_lookup(
+            request,
+            "kpis",
+            cache_parts(filters_obj, source=source, plan=plan, error_from=error_from, exact=exact),
+            sources=[span.source for span in plan.spans] if plan is not None else [source],
+        )
+        if cached is not None:
+            return cached
 
         # totals/errors/avg/max
         try:
-            if source in ("hourly", "daily"):
+            if plan is not None:
+                source = plan.source
+                totals_sql, totals_params = stitched_kpis_sql(
+                    plan=plan, filters=filters_obj, error_from=error_from
+                )
+            elif source != "raw":
                 totals_sql, totals_params = kpis_from_cagg_sql(
                     granularity=source,  # type: ignore[arg-type]
                     filters=filters_obj,
+                    error_from=error_from,
                 )
             else:
                 totals_sql, totals_params = kpis_from_raw_sql(
                     filters=filters_obj, error_from=error_from
                 )
 
-            with connection.cursor() as cursor:
-                cursor.execute(totals_sql, totals_params)
-                totals_row = cursor.fetchone()
+            totals_rows = fetch_all(totals_sql, totals_params)
+            totals_row = totals_rows[0] if totals_rows else None
         except ProgrammingError:
             # Missing CAGG or other SQL issue => raw fallback
             source = "raw"
+            plan = None
             totals_sql, totals_params = kpis_from_raw_sql(
                 filters=filters_obj, error_from=error_from
             )
-            with connection.cursor() as cursor:
-                cursor.execute(totals_sql, totals_params)
-                totals_row = cursor.fetchone()
+            totals_rows = fetch_all(totals_sql, totals_params)
+            totals_row = totals_rows[0] if totals_rows else None
 
         if not totals_row:
             hits = 0
@@ -408,27 +980,30 @@ class ApiRequestViewSet(viewsets.ModelViewSet):
             avg_latency_ms = float(avg_latency_ms) if avg_latency_ms is not None else None
             max_latency_ms = int(max_latency_ms) if max_latency_ms is not None else None
 
-        # p95 is always computed from RAW for correctness
-        p95_latency_ms = None
-        p95_sql, p95_params = p95_global_from_raw_sql(filters=filters_obj)
-        with connection.cursor() as cursor:
-            cursor.execute(p95_sql, p95_params)
-            row = cursor.fetchone()
-            if row:
-                p95_latency_ms = float(row[0]) if row[0] is not None else None
+        # Percentiles from the latency sketches (?exact=true => percentile_cont over raw)
+        percentiles, percentiles_source = self._latency_percentiles(
+            filters_obj,
+            granularity=granularity,
+            exact=exact,
+            max_latency_ms=max_latency_ms,
+            plan=plan,
+        )
 
-        return Response(
+        response = Response(
             {
                 "hits": hits,
                 "errors": errors,
                 "error_rate": error_rate,
                 "avg_latency_ms": avg_latency_ms,
-                "p95_latency_ms": p95_latency_ms,
+                **percentiles,
                 "max_latency_ms": max_latency_ms,
                 "source": source,
+                "percentiles_source": percentiles_source,
+                **_plan_metadata(plan),
             },
             status=status.HTTP_200_OK,
         )
+        return self._cache_store(lookup, response, end=end, source=ttl_source)
 
     # ----------------------------
     # Step 5 endpoint: /api/requests/top-endpoints/
@@ -443,7 +1018,7 @@ class ApiRequestViewSet(viewsets.ModelViewSet):
         qp.is_valid(raise_exception=True)
         v = qp.validated_data
 
-        now = timezone.now().astimezone(UTC)
+        now = self._analytics_now()
         end = v.get("end") or now
         start = v.get("start") or (end - timedelta(hours=24))
         if start > end:
@@ -475,6 +1050,32 @@ class ApiRequestViewSet(viewsets.ModelViewSet):
             error_from=error_from,
             sort_by=sort_by,
         )
+        plan = (
+            choose_plan(start, end, filters_obj)
+            if granularity == "auto" and source != "raw"
+            else None
+        )
+        exact = self._get_bool_qp(request, "exact", default=False)
+
+        ttl_source = plan_ttl_source(plan, source)
+        lookup, cached = self._cache_lookup(
+            request,
+            "top_endpoints",
+            cache_parts(
+                filters_obj,
+                source=source,
+                plan=plan,
+                error_from=error_from,
+                limit=limit,
+                sort_by=sort_by,
+                direction=direction,
+                with_p95=with_p95,
+                exact=exact,
+            ),
+            sources=[span.source for span in plan.spans] if plan is not None else [source],
+        )
+        if cached is not None:
+            return cached
 
         try:
             if source == "raw":
@@ -487,9 +1088,7 @@ class ApiRequestViewSet(viewsets.ModelViewSet):
                     direction=direction,
                     include_p95=include_p95,
                 )
-                with connection.cursor() as cursor:
-                    cursor.execute(sql, params)
-                    rows = cursor.fetchall()
+                rows = fetch_all(sql, params)
 
                 items: list[dict[str, Any]] = []
                 for r in rows:
@@ -512,35 +1111,49 @@ class ApiRequestViewSet(viewsets.ModelViewSet):
                         }
                     )
 
-                return Response({"source": source, "results": items}, status=status.HTTP_200_OK)
+                return self._cache_store(
+                    lookup,
+                    Response({"source": source, "results": items}, status=status.HTTP_200_OK),
+                    end=end,
+                    source=ttl_source,
+                )
 
-            # hourly/daily CAGG fast-path
-            sql, params = top_endpoints_from_cagg_sql(
-                granularity=source,  # type: ignore[arg-type]
-                filters=filters_obj,
-                limit=limit,
-                sort_by=sort_by,
-                direction=direction,
-            )
-            with connection.cursor() as cursor:
-                cursor.execute(sql, params)
-                rows = cursor.fetchall()
+            # minute/hourly/daily CAGG fast-path (stitched spans for auto)
+            if plan is not None:
+                source = plan.source
+                sql, params = stitched_top_endpoints_sql(
+                    plan=plan,
+                    filters=filters_obj,
+                    error_from=error_from,
+                    limit=limit,
+                    sort_by=sort_by,
+                    direction=direction,
+                )
+            else:
+                sql, params = top_endpoints_from_cagg_sql(
+                    granularity=source,  # type: ignore[arg-type]
+                    filters=filters_obj,
+                    error_from=error_from,
+                    limit=limit,
+                    sort_by=sort_by,
+                    direction=direction,
+                )
+            rows = fetch_all(sql, params)
 
         except ProgrammingError:
             # Missing CAGG -> raw fallback
             source = "raw"
+            plan = None
             include_p95 = with_p95
             sql, params = top_endpoints_from_raw_sql(
                 filters=filters_obj,
-                error_from=500,  # caggs are defined for >=500; fallback uses 500 for consistency
+                error_from=error_from,
                 limit=limit,
                 sort_by=sort_by if sort_by != "p95_latency_ms" else "hits",
                 direction=direction,
                 include_p95=include_p95,
             )
-            with connection.cursor() as cursor:
-                cursor.execute(sql, params)
-                rows = cursor.fetchall()
+            rows = fetch_all(sql, params)
 
             items: list[dict[str, Any]] = []
             for r in rows:
@@ -562,7 +1175,12 @@ class ApiRequestViewSet(viewsets.ModelViewSet):
                         "max_latency_ms": int(max_lat) if max_lat is not None else None,
                     }
                 )
-            return Response({"source": source, "results": items}, status=status.HTTP_200_OK)
+            return self._cache_store(
+                lookup,
+                Response({"source": source, "results": items}, status=status.HTTP_200_OK),
+                end=end,
+                source=ttl_source,
+            )
 
         # Parse CAGG rows
         items: list[dict[str, Any]] = []
@@ -582,32 +1200,254 @@ class ApiRequestViewSet(viewsets.ModelViewSet):
                 }
             )
 
-        # Optional p95 for returned endpoints only
+        # Optional p95 for returned endpoints only: merged latency sketches from the
+        # same rollup granularity (?exact=true => percentile_cont over raw).
         if with_p95 and endpoints_list:
-            p95_sql, p95_params = p95_by_endpoints_from_raw_sql(
-                filters=AnalyticsFilters(
-                    start=start,
-                    end=end,
-                    service=service,
-                    endpoint=endpoint,
-                    method=None,  # method would have forced raw
-                ),
-                endpoints=endpoints_list,
+            p95_filters = AnalyticsFilters(
+                start=start,
+                end=end,
+                service=service,
+                endpoint=endpoint,
+                method=method,
             )
-            with connection.cursor() as cursor:
-                cursor.execute(p95_sql, p95_params)
-                p95_rows = cursor.fetchall()
+            p95_map = None
+            if not exact:
+                p95_map = self._p95_by_endpoints_from_sketches(
+                    p95_filters, granularity=source, endpoints=endpoints_list, plan=plan
+                )
 
-            p95_map: dict[tuple[str, str], float] = {}
-            for svc, ep, p95_lat in p95_rows:
-                if p95_lat is not None:
-                    p95_map[(svc, ep)] = float(p95_lat)
+            if p95_map is None:
+                p95_sql, p95_params = p95_by_endpoints_from_raw_sql(
+                    filters=p95_filters,
+                    endpoints=endpoints_list,
+                )
+                p95_rows = fetch_all(p95_sql, p95_params)
+
+                p95_map = {}
+                for svc, ep, p95_lat in p95_rows:
+                    if p95_lat is not None:
+                        p95_map[(svc, ep)] = float(p95_lat)
 
             for item in items:
                 key = (item["service"], item["endpoint"])
-                item["p95_latency_ms"] = p95_map.get(key)
+                item["p95_latency_ms"] = _cap(p95_map.get(key), item["max_latency_ms"])
+
+        return self._cache_store(
+            lookup,
+            Response(
+                {"source": source, **_plan_metadata(plan), "results": items},
+                status=status.HTTP_200_OK,
+            ),
+            end=end,
+            source=ttl_source,
+        )
+
+    def _p95_by_endpoints_from_sketches(
+        self,
+        filters: AnalyticsFilters,
+        *,
+        granularity: str,
+        endpoints: list[tuple[str, str]],
+        plan: QueryPlan | None = None,
+    ) -> dict[tuple[str, str], float] | None:
+        """p95 per (service, endpoint) from the latency rollups; None if they are missing."""
+        if plan is not None:
+            sql, params = stitched_latency_bins_sql(plan=plan, filters=filters, endpoints=endpoints)
+        else:
+            sql, params = latency_bins_by_endpoints_sql(
+                granularity=granularity,  # type: ignore[arg-type]
+                filters=filters,
+                endpoints=endpoints,
+            )
+        try:
+            rows = fetch_all(sql, params)
+        except ProgrammingError:
+            return None
+
+        sketches: dict[tuple[str, str], LatencySketch] = {}
+        for svc, ep, b, n in rows:
+            sketches.setdefault((svc, ep), LatencySketch()).add_bin(int(b), int(n))
+        return {key: sk.quantile(0.95) for key, sk in sketches.items() if sk.count}
+
+    # ----------------------------
+    # Status distribution: /api/requests/status-distribution/
+    # ----------------------------
+    @action(detail=False, methods=["get"], url_path="status-distribution")
+    @postgres_required(
+        "Status distribution requires PostgreSQL and optionally TimescaleDB (CAGG fast-path)."
+    )
+    def status_distribution(self, request, *args, **kwargs):
+        qp = StatusDistributionQueryParamsSerializer(data=request.query_params)
+        qp.is_valid(raise_exception=True)
+        v = qp.validated_data
+
+        now = timezone.now().astimezone(UTC)
+        end = v.get("end") or now
+        start = v.get("start") or (end - timedelta(hours=24))
+        if start > end:
+            raise ValidationError({"detail": "`start` must be <= `end`."})
+
+        filters_obj = AnalyticsFilters(
+            start=start,
+            end=end,
+            service=v.get("service"),
+            endpoint=v.get("endpoint"),
+            method=v.get("method"),
+        )
+        source, width = select_status_distribution_source(
+            filters=filters_obj, granularity=v.get("granularity", "auto")
+        )
+
+        try:
+            if source == "raw":
+                sql, params = status_distribution_from_raw_sql(
+                    granularity=width, filters=filters_obj
+                )
+            else:
+                sql, params = status_distribution_from_cagg_sql(
+                    granularity=width, filters=filters_obj
+                )
+            with connection.cursor() as cursor:
+                cursor.execute(sql, params)
+                columns = [col[0] for col in cursor.description]
+                rows = cursor.fetchall()
+        except ProgrammingError:
+            # Missing CAGG => raw fallback
+            source = "raw"
+            sql, params = status_distribution_from_raw_sql(granularity=width, filters=filters_obj)
+            with connection.cursor() as cursor:
+                cursor.execute(sql, params)
+                columns = [col[0] for col in cursor.description]
+                rows = cursor.fetchall()
+
+        results: list[dict[str, Any]] = []
+        for row in rows:
+            data = dict(zip(columns, row, strict=True))
+            bucket = data.pop("bucket")
+            hits = data.pop("hits")
+            results.append(
+                {
+                    "bucket": bucket.astimezone(UTC).isoformat().replace("+00:00", "Z"),
+                    "hits": int(hits or 0),
+                    "classes": {
+                        f"{name[1]}xx": int(n or 0)
+                        for name, n in data.items()
+                        if name.startswith("s")
+                    },
+                    "codes": {
+                        name[1:]: int(n or 0) for name, n in data.items() if name.startswith("c")
+                    },
+                }
+            )
 
-        return Response({"source": source, "results": items}, status=status.HTTP_200_OK)
+        return Response(
+            {"source": source, "granularity": width, "results": results},
+            status=status.HTTP_200_OK,
+        )
+
+    # ----------------------------
+    # Time series: /api/requests/timeseries/
+    # ----------------------------
+    @action(detail=False, methods=["get"], url_path="timeseries")
+    @postgres_required(
+        "Time series requires PostgreSQL + TimescaleDB (time_bucket_gapfill, rollup CAGGs)."
+    )
+    def timeseries(self, request, *args, **kwargs):
+        qp = TimeseriesQueryParamsSerializer(data=request.query_params)
+        qp.is_valid(raise_exception=True)
+        v = qp.validated_data
+
+        now = self._analytics_now()
+        end = v.get("end") or now
+        start = v.get("start") or (end - timedelta(hours=24))
+        if start > end:
+            raise ValidationError({"detail": "`start` must be <= `end`."})
+
+        step_name = v.get("step", "1h")
+        step = TIMESERIES_STEPS[step_name]
+        error_from = int(v.get("error_from", 500))
+
+        # Whole step buckets covering [start, end]: [first, last + step)
+        first, finish = bucket_window(start, end, step)
+        points = (finish - first) // step
+        max_points = int(getattr(settings, "APM_TIMESERIES_MAX_POINTS", 5000))
+        if points > max_points:
+            raise ValidationError(
+                {
+                    "step": (
+                        f"{points} buckets of {step_name} exceed the maximum of {max_points};"
+                        " use a larger step or a shorter range."
+                    )
+                }
+            )
+
+        filters_obj = AnalyticsFilters(
+            start=first,
+            end=finish,
+            service=v.get("service"),
+            endpoint=v.get("endpoint"),
+            method=v.get("method"),
+        )
+        source = select_timeseries_source(step=step, filters=filters_obj, error_from=error_from)
+
+        lookup, cached = self._cache_lookup(
+            request,
+            "timeseries",
+            cache_parts(filters_obj, source=source, step=step_name, error_from=error_from),
+            sources=[source],
+        )
+        if cached is not None:
+            return cached
+
+        try:
+            sql, params = timeseries_sql(
+                source=source, step=step, filters=filters_obj, error_from=error_from
+            )
+            rows = fetch_all(sql, params)
+        except ProgrammingError:
+            # Missing CAGG => raw fallback
+            source = "raw"
+            sql, params = timeseries_sql(
+                source=source, step=step, filters=filters_obj, error_from=error_from
+            )
+            rows = fetch_all(sql, params)
+
+        # One array per series, aligned on `timestamps` (unix seconds, bucket start).
+        # Gap-filled buckets count 0 hits/errors and have no latency (null).
+        timestamps: list[int] = []
+        series: dict[str, list[Any]] = {
+            "hits": [],
+            "errors": [],
+            "error_rate": [],
+            "avg_latency_ms": [],
+            "max_latency_ms": [],
+        }
+        for bucket, hits, errors, avg_latency_ms, max_latency_ms in rows:
+            hits = int(hits or 0)
+            errors = int(errors or 0)
+            timestamps.append(int(bucket.timestamp()))
+            series["hits"].append(hits)
+            series["errors"].append(errors)
+            series["error_rate"].append(errors / hits if hits else 0.0)
+            series["avg_latency_ms"].append(
+                float(avg_latency_ms) if avg_latency_ms is not None else None
+            )
+            series["max_latency_ms"].append(
+                int(max_latency_ms) if max_latency_ms is not None else None
+            )
+
+        response = Response(
+            {
+                "step": step_name,
+                "source": source,
+                "start": first.astimezone(UTC).isoformat().replace("+00:00", "Z"),
+                "end": finish.astimezone(UTC).isoformat().replace("+00:00", "Z"),
+                "timestamps": timestamps,
+                "series": series,
+            },
+            status=status.HTTP_200_OK,
+        )
+        return self._cache_store(lookup, response, end=end, source=source)
 
     # ----------------------------
     # Embeddings: /api/requests/semantic-search/
@@ -690,7 +1530,7 @@ class ApiRequestViewSet(viewsets.ModelViewSet):
         service = v.get("service")
         endpoint = v.get("endpoint")
 
-        now = timezone.now().astimezone(UTC)
+        now = self._analytics_now()
         if end is None:
             end = now
         if start is None:
@@ -712,6 +1552,19 @@ class ApiRequestViewSet(viewsets.ModelViewSet):
 
         where_sql = " AND ".join(where_clauses)
 
+        lookup, cached = self._cache_lookup(
+            request,
+            "daily",
+            cache_parts(
+                AnalyticsFilters(start=start, end=end, service=service, endpoint=endpoint),
+                source="daily",
+                limit=limit,
+            ),
+            sources=["daily"],
+        )
+        if cached is not None:
+            return cached
+
         sql = f"""
             SELECT
                 bucket,
@@ -768,7 +1621,9 @@ class ApiRequestViewSet(viewsets.ModelViewSet):
             )
 
         out = DailyAggRowSerializer(items, many=True)
-        return Response(out.data, status=status.HTTP_200_OK)
+        return self._cache_store(
+            lookup, Response(out.data, status=status.HTTP_200_OK), end=end, source="daily"
+        )
 
 
 class HealthView(APIView):